@@ -1,4 +1,42 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+
+# availability -> (status, min score inclusive, max score exclusive)
+AVAILABILITY_BANDS: Dict[str, Tuple[str, Optional[float], Optional[float]]] = {
+    "UNAVAILABLE": ("Unavailable", None, 60),
+    "LIMITED": ("Caution", 60, 75),
+    "AVAILABLE": ("Fresh", 75, None),
+}
+
+
+def score_band(
+    availability: Optional[str] = None,
+    status: Optional[str] = None,
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Freshness score range [min, max) that decide_menu_item maps to the
+    given availability and/or status. Used to filter on precomputed
+    scores. Raises ValueError for unknown values.
+    """
+    if availability is None and status is None:
+        return None, None
+
+    statuses = {band[0].lower() for band in AVAILABILITY_BANDS.values()}
+
+    if availability is not None and availability.upper() not in AVAILABILITY_BANDS:
+        raise ValueError(f"Unknown availability '{availability}'")
+    if status is not None and status.lower() not in statuses:
+        raise ValueError(f"Unknown status '{status}'")
+
+    for key, (band_status, low, high) in AVAILABILITY_BANDS.items():
+        if availability is not None and key != availability.upper():
+            continue
+        if status is not None and band_status.lower() != status.lower():
+            continue
+        return low, high
+
+    # Contradictory availability + status: empty range
+    return 0, 0
 
 
 def decide_menu_item(
@@ -17,15 +55,9 @@ def decide_menu_item(
     # -------------------------
     freshness_score = freshness["score"]
 
-    if freshness_score < 60:
-        availability = "UNAVAILABLE"
-        status = "Unavailable"
-    elif freshness_score < 75:
-        availability = "LIMITED"
-        status = "Caution"
-    else:
-        availability = "AVAILABLE"
-        status = "Fresh"
+    for availability, (status, low, high) in AVAILABILITY_BANDS.items():
+        if high is None or freshness_score < high:
+            break
 
     # -------------------------
     # 2. Priority (ordering)
@@ -1,3 +1,6 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -5,9 +8,90 @@ from app.routes.menu import router as menu_router
 from app.routes.feedback import router as feedback_router
 from app.routes.insight import router as insight_router
 from app.routes.chat import router as chat_router
+from app.routes.metrics import router as metrics_router
+from app.routes.analytics import router as analytics_router
+from app.routes.sensors import router as sensors_router
+from app.services.postgres import get_pool, close_pool
+from app.services.async_postgres import get_async_pool, close_async_pool
+from app.services.scheduler import start_scheduler, shutdown_scheduler
+from app.services.freshness_snapshot import schedule_snapshot_refresh
+from app.services.freshness_listener import (
+    start_freshness_listener,
+    stop_freshness_listener,
+)
+from app.services.insight_warmup import (
+    insight_warmup_enabled,
+    start_insight_warmup,
+    stop_insight_warmup,
+)
+from app.services.log_writer import start_log_writer, stop_log_writer
+from app.services.blob_store import start_blob_store
+from app.services.partition_manager import start_partition_manager
+from app.services.sensor_ingest import start_sensor_ingest
+from app.services.telemetry_buffer import (
+    start_telemetry_buffer,
+    stop_telemetry_buffer,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the DB pool (best effort — routes still connect lazily)
+    try:
+        get_pool().open()
+    except Exception as e:
+        print("DB POOL WARMUP FAILED:", e)
+
+    try:
+        await get_async_pool()
+    except Exception as e:
+        print("ASYNC DB POOL WARMUP FAILED:", e)
+
+    # Background freshness snapshot (set FRESHNESS_SNAPSHOT_ENABLED=0 to disable)
+    if os.getenv("FRESHNESS_SNAPSHOT_ENABLED", "1") == "1":
+        # Regenerate changed insights after each publish (subscribe first)
+        if insight_warmup_enabled():
+            start_insight_warmup()
+
+        schedule_snapshot_refresh()
+
+        # Incremental re-scoring on ingredient / event changes (LISTEN/NOTIFY)
+        if os.getenv("FRESHNESS_LISTENER_ENABLED", "1") == "1":
+            start_freshness_listener()
+
+    # Deduplicated prompt / response storage (AI_BLOB_STORE=0 to keep full text)
+    start_blob_store()
+
+    # Log table partitions, retention and hourly rollups
+    # (PARTITION_MANAGER_ENABLED=0 to disable; tables are converted once
+    # with `python -m app.services.partition_manager --migrate`)
+    start_partition_manager()
+
+    # Latest storage reading per ingredient (bulk sensor ingestion)
+    start_sensor_ingest()
+
+    # In-memory sensor telemetry rings + downsampled persistence
+    # (TELEMETRY_BUFFER_ENABLED=0 to disable)
+    start_telemetry_buffer()
+
+    # Write-behind logging (LOG_WRITE_BEHIND=0 to insert inline)
+    start_log_writer()
+
+    start_scheduler()
+
+    yield
+
+    stop_freshness_listener()
+    stop_insight_warmup()
+    shutdown_scheduler()
+    # Flush queued log records / telemetry buckets while the pool is still open
+    stop_log_writer()
+    stop_telemetry_buffer()
+    await close_async_pool()
+    close_pool()
 
 
-app = FastAPI(title="AI Food Menu API")
+app = FastAPI(title="AI Food Menu API", lifespan=lifespan)
 
 
 # CORS — allow frontend (Vercel) + local dev
@@ -17,6 +101,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "ETag",
+        "X-Freshness-Source",
+        "X-Freshness-Age",
+        "X-Next-Cursor",
+    ],
 )
 
 
@@ -25,6 +115,9 @@ app.include_router(menu_router)
 app.include_router(feedback_router)
 app.include_router(insight_router)
 app.include_router(chat_router)
+app.include_router(metrics_router)
+app.include_router(analytics_router)
+app.include_router(sensors_router)
 
 
 # Health check (optional but useful)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Query
+import asyncpg
+
+from app.services.log_rollups import dish_hourly, dish_summaries
+
+router = APIRouter()
+
+
+# ----------------------------
+# Dashboards (hourly rollups, never the raw log tables)
+# ----------------------------
+
+@router.get("/analytics/dishes")
+async def get_dish_analytics(hours: int = Query(24, ge=1, le=24 * 366)):
+    """
+    Per dish interactions, average freshness and sentiment
+    over the last `hours` hours.
+    """
+    try:
+        dishes = await dish_summaries(hours)
+    except (RuntimeError, asyncpg.PostgresError):
+        raise HTTPException(status_code=500, detail="Analytics unavailable")
+
+    return {"hours": hours, "dishes": dishes}
+
+
+@router.get("/analytics/dishes/{slug}/hourly")
+async def get_dish_hourly_analytics(slug: str, hours: int = Query(48, ge=1, le=24 * 93)):
+    """
+    Hourly series of one dish (hours without activity omitted).
+    """
+    try:
+        series = await dish_hourly(slug, hours)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    except (RuntimeError, asyncpg.PostgresError):
+        raise HTTPException(status_code=500, detail="Analytics unavailable")
+
+    return {"id": slug, "hours": hours, "series": series}
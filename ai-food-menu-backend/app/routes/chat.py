@@ -1,10 +1,20 @@
-from fastapi import APIRouter, HTTPException
+import time
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from context_object.menu_context import MenuContextBuilder
+from context_object.async_menu_context import AsyncMenuContextBuilder
+from context_object.freshness_engine import FreshnessEngine
 from llm.prompt_builder import MenuPromptBuilder
-from llm.llm_client import LLMClient
-from app.services.ai_logger import log_ai_interaction
+from llm.circuit_breaker import CircuitOpenError, route_available
+from llm.degraded_answers import DegradedAnswers
+from llm.llm_client import LLMClient, LLMDisconnectedError, LLMTimeoutError
+from llm.llm_metrics import llm_latency
+from llm.single_flight import single_flight_for
+from llm.chat_cache import chat_cache, context_version
+from app.services.async_ai_logger import log_ai_interaction
+from app.services.sse import SSE_HEADERS, SSE_MEDIA_TYPE, sse_event
 
 # ✅ Router MUST be defined before decorators
 router = APIRouter()
@@ -17,46 +27,233 @@ class ChatRequest(BaseModel):
     question: str
 
 
+# ----------------------------
+# Shared steps
+# ----------------------------
+async def _prepare_chat(slug: str, question: str):
+    """
+    Dish context, chat prompt and the dish's context version.
+    """
+    context = await AsyncMenuContextBuilder.get_menu_context(slug)
+
+    prompt_inputs = {
+        "menu": context["menu"],
+        "ingredients": context["ingredients"],
+    }
+
+    version = context_version(
+        MenuPromptBuilder.build_prompt({**prompt_inputs, "user_question": ""})
+    )
+    prompt = MenuPromptBuilder.build_prompt(
+        {**prompt_inputs, "user_question": question},
+        endpoint="chat",
+    )
+
+    return context, prompt, version
+
+
+def _degraded_chat(context: dict) -> dict:
+    """
+    Templated answer from the dish's freshness report while the LLM
+    circuit is open (not cached or logged).
+    """
+    report = FreshnessEngine.score_menu(context)
+    payload = MenuPromptBuilder.build_insight_payload(context, report)
+
+    return {
+        "text": DegradedAnswers.answer("chat", payload),
+        "cached": False,
+        "degraded": True,
+    }
+
+
+async def _finish_chat(
+    slug: str,
+    context: dict,
+    version: str,
+    question: str,
+    prompt: str,
+    response: str,
+    llm_ms: float,
+    model_name: str,
+):
+    """Cache + log a completed answer."""
+    chat_cache.put(slug, version, question, response, llm_ms)
+
+    await log_ai_interaction(
+        menu_id=context["menu"]["menu_id"],
+        prompt=prompt,
+        response=response,
+        freshness_score=None,
+        risk_level=None,
+        model_name=model_name,
+    )
+
+
 # ----------------------------
 # Chat route
 # ----------------------------
 @router.post("/menu/{slug}/chat")
-def chat_about_menu_item(slug: str, payload: ChatRequest):
+async def chat_about_menu_item(slug: str, payload: ChatRequest, request: Request):
     """
     LLM-powered chat about a menu item using slug-based routing.
+
+    Near-duplicate questions about the same dish context are answered
+    from the semantic chat cache. While every model's circuit breaker
+    is open, a templated freshness summary is returned with
+    "degraded": true.
     """
 
     try:
-        # 1️⃣ Build DB-backed context
-        context = MenuContextBuilder.get_menu_context(slug)
-
-        # 2️⃣ Build prompt (RAG)
-        prompt = MenuPromptBuilder.build_prompt({
-            "menu": context["menu"],
-            "ingredients": context["ingredients"],
-            "user_question": payload.question,
-        })
+        # 1️⃣ Build DB-backed context + prompt (RAG)
+        context, prompt, version = await _prepare_chat(slug, payload.question)
+
+        # 2️⃣ Semantic cache, scoped to this exact dish context
+        cached = chat_cache.lookup(slug, version, payload.question)
+        if cached is not None:
+            return {"text": cached[0], "cached": True, "degraded": False}
+
+        # 3️⃣ LLM unavailable -> templated answer, no call
+        if not route_available("chat"):
+            return _degraded_chat(context)
 
-        # 3️⃣ Call LLM
-        response = LLMClient.generate(prompt)
+        # 4️⃣ Call LLM
+        started = time.perf_counter()
+        response, model_name = await LLMClient.agenerate_with_model(
+            prompt,
+            route="chat",
+            disconnected=request.is_disconnected,
+            flight=single_flight_for("chat"),
+        )
+        llm_ms = (time.perf_counter() - started) * 1000
+        llm_latency.record("chat", llm_ms, llm_ms)
 
-        # 4️⃣ Log interaction
-        log_ai_interaction(
-            menu_id=context["menu"]["menu_id"],
-            prompt=prompt,
-            response=response,
-            freshness_score=None,
-            risk_level=None,
+        # 5️⃣ Cache + log interaction
+        await _finish_chat(
+            slug,
+            context,
+            version,
+            payload.question,
+            prompt,
+            response,
+            llm_ms,
+            model_name,
         )
 
-        return {"text": response}
+        return {"text": response, "cached": False, "degraded": False}
 
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    except CircuitOpenError:
+        return _degraded_chat(context)
+
+    except LLMTimeoutError:
+        raise HTTPException(status_code=504, detail="LLM timed out")
+
+    except LLMDisconnectedError:
+        # Nobody is listening; skip caching and logging
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
     except Exception as e:
         print("CHAT ERROR:", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to generate chat response"
         )
+
+
+# ----------------------------
+# Streaming chat route (SSE)
+# ----------------------------
+@router.post("/menu/{slug}/chat/stream")
+async def stream_chat_about_menu_item(slug: str, payload: ChatRequest):
+    """
+    SSE variant of the chat endpoint.
+
+    Events: `token` {"text"} as chunks arrive, then `done`
+    {"cached", "degraded", "ttft_ms", "total_ms"} (or `error`). The
+    answer is cached and logged only once the stream has completed.
+    """
+
+    try:
+        context, prompt, version = await _prepare_chat(slug, payload.question)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="DB unavailable")
+
+    cached = chat_cache.lookup(slug, version, payload.question)
+
+    async def events():
+        started = time.perf_counter()
+
+        def instant(text: str, cached: bool, degraded: bool):
+            # Whole answer in one token event
+            elapsed = round((time.perf_counter() - started) * 1000, 3)
+            return [
+                sse_event("token", {"text": text}),
+                sse_event("done", {
+                    "cached": cached,
+                    "degraded": degraded,
+                    "ttft_ms": elapsed,
+                    "total_ms": elapsed,
+                }),
+            ]
+
+        if cached is not None:
+            for event in instant(cached[0], True, False):
+                yield event
+            return
+
+        if not route_available("chat"):
+            for event in instant(_degraded_chat(context)["text"], False, True):
+                yield event
+            return
+
+        parts = []
+        used = {}
+        ttft_ms = None
+
+        try:
+            async for text in LLMClient.astream(prompt, route="chat", used=used):
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+        except CircuitOpenError:
+            # Tripped since the check above; nothing was streamed yet
+            for event in instant(_degraded_chat(context)["text"], False, True):
+                yield event
+            return
+        except LLMTimeoutError:
+            yield sse_event("error", {"detail": "LLM timed out"})
+            return
+        except Exception as e:
+            print("CHAT STREAM ERROR:", e)
+            yield sse_event("error", {"detail": "Failed to generate chat response"})
+            return
+
+        total_ms = (time.perf_counter() - started) * 1000
+        ttft_ms = total_ms if ttft_ms is None else ttft_ms
+        llm_latency.record("chat_stream", ttft_ms, total_ms)
+
+        yield sse_event("done", {
+            "cached": False,
+            "degraded": False,
+            "ttft_ms": round(ttft_ms, 3),
+            "total_ms": round(total_ms, 3),
+        })
+
+        await _finish_chat(
+            slug,
+            context,
+            version,
+            payload.question,
+            prompt,
+            "".join(parts).strip(),
+            total_ms,
+            used["model"],
+        )
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
@@ -1,8 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from rlhf.feedback_analyzer import FeedbackAnalyzer
-from app.services.ai_logger import log_feedback
+from app.services.async_ai_logger import log_feedback
+from context_object.async_menu_context import AsyncMenuContextBuilder
 
 router = APIRouter()
 
@@ -20,17 +21,26 @@ class FeedbackRequest(BaseModel):
 # ----------------------------
 
 @router.post("/menu/{menu_id}/feedback")
-def submit_feedback(menu_id: str, payload: FeedbackRequest):
+async def submit_feedback(menu_id: str, payload: FeedbackRequest):
     """
-    Receives human feedback from frontend (chatbot / feedback UI)
+    Receives human feedback from frontend (chatbot / feedback UI).
+    `menu_id` may be the dish slug (what the frontend sends) or its id.
     """
 
-    # 1️⃣ Analyze feedback (NLP + RL signal)
+    # 1️⃣ Resolve the dish (feedback_logs.menu_id is an INT)
+    try:
+        resolved_id = await AsyncMenuContextBuilder.resolve_menu_id(menu_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="DB unavailable")
+
+    # 2️⃣ Analyze feedback (NLP + RL signal)
     analysis = FeedbackAnalyzer.analyze(payload.text)
 
-    # 2️⃣ Persist feedback for RLHF + auditing
-    log_feedback(
-        menu_id=menu_id,
+    # 3️⃣ Persist feedback for RLHF + auditing
+    await log_feedback(
+        menu_id=resolved_id,
         feedback_text=payload.text,
         sentiment=analysis["sentiment"],
         tags=analysis["tags"],
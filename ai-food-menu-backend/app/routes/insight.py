@@ -1,49 +1,264 @@
-from fastapi import APIRouter
+import time
 
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from context_object.async_menu_context import AsyncMenuContextBuilder
+from context_object.freshness_engine import FreshnessEngine
 from llm.prompt_builder import MenuPromptBuilder
-from llm.llm_client import LLMClient
-from app.services.ai_logger import log_ai_interaction
+from llm.circuit_breaker import CircuitOpenError, route_available
+from llm.degraded_answers import DegradedAnswers
+from llm.llm_client import LLMClient, LLMDisconnectedError, LLMTimeoutError
+from llm.llm_metrics import llm_latency
+from llm.single_flight import single_flight_for
+from llm.insight_cache import (
+    insight_cache,
+    insight_cache_key,
+    freshness_fingerprint,
+)
+from app.services.async_ai_logger import log_ai_interaction
+from app.services.insight_warmup import read_insight, store_insight
+from app.services.sse import SSE_HEADERS, SSE_MEDIA_TYPE, sse_event
 
 router = APIRouter()
 
-@router.get("/menu/{slug}/insight")
-def get_food_insight(slug: str):
+
+async def _prepare_insight(slug: str):
     """
-    TEMP insight endpoint (hardcoded menu, real LLM)
+    Context, prompt payload and cache coordinates for a dish.
     """
+    try:
+        context = await AsyncMenuContextBuilder.get_menu_context(slug)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="DB unavailable")
 
-   # TEMP slug → menu mapping
-    menu = {
-        "name": slug.replace("-", " ").title(),
-        "category": "Veg",
-        "price": 0,
-        "is_available": True
-    }
+    report = FreshnessEngine.score_menu(context)
+    freshness_report = MenuPromptBuilder.build_insight_payload(context, report)
+
+    key = insight_cache_key(slug, freshness_report)
+    fingerprint = freshness_fingerprint(freshness_report)
+
+    return context, freshness_report, key, fingerprint
+
+
+async def _lookup_insight(slug: str, context: dict, key: str, fingerprint: str):
+    """
+    Cached insight text or None: insight cache first, then the
+    menu_insights table kept current by the warm-up pipeline.
+    """
+    cached = await insight_cache.lookup(slug, key, fingerprint)
+    if cached is not None:
+        return cached
+
+    try:
+        stored = await read_insight(context["menu"]["menu_id"], fingerprint)
+    except Exception as e:
+        print("INSIGHT TABLE ERROR:", e)
+        return None
+
+    if stored is None:
+        return None
 
-    # TEMP freshness report (until DB + scheduler)
-    freshness_report = {
-        "menu": menu,
-        "overall_freshness": 85,
-        "overall_risk": "Low",
-        "ingredients": []
+    text, llm_ms = stored
+    insight_cache.put(slug, key, fingerprint, text, llm_ms)
+    return text
+
+
+def _degraded_insight(freshness_report: dict) -> dict:
+    """Templated answer while the LLM circuit is open (not cached or logged)."""
+    return {
+        "text": DegradedAnswers.answer("insight", freshness_report),
+        "cached": False,
+        "degraded": True,
     }
 
-    # ✅ Build prompt (THIS MATCHES YOUR FILE)
-    prompt = MenuPromptBuilder.build_prompt(freshness_report)
 
-    # Call LLM
-    client = LLMClient()
-    response = client.generate(prompt)
+async def _finish_insight(
+    slug: str,
+    context: dict,
+    freshness_report: dict,
+    key: str,
+    fingerprint: str,
+    prompt: str,
+    response: str,
+    llm_ms: float,
+    model_name: str,
+):
+    """Cache, store + log a completed generation."""
+    insight_cache.record_llm_call(llm_ms)
+    await insight_cache.store(slug, key, fingerprint, response, llm_ms)
 
-    # Log interaction (menu_id unknown for now)
-    log_ai_interaction(
-        menu_id=None,                # TEMP
+    try:
+        await store_insight(
+            context["menu"]["menu_id"], slug, fingerprint, prompt, response, llm_ms
+        )
+    except Exception as e:
+        print("INSIGHT TABLE ERROR:", e)
+
+    await log_ai_interaction(
+        menu_id=context["menu"]["menu_id"],
         prompt=prompt,
         response=response,
         freshness_score=freshness_report["overall_freshness"],
-        risk_level=freshness_report["overall_risk"]
+        risk_level=freshness_report["overall_risk"],
+        model_name=model_name,
+    )
+
+
+@router.get("/menu/{slug}/insight")
+async def get_food_insight(slug: str, request: Request):
+    """
+    Customer-facing freshness insight for a dish.
+
+    Answers are cached by a hash of the prompt inputs; a dish's
+    entries are dropped when its freshness status or warnings change.
+    Insights precomputed by the warm-up pipeline are served as cached.
+    While every model's circuit breaker is open, a templated summary
+    of the freshness report is returned with "degraded": true.
+    """
+
+    # 1️⃣ Real context + freshness
+    context, freshness_report, key, fingerprint = await _prepare_insight(slug)
+
+    # 2️⃣ Cache / warm-up lookup
+    cached = await _lookup_insight(slug, context, key, fingerprint)
+    if cached is not None:
+        return {"text": cached, "cached": True, "degraded": False}
+
+    # 3️⃣ LLM unavailable -> templated answer, no call
+    if not route_available("insight"):
+        return _degraded_insight(freshness_report)
+
+    # 4️⃣ Build prompt + call LLM
+    prompt = MenuPromptBuilder.build_prompt(freshness_report, endpoint="insight")
+
+    started = time.perf_counter()
+    try:
+        response, model_name = await LLMClient.agenerate_with_model(
+            prompt,
+            route="insight",
+            disconnected=request.is_disconnected,
+            flight=single_flight_for("insight"),
+        )
+    except CircuitOpenError:
+        return _degraded_insight(freshness_report)
+    except LLMTimeoutError:
+        raise HTTPException(status_code=504, detail="LLM timed out")
+    except LLMDisconnectedError:
+        # Nobody is listening; skip caching and logging
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
+    llm_ms = (time.perf_counter() - started) * 1000
+    llm_latency.record("insight", llm_ms, llm_ms)
+
+    # 5️⃣ Cache + log interaction
+    await _finish_insight(
+        slug,
+        context,
+        freshness_report,
+        key,
+        fingerprint,
+        prompt,
+        response,
+        llm_ms,
+        model_name,
     )
 
     return {
-        "text": response
+        "text": response,
+        "cached": False,
+        "degraded": False,
     }
+
+
+@router.get("/menu/{slug}/insight/stream")
+async def stream_food_insight(slug: str):
+    """
+    SSE variant of the insight endpoint.
+
+    Events: `token` {"text"} as chunks arrive, then `done`
+    {"cached", "degraded", "ttft_ms", "total_ms"} (or `error`). The
+    interaction is cached and logged only once the stream has completed.
+    """
+
+    context, freshness_report, key, fingerprint = await _prepare_insight(slug)
+    cached = await _lookup_insight(slug, context, key, fingerprint)
+
+    async def events():
+        started = time.perf_counter()
+
+        def instant(text: str, cached: bool, degraded: bool):
+            # Whole answer in one token event
+            elapsed = round((time.perf_counter() - started) * 1000, 3)
+            return [
+                sse_event("token", {"text": text}),
+                sse_event("done", {
+                    "cached": cached,
+                    "degraded": degraded,
+                    "ttft_ms": elapsed,
+                    "total_ms": elapsed,
+                }),
+            ]
+
+        if cached is not None:
+            for event in instant(cached, True, False):
+                yield event
+            return
+
+        if not route_available("insight"):
+            degraded = _degraded_insight(freshness_report)["text"]
+            for event in instant(degraded, False, True):
+                yield event
+            return
+
+        prompt = MenuPromptBuilder.build_prompt(freshness_report, endpoint="insight")
+        parts = []
+        used = {}
+        ttft_ms = None
+
+        try:
+            async for text in LLMClient.astream(prompt, route="insight", used=used):
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+        except CircuitOpenError:
+            # Tripped since the check above; nothing was streamed yet
+            degraded = _degraded_insight(freshness_report)["text"]
+            for event in instant(degraded, False, True):
+                yield event
+            return
+        except LLMTimeoutError:
+            yield sse_event("error", {"detail": "LLM timed out"})
+            return
+        except Exception as e:
+            print("INSIGHT STREAM ERROR:", e)
+            yield sse_event("error", {"detail": "Failed to generate insight"})
+            return
+
+        total_ms = (time.perf_counter() - started) * 1000
+        ttft_ms = total_ms if ttft_ms is None else ttft_ms
+        llm_latency.record("insight_stream", ttft_ms, total_ms)
+
+        yield sse_event("done", {
+            "cached": False,
+            "degraded": False,
+            "ttft_ms": round(ttft_ms, 3),
+            "total_ms": round(total_ms, 3),
+        })
+
+        await _finish_insight(
+            slug,
+            context,
+            freshness_report,
+            key,
+            fingerprint,
+            prompt,
+            "".join(parts).strip(),
+            total_ms,
+            used["model"],
+        )
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
@@ -1,15 +1,35 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import base64
+import binascii
+import json
+import os
 import re
-from psycopg2.extras import RealDictCursor
 
-from context_object.menu_context import MenuContextBuilder
-from context_object.freshness_engine import FreshnessEngine
-from app.domain.menu_decision_engine import decide_menu_item
-from app.services.postgres import get_db_connection
+from context_object.async_menu_context import AsyncMenuContextBuilder
+from app.domain.menu_decision_engine import decide_menu_item, score_band
+from app.services.freshness_snapshot import (
+    get_freshness_snapshot,
+    build_snapshot_entries,
+)
+from app.services.tenancy import DEFAULT_TENANT, Tenant, resolve_tenant
+from app.services.response_cache import (
+    get_menu_response_cache,
+    menu_cache_max_age,
+    render_json,
+    make_etag,
+    etag_matches,
+)
 
 router = APIRouter()
 SCHEMA = "public"
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# menu_items.menu_id is an INT column
+MAX_MENU_ID = 2 ** 31 - 1
+
 
 # ----------------------------
 # Helpers
@@ -19,68 +39,396 @@ def slugify(text: str) -> str:
     return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
 
 
-# ----------------------------
-# GET FULL MENU
-# ----------------------------
+def _decide(slug: str, entry: dict) -> dict:
+    freshness_report = entry["freshness"]
 
-@router.get("/menu")
-def get_menu():
+    decided = decide_menu_item(
+        menu=entry["menu"],
+        freshness={
+            "score": freshness_report["menu_freshness"],
+            "risk_level": freshness_report["status"],
+        },
+        feedback=None,
+    )
+
+    decided["id"] = slug
+    decided["last_checked"] = freshness_report["evaluated_at"]
+
+    return decided
+
+
+def _detail(slug: str, entry: dict) -> dict:
+    return {
+        "id": slug,
+        "name": entry["menu"]["name"],
+        "category": entry["menu"]["category"],
+        "price": entry["menu"]["price"],
+        "status": entry["freshness"]["status"],
+        "last_checked": entry["freshness"]["evaluated_at"],
+    }
+
+
+def _scope(tenant: Tenant) -> Optional[Tenant]:
+    """Tenant argument for the context builders (None = whole menu)."""
+    return None if tenant.is_default else tenant
+
+
+async def _tenant(restaurant_id: int) -> Tenant:
+    try:
+        return await resolve_tenant(restaurant_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="DB unavailable")
+
+
+def _respond(
+    request: Request,
+    tenant: Tenant,
+    body: bytes,
+    etag: str,
+    source: str,
+) -> Response:
     """
-    Returns all menu items with LIVE freshness status.
+    Conditional JSON response.
+
+    Snapshot-backed bodies are cacheable until the next freshness
+    rollover (capped); live bodies must always be revalidated.
+    Answers If-None-Match with 304.
     """
+    headers = {
+        "ETag": etag,
+        "X-Freshness-Source": source,
+    }
 
-    conn = get_db_connection()
-    if not conn:
+    if source == "snapshot":
+        age = get_freshness_snapshot(tenant).age_seconds() or 0.0
+        headers["X-Freshness-Age"] = f"{age:.1f}"
+        headers["Cache-Control"] = (
+            f"public, max-age={menu_cache_max_age()}, must-revalidate"
+        )
+    else:
+        headers["X-Freshness-Age"] = "0"
+        headers["Cache-Control"] = "no-cache"
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        get_menu_response_cache(tenant.key).record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _wants_ndjson(request: Request) -> bool:
+    """
+    Streaming is opt-in: ?format=ndjson or Accept: application/x-ndjson.
+    """
+    if request.query_params.get("format") == "ndjson":
+        return True
+
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def _stream_menu(tenant: Tenant) -> StreamingResponse:
+    """
+    NDJSON variant of GET /menu: one decided item per line, written
+    as soon as its chunk is scored.
+
+    Snapshot entries are streamed straight from memory; otherwise
+    menu_items is walked with a server-side cursor in chunks of
+    MENU_STREAM_CHUNK_SIZE, so first-byte latency and memory do not
+    grow with the catalog.
+    """
+    headers = {"Cache-Control": "no-cache"}
+    snapshot = get_freshness_snapshot(tenant)
+
+    if snapshot.is_fresh():
+        entries = snapshot.items()
+        headers["X-Freshness-Source"] = "snapshot"
+        headers["X-Freshness-Age"] = f"{snapshot.age_seconds() or 0.0:.1f}"
+
+        async def lines():
+            for slug, entry in entries:
+                yield render_json(_decide(slug, entry)) + b"\n"
+
+        return StreamingResponse(
+            lines(), media_type=NDJSON_MEDIA_TYPE, headers=headers
+        )
+
+    chunks = AsyncMenuContextBuilder.iter_menu_contexts(
+        chunk_size=int(os.getenv("MENU_STREAM_CHUNK_SIZE", 100)),
+        tenant=_scope(tenant),
+    )
+
+    # Pull the first chunk before committing to a 200,
+    # so a DB outage still surfaces as a proper error response
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except RuntimeError:
         raise HTTPException(status_code=500, detail="DB unavailable")
 
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    headers["X-Freshness-Source"] = "live"
+    headers["X-Freshness-Age"] = "0"
 
+    async def lines():
+        if first is None:
+            return
+
+        try:
+            contexts = first
+            while True:
+                # 2️⃣ Freshness evaluation + 3️⃣ Decision engine, per chunk
+                for slug, entry in build_snapshot_entries(contexts).items():
+                    yield render_json(_decide(slug, entry)) + b"\n"
+
+                try:
+                    contexts = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+        finally:
+            # Releases the connection if the client goes away mid-stream
+            await chunks.aclose()
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+def _encode_cursor(row: dict) -> str:
+    key = [row["category"], row["name"], row["menu_id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
     try:
-        cur.execute(
-            f"""
-            SELECT
-                menu_id,
-                name,
-                category,
-                price,
-                is_available
-            FROM {SCHEMA}.menu_items
-            ORDER BY category, name
-            """
-        )
+        key = json.loads(base64.urlsafe_b64decode(cursor))
+        # [category, name, menu_id], as _encode_cursor writes it
+        if not isinstance(key, list):
+            raise TypeError(key)
+        category, name, menu_id = key
+        key = str(category), str(name), int(menu_id)
+    # OverflowError: e.g. a menu_id of 1e400 (infinity)
+    except (binascii.Error, ValueError, TypeError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Must still bind as TEXT / INT parameters (a DB error would be a 500)
+    if not 0 <= key[2] <= MAX_MENU_ID or "\x00" in key[0] + key[1]:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return key
+
+
+async def _menu_page(
+    request: Request,
+    tenant: Tenant,
+    category: Optional[str],
+    status: Optional[str],
+    availability: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    restaurant_id: Optional[int],
+    limit: int,
+    cursor: Optional[str],
+) -> Response:
+    """
+    Filtered / paginated GET /menu.
 
-        menu_items = cur.fetchall()
-        final_menu = []
+    Filters run in SQL; status and availability use the precomputed
+    snapshot scores. Only the dishes on the page are looked up (from
+    the in-memory snapshot) or, failing that, scored live.
+    """
+    try:
+        min_score, max_score = score_band(availability=availability, status=status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        for item in menu_items:
-            slug = slugify(item["name"])
+    try:
+        # Fetch one extra row to know whether another page follows
+        rows = await AsyncMenuContextBuilder.find_menu_page(
+            category=category,
+            restaurant_id=restaurant_id,
+            min_price=min_price,
+            max_price=max_price,
+            min_score=min_score,
+            max_score=max_score,
+            after=_decode_cursor(cursor) if cursor else None,
+            limit=limit + 1,
+            tenant=_scope(tenant),
+        )
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="DB unavailable")
 
-            # 1️⃣ Build DB context
-            context = MenuContextBuilder.get_menu_context(slug)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-            # 2️⃣ Freshness evaluation
-            freshness_report = FreshnessEngine.score_menu(context)
+    # 1️⃣ Freshness from the snapshot where possible
+    entries = {}
+    snapshot = get_freshness_snapshot(tenant)
+    if snapshot.is_fresh():
+        for row in rows:
+            entry = snapshot.get(row["slug"])
+            if entry is not None:
+                entries[row["slug"]] = entry
 
-            # 3️⃣ Decision engine
-            decided = decide_menu_item(
-                menu=item,
-                freshness={
-                    "score": freshness_report["menu_freshness"],
-                    "risk_level": freshness_report["status"],
-                },
-                feedback=None,
+    # 2️⃣ Score the rest live (only this page's dishes)
+    missing = [row["slug"] for row in rows if row["slug"] not in entries]
+    if missing:
+        try:
+            contexts = await AsyncMenuContextBuilder.get_menu_contexts(
+                missing, tenant=_scope(tenant)
             )
+        except RuntimeError:
+            raise HTTPException(status_code=500, detail="DB unavailable")
+        entries.update(build_snapshot_entries(contexts))
+
+    # 3️⃣ Decision engine, in page order
+    body = render_json([
+        _decide(row["slug"], entries[row["slug"]])
+        for row in rows
+        if row["slug"] in entries
+    ])
+
+    response = _respond(
+        request,
+        tenant,
+        body,
+        make_etag(body),
+        source="live" if missing else "snapshot",
+    )
+    if has_more:
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
 
-            decided["id"] = slug
-            decided["last_checked"] = freshness_report["evaluated_at"]
+    return response
 
-            final_menu.append(decided)
 
-        return final_menu
+def _menu_query(
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    availability: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    # Aliased: the name itself would bind to the /r/{restaurant_id} path
+    restaurant: Optional[int] = Query(None, alias="restaurant_id"),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+) -> dict:
+    """Filter / pagination query parameters shared by the menu routes."""
+    return {
+        "category": category,
+        "status": status,
+        "availability": availability,
+        "min_price": min_price,
+        "max_price": max_price,
+        "restaurant_id": restaurant,
+        "limit": limit,
+        "cursor": cursor,
+    }
 
-    finally:
-        cur.close()
-        conn.close()
+
+async def _serve_menu(request: Request, tenant: Tenant, query: dict) -> Response:
+    if any(value is not None for value in query.values()):
+        return await _menu_page(
+            request,
+            tenant,
+            **{
+                **query,
+                "limit": query["limit"] or int(os.getenv("MENU_PAGE_SIZE", 20)),
+            },
+        )
+
+    if _wants_ndjson(request):
+        return await _stream_menu(tenant)
+
+    snapshot = get_freshness_snapshot(tenant)
+
+    if snapshot.is_fresh():
+        version, entries = snapshot.versioned_items()
+
+        cache = get_menu_response_cache(tenant.key)
+        cached = cache.get("menu", version)
+        if cached is None:
+            body = render_json([_decide(slug, entry) for slug, entry in entries])
+            cached = cache.put("menu", version, body)
+
+        return _respond(request, tenant, *cached, source="snapshot")
+
+    try:
+        # 1️⃣ Build DB context for every dish in one batch
+        contexts = await AsyncMenuContextBuilder.get_menu_contexts(
+            tenant=_scope(tenant)
+        )
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="DB unavailable")
+
+    # 2️⃣ Freshness evaluation + 3️⃣ Decision engine
+    entries = build_snapshot_entries(contexts)
+    body = render_json([_decide(slug, entry) for slug, entry in entries.items()])
+
+    return _respond(request, tenant, body, make_etag(body), source="live")
+
+
+async def _serve_menu_item(request: Request, tenant: Tenant, slug: str) -> Response:
+    snapshot = get_freshness_snapshot(tenant)
+
+    if snapshot.is_fresh():
+        version, entry = snapshot.versioned_get(slug)
+
+        if entry is not None:
+            key = f"menu/{slug}"
+            cache = get_menu_response_cache(tenant.key)
+            cached = cache.get(key, version)
+            if cached is None:
+                cached = cache.put(key, version, render_json(_detail(slug, entry)))
+
+            return _respond(request, tenant, *cached, source="snapshot")
+
+    try:
+        context = await AsyncMenuContextBuilder.get_menu_context(
+            slug, tenant=_scope(tenant)
+        )
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+
+    entry = build_snapshot_entries({slug: context})[slug]
+    body = render_json(_detail(slug, entry))
+
+    return _respond(request, tenant, body, make_etag(body), source="live")
+
+
+# ----------------------------
+# GET FULL MENU
+# ----------------------------
+
+@router.get("/menu")
+async def get_menu(request: Request, query: dict = Depends(_menu_query)):
+    """
+    Returns all menu items with freshness status.
+
+    Any filter (category, status, availability, min_price / max_price,
+    restaurant_id) or pagination parameter (limit, cursor) switches to
+    a filtered page, ordered by category, name. When more rows follow,
+    X-Next-Cursor holds the `cursor` value for the next page.
+
+    Served from the background freshness snapshot while it is within
+    its staleness bound (rendered once per data version), otherwise
+    computed live.
+
+    ?format=ndjson (or Accept: application/x-ndjson) streams the
+    same items one per line instead.
+    """
+    return await _serve_menu(request, DEFAULT_TENANT, query)
+
+
+@router.get("/r/{restaurant_id}/menu")
+async def get_restaurant_menu(
+    restaurant_id: int,
+    request: Request,
+    query: dict = Depends(_menu_query),
+):
+    """
+    GET /menu for one restaurant, with its own snapshot and cache.
+    """
+    tenant = await _tenant(restaurant_id)
+    return await _serve_menu(request, tenant, query)
 
 
 # ----------------------------
@@ -88,23 +436,17 @@ def get_menu():
 # ----------------------------
 
 @router.get("/menu/{slug}")
-def get_menu_item(slug: str):
+async def get_menu_item(slug: str, request: Request):
     """
     Returns a single menu item for Dish Detail Page
     """
+    return await _serve_menu_item(request, DEFAULT_TENANT, slug)
 
-    try:
-        context = MenuContextBuilder.get_menu_context(slug)
-        freshness = FreshnessEngine.score_menu(context)
-
-        return {
-            "id": slug,
-            "name": context["menu"]["name"],
-            "category": context["menu"]["category"],
-            "price": context["menu"]["price"],
-            "status": freshness["status"],
-            "last_checked": freshness["evaluated_at"],
-        }
 
-    except ValueError:
-        raise HTTPException(status_code=404, detail="Menu item not found")
+@router.get("/r/{restaurant_id}/menu/{slug}")
+async def get_restaurant_menu_item(restaurant_id: int, slug: str, request: Request):
+    """
+    GET /menu/{slug} for one restaurant.
+    """
+    tenant = await _tenant(restaurant_id)
+    return await _serve_menu_item(request, tenant, slug)
@@ -0,0 +1,68 @@
+from fastapi import APIRouter
+
+from app.services.postgres import get_pool_stats
+from app.services.async_postgres import get_async_pool_stats
+from app.services.freshness_snapshot import freshness_snapshot, tenant_snapshots
+from app.services.freshness_listener import get_listener_stats
+from app.services.insight_warmup import insight_warmup
+from app.services.log_writer import log_writer
+from app.services.blob_store import blob_store
+from app.services.partition_manager import partition_manager
+from app.services.sensor_ingest import sensor_ingestor
+from app.services.telemetry_buffer import telemetry_buffer
+from app.services.response_cache import menu_response_cache, tenant_cache_stats
+from app.services.tenancy import DEFAULT_TENANT_KEY, tenancy_mode
+from llm.insight_cache import insight_cache
+from llm.chat_cache import chat_cache
+from llm.llm_metrics import llm_latency, prompt_sizes
+from llm.llm_client import LLMClient
+from llm.circuit_breaker import breaker_stats
+from llm.degraded_answers import DegradedAnswers
+from llm.single_flight import single_flight_stats
+
+router = APIRouter()
+
+
+# ----------------------------
+# Runtime metrics (for sizing / load tests)
+# ----------------------------
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Returns internal runtime statistics.
+    """
+    cache_stats = tenant_cache_stats()
+
+    tenants = {
+        key: {
+            "freshness_snapshot": snapshot.stats(),
+            "menu_response_cache": cache_stats.get(key),
+        }
+        for key, snapshot in tenant_snapshots().items()
+        if key != DEFAULT_TENANT_KEY
+    }
+
+    return {
+        "db_pool": get_pool_stats(),
+        "async_db_pool": get_async_pool_stats(),
+        "freshness_snapshot": freshness_snapshot.stats(),
+        "freshness_listener": get_listener_stats(),
+        "menu_response_cache": menu_response_cache.stats(),
+        "insight_cache": insight_cache.stats(),
+        "insight_warmup": insight_warmup.stats(),
+        "chat_cache": chat_cache.stats(),
+        "llm_latency": llm_latency.stats(),
+        "prompt_sizes": prompt_sizes.stats(),
+        "llm_client": LLMClient.stats(),
+        "single_flight": single_flight_stats(),
+        "circuit_breakers": breaker_stats(),
+        "degraded_answers": DegradedAnswers.stats(),
+        "log_writer": log_writer.stats(),
+        "blob_store": blob_store.stats(),
+        "partitions": partition_manager.stats(),
+        "sensor_ingest": sensor_ingestor.stats(),
+        "telemetry": telemetry_buffer.stats(),
+        "tenancy_mode": tenancy_mode(),
+        "tenants": tenants,
+    }
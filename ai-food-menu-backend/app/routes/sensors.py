@@ -0,0 +1,150 @@
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+import asyncpg
+
+from app.services.sensor_ingest import (
+    ndjson_readings,
+    parse_readings,
+    sensor_batch_size,
+    sensor_ingestor,
+    sensor_max_readings,
+)
+
+router = APIRouter()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rejected readings reported back per request
+MAX_REPORTED_ERRORS = 20
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+
+class _Totals:
+    def __init__(self):
+        self.accepted = 0
+        self.rejected = 0
+        self.deviations = 0
+        self.batches = 0
+        self.errors = []
+        # (status code, detail) of the batch that stopped the request
+        self.failure = None
+
+    def add(self, result: dict, errors):
+        self.accepted += result["accepted"]
+        self.deviations += result["deviations"]
+        self.rejected += len(errors)
+        self.batches += 1 if result["accepted"] else 0
+        self.errors.extend(errors[:MAX_REPORTED_ERRORS - len(self.errors)])
+
+    def response(self):
+        body = {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "deviations": self.deviations,
+            "batches": self.batches,
+            "errors": self.errors,
+        }
+
+        if self.failure is None:
+            return body
+
+        # Earlier batches stay committed: report them with the error
+        status_code, body["detail"] = self.failure
+        return JSONResponse(status_code=status_code, content=body)
+
+
+async def _ingest(objects, totals: _Totals, decode_errors=()) -> bool:
+    """Write one batch; False (and totals.failure set) if it was not written."""
+    readings, errors = parse_readings(objects)
+    errors = list(decode_errors) + errors
+
+    try:
+        result = await sensor_ingestor.ingest(readings, rejected=len(errors))
+    except (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError):
+        totals.failure = (422, "Readings rejected by the database")
+        return False
+    except (RuntimeError, asyncpg.PostgresError, asyncpg.InterfaceError):
+        totals.failure = (500, "DB unavailable")
+        return False
+
+    totals.add(result, errors)
+    return True
+
+
+async def _ingest_ndjson(request: Request, totals: _Totals):
+    """
+    Stream the body, COPY every sensor_batch_size() readings.
+    Stops at the first batch that fails.
+    """
+    batch_size = sensor_batch_size()
+    pending = b""
+    lines = []
+
+    async for chunk in request.stream():
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        lines.extend(line.decode("utf-8", "replace") for line in complete)
+
+        while len(lines) >= batch_size:
+            objects, errors = ndjson_readings(lines[:batch_size])
+            lines = lines[batch_size:]
+            if not await _ingest(objects, totals, errors):
+                return
+
+    if pending.strip():
+        lines.append(pending.decode("utf-8", "replace"))
+
+    if lines:
+        objects, errors = ndjson_readings(lines)
+        await _ingest(objects, totals, errors)
+
+
+# ----------------------------
+# Routes
+# ----------------------------
+
+@router.post("/storage/readings")
+async def ingest_storage_readings(request: Request):
+    """
+    Bulk sensor readings for storage_conditions.
+
+    Body: a JSON array of readings, or NDJSON (Content-Type
+    application/x-ndjson) streamed one reading per line:
+    {"ingredient_id": 12, "storage_type": "Chiller",
+     "temperature": 3.5, "humidity": 61, "timestamp": "2025-01-01T10:00:00Z"}
+
+    Invalid readings are skipped and reported; the rest are written.
+    If the database fails a batch, the request stops there and answers
+    422 / 500 with the totals of the batches already written and a
+    `detail`.
+    """
+    if not sensor_ingestor.ready:
+        raise HTTPException(status_code=503, detail="Sensor ingestion not available")
+
+    totals = _Totals()
+
+    if NDJSON_MEDIA_TYPE in request.headers.get("content-type", ""):
+        await _ingest_ndjson(request, totals)
+        return totals.response()
+
+    try:
+        payload = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array")
+
+    if isinstance(payload, dict):
+        payload = [payload]
+
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array")
+
+    if len(payload) > sensor_max_readings():
+        raise HTTPException(status_code=413, detail="Too many readings in one request")
+
+    await _ingest(payload, totals)
+    return totals.response()
@@ -1,7 +1,18 @@
-from app.services.postgres import get_db_connection
+from app.services.postgres import db_connection
+from app.services.blob_store import blob_store
+from app.services.log_writer import log_writer
+from app.services.sensor_ingest import (
+    deviation_flags,
+    sensor_ingestor,
+    upsert_latest_reading,
+)
+from app.services.telemetry_buffer import telemetry_buffer
 from datetime import datetime
 import json
 
+# Log calls only enqueue while the write-behind writer runs
+# (see log_writer); otherwise they insert + commit directly.
+
 
 # -------------------------
 # Freshness logging
@@ -14,34 +25,41 @@ def log_freshness(
     risk_level: str,
     factors: dict,
 ):
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO freshness_logs (
-            menu_id,
-            ingredient_id,
-            freshness_score,
-            risk_level,
-            factors,
-            created_at
-        )
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """,
-        (
-            menu_id,
-            ingredient_id,
-            freshness_score,
-            risk_level,
-            json.dumps(factors),
-            datetime.utcnow(),
-        )
-    )
-
-    conn.commit()
-    cur.close()
-    conn.close()
+    if log_writer.enqueue("freshness", (
+        menu_id,
+        ingredient_id,
+        freshness_score,
+        risk_level,
+        json.dumps(factors),
+        datetime.utcnow(),
+    )):
+        return
+
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO freshness_logs (
+                    menu_id,
+                    ingredient_id,
+                    freshness_score,
+                    risk_level,
+                    factors,
+                    created_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                (
+                    menu_id,
+                    ingredient_id,
+                    freshness_score,
+                    risk_level,
+                    json.dumps(factors),
+                    datetime.utcnow(),
+                )
+            )
+
+        conn.commit()
 
 
 # -------------------------
@@ -54,37 +72,64 @@ def log_ai_interaction(
     response: str,
     freshness_score: float,
     risk_level: str,
+    model_name: str = "gemini-flash",
 ):
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO ai_interactions (
-            menu_id,
-            model_name,
-            prompt,
-            response,
-            freshness_score,
-            risk_level,
-            created_at
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """,
-        (
-            menu_id,
-            "gemini-flash",
-            prompt,
-            response,
-            freshness_score,
-            risk_level,
-            datetime.utcnow(),
-        )
+    row = (
+        menu_id,
+        model_name,
+        prompt,
+        response,
+        freshness_score,
+        risk_level,
+        datetime.utcnow(),
     )
-
-    conn.commit()
-    cur.close()
-    conn.close()
+    if log_writer.enqueue("ai_interaction", row):
+        return
+
+    if blob_store.ready:
+        # Prompt / response bodies go to ai_blobs (see blob_store)
+        ref_row = blob_store.to_references([row])[0]
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO ai_interactions (
+                        menu_id,
+                        model_name,
+                        prompt_hash,
+                        response_hash,
+                        freshness_score,
+                        risk_level,
+                        created_at
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    ref_row
+                )
+
+            conn.commit()
+        return
+
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO ai_interactions (
+                    menu_id,
+                    model_name,
+                    prompt,
+                    response,
+                    freshness_score,
+                    risk_level,
+                    created_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                row
+            )
+
+        conn.commit()
 
 
 # -------------------------
@@ -100,40 +145,46 @@ def upsert_storage_condition(
     """
     Called periodically (e.g., every 5 hours)
     to record real storage state.
+
+    Single reading; sensors should use POST /storage/readings
+    (sensor_ingest) for bulk loads.
     """
 
-    deviation_flag = False
-
-    if storage_type == "Chiller" and temperature > 5:
-        deviation_flag = True
-    if storage_type == "Freezer" and temperature > -10:
-        deviation_flag = True
-
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO storage_conditions (
-            ingredient_id,
-            storage_type,
-            temperature,
-            humidity,
-            last_checked,
-            deviation_flag
-        )
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """,
-        (
-            ingredient_id,
-            storage_type,
-            temperature,
-            humidity,
-            datetime.utcnow(),
-            deviation_flag,
-        )
+    row = (
+        ingredient_id,
+        storage_type,
+        temperature,
+        humidity,
+        datetime.utcnow(),
+        bool(deviation_flags([storage_type], [temperature])[0]),
     )
 
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO storage_conditions (
+                    ingredient_id,
+                    storage_type,
+                    temperature,
+                    humidity,
+                    last_checked,
+                    deviation_flag
+                )
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                row
+            )
+
+            if sensor_ingestor.ready:
+                upsert_latest_reading(cur, row)
+
+        conn.commit()
+
+    if telemetry_buffer.ready:
+        telemetry_buffer.submit([row])
+
+
 def log_feedback(
     menu_id,
     feedback_text,
@@ -141,33 +192,36 @@ def log_feedback(
     tags,
     confidence
 ):
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO feedback_logs (
-            menu_id,
-            feedback_text,
-            sentiment,
-            tags,
-            confidence,
-            created_at
-        )
-        VALUES (%s, %s, %s, %s, %s, NOW())
-        """,
-        (
-            menu_id,
-            feedback_text,
-            sentiment,
-            tags,
-            confidence,
-        )
-    )
-
-    conn.commit()
-    cur.close()
-    conn.close()
-
-
-
+    if log_writer.enqueue("feedback", (
+        menu_id,
+        feedback_text,
+        sentiment,
+        tags,
+        confidence,
+    )):
+        return
+
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO feedback_logs (
+                    menu_id,
+                    feedback_text,
+                    sentiment,
+                    tags,
+                    confidence,
+                    created_at
+                )
+                VALUES (%s, %s, %s, %s, %s, NOW())
+                """,
+                (
+                    menu_id,
+                    feedback_text,
+                    sentiment,
+                    tags,
+                    confidence,
+                )
+            )
+
+        conn.commit()
@@ -0,0 +1,201 @@
+import json
+from datetime import datetime
+
+from app.services.async_postgres import async_db_connection
+from app.services.blob_store import blob_store
+from app.services.log_writer import log_writer
+
+
+# Async twins of ai_logger / feedback_logger for `async def` routes.
+# Same tables, same columns — asyncpg placeholders ($1) instead of %s.
+# While the write-behind writer runs they only enqueue (no DB round
+# trip inside the request); otherwise they insert directly.
+
+
+# -------------------------
+# Freshness logging
+# -------------------------
+
+async def log_freshness(
+    menu_id: int,
+    ingredient_id: int,
+    freshness_score: float,
+    risk_level: str,
+    factors: dict,
+):
+    if log_writer.enqueue("freshness", (
+        menu_id,
+        ingredient_id,
+        freshness_score,
+        risk_level,
+        json.dumps(factors),
+        datetime.utcnow(),
+    )):
+        return
+
+    async with async_db_connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO freshness_logs (
+                menu_id,
+                ingredient_id,
+                freshness_score,
+                risk_level,
+                factors,
+                created_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6)
+            """,
+            menu_id,
+            ingredient_id,
+            freshness_score,
+            risk_level,
+            factors,
+            datetime.utcnow(),
+        )
+
+
+# -------------------------
+# AI interaction logging
+# -------------------------
+
+async def log_ai_interaction(
+    menu_id: int,
+    prompt: str,
+    response: str,
+    freshness_score: float,
+    risk_level: str,
+    model_name: str = "gemini-flash",
+):
+    row = (
+        menu_id,
+        model_name,
+        prompt,
+        response,
+        freshness_score,
+        risk_level,
+        datetime.utcnow(),
+    )
+    if log_writer.enqueue("ai_interaction", row):
+        return
+
+    async with async_db_connection() as conn:
+        if blob_store.ready:
+            # Prompt / response bodies go to ai_blobs (see blob_store)
+            ref_row = (await blob_store.ato_references(conn, [row]))[0]
+
+            await conn.execute(
+                """
+                INSERT INTO ai_interactions (
+                    menu_id,
+                    model_name,
+                    prompt_hash,
+                    response_hash,
+                    freshness_score,
+                    risk_level,
+                    created_at
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                """,
+                *ref_row,
+            )
+            return
+
+        await conn.execute(
+            """
+            INSERT INTO ai_interactions (
+                menu_id,
+                model_name,
+                prompt,
+                response,
+                freshness_score,
+                risk_level,
+                created_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7)
+            """,
+            *row,
+        )
+
+
+# -------------------------
+# Feedback logging
+# -------------------------
+
+async def log_feedback(
+    menu_id: int,
+    feedback_text,
+    sentiment,
+    tags,
+    confidence
+):
+    if log_writer.enqueue("feedback", (
+        menu_id,
+        feedback_text,
+        sentiment,
+        tags,
+        confidence,
+    )):
+        return
+
+    async with async_db_connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO feedback_logs (
+                menu_id,
+                feedback_text,
+                sentiment,
+                tags,
+                confidence,
+                created_at
+            )
+            VALUES ($1, $2, $3, $4, $5, NOW())
+            """,
+            menu_id,
+            feedback_text,
+            sentiment,
+            tags,
+            confidence,
+        )
+
+
+async def log_human_feedback(
+    menu_id: int,
+    sentiment: float,
+    tags: list,
+    confidence: float,
+    raw_text: str,
+):
+    """
+    Async twin of feedback_logger.log_human_feedback.
+    """
+    if log_writer.enqueue("human_feedback", (
+        menu_id,
+        sentiment,
+        tags,
+        confidence,
+        raw_text,
+        datetime.utcnow(),
+    )):
+        return
+
+    async with async_db_connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO feedback_logs (
+                menu_id,
+                sentiment,
+                tags,
+                confidence,
+                raw_text,
+                created_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6)
+            """,
+            menu_id,
+            sentiment,
+            tags,
+            confidence,
+            raw_text,
+            datetime.utcnow(),
+        )
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+
+import asyncpg
+from dotenv import load_dotenv
+
+# Safe: loads .env locally if present, ignored on Render
+load_dotenv()
+
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+
+async def _init_connection(conn):
+    """
+    Per physical connection setup.
+    Decode json/jsonb like psycopg2 does, so both paths return dicts.
+    """
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog",
+        )
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """
+    Process-wide asyncpg pool, configured from the same DB_* env vars
+    as the sync pool plus DB_ASYNC_POOL_MIN / DB_ASYNC_POOL_MAX.
+    """
+    global _pool
+
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await asyncpg.create_pool(
+                    host=os.getenv("DB_HOST", "localhost"),
+                    database=os.getenv("DB_NAME", "ai_food_menu"),
+                    user=os.getenv("DB_USER", "postgres"),
+                    password=os.getenv("DB_PASSWORD"),
+                    port=int(os.getenv("DB_PORT", 5432)),
+                    min_size=int(os.getenv("DB_ASYNC_POOL_MIN", 1)),
+                    max_size=int(os.getenv("DB_ASYNC_POOL_MAX", 20)),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", 5)),
+                    server_settings={
+                        "search_path": os.getenv("DB_SCHEMA", "public"),
+                    },
+                    init=_init_connection,
+                )
+
+    return _pool
+
+
+@asynccontextmanager
+async def async_db_connection():
+    """
+    Async counterpart of postgres.db_connection().
+
+        async with async_db_connection() as conn:
+            rows = await conn.fetch("SELECT ...", arg)
+
+    Raises RuntimeError if no connection is available.
+    """
+    try:
+        pool = await get_async_pool()
+        conn = await pool.acquire(
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", 5))
+        )
+    except (
+        OSError,
+        asyncio.TimeoutError,
+        asyncpg.PostgresError,
+        asyncpg.InterfaceError,
+    ) as e:
+        raise RuntimeError("Database connection not available") from e
+
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+def get_async_pool_stats() -> dict:
+    if _pool is None:
+        return {"initialized": False}
+
+    return {
+        "initialized": True,
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+        "size": _pool.get_size(),
+        "idle": _pool.get_idle_size(),
+        "in_use": _pool.get_size() - _pool.get_idle_size(),
+    }
+
+
+async def close_async_pool():
+    global _pool
+
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
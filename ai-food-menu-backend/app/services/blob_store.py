@@ -0,0 +1,687 @@
+import argparse
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import xxhash
+import zstandard
+from psycopg2.extras import execute_values
+
+from app.services.postgres import db_connection
+
+# Content-addressed storage for ai_interactions prompts and responses.
+#
+# Most of every logged prompt is the same system framing and dish
+# context (see MenuPromptBuilder), so instead of the full text each row
+# keeps references into ai_blobs:
+#
+#   - prompt_hash: a manifest blob listing the hashes of the prompt
+#     split on blank lines (framing, tone, dish facts, ingredients,
+#     instruction, ...)
+#   - response_hash: the response
+#
+# A body is stored once, whatever the number of rows pointing at it.
+# Bodies of BLOB_COMPRESS_MIN_BYTES or more are zstd-compressed.
+#
+# Rows written before the migration (prompt / response text set,
+# references NULL) stay readable: rehydrate() only touches rows that
+# carry references. Move them over with:
+#
+#     python -m app.services.blob_store --backfill --batch 500
+
+BLOB_TABLE = "ai_blobs"
+
+# Rejoining the segments with it gives back the exact prompt
+SEGMENT_SEPARATOR = "\n\n"
+
+CODEC_RAW = "raw"
+CODEC_ZSTD = "zstd"
+# Manifest: space-separated segment hashes
+CODEC_SEGMENTS = "segments"
+
+# Prompt (manifest) hashes never collide with a segment of the same text
+PROMPT_HASH_SEED = 1
+
+# ai_interactions columns written once the blob store is ready
+INTERACTION_REF_COLUMNS = (
+    "menu_id", "model_name", "prompt_hash", "response_hash",
+    "freshness_score", "risk_level", "created_at",
+)
+
+
+def blob_store_enabled() -> bool:
+    """AI_BLOB_STORE=0 keeps the full text in ai_interactions."""
+    return os.getenv("AI_BLOB_STORE", "1") == "1"
+
+
+# -------------------------
+# Encoding
+# -------------------------
+
+def content_hash(text: str) -> str:
+    return xxhash.xxh3_128_hexdigest(text.encode("utf-8"))
+
+
+def prompt_hash(prompt: str) -> str:
+    return xxhash.xxh3_128_hexdigest(prompt.encode("utf-8"), seed=PROMPT_HASH_SEED)
+
+
+def split_prompt(prompt: str) -> List[str]:
+    return prompt.split(SEGMENT_SEPARATOR)
+
+
+# zstd (de)compressor objects must not be shared between threads
+_codecs = threading.local()
+
+
+def _compressor() -> zstandard.ZstdCompressor:
+    if not hasattr(_codecs, "compressor"):
+        _codecs.compressor = zstandard.ZstdCompressor(
+            level=int(os.getenv("BLOB_ZSTD_LEVEL", 3))
+        )
+    return _codecs.compressor
+
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    if not hasattr(_codecs, "decompressor"):
+        _codecs.decompressor = zstandard.ZstdDecompressor()
+    return _codecs.decompressor
+
+
+def encode_body(text: str, compress_min_bytes: int) -> Tuple[str, int, bytes]:
+    """(codec, raw size, body); compressed only when it actually shrinks."""
+    raw = text.encode("utf-8")
+
+    if len(raw) >= compress_min_bytes:
+        compressed = _compressor().compress(raw)
+        if len(compressed) < len(raw):
+            return CODEC_ZSTD, len(raw), compressed
+
+    return CODEC_RAW, len(raw), raw
+
+
+def decode_body(codec: str, body) -> str:
+    body = bytes(body)
+    if codec == CODEC_ZSTD:
+        body = _decompressor().decompress(body)
+    return body.decode("utf-8")
+
+
+# -------------------------
+# Blob store
+# -------------------------
+
+class BlobStore:
+    """
+    Writes and reads ai_blobs.
+
+    Hashes written recently are remembered (`known_max` entries, for
+    `known_ttl` seconds) so the shared framing is not re-sent with
+    every row. Re-sending an existing blob only bumps its created_at,
+    which collect_garbage() treats as "last written": blobs written
+    within `gc_grace_hours` (keep it above `known_ttl`) are never
+    collected. Decoded bodies are kept in a small LRU (`cache_max`
+    entries) for reads.
+    """
+
+    def __init__(
+        self,
+        compress_min_bytes: int = 256,
+        known_max: int = 50000,
+        known_ttl: float = 3600,
+        cache_max: int = 4096,
+        gc_grace_hours: float = 24,
+    ):
+        self.compress_min_bytes = compress_min_bytes
+        self.known_max = known_max
+        self.known_ttl = known_ttl
+        self.cache_max = cache_max
+        self.gc_grace_hours = gc_grace_hours
+
+        # Set once the tables exist (start_blob_store)
+        self.ready = False
+
+        self._lock = threading.Lock()
+        # hash -> monotonic time it was last written
+        self._known: OrderedDict = OrderedDict()
+        # hash -> decoded text
+        self._cache: OrderedDict = OrderedDict()
+
+        # Stats
+        self._rows = 0
+        self._bodies = 0
+        self._written = 0
+        self._skipped_known = 0
+        self._raw_bytes = 0
+        self._stored_bytes = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._collected = 0
+
+    # ---------- schema ----------
+
+    @staticmethod
+    def ensure_tables():
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {BLOB_TABLE} (
+                        hash TEXT PRIMARY KEY,
+                        codec TEXT NOT NULL,
+                        raw_size INT NOT NULL,
+                        body BYTEA NOT NULL,
+                        created_at TIMESTAMP NOT NULL DEFAULT NOW()
+                    )
+                    """
+                )
+
+                # Reference columns; the text columns become optional
+                cur.execute(
+                    """
+                    ALTER TABLE ai_interactions
+                        ADD COLUMN IF NOT EXISTS prompt_hash TEXT,
+                        ADD COLUMN IF NOT EXISTS response_hash TEXT,
+                        ALTER COLUMN prompt DROP NOT NULL,
+                        ALTER COLUMN response DROP NOT NULL
+                    """
+                )
+
+            conn.commit()
+
+    # ---------- write side ----------
+
+    def _is_known(self, digest: str, now: float) -> bool:
+        with self._lock:
+            written_at = self._known.get(digest)
+            if written_at is None or now - written_at > self.known_ttl:
+                return False
+            self._known.move_to_end(digest)
+            return True
+
+    def _remember(self, digests: Iterable[str]):
+        now = time.monotonic()
+        with self._lock:
+            for digest in digests:
+                self._known[digest] = now
+                self._known.move_to_end(digest)
+            while len(self._known) > self.known_max:
+                self._known.popitem(last=False)
+
+    def prepare(self, rows: List[Tuple]) -> Tuple[List[Tuple], Dict[str, Tuple]]:
+        """
+        ai_interaction log rows (menu_id, model_name, prompt, response,
+        freshness_score, risk_level, created_at) -> rows for
+        INTERACTION_REF_COLUMNS + the blobs still to write
+        {hash: (codec, raw_size, body)}. No database access.
+        """
+        ref_rows = []
+        # hash -> (codec, text) of every body the rows refer to
+        bodies: Dict[str, Tuple[str, str]] = {}
+        now = time.monotonic()
+
+        for menu_id, model_name, prompt, response, score, risk, created_at in rows:
+            prompt_ref = None
+            if prompt is not None:
+                prompt_ref = prompt_hash(prompt)
+
+                # A known prompt means its segments are stored too
+                if prompt_ref not in bodies and not self._is_known(prompt_ref, now):
+                    segments = []
+                    for segment in split_prompt(prompt):
+                        digest = content_hash(segment)
+                        bodies[digest] = (CODEC_RAW, segment)
+                        segments.append(digest)
+                    bodies[prompt_ref] = (CODEC_SEGMENTS, " ".join(segments))
+
+            response_ref = None
+            if response is not None:
+                response_ref = content_hash(response)
+                bodies[response_ref] = (CODEC_RAW, response)
+
+            ref_rows.append(
+                (menu_id, model_name, prompt_ref, response_ref, score, risk, created_at)
+            )
+
+        missing = [digest for digest in bodies if not self._is_known(digest, now)]
+
+        with self._lock:
+            self._rows += len(rows)
+            self._bodies += len(bodies)
+            self._skipped_known += len(bodies) - len(missing)
+
+        blobs = {}
+        for digest in missing:
+            codec, text = bodies[digest]
+            if codec == CODEC_SEGMENTS:
+                raw = text.encode("ascii")
+                blobs[digest] = (CODEC_SEGMENTS, len(raw), raw)
+            else:
+                blobs[digest] = encode_body(text, self.compress_min_bytes)
+
+        return ref_rows, blobs
+
+    def _count_written(self, blobs: Dict[str, Tuple]):
+        with self._lock:
+            self._written += len(blobs)
+            for codec, raw_size, body in blobs.values():
+                self._raw_bytes += raw_size
+                self._stored_bytes += len(body)
+
+    def write_blobs(self, blobs: Dict[str, Tuple]):
+        """Own transaction, committed before any row references them."""
+        if not blobs:
+            return
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    f"""
+                    INSERT INTO {BLOB_TABLE} (hash, codec, raw_size, body)
+                    VALUES %s
+                    ON CONFLICT (hash) DO UPDATE SET created_at = NOW()
+                    """,
+                    [
+                        (digest, codec, raw_size, body)
+                        for digest, (codec, raw_size, body) in blobs.items()
+                    ],
+                    page_size=len(blobs),
+                )
+            conn.commit()
+
+        self._remember(blobs)
+        self._count_written(blobs)
+
+    async def awrite_blobs(self, conn, blobs: Dict[str, Tuple]):
+        """write_blobs() on an asyncpg connection."""
+        if not blobs:
+            return
+
+        await conn.executemany(
+            f"""
+            INSERT INTO {BLOB_TABLE} (hash, codec, raw_size, body)
+            VALUES ($1, $2, $3, $4)
+            ON CONFLICT (hash) DO UPDATE SET created_at = NOW()
+            """,
+            [
+                (digest, codec, raw_size, body)
+                for digest, (codec, raw_size, body) in blobs.items()
+            ],
+        )
+
+        self._remember(blobs)
+        self._count_written(blobs)
+
+    def to_references(self, rows: List[Tuple]) -> List[Tuple]:
+        """Store the bodies of `rows`, return them as reference rows."""
+        ref_rows, blobs = self.prepare(rows)
+        self.write_blobs(blobs)
+        return ref_rows
+
+    async def ato_references(self, conn, rows: List[Tuple]) -> List[Tuple]:
+        ref_rows, blobs = self.prepare(rows)
+        await self.awrite_blobs(conn, blobs)
+        return ref_rows
+
+    # ---------- read side ----------
+
+    def _cached(self, digests: Iterable[str]) -> Tuple[Dict[str, str], List[str]]:
+        found: Dict[str, str] = {}
+        missing = []
+
+        with self._lock:
+            for digest in set(digests):
+                if digest in self._cache:
+                    self._cache.move_to_end(digest)
+                    found[digest] = self._cache[digest]
+                    self._cache_hits += 1
+                else:
+                    missing.append(digest)
+            self._cache_misses += len(missing)
+
+        return found, missing
+
+    def load(self, digests: Iterable[str], cur=None) -> Dict[str, str]:
+        """hash -> text for every hash found (prompts reassembled, cached)."""
+        found, missing = self._cached(digests)
+        if not missing:
+            return found
+
+        if cur is None:
+            with db_connection() as conn:
+                with conn.cursor() as own_cur:
+                    return {**found, **self._fetch(own_cur, missing)}
+
+        return {**found, **self._fetch(cur, missing)}
+
+    def _fetch(self, cur, digests: List[str]) -> Dict[str, str]:
+        cur.execute(
+            f"SELECT hash, codec, body FROM {BLOB_TABLE} WHERE hash = ANY(%s)",
+            (digests,)
+        )
+
+        texts: Dict[str, str] = {}
+        manifests: Dict[str, List[str]] = {}
+
+        for row in cur.fetchall():
+            if row["codec"] == CODEC_SEGMENTS:
+                manifests[row["hash"]] = bytes(row["body"]).decode("ascii").split()
+            else:
+                texts[row["hash"]] = decode_body(row["codec"], row["body"])
+
+        if manifests:
+            # Segments are plain bodies, so one more lookup is enough
+            parts, missing = self._cached(
+                digest for segments in manifests.values() for digest in segments
+            )
+            if missing:
+                parts.update(self._fetch(cur, missing))
+
+            for digest, segments in manifests.items():
+                if all(segment in parts for segment in segments):
+                    texts[digest] = SEGMENT_SEPARATOR.join(parts[s] for s in segments)
+                else:
+                    print("BLOB STORE ERROR: missing segment of prompt", digest)
+
+        with self._lock:
+            for digest, text in texts.items():
+                self._cache[digest] = text
+            while len(self._cache) > self.cache_max:
+                self._cache.popitem(last=False)
+
+        return texts
+
+    def rehydrate(self, rows: List[dict], cur=None) -> List[dict]:
+        """
+        Fill prompt / response of ai_interactions rows (dicts) from
+        their references, in place; the reference keys are removed.
+        Rows without references are left as they are.
+        """
+        digests = set()
+        for row in rows:
+            for key in ("prompt_hash", "response_hash"):
+                if row.get(key):
+                    digests.add(row[key])
+
+        texts = self.load(digests, cur) if digests else {}
+
+        for row in rows:
+            for key, column in (("prompt_hash", "prompt"), ("response_hash", "response")):
+                digest = row.pop(key, None)
+                if digest is None or row.get(column) is not None:
+                    continue
+
+                if digest in texts:
+                    row[column] = texts[digest]
+                else:
+                    print(f"BLOB STORE ERROR: missing {column}, row", row.get("id"))
+
+        return rows
+
+    # ---------- garbage collection ----------
+
+    def collect_garbage(self) -> int:
+        """
+        Delete blobs no ai_interactions row (or live prompt manifest)
+        refers to any more, e.g. after retention dropped partitions.
+        Full scan of ai_interactions: run it after drops, not per request.
+        """
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    WITH live AS (
+                        SELECT prompt_hash AS hash FROM ai_interactions
+                        WHERE prompt_hash IS NOT NULL
+                        UNION
+                        SELECT response_hash FROM ai_interactions
+                        WHERE response_hash IS NOT NULL
+                    ),
+                    live_segments AS (
+                        SELECT DISTINCT unnest(
+                            string_to_array(convert_from(b.body, 'UTF8'), ' ')
+                        ) AS hash
+                        FROM {BLOB_TABLE} b
+                        JOIN live l ON l.hash = b.hash
+                        WHERE b.codec = %s
+                    )
+                    DELETE FROM {BLOB_TABLE} b
+                    WHERE b.created_at < NOW() - make_interval(secs => %s)
+                      AND NOT EXISTS (SELECT 1 FROM live l WHERE l.hash = b.hash)
+                      AND NOT EXISTS (SELECT 1 FROM live_segments s WHERE s.hash = b.hash)
+                    RETURNING b.hash
+                    """,
+                    (CODEC_SEGMENTS, self.gc_grace_hours * 3600)
+                )
+                collected = [row["hash"] for row in cur.fetchall()]
+            conn.commit()
+
+        with self._lock:
+            for digest in collected:
+                self._known.pop(digest, None)
+                self._cache.pop(digest, None)
+            self._collected += len(collected)
+
+        return len(collected)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                "enabled": blob_store_enabled(),
+                "ready": self.ready,
+                "rows": self._rows,
+                "bodies": self._bodies,
+                "blobs_written": self._written,
+                "skipped_known": self._skipped_known,
+                "raw_bytes_written": self._raw_bytes,
+                "stored_bytes_written": self._stored_bytes,
+                "compression_ratio": (
+                    round(self._raw_bytes / self._stored_bytes, 3)
+                    if self._stored_bytes else None
+                ),
+                "known_hashes": len(self._known),
+                "collected": self._collected,
+                "read_cache": {
+                    "size": len(self._cache),
+                    "hit_rate": (
+                        round(self._cache_hits / lookups, 4) if lookups else None
+                    ),
+                },
+            }
+
+
+blob_store = BlobStore(
+    compress_min_bytes=int(os.getenv("BLOB_COMPRESS_MIN_BYTES", 256)),
+    known_max=int(os.getenv("BLOB_KNOWN_MAX", 50000)),
+    known_ttl=float(os.getenv("BLOB_KNOWN_TTL_SECONDS", 3600)),
+    cache_max=int(os.getenv("BLOB_CACHE_MAX", 4096)),
+    gc_grace_hours=float(os.getenv("BLOB_GC_GRACE_HOURS", 24)),
+)
+
+
+def start_blob_store():
+    """Create / migrate the tables; rows keep full text until this succeeds."""
+    if not blob_store_enabled():
+        return
+
+    try:
+        blob_store.ensure_tables()
+    except Exception as e:
+        print("BLOB STORE SETUP ERROR:", e)
+        return
+
+    blob_store.ready = True
+
+
+# -------------------------
+# Read helpers
+# -------------------------
+
+def fetch_interactions(
+    menu_id: Optional[int] = None,
+    since=None,
+    limit: int = 100,
+) -> List[dict]:
+    """Latest ai_interactions rows, prompt / response as full text."""
+    filters = []
+    params = []
+
+    if menu_id is not None:
+        filters.append("menu_id = %s")
+        params.append(menu_id)
+
+    if since is not None:
+        filters.append("created_at >= %s")
+        params.append(since)
+
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    params.append(limit)
+
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT *
+                FROM ai_interactions
+                {where}
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+                """,
+                params
+            )
+            rows = [dict(row) for row in cur.fetchall()]
+            return blob_store.rehydrate(rows, cur)
+
+
+# -------------------------
+# Backfill (existing rows -> references)
+# -------------------------
+
+def backfill(batch: int = 500, limit: Optional[int] = None) -> dict:
+    """
+    Move the text of rows without references into ai_blobs, one
+    committed batch at a time (safe to interrupt and re-run).
+    The freed space is reused by new rows after VACUUM; VACUUM FULL
+    (or pg_repack) gives it back to the OS.
+    """
+    blob_store.ensure_tables()
+
+    last_id = 0
+    moved = 0
+    raw_bytes = 0
+
+    while limit is None or moved < limit:
+        size = batch if limit is None else min(batch, limit - moved)
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT id, menu_id, model_name, prompt, response,
+                           freshness_score, risk_level, created_at
+                    FROM ai_interactions
+                    WHERE id > %s
+                      AND prompt_hash IS NULL
+                      AND response_hash IS NULL
+                      AND (prompt IS NOT NULL OR response IS NOT NULL)
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    (last_id, size)
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    conn.rollback()
+                    break
+
+                ref_rows, blobs = blob_store.prepare([
+                    (
+                        row["menu_id"], row["model_name"], row["prompt"],
+                        row["response"], row["freshness_score"],
+                        row["risk_level"], row["created_at"],
+                    )
+                    for row in rows
+                ])
+
+                # Blobs first (own transaction), then the references
+                blob_store.write_blobs(blobs)
+
+                execute_values(
+                    cur,
+                    """
+                    UPDATE ai_interactions AS t
+                    SET prompt_hash = v.prompt_hash,
+                        response_hash = v.response_hash,
+                        prompt = NULL,
+                        response = NULL
+                    FROM (VALUES %s) AS v (id, prompt_hash, response_hash)
+                    WHERE t.id = v.id
+                    """,
+                    [
+                        (row["id"], ref[2], ref[3])
+                        for row, ref in zip(rows, ref_rows)
+                    ],
+                    page_size=len(rows),
+                )
+            conn.commit()
+
+        moved += len(rows)
+        raw_bytes += sum(
+            len((row["prompt"] or "").encode("utf-8"))
+            + len((row["response"] or "").encode("utf-8"))
+            for row in rows
+        )
+        last_id = rows[-1]["id"]
+        print(f"BLOB BACKFILL: {moved} rows moved (last id {last_id})")
+
+    return {"rows": moved, "raw_bytes": raw_bytes}
+
+
+def storage_report() -> dict:
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT COUNT(*) AS blobs,
+                       COALESCE(SUM(raw_size), 0) AS raw_bytes,
+                       COALESCE(SUM(octet_length(body)), 0) AS stored_bytes
+                FROM {BLOB_TABLE}
+                """
+            )
+            blobs = cur.fetchone()
+
+            cur.execute(
+                """
+                SELECT COUNT(*) AS rows,
+                       COUNT(*) FILTER (
+                           WHERE prompt_hash IS NOT NULL OR response_hash IS NOT NULL
+                       ) AS referenced_rows,
+                       COALESCE(SUM(octet_length(prompt)), 0)
+                         + COALESCE(SUM(octet_length(response)), 0) AS inline_bytes
+                FROM ai_interactions
+                """
+            )
+            interactions = cur.fetchone()
+
+    return {**dict(blobs), **dict(interactions)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Move ai_interactions prompt / response text into ai_blobs."
+    )
+    parser.add_argument("--backfill", action="store_true")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.backfill:
+        result = backfill(batch=args.batch, limit=args.limit)
+        print(f"✅ Moved {result['rows']} rows ({result['raw_bytes']} bytes of text)")
+
+    print(storage_report())
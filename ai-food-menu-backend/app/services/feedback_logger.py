@@ -1,5 +1,6 @@
 from datetime import datetime
-from app.services.postgres import get_db_connection
+from app.services.postgres import db_connection
+from app.services.log_writer import log_writer
 
 
 def log_human_feedback(
@@ -13,34 +14,42 @@ def log_human_feedback(
     Stores raw human feedback for RLHF.
 
     Called AFTER feedback_analyser.analyze().
-    This function has NO intelligence — it only logs.
+    This function has NO intelligence — it only logs
+    (enqueued while the write-behind writer runs).
     """
 
-    conn = get_db_connection()
-    cur = conn.cursor()
+    if log_writer.enqueue("human_feedback", (
+        menu_id,
+        sentiment,
+        tags,
+        confidence,
+        raw_text,
+        datetime.utcnow(),
+    )):
+        return
 
-    cur.execute(
-        """
-        INSERT INTO feedback_logs (
-            menu_id,
-            sentiment,
-            tags,
-            confidence,
-            raw_text,
-            created_at
-        )
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """,
-        (
-            menu_id,
-            sentiment,
-            tags,
-            confidence,
-            raw_text,
-            datetime.utcnow(),
-        )
-    )
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO feedback_logs (
+                    menu_id,
+                    sentiment,
+                    tags,
+                    confidence,
+                    raw_text,
+                    created_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                (
+                    menu_id,
+                    sentiment,
+                    tags,
+                    confidence,
+                    raw_text,
+                    datetime.utcnow(),
+                )
+            )
 
-    conn.commit()
-    cur.close()
-    conn.close()
+        conn.commit()
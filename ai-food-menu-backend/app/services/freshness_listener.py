@@ -0,0 +1,419 @@
+import json
+import os
+import select
+import threading
+import time
+from typing import Dict, Set
+
+import psycopg2
+from psycopg2 import extensions
+
+from app.services.postgres import get_db_connection
+from app.services.freshness_snapshot import (
+    freshness_snapshot,
+    build_snapshot_entries,
+    persist_snapshot,
+    refresh_snapshot,
+    tenant_snapshots,
+)
+from app.services.tenancy import known_tenants, tenancy_mode
+from context_object.menu_context import MenuContextBuilder, SCHEMA
+
+CHANNEL = "freshness_changes"
+
+# Tables whose row changes can move a dish's freshness
+WATCHED_TABLES = (
+    "ingredient_events",
+    "ingredients",
+    "menu_ingredients",
+    "menu_items",
+)
+
+
+# -------------------------
+# Database side: NOTIFY triggers
+# -------------------------
+
+def ensure_freshness_triggers():
+    """
+    Install (idempotently) row triggers that pg_notify CHANNEL with
+    {"table", "op", "ingredient_id" | "menu_id"} for every change
+    (menu_items also carry "restaurant_id" when the column exists).
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError("Database connection not available")
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                CREATE OR REPLACE FUNCTION {SCHEMA}.notify_freshness_change()
+                RETURNS trigger AS $$
+                DECLARE
+                    rec RECORD;
+                BEGIN
+                    IF TG_OP = 'DELETE' THEN
+                        rec := OLD;
+                    ELSE
+                        rec := NEW;
+                    END IF;
+
+                    IF TG_TABLE_NAME = 'menu_ingredients' THEN
+                        -- A re-keyed mapping drops the old pair first
+                        IF TG_OP = 'UPDATE'
+                           AND (OLD.menu_id, OLD.ingredient_id)
+                               IS DISTINCT FROM (NEW.menu_id, NEW.ingredient_id) THEN
+                            PERFORM pg_notify('{CHANNEL}', json_build_object(
+                                'table', TG_TABLE_NAME, 'op', 'DELETE',
+                                'menu_id', OLD.menu_id,
+                                'ingredient_id', OLD.ingredient_id
+                            )::text);
+                        END IF;
+                        PERFORM pg_notify('{CHANNEL}', json_build_object(
+                            'table', TG_TABLE_NAME, 'op', TG_OP,
+                            'menu_id', rec.menu_id,
+                            'ingredient_id', rec.ingredient_id
+                        )::text);
+                    ELSIF TG_TABLE_NAME = 'menu_items' THEN
+                        PERFORM pg_notify('{CHANNEL}', json_build_object(
+                            'table', TG_TABLE_NAME, 'op', TG_OP,
+                            'menu_id', rec.menu_id,
+                            'restaurant_id', to_jsonb(rec)->'restaurant_id'
+                        )::text);
+                    ELSE
+                        PERFORM pg_notify('{CHANNEL}', json_build_object(
+                            'table', TG_TABLE_NAME, 'op', TG_OP,
+                            'ingredient_id', rec.ingredient_id
+                        )::text);
+                    END IF;
+
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                """
+            )
+
+            for table in WATCHED_TABLES:
+                cur.execute(
+                    f"DROP TRIGGER IF EXISTS freshness_notify ON {SCHEMA}.{table}"
+                )
+                cur.execute(
+                    f"""
+                    CREATE TRIGGER freshness_notify
+                    AFTER INSERT OR UPDATE OR DELETE ON {SCHEMA}.{table}
+                    FOR EACH ROW EXECUTE FUNCTION {SCHEMA}.notify_freshness_change()
+                    """
+                )
+
+        conn.commit()
+
+    finally:
+        conn.close()
+
+
+# -------------------------
+# Listener
+# -------------------------
+
+class FreshnessChangeListener(threading.Thread):
+    """
+    Background LISTEN loop that re-scores only the dishes affected by
+    a change, using a reverse index ingredient_id -> {menu_id}.
+
+    Notifications arriving within `debounce` seconds are handled as one
+    batch (one set-based context load for all affected dishes).
+    After a (re)connect the snapshot is fully refreshed, since
+    notifications sent while disconnected are lost.
+
+    In column tenancy mode the re-scored dishes are also routed to the
+    owning restaurant's snapshot (menu_id -> restaurant_id index).
+    Schema-per-tenant snapshots rely on their periodic refresh.
+    """
+
+    def __init__(self, debounce: float = 0.1, reconnect_delay: float = 5.0):
+        super().__init__(name="freshness-listener", daemon=True)
+        self.debounce = debounce
+        self.reconnect_delay = reconnect_delay
+
+        self._stop_event = threading.Event()
+        self._menus_by_ingredient: Dict[int, Set[int]] = {}
+        self._restaurant_by_menu: Dict[int, int] = {}
+
+        # Stats
+        self._lock = threading.Lock()
+        self._connected = False
+        self._notifications = 0
+        self._batches = 0
+        self._dishes_rescored = 0
+        self._last_batch_ms = None
+        self._last_lag_ms = None
+        self._max_lag_ms = 0.0
+        self._errors = 0
+
+    def stop(self):
+        self._stop_event.set()
+
+    # ---------- main loop ----------
+
+    def run(self):
+        reconnecting = False
+
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = get_db_connection()
+                if not conn:
+                    raise RuntimeError("Database connection not available")
+
+                conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CHANNEL}")
+
+                self._rebuild_index(conn)
+
+                # Catch up on anything sent while we were not listening
+                if reconnecting or not freshness_snapshot.is_fresh():
+                    refresh_snapshot()
+
+                with self._lock:
+                    self._connected = True
+
+                self._listen(conn)
+
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                print("FRESHNESS LISTENER ERROR:", e)
+
+            finally:
+                reconnecting = True
+                with self._lock:
+                    self._connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except psycopg2.Error:
+                        pass
+
+            self._stop_event.wait(self.reconnect_delay)
+
+    def _listen(self, conn):
+        while not self._stop_event.is_set():
+            if select.select([conn], [], [], 1.0) == ([], [], []):
+                continue
+
+            first_seen = time.monotonic()
+            conn.poll()
+
+            # Debounce: let a burst of related changes land together
+            deadline = first_seen + self.debounce
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if select.select([conn], [], [], remaining) != ([], [], []):
+                    conn.poll()
+
+            payloads = []
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    payloads.append(json.loads(notify.payload))
+                except ValueError:
+                    continue
+
+            if payloads:
+                self._handle(conn, payloads, first_seen)
+
+    # ---------- change handling ----------
+
+    def _rebuild_index(self, conn):
+        with conn.cursor() as cur:
+            cur.execute(
+                f"SELECT menu_id, ingredient_id FROM {SCHEMA}.menu_ingredients"
+            )
+            index: Dict[int, Set[int]] = {}
+            for row in cur.fetchall():
+                index.setdefault(row["ingredient_id"], set()).add(row["menu_id"])
+
+        self._menus_by_ingredient = index
+
+        if tenancy_mode() == "column":
+            with conn.cursor() as cur:
+                # Single-restaurant databases have no restaurant_id column
+                cur.execute(
+                    """
+                    SELECT EXISTS (
+                        SELECT 1 FROM information_schema.columns
+                        WHERE table_schema = %s
+                          AND table_name = 'menu_items'
+                          AND column_name = 'restaurant_id'
+                    ) AS has_column
+                    """,
+                    (SCHEMA,)
+                )
+                if not cur.fetchone()["has_column"]:
+                    self._restaurant_by_menu = {}
+                    return
+
+                cur.execute(
+                    f"SELECT menu_id, restaurant_id FROM {SCHEMA}.menu_items"
+                )
+                self._restaurant_by_menu = {
+                    row["menu_id"]: row["restaurant_id"] for row in cur.fetchall()
+                }
+
+    def _affected_menu_ids(self, payloads) -> Set[int]:
+        affected: Set[int] = set()
+
+        for payload in payloads:
+            table = payload.get("table")
+
+            if table == "menu_ingredients":
+                menu_id = payload["menu_id"]
+                ingredient_id = payload["ingredient_id"]
+                menus = self._menus_by_ingredient.setdefault(ingredient_id, set())
+
+                if payload.get("op") == "DELETE":
+                    menus.discard(menu_id)
+                else:
+                    menus.add(menu_id)
+
+                affected.add(menu_id)
+
+            elif table == "menu_items":
+                affected.add(payload["menu_id"])
+
+                if payload.get("op") == "DELETE":
+                    self._restaurant_by_menu.pop(payload["menu_id"], None)
+                elif payload.get("restaurant_id") is not None:
+                    self._restaurant_by_menu[payload["menu_id"]] = payload["restaurant_id"]
+
+            elif payload.get("ingredient_id") is not None:
+                affected |= self._menus_by_ingredient.get(
+                    payload["ingredient_id"], set()
+                )
+
+        return affected
+
+    def _handle(self, conn, payloads, first_seen: float):
+        started = time.monotonic()
+        affected = self._affected_menu_ids(payloads)
+
+        if affected:
+            contexts = MenuContextBuilder.get_menu_contexts(
+                menu_ids=sorted(affected)
+            )
+            entries = build_snapshot_entries(contexts)
+
+            found = {entry["menu"]["menu_id"] for entry in entries.values()}
+            removed = affected - found
+
+            freshness_snapshot.update(entries, removed_menu_ids=removed)
+
+            try:
+                persist_snapshot(entries, prune=False, removed_menu_ids=removed)
+            except Exception as e:
+                print("SNAPSHOT PERSIST ERROR:", e)
+
+            self._route_to_tenants(entries, affected)
+
+        finished = time.monotonic()
+        with self._lock:
+            self._notifications += len(payloads)
+            self._batches += 1
+            self._dishes_rescored += len(affected)
+            self._last_batch_ms = (finished - started) * 1000
+            self._last_lag_ms = (finished - first_seen) * 1000
+            self._max_lag_ms = max(self._max_lag_ms, self._last_lag_ms)
+
+    def _route_to_tenants(self, entries: Dict[str, dict], affected: Set[int]):
+        """
+        Apply re-scored dishes to the restaurant snapshots that exist.
+        A dish is removed from every other restaurant's snapshot, which
+        also covers dishes moved between restaurants.
+        """
+        if tenancy_mode() != "column":
+            return
+
+        snapshots = tenant_snapshots()
+
+        for tenant in known_tenants():
+            snapshot = snapshots.get(tenant.key)
+            if snapshot is None or tenant.restaurant_id is None:
+                continue
+
+            owned = {
+                slug: entry
+                for slug, entry in entries.items()
+                if self._restaurant_by_menu.get(entry["menu"]["menu_id"])
+                == tenant.restaurant_id
+            }
+            owned_ids = {entry["menu"]["menu_id"] for entry in owned.values()}
+
+            snapshot.update(owned, removed_menu_ids=affected - owned_ids)
+
+    # ---------- stats ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "connected": self._connected,
+                "notifications": self._notifications,
+                "batches": self._batches,
+                "dishes_rescored": self._dishes_rescored,
+                "indexed_ingredients": len(self._menus_by_ingredient),
+                "last_batch_ms": (
+                    round(self._last_batch_ms, 3)
+                    if self._last_batch_ms is not None else None
+                ),
+                "last_lag_ms": (
+                    round(self._last_lag_ms, 3)
+                    if self._last_lag_ms is not None else None
+                ),
+                "max_lag_ms": round(self._max_lag_ms, 3),
+                "errors": self._errors,
+            }
+
+
+_listener = None
+
+
+def start_freshness_listener():
+    """
+    Install triggers and start the listener thread (best effort).
+    """
+    global _listener
+
+    if _listener is not None:
+        return _listener
+
+    try:
+        ensure_freshness_triggers()
+    except Exception as e:
+        print("FRESHNESS TRIGGER SETUP ERROR:", e)
+        return None
+
+    _listener = FreshnessChangeListener(
+        debounce=float(os.getenv("FRESHNESS_LISTENER_DEBOUNCE_MS", 100)) / 1000,
+    )
+    _listener.start()
+
+    return _listener
+
+
+def stop_freshness_listener():
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener.join(timeout=5)
+        _listener = None
+
+
+def get_listener_stats() -> dict:
+    if _listener is None:
+        return {"running": False}
+
+    return {"running": True, **_listener.stats()}
@@ -0,0 +1,473 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import xxhash
+from apscheduler.triggers.cron import CronTrigger
+from psycopg2.extras import execute_values
+
+from app.services.postgres import db_connection
+from app.services.scheduler import get_scheduler
+from app.services.tenancy import DEFAULT_TENANT, Tenant
+from context_object.freshness_engine import FreshnessEngine
+from context_object.menu_context import MenuContextBuilder, SCHEMA
+
+SNAPSHOT_TABLE = "menu_freshness_snapshot"
+
+
+def snapshot_interval_seconds() -> float:
+    return float(os.getenv("FRESHNESS_SNAPSHOT_INTERVAL_SECONDS", 60))
+
+
+def snapshot_max_age_seconds() -> float:
+    """Staleness bound: older snapshots are ignored by the read path."""
+    return float(os.getenv("FRESHNESS_SNAPSHOT_MAX_AGE_SECONDS", 300))
+
+
+def _entry_digest(slug: str, entry: dict) -> int:
+    """
+    Content digest of what a client can see for one dish.
+    Deliberately excludes evaluated_at: re-scoring to the same result
+    must not change the data version.
+    """
+    menu = entry["menu"]
+    freshness = entry["freshness"]
+
+    return xxhash.xxh64_intdigest(repr((
+        slug,
+        menu["menu_id"],
+        menu["name"],
+        menu["category"],
+        str(menu["price"]),
+        menu["is_available"],
+        freshness["menu_freshness"],
+        freshness["status"],
+        tuple(sorted(freshness["warnings"])),
+    )))
+
+
+class FreshnessSnapshot:
+    """
+    In-memory, materialized FreshnessEngine.score_menu output
+    for every menu item, refreshed in the background.
+
+    Entries: {slug: {"menu": context["menu"], "freshness": report}}
+    kept in menu order (category, name).
+
+    Every entry carries a content digest; the snapshot version is the
+    XOR of all entry digests, so it only changes when visible data
+    changes and can be maintained in O(changed entries).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._refreshed_at: Optional[datetime] = None
+        self._refreshed_monotonic: Optional[float] = None
+        # slug -> monotonic time of its last incremental update
+        self._touched: Dict[str, float] = {}
+        self._digests: Dict[str, int] = {}
+        self._version = 0
+        self._subscribers: List[Callable[[], None]] = []
+
+    def subscribe(self, callback: Callable[[], None]):
+        """
+        Call `callback` (no arguments) after every publish. Runs on the
+        publishing thread, so it must be quick.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def _notify(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback()
+            except Exception as e:
+                print("SNAPSHOT SUBSCRIBER ERROR:", e)
+
+    def replace(self, entries: Dict[str, dict], started: Optional[float] = None):
+        """
+        Publish a full refresh.
+
+        `started` is when the refresh began reading the database;
+        entries updated incrementally after that moment are newer than
+        the refresh's copy and are kept. Returns the published entries.
+        """
+        with self._lock:
+            if started is not None:
+                for slug, touched_at in self._touched.items():
+                    if touched_at > started and slug in self._entries:
+                        entries[slug] = self._entries[slug]
+
+            self._entries = entries
+            self._touched = {}
+            self._digests = {
+                slug: _entry_digest(slug, entry) for slug, entry in entries.items()
+            }
+            self._version = 0
+            for digest in self._digests.values():
+                self._version ^= digest
+            self._refreshed_at = datetime.now(timezone.utc)
+            self._refreshed_monotonic = time.monotonic()
+
+        self._notify()
+        return entries
+
+    def update(self, entries: Dict[str, dict], removed_menu_ids=()):
+        """
+        Apply an incremental change: upsert `entries` and drop dishes
+        in `removed_menu_ids`. Keeps menu order (category, name).
+        """
+        with self._lock:
+            changed_ids = {
+                entry["menu"]["menu_id"] for entry in entries.values()
+            } | set(removed_menu_ids)
+
+            merged = {
+                slug: entry
+                for slug, entry in self._entries.items()
+                if entry["menu"]["menu_id"] not in changed_ids
+                or slug in entries
+            }
+
+            needs_sort = any(slug not in merged for slug in entries)
+            for slug, entry in entries.items():
+                merged[slug] = entry
+
+            if needs_sort:
+                merged = dict(sorted(
+                    merged.items(),
+                    key=lambda kv: (kv[1]["menu"]["category"], kv[1]["menu"]["name"]),
+                ))
+
+            now = time.monotonic()
+            for slug in entries:
+                self._touched[slug] = now
+
+            for slug in set(self._entries) - set(merged):
+                self._version ^= self._digests.pop(slug, 0)
+            for slug, entry in entries.items():
+                self._version ^= self._digests.get(slug, 0)
+                self._digests[slug] = _entry_digest(slug, entry)
+                self._version ^= self._digests[slug]
+
+            self._entries = merged
+
+        self._notify()
+
+    def age_seconds(self) -> Optional[float]:
+        with self._lock:
+            if self._refreshed_monotonic is None:
+                return None
+            return time.monotonic() - self._refreshed_monotonic
+
+    def is_fresh(self, max_age: Optional[float] = None) -> bool:
+        """
+        True if the snapshot is within the staleness bound and was
+        computed today (scores depend on the UTC date).
+        """
+        max_age = snapshot_max_age_seconds() if max_age is None else max_age
+
+        with self._lock:
+            if self._refreshed_monotonic is None:
+                return False
+            if self._refreshed_at.date() != datetime.now(timezone.utc).date():
+                return False
+            return time.monotonic() - self._refreshed_monotonic <= max_age
+
+    def get(self, slug: str) -> Optional[dict]:
+        with self._lock:
+            return self._entries.get(slug)
+
+    def items(self) -> List[tuple]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def versioned_items(self) -> Tuple[str, List[tuple]]:
+        """(data version, entries) read atomically."""
+        with self._lock:
+            return f"{self._version:016x}", list(self._entries.items())
+
+    def versioned_get(self, slug: str) -> Tuple[Optional[str], Optional[dict]]:
+        """(entry version, entry) read atomically."""
+        with self._lock:
+            if slug not in self._entries:
+                return None, None
+            return f"{self._digests[slug]:016x}", self._entries[slug]
+
+    def stats(self) -> dict:
+        age = self.age_seconds()
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "version": f"{self._version:016x}",
+                "refreshed_at": (
+                    self._refreshed_at.isoformat() if self._refreshed_at else None
+                ),
+                "age_seconds": round(age, 3) if age is not None else None,
+                "max_age_seconds": snapshot_max_age_seconds(),
+            }
+
+
+freshness_snapshot = FreshnessSnapshot()
+
+# One independent snapshot per restaurant: a busy outlet's refresh
+# only ever takes its own lock and replaces its own entries.
+_tenant_snapshots: Dict[str, FreshnessSnapshot] = {
+    DEFAULT_TENANT.key: freshness_snapshot,
+}
+_tenant_snapshots_lock = threading.Lock()
+
+
+def get_freshness_snapshot(tenant: Optional[Tenant] = None) -> FreshnessSnapshot:
+    """
+    Snapshot for a tenant (the shared one for the default tenant).
+    The first call for a restaurant schedules its background refresh.
+    """
+    tenant = tenant or DEFAULT_TENANT
+
+    with _tenant_snapshots_lock:
+        snapshot = _tenant_snapshots.get(tenant.key)
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = FreshnessSnapshot()
+        _tenant_snapshots[tenant.key] = snapshot
+
+    if snapshots_enabled():
+        schedule_snapshot_refresh(tenant)
+
+    return snapshot
+
+
+def tenant_snapshots() -> Dict[str, FreshnessSnapshot]:
+    with _tenant_snapshots_lock:
+        return dict(_tenant_snapshots)
+
+
+def snapshots_enabled() -> bool:
+    return os.getenv("FRESHNESS_SNAPSHOT_ENABLED", "1") == "1"
+
+
+# -------------------------
+# Persistence
+# -------------------------
+
+def ensure_snapshot_table(schema: str = SCHEMA):
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {schema}.{SNAPSHOT_TABLE} (
+                    menu_id INT PRIMARY KEY,
+                    slug TEXT NOT NULL,
+                    menu_freshness DOUBLE PRECISION NOT NULL,
+                    status TEXT NOT NULL,
+                    warnings JSONB NOT NULL,
+                    report JSONB NOT NULL,
+                    evaluated_at TIMESTAMP NOT NULL,
+                    refreshed_at TIMESTAMP NOT NULL DEFAULT NOW()
+                )
+                """
+            )
+
+            # Status / availability filters on GET /menu
+            cur.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS {SNAPSHOT_TABLE}_freshness_idx
+                ON {schema}.{SNAPSHOT_TABLE} (menu_freshness)
+                """
+            )
+
+            # Keyset pagination on GET /menu
+            cur.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS menu_items_category_name_idx
+                ON {schema}.menu_items (category, name, menu_id)
+                """
+            )
+
+        conn.commit()
+
+
+# Schemas whose snapshot table exists (created by their first refresh)
+_snapshot_tables: Set[str] = set()
+_snapshot_tables_lock = threading.Lock()
+
+
+def _ensure_snapshot_table_once(schema: str):
+    with _snapshot_tables_lock:
+        if schema in _snapshot_tables:
+            return
+
+    ensure_snapshot_table(schema)
+
+    with _snapshot_tables_lock:
+        _snapshot_tables.add(schema)
+
+
+def persist_snapshot(
+    entries: Dict[str, dict],
+    prune: bool = True,
+    removed_menu_ids=(),
+    schema: str = SCHEMA,
+):
+    """
+    Upsert snapshot rows into `schema` and delete rows for
+    `removed_menu_ids`. With prune=True (full refresh), also drop
+    every row not in `entries`.
+    """
+    rows = [
+        (
+            entry["menu"]["menu_id"],
+            slug,
+            entry["freshness"]["menu_freshness"],
+            entry["freshness"]["status"],
+            json.dumps(entry["freshness"]["warnings"]),
+            json.dumps(entry["freshness"]),
+            entry["freshness"]["evaluated_at"],
+        )
+        for slug, entry in entries.items()
+    ]
+
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            if rows:
+                execute_values(
+                    cur,
+                    f"""
+                    INSERT INTO {schema}.{SNAPSHOT_TABLE} (
+                        menu_id,
+                        slug,
+                        menu_freshness,
+                        status,
+                        warnings,
+                        report,
+                        evaluated_at
+                    )
+                    VALUES %s
+                    ON CONFLICT (menu_id) DO UPDATE SET
+                        slug = EXCLUDED.slug,
+                        menu_freshness = EXCLUDED.menu_freshness,
+                        status = EXCLUDED.status,
+                        warnings = EXCLUDED.warnings,
+                        report = EXCLUDED.report,
+                        evaluated_at = EXCLUDED.evaluated_at,
+                        refreshed_at = NOW()
+                    """,
+                    rows,
+                )
+
+            if prune:
+                cur.execute(
+                    f"""
+                    DELETE FROM {schema}.{SNAPSHOT_TABLE}
+                    WHERE NOT (menu_id = ANY(%s))
+                    """,
+                    ([row[0] for row in rows],)
+                )
+            elif removed_menu_ids:
+                cur.execute(
+                    f"""
+                    DELETE FROM {schema}.{SNAPSHOT_TABLE}
+                    WHERE menu_id = ANY(%s)
+                    """,
+                    (list(removed_menu_ids),)
+                )
+
+        conn.commit()
+
+
+# -------------------------
+# Refresh
+# -------------------------
+
+def build_snapshot_entries(contexts: Dict[str, dict]) -> Dict[str, dict]:
+    return {
+        slug: {
+            "menu": context["menu"],
+            "freshness": FreshnessEngine.score_menu(context),
+        }
+        for slug, context in contexts.items()
+    }
+
+
+def refresh_snapshot(tenant: Optional[Tenant] = None):
+    """
+    Score every menu item of a tenant and publish the result
+    (memory + table).
+
+    Restaurants in column mode share the public table, which the
+    default tenant's refresh already maintains, so they only publish
+    in memory.
+    """
+    tenant = tenant or DEFAULT_TENANT
+    snapshot = get_freshness_snapshot(tenant)
+
+    started = time.perf_counter()
+    started_monotonic = time.monotonic()
+
+    contexts = MenuContextBuilder.get_menu_contexts(
+        tenant=None if tenant.is_default else tenant
+    )
+    entries = build_snapshot_entries(contexts)
+    entries = snapshot.replace(entries, started=started_monotonic)
+
+    if tenant.owns_schema:
+        try:
+            _ensure_snapshot_table_once(tenant.schema)
+            persist_snapshot(entries, schema=tenant.schema)
+        except Exception as e:
+            # Memory copy is still valid; the table catches up next run
+            print("SNAPSHOT PERSIST ERROR:", e)
+
+    print(
+        f"Freshness snapshot refreshed ({tenant.key}): {len(entries)} items "
+        f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+    )
+
+
+def _safe_refresh(tenant: Optional[Tenant] = None):
+    try:
+        refresh_snapshot(tenant)
+    except Exception as e:
+        print("SNAPSHOT REFRESH ERROR:", e)
+
+
+def schedule_snapshot_refresh(tenant: Optional[Tenant] = None):
+    """
+    Register the periodic refresh for a tenant (plus one just after UTC
+    midnight, when shelf-life scores roll over) and run it once
+    immediately. Each tenant gets its own jobs, so refreshes of
+    different restaurants run independently on the scheduler's pool.
+
+    Only registers jobs (safe on the event loop); the snapshot table
+    is created by the first refresh.
+    """
+    tenant = tenant or DEFAULT_TENANT
+    suffix = "" if tenant.is_default else f":{tenant.key}"
+
+    scheduler = get_scheduler()
+
+    scheduler.add_job(
+        _safe_refresh,
+        "interval",
+        seconds=snapshot_interval_seconds(),
+        args=[tenant],
+        id=f"freshness_snapshot_refresh{suffix}",
+        replace_existing=True,
+        next_run_time=datetime.now(timezone.utc),
+    )
+    scheduler.add_job(
+        _safe_refresh,
+        CronTrigger(hour=0, minute=0, second=5, timezone="UTC"),
+        args=[tenant],
+        id=f"freshness_snapshot_rollover{suffix}",
+        replace_existing=True,
+    )
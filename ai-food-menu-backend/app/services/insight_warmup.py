@@ -0,0 +1,547 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.services.async_postgres import async_db_connection
+from app.services.freshness_snapshot import freshness_snapshot
+from app.services.log_rollups import rollup_interactions
+from app.services.partition_manager import partition_manager
+from app.services.postgres import db_connection
+from app.services.scheduler import get_scheduler
+from context_object.freshness_engine import FreshnessEngine
+from context_object.menu_context import MenuContextBuilder, SCHEMA
+from llm.batch_insights import BatchInsightGenerator
+from llm.circuit_breaker import route_available
+from llm.insight_cache import freshness_fingerprint, insight_cache, insight_cache_key
+from llm.prompt_builder import MenuPromptBuilder
+
+INSIGHTS_TABLE = "menu_insights"
+
+# Lower = warmed first
+STATUS_PRIORITY = {"Unsafe": 0, "Caution": 1, "Fresh": 2}
+
+
+def insight_warmup_enabled() -> bool:
+    return os.getenv("INSIGHT_WARMUP_ENABLED", "1") == "1"
+
+
+def entry_fingerprint(entry: dict) -> str:
+    """
+    freshness_fingerprint() of a snapshot entry: status + warnings come
+    straight from the score_menu report, no context needed.
+    """
+    report = entry["freshness"]
+    return freshness_fingerprint({
+        "overall_risk": report["status"],
+        "ingredients": report["ingredients"],
+    })
+
+
+# -------------------------
+# Storage
+# -------------------------
+
+def ensure_insights_table():
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {SCHEMA}.{INSIGHTS_TABLE} (
+                    menu_id INT PRIMARY KEY,
+                    slug TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    llm_ms DOUBLE PRECISION NOT NULL,
+                    source TEXT NOT NULL,
+                    generated_at TIMESTAMP NOT NULL DEFAULT NOW()
+                )
+                """
+            )
+
+        conn.commit()
+
+
+def load_insight_fingerprints() -> Dict[int, str]:
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"SELECT menu_id, fingerprint FROM {SCHEMA}.{INSIGHTS_TABLE}"
+            )
+            return {row["menu_id"]: row["fingerprint"] for row in cur.fetchall()}
+
+
+def dish_popularity(days: int = 7) -> Dict[int, int]:
+    """
+    AI interactions per dish over the last `days` days, from the
+    hourly rollups once they are maintained (raw rows otherwise).
+    """
+    if partition_manager.rollups_ready:
+        return rollup_interactions(days)
+
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT menu_id, COUNT(*) AS interactions
+                FROM ai_interactions
+                WHERE created_at >= NOW() - make_interval(days => %s)
+                GROUP BY menu_id
+                """,
+                (days,)
+            )
+            return {row["menu_id"]: row["interactions"] for row in cur.fetchall()}
+
+
+_UPSERT_INSIGHT = f"""
+    INSERT INTO {SCHEMA}.{INSIGHTS_TABLE} (
+        menu_id,
+        slug,
+        fingerprint,
+        prompt,
+        response,
+        llm_ms,
+        source,
+        generated_at
+    )
+    VALUES ({{placeholders}})
+    ON CONFLICT (menu_id) DO UPDATE SET
+        slug = EXCLUDED.slug,
+        fingerprint = EXCLUDED.fingerprint,
+        prompt = EXCLUDED.prompt,
+        response = EXCLUDED.response,
+        llm_ms = EXCLUDED.llm_ms,
+        source = EXCLUDED.source,
+        generated_at = EXCLUDED.generated_at
+"""
+
+
+def save_insight(
+    menu_id: int,
+    slug: str,
+    fingerprint: str,
+    prompt: str,
+    response: str,
+    llm_ms: float,
+    source: str = "warmup",
+):
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                _UPSERT_INSIGHT.format(placeholders=", ".join(["%s"] * 8)),
+                (
+                    menu_id, slug, fingerprint, prompt, response, llm_ms, source,
+                    datetime.utcnow(),
+                ),
+            )
+
+        conn.commit()
+
+
+async def store_insight(
+    menu_id: int,
+    slug: str,
+    fingerprint: str,
+    prompt: str,
+    response: str,
+    llm_ms: float,
+    source: str = "on_demand",
+):
+    """Async twin of save_insight for the insight routes."""
+    async with async_db_connection() as conn:
+        await conn.execute(
+            _UPSERT_INSIGHT.format(
+                placeholders=", ".join(f"${i}" for i in range(1, 9))
+            ),
+            menu_id, slug, fingerprint, prompt, response, llm_ms, source,
+            datetime.utcnow(),
+        )
+
+
+async def read_insight(menu_id: int, fingerprint: str) -> Optional[Tuple[str, float]]:
+    """(response, llm_ms) of the stored insight if it matches the fingerprint."""
+    async with async_db_connection() as conn:
+        row = await conn.fetchrow(
+            f"""
+            SELECT response, llm_ms
+            FROM {SCHEMA}.{INSIGHTS_TABLE}
+            WHERE menu_id = $1
+              AND fingerprint = $2
+            """,
+            menu_id,
+            fingerprint,
+        )
+
+    if row is None:
+        return None
+    return row["response"], row["llm_ms"]
+
+
+# -------------------------
+# Rate budget
+# -------------------------
+
+class RateBudget:
+    """
+    Token bucket shared by the warm-up workers: at most `per_minute`
+    LLM calls per minute, bursts up to `burst`. per_minute <= 0
+    disables the limit.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.per_minute = per_minute
+        self.burst = burst if burst is not None else max(per_minute / 6, 1)
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def acquire(self, stop: threading.Event) -> bool:
+        """Block for a token; False if `stop` was set meanwhile."""
+        if self.per_minute <= 0:
+            return not stop.is_set()
+
+        rate = self.per_minute / 60
+
+        while not stop.is_set():
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+
+                wait = (1 - self._tokens) / rate
+
+            stop.wait(wait)
+
+        return False
+
+
+# -------------------------
+# Pipeline
+# -------------------------
+
+class InsightWarmup:
+    """
+    Regenerates insights ahead of the first customer.
+
+    Every snapshot publish requests a run. A run compares each dish's
+    freshness fingerprint (status + warnings) with the one stored in
+    menu_insights and regenerates only the dishes that changed, most
+    urgent first (Unsafe, Caution, then Fresh; popular dishes first
+    within a status), with `concurrency` workers and a shared
+    RateBudget (one token per LLM call). With batch_size > 1, dishes
+    are generated several per call (BatchInsightGenerator). Runs never
+    overlap: requests arriving during a run are merged into one
+    follow-up run. While the LLM circuit is open runs are deferred;
+    the dishes stay outdated, so the next snapshot publish retries them.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        rate_per_minute: float = 30,
+        batch_size: int = 1,
+    ):
+        self.concurrency = concurrency
+        self.budget = RateBudget(rate_per_minute)
+        self.generator = BatchInsightGenerator(batch_size)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pending = False
+        # monotonic time of the oldest change not yet handled by a run
+        self._requested_at: Optional[float] = None
+        self._running = False
+        self._run_started: Optional[float] = None
+
+        # Stats
+        self._runs = 0
+        self._deferred_runs = 0
+        self._last_run_at: Optional[datetime] = None
+        self._last_run_ms: Optional[float] = None
+        self._queued = 0
+        self._done = 0
+        self._failed = 0
+        self._unchanged = 0
+        self._generated_total = 0
+        self._failed_total = 0
+        self._lag_seconds: deque = deque(maxlen=256)
+
+    # ---------- triggering ----------
+
+    def request(self):
+        """Snapshot subscriber: schedule a run (cheap, non-blocking)."""
+        if self._stop.is_set():
+            return
+
+        with self._lock:
+            if self._requested_at is None:
+                self._requested_at = time.monotonic()
+            if self._pending:
+                return
+            self._pending = True
+
+            # A running loop picks the request up when its run ends
+            if self._running:
+                return
+
+        get_scheduler().add_job(
+            self.run,
+            id="insight_warmup",
+            replace_existing=True,
+            next_run_time=datetime.now(timezone.utc),
+        )
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """Scheduler job: run until no request is pending."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+
+        try:
+            while not self._stop.is_set():
+                with self._lock:
+                    if not self._pending:
+                        self._running = False
+                        return
+                    self._pending = False
+                    requested_at = self._requested_at
+                    self._requested_at = None
+
+                try:
+                    self._run_once(requested_at or time.monotonic())
+                except Exception as e:
+                    print("INSIGHT WARMUP ERROR:", e)
+        finally:
+            with self._lock:
+                self._running = False
+
+    # ---------- one run ----------
+
+    def plan(self) -> List[Tuple[str, dict]]:
+        """Snapshot entries whose insight is missing or outdated, by priority."""
+        stored = load_insight_fingerprints()
+        entries = freshness_snapshot.items()
+
+        changed = [
+            (slug, entry)
+            for slug, entry in entries
+            if stored.get(entry["menu"]["menu_id"]) != entry_fingerprint(entry)
+        ]
+
+        with self._lock:
+            self._unchanged = len(entries) - len(changed)
+
+        if not changed:
+            return []
+
+        popularity = dish_popularity()
+        changed.sort(key=lambda item: (
+            STATUS_PRIORITY.get(item[1]["freshness"]["status"], len(STATUS_PRIORITY)),
+            -popularity.get(item[1]["menu"]["menu_id"], 0),
+            item[1]["freshness"]["menu_freshness"],
+        ))
+        return changed
+
+    def _run_once(self, requested_at: float):
+        started = time.perf_counter()
+        plan = self.plan()
+
+        with self._lock:
+            self._runs += 1
+            self._queued = len(plan)
+            self._run_started = time.monotonic()
+            self._done = 0
+            self._failed = 0
+
+        if plan and not route_available(self.generator.route):
+            with self._lock:
+                self._deferred_runs += 1
+                self._queued = 0
+            print(f"Insight warm-up: LLM circuit open, {len(plan)} dishes deferred")
+            plan = []
+
+        if plan:
+            contexts = MenuContextBuilder.get_menu_contexts(
+                menu_ids=[entry["menu"]["menu_id"] for _, entry in plan]
+            )
+
+            # Workers take jobs in submission (= priority) order
+            with ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="insight-warmup"
+            ) as pool:
+                size = self.generator.batch_size
+                for i in range(0, len(plan), size):
+                    batch = [
+                        (slug, contexts.get(slug)) for slug, _ in plan[i:i + size]
+                    ]
+                    pool.submit(self._warm_batch, batch, requested_at)
+
+        with self._lock:
+            self._last_run_at = datetime.now(timezone.utc)
+            self._last_run_ms = (time.perf_counter() - started) * 1000
+
+        if plan:
+            print(
+                f"Insight warm-up: {self._done}/{len(plan)} generated, "
+                f"{self._failed} failed in {self._last_run_ms:.1f}ms"
+            )
+
+    def _fail(self, count: int, slug: str, error: Exception):
+        with self._lock:
+            first_failure = self._failed == 0
+            self._failed += count
+            self._failed_total += count
+        if first_failure:
+            print("INSIGHT WARMUP ERROR:", slug, error)
+
+    def _warm_batch(self, batch: List[Tuple[str, Optional[dict]]], requested_at: float):
+        """
+        Generate + store insights for up to batch_size dishes
+        (one LLM call per dish when batch_size is 1).
+        """
+        payloads = {}
+        contexts = {}
+
+        for slug, context in batch:
+            if context is None:
+                # Removed since the snapshot was taken
+                with self._lock:
+                    self._done += 1
+                continue
+
+            report = FreshnessEngine.score_menu(context)
+            payloads[slug] = MenuPromptBuilder.build_insight_payload(context, report)
+            contexts[slug] = context
+
+        if not payloads:
+            return
+
+        try:
+            results = self.generator.generate(
+                payloads, acquire=lambda: self.budget.acquire(self._stop)
+            )
+        except Exception as e:
+            self._fail(len(payloads), next(iter(payloads)), e)
+            return
+
+        if self._stop.is_set():
+            return
+
+        for slug, payload in payloads.items():
+            if slug not in results:
+                self._fail(1, slug, RuntimeError("no answer"))
+                continue
+
+            response, prompt, llm_ms = results[slug]
+            fingerprint = freshness_fingerprint(payload)
+
+            try:
+                save_insight(
+                    contexts[slug]["menu"]["menu_id"],
+                    slug,
+                    fingerprint,
+                    prompt,
+                    response,
+                    llm_ms,
+                )
+            except Exception as e:
+                self._fail(1, slug, e)
+                continue
+
+            insight_cache.put(
+                slug, insight_cache_key(slug, payload), fingerprint, response, llm_ms
+            )
+
+            with self._lock:
+                self._done += 1
+                self._generated_total += 1
+                self._lag_seconds.append(time.monotonic() - requested_at)
+
+    # ---------- stats ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            lags = list(self._lag_seconds)
+            remaining = self._queued - self._done - self._failed if self._running else 0
+
+            return {
+                "enabled": insight_warmup_enabled(),
+                "running": self._running,
+                "pending": self._pending,
+                "concurrency": self.concurrency,
+                "rate_per_minute": self.budget.per_minute,
+                "batching": self.generator.stats(),
+                "runs": self._runs,
+                "deferred_runs": self._deferred_runs,
+                "last_run_at": (
+                    self._last_run_at.isoformat() if self._last_run_at else None
+                ),
+                "last_run_ms": (
+                    round(self._last_run_ms, 3) if self._last_run_ms is not None else None
+                ),
+                "progress": {
+                    "queued": self._queued,
+                    "done": self._done,
+                    "failed": self._failed,
+                    "remaining": remaining,
+                    "unchanged": self._unchanged,
+                },
+                "generated_total": self._generated_total,
+                "failed_total": self._failed_total,
+                # Freshness change -> insight stored
+                "lag_seconds": {
+                    "last": round(lags[-1], 3) if lags else None,
+                    "avg": round(sum(lags) / len(lags), 3) if lags else None,
+                    "max": round(max(lags), 3) if lags else None,
+                },
+                "current_run_seconds": (
+                    round(time.monotonic() - self._run_started, 3)
+                    if self._running and self._run_started is not None else None
+                ),
+            }
+
+
+insight_warmup = InsightWarmup(
+    concurrency=int(os.getenv("INSIGHT_WARMUP_CONCURRENCY", 2)),
+    rate_per_minute=float(os.getenv("INSIGHT_WARMUP_RATE_PER_MINUTE", 30)),
+    batch_size=int(os.getenv("INSIGHT_WARMUP_BATCH_SIZE", 1)),
+)
+
+
+_subscribed = False
+
+
+def start_insight_warmup():
+    """Create the table and warm up after every snapshot publish."""
+    global _subscribed
+
+    try:
+        ensure_insights_table()
+    except Exception as e:
+        print("INSIGHTS TABLE SETUP ERROR:", e)
+        return
+
+    insight_warmup._stop.clear()
+
+    if not _subscribed:
+        freshness_snapshot.subscribe(insight_warmup.request)
+        _subscribed = True
+
+
+def stop_insight_warmup():
+    insight_warmup.stop()
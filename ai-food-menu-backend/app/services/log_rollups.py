@@ -0,0 +1,284 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.services.async_postgres import async_db_connection
+from app.services.postgres import db_connection
+
+# Per dish, per hour aggregates of the log tables. Dashboards read
+# these instead of the raw (partitioned, retention-limited) rows.
+#
+# Each source table owns its columns: re-rolling an hour from one
+# source never touches what the others contributed, so an hour stays
+# correct after one of its sources was dropped by retention.
+
+ROLLUP_TABLE = "dish_hourly_rollups"
+
+# source table -> (time column, aggregate query, rollup columns)
+ROLLUP_SOURCES = {
+    "ai_interactions": (
+        "created_at",
+        """
+        SELECT menu_id,
+               date_trunc('hour', created_at) AS hour,
+               COUNT(*) AS interactions,
+               COALESCE(SUM(freshness_score), 0) AS freshness_sum,
+               COUNT(freshness_score) AS freshness_samples
+        FROM ai_interactions
+        WHERE menu_id IS NOT NULL
+          {window}
+        GROUP BY 1, 2
+        """,
+        ("interactions", "freshness_sum", "freshness_samples"),
+    ),
+    "freshness_logs": (
+        "created_at",
+        """
+        SELECT menu_id,
+               date_trunc('hour', created_at) AS hour,
+               COUNT(*) AS ingredient_checks,
+               COALESCE(SUM(freshness_score), 0) AS ingredient_freshness_sum
+        FROM freshness_logs
+        WHERE menu_id IS NOT NULL
+          {window}
+        GROUP BY 1, 2
+        """,
+        ("ingredient_checks", "ingredient_freshness_sum"),
+    ),
+    # feedback_logs.menu_id is the dish id (INT); rows written before the
+    # feedback route resolved slugs may hold the slug, so compare as text
+    "feedback_logs": (
+        "f.created_at",
+        """
+        SELECT m.menu_id,
+               date_trunc('hour', f.created_at) AS hour,
+               COUNT(*) AS feedback_count,
+               COALESCE(SUM(f.sentiment), 0) AS sentiment_sum,
+               COUNT(f.sentiment) AS sentiment_samples
+        FROM feedback_logs f
+        JOIN menu_items m ON f.menu_id::text IN (m.menu_id::text, m.slug)
+        WHERE TRUE
+          {window}
+        GROUP BY 1, 2
+        """,
+        ("feedback_count", "sentiment_sum", "sentiment_samples"),
+    ),
+}
+
+
+def rollup_lookback_hours() -> int:
+    """Hours re-rolled on every run (late / write-behind rows)."""
+    return int(os.getenv("ROLLUP_LOOKBACK_HOURS", 3))
+
+
+def rollup_retention_days() -> int:
+    return int(os.getenv("ROLLUP_RETENTION_DAYS", 730))
+
+
+def hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+# -------------------------
+# Storage
+# -------------------------
+
+def ensure_rollup_table():
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+                    menu_id INT NOT NULL,
+                    hour TIMESTAMP NOT NULL,
+                    interactions INT NOT NULL DEFAULT 0,
+                    freshness_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    freshness_samples INT NOT NULL DEFAULT 0,
+                    ingredient_checks INT NOT NULL DEFAULT 0,
+                    ingredient_freshness_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    feedback_count INT NOT NULL DEFAULT 0,
+                    sentiment_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    sentiment_samples INT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (menu_id, hour)
+                )
+                """
+            )
+
+            # Time-window reads across all dishes
+            cur.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS {ROLLUP_TABLE}_hour_idx
+                ON {ROLLUP_TABLE} (hour)
+                """
+            )
+
+        conn.commit()
+
+
+def refresh_rollups(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sources: Optional[List[str]] = None,
+) -> Dict[str, int]:
+    """
+    Re-aggregate [start, end) from the source tables (None = unbounded)
+    and upsert the hours found. Returns the rows upserted per source,
+    None for a source that failed.
+
+    Each source commits on its own, so one failing source never rolls
+    back (or blocks) the others.
+    """
+    upserted: Dict[str, Optional[int]] = {}
+
+    with db_connection() as conn:
+        for source in sources or ROLLUP_SOURCES:
+            column, query, columns = ROLLUP_SOURCES[source]
+
+            window = ""
+            params = []
+            if start is not None:
+                window += f" AND {column} >= %s"
+                params.append(start)
+            if end is not None:
+                window += f" AND {column} < %s"
+                params.append(end)
+
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        f"""
+                        INSERT INTO {ROLLUP_TABLE} (menu_id, hour, {', '.join(columns)})
+                        {query.format(window=window)}
+                        ON CONFLICT (menu_id, hour) DO UPDATE SET
+                            {', '.join(f'{col} = EXCLUDED.{col}' for col in columns)},
+                            updated_at = NOW()
+                        """,
+                        params
+                    )
+                    upserted[source] = cur.rowcount
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print("ROLLUP ERROR:", source, e)
+                upserted[source] = None
+
+    return upserted
+
+
+def refresh_recent_rollups() -> Dict[str, Optional[int]]:
+    start = hour_start(datetime.utcnow()) - timedelta(hours=rollup_lookback_hours())
+    return refresh_rollups(start=start)
+
+
+def drop_expired_rollups() -> int:
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                DELETE FROM {ROLLUP_TABLE}
+                WHERE hour < NOW() - make_interval(days => %s)
+                """,
+                (rollup_retention_days(),)
+            )
+            deleted = cur.rowcount
+
+        conn.commit()
+
+    return deleted
+
+
+# -------------------------
+# Reads (dashboards / analytics routes)
+# -------------------------
+
+def rollup_interactions(days: int = 7) -> Dict[int, int]:
+    """AI interactions per dish over the last `days` days."""
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT menu_id, SUM(interactions) AS interactions
+                FROM {ROLLUP_TABLE}
+                WHERE hour >= NOW() - make_interval(days => %s)
+                GROUP BY menu_id
+                """,
+                (days,)
+            )
+            return {
+                row["menu_id"]: int(row["interactions"]) for row in cur.fetchall()
+            }
+
+
+_SUMMARY_COLUMNS = """
+    SUM(r.interactions) AS interactions,
+    ROUND((SUM(r.freshness_sum) / NULLIF(SUM(r.freshness_samples), 0))::numeric, 2)
+        AS avg_freshness,
+    SUM(r.ingredient_checks) AS ingredient_checks,
+    ROUND((SUM(r.ingredient_freshness_sum) / NULLIF(SUM(r.ingredient_checks), 0))::numeric, 2)
+        AS avg_ingredient_freshness,
+    SUM(r.feedback_count) AS feedback_count,
+    ROUND((SUM(r.sentiment_sum) / NULLIF(SUM(r.sentiment_samples), 0))::numeric, 4)
+        AS avg_sentiment
+"""
+
+
+def _summary_row(row) -> dict:
+    summary = dict(row)
+    for key in ("avg_freshness", "avg_ingredient_freshness", "avg_sentiment"):
+        if summary.get(key) is not None:
+            summary[key] = float(summary[key])
+    for key in ("interactions", "ingredient_checks", "feedback_count"):
+        if key in summary:
+            summary[key] = int(summary[key] or 0)
+    if isinstance(summary.get("hour"), datetime):
+        summary["hour"] = summary["hour"].isoformat()
+    return summary
+
+
+async def dish_summaries(hours: int = 24) -> List[dict]:
+    """Per dish totals / averages over the last `hours` hours."""
+    async with async_db_connection() as conn:
+        rows = await conn.fetch(
+            f"""
+            SELECT m.menu_id, m.slug, m.name,
+                   {_SUMMARY_COLUMNS}
+            FROM {ROLLUP_TABLE} r
+            JOIN menu_items m ON m.menu_id = r.menu_id
+            WHERE r.hour >= $1
+            GROUP BY m.menu_id, m.slug, m.name
+            ORDER BY interactions DESC, m.name
+            """,
+            hour_start(datetime.utcnow()) - timedelta(hours=hours - 1),
+        )
+
+    return [_summary_row(row) for row in rows]
+
+
+async def dish_hourly(slug: str, hours: int = 48) -> List[dict]:
+    """
+    Hourly series of one dish, oldest first (hours without any
+    activity are omitted). Raises ValueError for an unknown slug.
+    """
+    async with async_db_connection() as conn:
+        menu_id = await conn.fetchval(
+            "SELECT menu_id FROM menu_items WHERE slug = $1", slug
+        )
+        if menu_id is None:
+            raise ValueError(f"Menu item not found: {slug}")
+
+        rows = await conn.fetch(
+            f"""
+            SELECT r.hour,
+                   {_SUMMARY_COLUMNS}
+            FROM {ROLLUP_TABLE} r
+            WHERE r.menu_id = $1
+              AND r.hour >= $2
+            GROUP BY r.hour
+            ORDER BY r.hour
+            """,
+            menu_id,
+            hour_start(datetime.utcnow()) - timedelta(hours=hours - 1),
+        )
+
+    return [_summary_row(row) for row in rows]
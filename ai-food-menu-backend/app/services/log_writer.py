@@ -0,0 +1,387 @@
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from app.services.blob_store import INTERACTION_REF_COLUMNS, blob_store
+from app.services.postgres import db_connection
+
+
+# -------------------------
+# Record kinds: (table, columns)
+# -------------------------
+
+LOG_RECORDS = {
+    "ai_interaction": (
+        "ai_interactions",
+        ("menu_id", "model_name", "prompt", "response",
+         "freshness_score", "risk_level", "created_at"),
+    ),
+    "freshness": (
+        "freshness_logs",
+        ("menu_id", "ingredient_id", "freshness_score",
+         "risk_level", "factors", "created_at"),
+    ),
+    # created_at is left to the column default (NOW()), as before
+    "feedback": (
+        "feedback_logs",
+        ("menu_id", "feedback_text", "sentiment", "tags", "confidence"),
+    ),
+    "human_feedback": (
+        "feedback_logs",
+        ("menu_id", "sentiment", "tags", "confidence", "raw_text", "created_at"),
+    ),
+}
+
+BACKPRESSURE_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+
+def write_behind_enabled() -> bool:
+    """LOG_WRITE_BEHIND=0 restores one INSERT + commit per log call."""
+    return os.getenv("LOG_WRITE_BEHIND", "1") == "1"
+
+
+class WriteBehindLogWriter:
+    """
+    In-process write-behind queue for the log tables.
+
+    Request handlers only enqueue(); a background thread flushes the
+    queue with one multi-row INSERT (execute_values) + commit per
+    record kind, every `flush_interval` seconds or as soon as
+    `batch_size` records are waiting.
+
+    The queue holds at most `max_queue` records. When it is full the
+    backpressure `policy` applies:
+      - drop_newest: the new record is dropped (default; never blocks)
+      - drop_oldest: the oldest queued record makes room
+      - block: the caller waits up to `block_ms` for room, then the
+        record is dropped. This stalls the event loop when called from
+        `async def` code, so use it only for sync callers.
+
+    When the database is unreachable, batches are put back and
+    retried up to `max_attempts` times. When it rejects a batch, its
+    rows are re-inserted one by one (savepoints) and only the rows the
+    database rejects are dropped. stop() flushes what is left.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        policy: str = "drop_newest",
+        block_ms: float = 50,
+        max_attempts: int = 3,
+    ):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_ms = block_ms
+        self.max_attempts = max_attempts
+
+        self._cond = threading.Condition()
+        # (kind, values, attempts)
+        self._queue: deque = deque()
+        self._in_flight = 0
+        self._flush_requested = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Stats
+        self._peak_depth = 0
+        self._enqueued = 0
+        self._written: Dict[str, int] = {}
+        self._dropped_full = 0
+        self._dropped_failed = 0
+        self._dropped_rejected = 0
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._flush_ms: deque = deque(maxlen=256)
+        self._flush_rows: deque = deque(maxlen=256)
+        self._last_flush_at: Optional[datetime] = None
+
+    # ---------- producer side ----------
+
+    def enqueue(self, kind: str, values: Tuple) -> bool:
+        """
+        Queue one record. False only when the writer is not running
+        (the caller should write it directly); records dropped by the
+        backpressure policy still count as handled.
+        """
+        if kind not in LOG_RECORDS:
+            raise ValueError(f"Unknown log record kind: {kind}")
+
+        with self._cond:
+            if self._thread is None or self._stopping:
+                return False
+
+            if len(self._queue) >= self.max_queue:
+                if self.policy == "drop_oldest":
+                    self._queue.popleft()
+                    self._dropped_full += 1
+
+                elif self.policy == "block":
+                    self._cond.wait_for(
+                        lambda: len(self._queue) < self.max_queue or self._stopping,
+                        timeout=self.block_ms / 1000,
+                    )
+
+                if len(self._queue) >= self.max_queue or self._stopping:
+                    self._dropped_full += 1
+                    return True
+
+            self._queue.append((kind, values, 0))
+            self._enqueued += 1
+            self._peak_depth = max(self._peak_depth, len(self._queue))
+
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+
+        return True
+
+    # ---------- flushing ----------
+
+    def _take_batch(self):
+        """Wait for a flush trigger; None once stopped and drained."""
+        with self._cond:
+            deadline = time.monotonic() + self.flush_interval
+
+            while (
+                not self._stopping
+                and not self._flush_requested
+                and len(self._queue) < self.batch_size
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            if not self._queue:
+                self._flush_requested = False
+                self._cond.notify_all()
+                return None if self._stopping else []
+
+            count = min(len(self._queue), self.batch_size)
+            batch = [self._queue.popleft() for _ in range(count)]
+            self._in_flight = count
+            if not self._queue:
+                self._flush_requested = False
+
+            # Room for blocked producers
+            self._cond.notify_all()
+            return batch
+
+    @staticmethod
+    def _insert(cur, table: str, columns, rows):
+        execute_values(
+            cur,
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s",
+            rows,
+            page_size=len(rows),
+        )
+
+    def _insert_rows(self, table: str, columns, rows) -> int:
+        """Row by row under savepoints; returns the number of rejected rows."""
+        rejected = 0
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                for row in rows:
+                    cur.execute("SAVEPOINT log_row")
+                    try:
+                        self._insert(cur, table, columns, [row])
+                    except psycopg2.Error as e:
+                        cur.execute("ROLLBACK TO SAVEPOINT log_row")
+                        if not rejected:
+                            print("LOG WRITER REJECTED ROW:", table, e)
+                        rejected += 1
+            conn.commit()
+
+        return rejected
+
+    def _write(self, batch):
+        started = time.perf_counter()
+
+        by_kind: Dict[str, list] = {}
+        for record in batch:
+            by_kind.setdefault(record[0], []).append(record)
+
+        failed = []
+        rejected = 0
+
+        for kind, records in by_kind.items():
+            table, columns = LOG_RECORDS[kind]
+            rows = [values for _, values, _ in records]
+            kind_rejected = 0
+
+            try:
+                if kind == "ai_interaction" and blob_store.ready:
+                    # Prompt / response bodies go to ai_blobs, rows keep references
+                    columns = INTERACTION_REF_COLUMNS
+                    rows = blob_store.to_references(rows)
+
+                try:
+                    with db_connection() as conn:
+                        with conn.cursor() as cur:
+                            self._insert(cur, table, columns, rows)
+                        conn.commit()
+
+                except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                    raise
+
+                except psycopg2.Error:
+                    # Bad data somewhere in the batch: isolate it
+                    kind_rejected = self._insert_rows(table, columns, rows)
+
+            except Exception as e:
+                # Database unreachable: retry the whole batch later
+                print("LOG WRITER ERROR:", kind, e)
+                failed.extend(records)
+                continue
+
+            rejected += kind_rejected
+            with self._cond:
+                self._written[kind] = (
+                    self._written.get(kind, 0) + len(records) - kind_rejected
+                )
+
+        elapsed = (time.perf_counter() - started) * 1000
+
+        with self._cond:
+            self._in_flight = 0
+            self._flushes += 1
+            self._flush_ms.append(elapsed)
+            self._flush_rows.append(len(batch) - len(failed) - rejected)
+            self._last_flush_at = datetime.now(timezone.utc)
+            self._dropped_rejected += rejected
+
+            if failed:
+                self._failed_flushes += 1
+
+                # Retry at the front, oldest first, while there is room
+                for kind, values, attempts in reversed(failed):
+                    if attempts + 1 >= self.max_attempts or len(self._queue) >= self.max_queue:
+                        self._dropped_failed += 1
+                    else:
+                        self._queue.appendleft((kind, values, attempts + 1))
+
+            self._cond.notify_all()
+
+        if failed and not self._stopping:
+            # Don't hammer a failing database
+            time.sleep(min(self.flush_interval, 1.0))
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            if batch:
+                self._write(batch)
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Write everything queued now; True once the queue is empty."""
+        with self._cond:
+            if self._thread is None:
+                return not self._queue
+
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: not self._queue and self._in_flight == 0, timeout=timeout
+            )
+
+    def stop(self, timeout: float = 10.0):
+        """Stop accepting records, flush the queue, join the thread."""
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+
+        thread.join(timeout)
+
+        with self._cond:
+            self._thread = None
+            if self._queue:
+                print(f"LOG WRITER: {len(self._queue)} records not written at shutdown")
+
+    # ---------- stats ----------
+
+    def stats(self) -> dict:
+        with self._cond:
+            flush_ms = sorted(self._flush_ms)
+            rows = list(self._flush_rows)
+
+            return {
+                "enabled": write_behind_enabled(),
+                "running": self._thread is not None and not self._stopping,
+                "policy": self.policy,
+                "queue_depth": len(self._queue),
+                "peak_depth": self._peak_depth,
+                "max_queue": self.max_queue,
+                "batch_size": self.batch_size,
+                "flush_interval": self.flush_interval,
+                "enqueued": self._enqueued,
+                "written": dict(self._written),
+                "dropped": {
+                    "queue_full": self._dropped_full,
+                    "insert_failed": self._dropped_failed,
+                    "rejected": self._dropped_rejected,
+                },
+                "flushes": self._flushes,
+                "failed_flushes": self._failed_flushes,
+                "rows_per_flush": round(sum(rows) / len(rows), 2) if rows else None,
+                "flush_ms": {
+                    "last": round(self._flush_ms[-1], 3) if flush_ms else None,
+                    "p50": round(flush_ms[len(flush_ms) // 2], 3) if flush_ms else None,
+                    "p95": (
+                        round(flush_ms[min(len(flush_ms) - 1, int(len(flush_ms) * 0.95))], 3)
+                        if flush_ms else None
+                    ),
+                    "max": round(flush_ms[-1], 3) if flush_ms else None,
+                },
+                "last_flush_at": (
+                    self._last_flush_at.isoformat() if self._last_flush_at else None
+                ),
+            }
+
+
+log_writer = WriteBehindLogWriter(
+    max_queue=int(os.getenv("LOG_QUEUE_MAX", 10000)),
+    batch_size=int(os.getenv("LOG_BATCH_SIZE", 500)),
+    flush_interval=float(os.getenv("LOG_FLUSH_INTERVAL_SECONDS", 1.0)),
+    policy=os.getenv("LOG_QUEUE_POLICY", "drop_newest"),
+    block_ms=float(os.getenv("LOG_QUEUE_BLOCK_MS", 50)),
+)
+
+
+def start_log_writer():
+    if write_behind_enabled():
+        log_writer.start()
+
+
+def stop_log_writer():
+    log_writer.stop(float(os.getenv("LOG_SHUTDOWN_TIMEOUT_SECONDS", 10)))
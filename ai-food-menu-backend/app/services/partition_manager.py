@@ -0,0 +1,758 @@
+import argparse
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from app.services.log_rollups import (
+    ROLLUP_SOURCES,
+    drop_expired_rollups,
+    ensure_rollup_table,
+    hour_start,
+    refresh_recent_rollups,
+    refresh_rollups,
+)
+from app.services.blob_store import blob_store
+from app.services.postgres import db_connection
+from app.services.scheduler import get_scheduler
+from context_object.menu_context import SCHEMA
+
+# Range partitions (by time) for the append-only log tables.
+#
+# An existing heap is converted once: it is renamed to <table>_legacy
+# and attached to a new partitioned <table> as the partition holding
+# everything up to the end of its newest period. New partitions
+# (<table>_pYYYYMMDD or <table>_pYYYYMM) are created ahead of time; a
+# <table>_default partition catches anything outside them and is
+# drained into the right partition when that partition gets created.
+# The primary key becomes (id, <time column>), as a partitioned table
+# requires, so the time column is NOT NULL from then on. Partitions past retention are rolled up
+# (see log_rollups), detached and dropped; the legacy partition has its
+# old rows deleted in batches until all of it is past retention.
+
+PARTITIONED_TABLES = {
+    "ai_interactions": {"column": "created_at", "interval": "daily", "retention_days": 90},
+    "freshness_logs": {"column": "created_at", "interval": "daily", "retention_days": 90},
+    "feedback_logs": {"column": "created_at", "interval": "monthly", "retention_days": 365},
+    "storage_conditions": {"column": "last_checked", "interval": "monthly", "retention_days": 180},
+}
+
+PARTITION_INTERVALS = ("daily", "monthly")
+
+_BOUND_RE = re.compile(r"FROM \((.+)\) TO \((.+)\)")
+
+
+def partition_manager_enabled() -> bool:
+    return os.getenv("PARTITION_MANAGER_ENABLED", "1") == "1"
+
+
+def table_settings(table: str) -> dict:
+    """
+    PARTITIONED_TABLES entry, overridable per table, e.g.
+    AI_INTERACTIONS_PARTITION_INTERVAL=monthly,
+    AI_INTERACTIONS_RETENTION_DAYS=30 (0 = keep forever).
+    """
+    settings = dict(PARTITIONED_TABLES[table])
+    prefix = table.upper()
+
+    settings["interval"] = os.getenv(f"{prefix}_PARTITION_INTERVAL", settings["interval"])
+    settings["retention_days"] = int(
+        os.getenv(f"{prefix}_RETENTION_DAYS", settings["retention_days"])
+    )
+
+    if settings["interval"] not in PARTITION_INTERVALS:
+        raise ValueError(f"Unknown partition interval for {table}: {settings['interval']}")
+
+    return settings
+
+
+def partitions_ahead() -> int:
+    """Periods created in advance, beyond the current one."""
+    return int(os.getenv("PARTITIONS_AHEAD", 3))
+
+
+# -------------------------
+# Periods
+# -------------------------
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    if interval == "monthly":
+        return datetime(moment.year, moment.month, 1)
+    return datetime(moment.year, moment.month, moment.day)
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    if interval == "monthly":
+        if start.month == 12:
+            return datetime(start.year + 1, 1, 1)
+        return datetime(start.year, start.month + 1, 1)
+    return start + timedelta(days=1)
+
+
+def partition_name(table: str, start: datetime, interval: str) -> str:
+    suffix = start.strftime("%Y%m" if interval == "monthly" else "%Y%m%d")
+    return f"{table}_p{suffix}"
+
+
+def _utcnow() -> datetime:
+    # Log timestamps are naive UTC (datetime.utcnow())
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    """A FROM / TO value of pg_get_expr(relpartbound); None for MINVALUE / MAXVALUE."""
+    value = value.strip()
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+# -------------------------
+# Catalog
+# -------------------------
+
+def is_partitioned(cur, table: str) -> bool:
+    cur.execute(
+        """
+        SELECT c.relkind
+        FROM pg_class c
+        WHERE c.oid = to_regclass(%s)
+        """,
+        (f"{SCHEMA}.{table}",)
+    )
+    row = cur.fetchone()
+    return row is not None and row["relkind"] == "p"
+
+
+def list_partitions(cur, table: str) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """
+    (name, start, end) of every range partition, oldest first
+    (start None = MINVALUE). The default partition is left out.
+    """
+    cur.execute(
+        """
+        SELECT c.relname AS name,
+               pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        (f"{SCHEMA}.{table}",)
+    )
+
+    partitions = []
+    for row in cur.fetchall():
+        match = _BOUND_RE.search(row["bound"])
+        if match is None:
+            continue
+        partitions.append(
+            (row["name"], _parse_bound(match.group(1)), _parse_bound(match.group(2)))
+        )
+
+    partitions.sort(key=lambda p: p[1] or datetime.min)
+    return partitions
+
+
+def primary_key(cur, table: str) -> Tuple[Optional[str], List[str]]:
+    """(constraint name, columns) of a table's primary key; (None, []) if none."""
+    cur.execute(
+        """
+        SELECT con.conname AS name, a.attname AS column
+        FROM pg_constraint con
+        CROSS JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+        WHERE con.conrelid = to_regclass(%s)
+          AND con.contype = 'p'
+        ORDER BY k.ord
+        """,
+        (f"{SCHEMA}.{table}",)
+    )
+    rows = cur.fetchall()
+    if not rows:
+        return None, []
+    return rows[0]["name"], [row["column"] for row in rows]
+
+
+def _free_range(
+    partitions: List[Tuple[str, Optional[datetime], Optional[datetime]]],
+    start: datetime,
+    end: datetime,
+) -> Optional[Tuple[datetime, datetime]]:
+    """The part of [start, end) no existing partition covers yet (None if none)."""
+    for _, lower, upper in partitions:
+        covers_start = (lower is None or lower <= start) and (upper is None or start < upper)
+        if covers_start:
+            if upper is None:
+                return None
+            start = upper
+
+    for _, lower, _ in partitions:
+        if lower is not None and start < lower < end:
+            end = lower
+
+    return (start, end) if start < end else None
+
+
+def _rollup_before_delete(table: str, start: Optional[datetime], end: datetime):
+    """Roll up [start, end) of a source table; raise so the rows are kept on failure."""
+    if refresh_rollups(start=start, end=end, sources=[table]).get(table) is None:
+        raise RuntimeError(f"Rollup of {table} before {end.isoformat()} failed")
+
+
+# -------------------------
+# Partition manager
+# -------------------------
+
+class PartitionManager:
+    """
+    Converts the log tables to range partitions (once), keeps
+    `partitions_ahead()` periods created in advance, drops partitions
+    past retention, and refreshes the hourly rollups.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        # Stats
+        self._runs = 0
+        self._migrated: List[str] = []
+        self._created = 0
+        self._drained = 0
+        self._dropped: List[str] = []
+        self._trimmed = 0
+        self._rollup_rows = 0
+        self._errors = 0
+        # Set once the rollups were refreshed (readers may use them)
+        self.rollups_ready = False
+        self._last_run_at: Optional[datetime] = None
+        self._last_run_ms: Optional[float] = None
+
+    # ---------- conversion ----------
+
+    @staticmethod
+    def _lock_timeout(cur):
+        cur.execute(
+            "SELECT set_config('lock_timeout', %s, true)",
+            (f"{int(os.getenv('PARTITION_LOCK_TIMEOUT_MS', 5000))}ms",)
+        )
+
+    def _prepare_legacy(self, table: str, settings: dict, key: List[str]) -> datetime:
+        """
+        Step 1 of migrate, without blocking readers or writers for long:
+        add the future partition constraint as a CHECK (NOT VALID, then
+        VALIDATE, which scans under SHARE UPDATE EXCLUSIVE), give rows
+        without a timestamp the migration time, and build the time index
+        and the unique index matching the new primary key CONCURRENTLY.
+        Returns the legacy partition's upper bound.
+        """
+        column = settings["column"]
+        interval = settings["interval"]
+        check = f"{table}_partition_check"
+        # Keep their names when the table becomes <table>_legacy
+        legacy = f"{table}_legacy"
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT MAX({column}) AS newest FROM {SCHEMA}.{table}")
+                newest = cur.fetchone()["newest"]
+            conn.rollback()
+
+        # Writes past the bound fail until step 2 finishes: leave an hour
+        now = _utcnow()
+        cutoff = next_period(period_start(max(newest or now, now), interval), interval)
+        if cutoff - now < timedelta(hours=1):
+            cutoff = next_period(cutoff, interval)
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                self._lock_timeout(cur)
+                cur.execute(f"ALTER TABLE {SCHEMA}.{table} DROP CONSTRAINT IF EXISTS {check}")
+                cur.execute(
+                    f"""
+                    ALTER TABLE {SCHEMA}.{table} ADD CONSTRAINT {check}
+                    CHECK ({column} IS NOT NULL AND {column} < %s) NOT VALID
+                    """,
+                    (cutoff,)
+                )
+                conn.commit()
+
+                # Rows written without a timestamp before the CHECK existed;
+                # the primary key rules out NULLs. Kept a full retention.
+                cur.execute(
+                    f"UPDATE {SCHEMA}.{table} SET {column} = %s WHERE {column} IS NULL",
+                    (now,)
+                )
+                conn.commit()
+
+                cur.execute(f"ALTER TABLE {SCHEMA}.{table} VALIDATE CONSTRAINT {check}")
+                conn.commit()
+
+            indexes = [
+                f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS {legacy}_{column}_idx
+                ON {SCHEMA}.{table} ({column})
+                """
+            ]
+            # Becomes a UNIQUE constraint the parent's primary key adopts
+            if key:
+                indexes.append(
+                    f"""
+                    CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {legacy}_{'_'.join(key)}_key
+                    ON {SCHEMA}.{table} ({', '.join(key)})
+                    """
+                )
+
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cur:
+                    for index in indexes:
+                        cur.execute(index)
+            finally:
+                conn.autocommit = False
+
+        return cutoff
+
+    def migrate(self, table: str) -> bool:
+        """
+        Turn a plain heap into a partitioned table. False if it already was.
+
+        The scans happen first (_prepare_legacy). The swap itself holds
+        ACCESS EXCLUSIVE only for catalog work: SET NOT NULL and ATTACH
+        skip their scans thanks to the validated CHECK, and the parent
+        primary key and index only adopt the indexes built beforehand.
+        lock_timeout PARTITION_LOCK_TIMEOUT_MS bounds the wait for each
+        lock.
+
+        Run explicitly (python -m app.services.partition_manager
+        --migrate); an advisory lock keeps concurrent runs from
+        converting the same table twice.
+        """
+        lock_key = f"partition_migrate:{table}"
+
+        # Session-level: the conversion spans several transactions. Poll
+        # rather than block, since a transaction left waiting here would
+        # stall the holder's CREATE INDEX CONCURRENTLY.
+        with db_connection() as conn:
+            while True:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT pg_try_advisory_lock(hashtext(%s)) AS locked", (lock_key,)
+                    )
+                    locked = cur.fetchone()["locked"]
+                conn.commit()
+                if locked:
+                    break
+                time.sleep(1)
+
+            try:
+                return self._migrate(table)
+            finally:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (lock_key,))
+                conn.commit()
+
+    def _migrate(self, table: str) -> bool:
+        settings = table_settings(table)
+        column = settings["column"]
+        legacy = f"{table}_legacy"
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                partitioned = is_partitioned(cur, table)
+                pkey, key = primary_key(cur, table)
+            conn.rollback()
+
+        if partitioned:
+            return False
+
+        # A partitioned table's primary key must include the partition column
+        if key and column not in key:
+            key.append(column)
+
+        cutoff = self._prepare_legacy(table, settings, key)
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                self._lock_timeout(cur)
+                cur.execute(f"LOCK TABLE {SCHEMA}.{table} IN ACCESS EXCLUSIVE MODE")
+                cur.execute(f"ALTER TABLE {SCHEMA}.{table} ALTER COLUMN {column} SET NOT NULL")
+
+                if key:
+                    unique = f"{legacy}_{'_'.join(key)}_key"
+                    cur.execute(
+                        f"ALTER TABLE {SCHEMA}.{table} "
+                        f"ADD CONSTRAINT {unique} UNIQUE USING INDEX {unique}"
+                    )
+
+                cur.execute(f"ALTER TABLE {SCHEMA}.{table} RENAME TO {legacy}")
+                # Frees <table>_pkey for the parent
+                if pkey == f"{table}_pkey":
+                    cur.execute(
+                        f"ALTER TABLE {SCHEMA}.{legacy} RENAME CONSTRAINT {pkey} TO {legacy}_pkey"
+                    )
+
+                primary = (
+                    f", CONSTRAINT {table}_pkey PRIMARY KEY ({', '.join(key)})" if key else ""
+                )
+                cur.execute(
+                    f"""
+                    CREATE TABLE {SCHEMA}.{table} (
+                        LIKE {SCHEMA}.{legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS{primary}
+                    ) PARTITION BY RANGE ({column})
+                    """
+                )
+                # Copied by INCLUDING CONSTRAINTS; the partition bounds replace it
+                cur.execute(
+                    f"ALTER TABLE {SCHEMA}.{table} DROP CONSTRAINT {table}_partition_check"
+                )
+
+                # SERIAL sequences must outlive the legacy partition
+                cur.execute(
+                    """
+                    SELECT a.attname AS name,
+                           pg_get_serial_sequence(%s, a.attname) AS seq
+                    FROM pg_attribute a
+                    WHERE a.attrelid = to_regclass(%s)
+                      AND a.attnum > 0
+                      AND NOT a.attisdropped
+                    """,
+                    (f"{SCHEMA}.{legacy}", f"{SCHEMA}.{legacy}")
+                )
+                for row in cur.fetchall():
+                    if row["seq"]:
+                        cur.execute(
+                            f"ALTER SEQUENCE {row['seq']} OWNED BY {SCHEMA}.{table}.{row['name']}"
+                        )
+
+                cur.execute(
+                    f"CREATE TABLE {SCHEMA}.{table}_default PARTITION OF {SCHEMA}.{table} DEFAULT"
+                )
+                # Adopts the legacy unique index as its primary key partition
+                cur.execute(
+                    f"""
+                    ALTER TABLE {SCHEMA}.{table} ATTACH PARTITION {SCHEMA}.{legacy}
+                    FOR VALUES FROM (MINVALUE) TO (%s)
+                    """,
+                    (cutoff,)
+                )
+                cur.execute(
+                    f"ALTER TABLE {SCHEMA}.{legacy} DROP CONSTRAINT {table}_partition_check"
+                )
+
+                # Time-window scans (rollups, retention checks, analytics):
+                # the parent index adopts the legacy index, the (small)
+                # default partition gets its own
+                cur.execute(
+                    f"""
+                    CREATE INDEX IF NOT EXISTS {table}_{column}_idx
+                    ON ONLY {SCHEMA}.{table} ({column})
+                    """
+                )
+                cur.execute(
+                    f"""
+                    CREATE INDEX IF NOT EXISTS {table}_default_{column}_idx
+                    ON {SCHEMA}.{table}_default ({column})
+                    """
+                )
+                for index in (f"{legacy}_{column}_idx", f"{table}_default_{column}_idx"):
+                    cur.execute(
+                        f"ALTER INDEX {SCHEMA}.{table}_{column}_idx "
+                        f"ATTACH PARTITION {SCHEMA}.{index}"
+                    )
+
+            conn.commit()
+
+        print(f"PARTITIONED: {table} (legacy rows up to {cutoff.isoformat()})")
+        with self._lock:
+            self._migrated.append(table)
+        return True
+
+    # ---------- ahead-of-time partitions ----------
+
+    def create_ahead(self, table: str) -> List[str]:
+        settings = table_settings(table)
+        interval = settings["interval"]
+        column = settings["column"]
+        created = []
+
+        start = period_start(_utcnow(), interval)
+        periods = []
+        for _ in range(partitions_ahead() + 1):
+            end = next_period(start, interval)
+            periods.append((start, end))
+            start = end
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                if not is_partitioned(cur, table):
+                    conn.rollback()
+                    return created
+
+                for period_from, period_to in periods:
+                    free = _free_range(list_partitions(cur, table), period_from, period_to)
+                    if free is None:
+                        continue
+
+                    lower, upper = free
+                    name = partition_name(table, lower, interval)
+
+                    # Rows that landed in the default partition move first
+                    cur.execute(
+                        f"CREATE TABLE {SCHEMA}.{name} (LIKE {SCHEMA}.{table} INCLUDING DEFAULTS)"
+                    )
+                    cur.execute(
+                        f"""
+                        WITH moved AS (
+                            DELETE FROM {SCHEMA}.{table}_default
+                            WHERE {column} >= %s AND {column} < %s
+                            RETURNING *
+                        )
+                        INSERT INTO {SCHEMA}.{name} SELECT * FROM moved
+                        """,
+                        (lower, upper)
+                    )
+                    drained = cur.rowcount
+
+                    cur.execute(
+                        f"""
+                        ALTER TABLE {SCHEMA}.{table} ATTACH PARTITION {SCHEMA}.{name}
+                        FOR VALUES FROM (%s) TO (%s)
+                        """,
+                        (lower, upper)
+                    )
+                    conn.commit()
+
+                    created.append(name)
+                    with self._lock:
+                        self._created += 1
+                        self._drained += drained
+
+        return created
+
+    # ---------- retention ----------
+
+    def drop_expired(self, table: str) -> List[str]:
+        """
+        Roll up, detach and drop partitions whose whole range is older
+        than the table's retention. Each partition in its own transaction.
+        The legacy partition is trimmed row-wise until it can go whole.
+        """
+        settings = table_settings(table)
+        if settings["retention_days"] <= 0:
+            return []
+
+        horizon = _utcnow() - timedelta(days=settings["retention_days"])
+        dropped = []
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                if not is_partitioned(cur, table):
+                    conn.rollback()
+                    return dropped
+
+                partitions = list_partitions(cur, table)
+            conn.rollback()
+
+        expired = [
+            (name, lower, upper)
+            for name, lower, upper in partitions
+            if upper is not None and upper <= horizon
+        ]
+
+        for name, lower, upper in expired:
+            # Keep the dashboards' history of what is about to go
+            if table in ROLLUP_SOURCES:
+                _rollup_before_delete(table, lower, upper)
+
+            with db_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"ALTER TABLE {SCHEMA}.{table} DETACH PARTITION {SCHEMA}.{name}")
+                    cur.execute(f"DROP TABLE {SCHEMA}.{name}")
+                conn.commit()
+
+            print(f"PARTITION DROPPED: {name} (retention {settings['retention_days']}d)")
+            dropped.append(name)
+            with self._lock:
+                self._dropped.append(name)
+
+        trimmed = 0
+        for name, lower, upper in partitions:
+            if lower is None and (upper is None or upper > horizon):
+                trimmed += self._trim(table, name, settings["column"], hour_start(horizon))
+
+        # Prompt / response bodies only these rows referred to
+        if table == "ai_interactions" and (dropped or trimmed) and blob_store.ready:
+            print("BLOBS COLLECTED:", blob_store.collect_garbage())
+
+        return dropped
+
+    def _trim(self, table: str, partition: str, column: str, cutoff: datetime) -> int:
+        """Delete rows older than `cutoff` from one partition, in batches."""
+        batch = int(os.getenv("PARTITION_TRIM_BATCH", 10000))
+        deleted = 0
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT MIN({column}) AS oldest FROM {SCHEMA}.{partition}")
+                oldest = cur.fetchone()["oldest"]
+            conn.rollback()
+
+        if oldest is None or oldest >= cutoff:
+            return 0
+
+        if table in ROLLUP_SOURCES:
+            _rollup_before_delete(table, hour_start(oldest), cutoff)
+
+        while True:
+            with db_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        f"""
+                        DELETE FROM {SCHEMA}.{partition}
+                        WHERE ctid IN (
+                            SELECT ctid FROM {SCHEMA}.{partition}
+                            WHERE {column} < %s
+                            LIMIT %s
+                        )
+                        """,
+                        (cutoff, batch)
+                    )
+                    count = cur.rowcount
+                conn.commit()
+
+            deleted += count
+            if count < batch:
+                break
+
+        print(f"PARTITION TRIMMED: {partition} ({deleted} rows before {cutoff.isoformat()})")
+        with self._lock:
+            self._trimmed += deleted
+        return deleted
+
+    # ---------- maintenance ----------
+
+    def run(self):
+        """One maintenance pass over every table (errors logged per step)."""
+        started = datetime.now(timezone.utc)
+
+        for table in PARTITIONED_TABLES:
+            for step in (self.create_ahead, self.drop_expired):
+                try:
+                    step(table)
+                except Exception as e:
+                    print("PARTITION MAINTENANCE ERROR:", table, step.__name__, e)
+                    with self._lock:
+                        self._errors += 1
+
+        try:
+            upserted = refresh_recent_rollups()
+            failed = [source for source, rows in upserted.items() if rows is None]
+            if len(failed) < len(upserted):
+                self.rollups_ready = True
+            drop_expired_rollups()
+        except Exception as e:
+            print("ROLLUP ERROR:", e)
+            upserted, failed = {}, [None]
+
+        with self._lock:
+            self._errors += len(failed)
+            self._runs += 1
+            self._rollup_rows += sum(rows or 0 for rows in upserted.values())
+            self._last_run_at = started
+            self._last_run_ms = (datetime.now(timezone.utc) - started).total_seconds() * 1000
+
+    def stats(self) -> dict:
+        partitions = {}
+        try:
+            with db_connection() as conn:
+                with conn.cursor() as cur:
+                    for table in PARTITIONED_TABLES:
+                        if is_partitioned(cur, table):
+                            ranges = list_partitions(cur, table)
+                            partitions[table] = {
+                                "count": len(ranges),
+                                "oldest": ranges[0][0] if ranges else None,
+                                "newest": ranges[-1][0] if ranges else None,
+                                "covered_until": (
+                                    ranges[-1][2].isoformat()
+                                    if ranges and ranges[-1][2] else None
+                                ),
+                            }
+                        else:
+                            partitions[table] = None
+        except Exception as e:
+            partitions = {"error": str(e)}
+
+        with self._lock:
+            return {
+                "enabled": partition_manager_enabled(),
+                "runs": self._runs,
+                "migrated": list(self._migrated),
+                "created": self._created,
+                "drained_from_default": self._drained,
+                "dropped": list(self._dropped[-20:]),
+                "trimmed_rows": self._trimmed,
+                "rollup_rows_upserted": self._rollup_rows,
+                "rollups_ready": self.rollups_ready,
+                "errors": self._errors,
+                "last_run_at": self._last_run_at.isoformat() if self._last_run_at else None,
+                "last_run_ms": round(self._last_run_ms, 3) if self._last_run_ms else None,
+                "tables": partitions,
+            }
+
+
+partition_manager = PartitionManager()
+
+
+def start_partition_manager():
+    """
+    Create the rollup table and run maintenance now and every
+    PARTITION_MAINTENANCE_MINUTES (default 60). Tables that are not
+    partitioned yet (see --migrate) only get their rollups.
+    """
+    if not partition_manager_enabled():
+        return
+
+    try:
+        ensure_rollup_table()
+    except Exception as e:
+        print("ROLLUP TABLE SETUP ERROR:", e)
+        return
+
+    get_scheduler().add_job(
+        partition_manager.run,
+        "interval",
+        minutes=float(os.getenv("PARTITION_MAINTENANCE_MINUTES", 60)),
+        id="partition_maintenance",
+        replace_existing=True,
+        next_run_time=datetime.now(timezone.utc),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Partition the log tables and maintain the hourly rollups."
+    )
+    parser.add_argument("--migrate", action="store_true", help="convert plain tables")
+    parser.add_argument("--maintain", action="store_true", help="create ahead / drop expired")
+    parser.add_argument(
+        "--rollup-since",
+        help="re-roll every hour from this date (YYYY-MM-DD), e.g. after the first deploy",
+    )
+    args = parser.parse_args()
+
+    if args.migrate:
+        for table in PARTITIONED_TABLES:
+            partition_manager.migrate(table)
+
+    ensure_rollup_table()
+
+    if args.rollup_since:
+        print(refresh_rollups(start=datetime.fromisoformat(args.rollup_since)))
+
+    if args.maintain:
+        partition_manager.run()
+
+    print(partition_manager.stats())
@@ -1,5 +1,11 @@
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2 import extensions
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 
@@ -7,37 +13,335 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _connect():
+    """
+    Open one physical connection.
+
+    search_path is passed as a startup option, so it is set once per
+    physical connection during the handshake (no extra round trip and
+    no autocommit toggling).
+    """
+    schema = os.getenv("DB_SCHEMA", "public")
+
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        dbname=os.getenv("DB_NAME", "ai_food_menu"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD"),
+        port=int(os.getenv("DB_PORT", 5432)),
+        cursor_factory=RealDictCursor,
+        options=f"-c search_path={schema}",
+    )
+
+
 def get_db_connection():
     """
     Create and return a PostgreSQL database connection.
     Works for both LOCAL (.env) and RENDER (environment variables).
+
+    Unpooled: the caller owns the connection and must close it.
+    Prefer db_connection() in request/service code.
     """
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            dbname=os.getenv("DB_NAME", "ai_food_menu"),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASSWORD"),
-            port=int(os.getenv("DB_PORT", 5432)),
-            cursor_factory=RealDictCursor,
-        )
+        return _connect()
+
+    except psycopg2.Error as e:
+        print("❌ PostgreSQL connection failed")
+        print(e)
+        return None
+
+
+# -------------------------
+# Connection pool
+# -------------------------
+
+class PoolTimeout(RuntimeError):
+    """Raised when no connection could be checked out in time."""
+
+
+class PostgresPool:
+    """
+    Bounded, thread-safe pool of pre-configured psycopg2 connections.
+
+    - at most `maxconn` physical connections, `minconn` kept warm
+    - callers wait up to `timeout` seconds for a free connection
+    - connections idle longer than `ping_after` seconds are
+      health-checked (SELECT 1) before being handed out
+    """
+
+    def __init__(
+        self,
+        minconn: int = 1,
+        maxconn: int = 10,
+        timeout: float = 5.0,
+        ping_after: float = 30.0,
+    ):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Invalid pool size (need 0 <= min <= max, max >= 1)")
 
-        # Enable autocommit before session-level commands
-        conn.autocommit = True
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.ping_after = ping_after
 
-        schema = os.getenv("DB_SCHEMA", "public")
-        with conn.cursor() as cur:
-            cur.execute(f"SET search_path TO {schema};")
+        self._cond = threading.Condition()
+        self._idle = []          # [(conn, last_used_monotonic)]
+        self._size = 0           # physical connections (idle + in use)
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
 
-        # Optional: return to transactional mode
-        conn.autocommit = False
+        # Stats
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recent_waits = deque(maxlen=1024)
+
+    # ---------- lifecycle ----------
+
+    def open(self):
+        """Pre-open `minconn` connections (best effort)."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.minconn:
+                    return
+                self._size += 1
+
+            try:
+                conn = _connect()
+            except psycopg2.Error:
+                with self._cond:
+                    self._size -= 1
+                raise
+
+            with self._cond:
+                self._created += 1
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+
+    # ---------- checkout / return ----------
+
+    def getconn(self, timeout: float | None = None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        conn, last_used = None, None
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+
+                    if self._size < self.maxconn:
+                        self._size += 1
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {timeout}s"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+            self._in_use += 1
+
+        # Connect / health-check outside the lock
+        try:
+            if conn is not None and not self._is_healthy(conn, last_used):
+                self._close_quietly(conn)
+                with self._cond:
+                    self._discarded += 1
+                conn = None
+
+            if conn is None:
+                conn = _connect()
+                with self._cond:
+                    self._created += 1
+
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._recent_waits.append(waited)
 
         return conn
 
-    except psycopg2.Error as e:
-        print("❌ PostgreSQL connection failed")
-        print(e)
-        return None
+    def putconn(self, conn, discard: bool = False):
+        if not discard:
+            discard = not self._reset(conn)
+
+        with self._cond:
+            self._in_use -= 1
+
+            if discard or self._closed:
+                self._size -= 1
+                self._discarded += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+
+            self._cond.notify()
+
+        if discard or self._closed:
+            self._close_quietly(conn)
+
+    # ---------- helpers ----------
+
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+
+        if time.monotonic() - last_used < self.ping_after:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _reset(conn) -> bool:
+        """Roll back any open transaction. Returns False if unusable."""
+        if conn.closed:
+            return False
+
+        try:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    # ---------- stats ----------
+
+    def stats(self) -> dict:
+        with self._cond:
+            recent = sorted(self._recent_waits)
+            p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "checkout_ms_avg": round(
+                    (self._wait_total / self._checkouts) * 1000, 3
+                ) if self._checkouts else 0.0,
+                "checkout_ms_p95": round(p95 * 1000, 3),
+                "checkout_ms_max": round(self._wait_max * 1000, 3),
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> PostgresPool:
+    """Process-wide pool, configured from DB_POOL_* env vars."""
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PostgresPool(
+                    minconn=int(os.getenv("DB_POOL_MIN", 1)),
+                    maxconn=int(os.getenv("DB_POOL_MAX", 10)),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", 5)),
+                    ping_after=float(os.getenv("DB_POOL_PING_AFTER", 30)),
+                )
+
+    return _pool
+
+
+@contextmanager
+def db_connection():
+    """
+    Borrow a pooled connection for the duration of a `with` block.
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(...)
+            conn.commit()
+
+    Uncommitted work is rolled back when the connection is returned.
+    Raises RuntimeError if no connection is available.
+    """
+    pool = get_pool()
+
+    try:
+        conn = pool.getconn()
+    except (PoolTimeout, psycopg2.Error) as e:
+        raise RuntimeError("Database connection not available") from e
+
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def get_pool_stats() -> dict:
+    return get_pool().stats()
+
+
+def close_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
 
 
 # ---------- Local test ----------
@@ -0,0 +1,160 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import xxhash
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def render_json(data) -> bytes:
+    """Serialize exactly like FastAPI's default JSON response."""
+    return JSONResponse(content=jsonable_encoder(data)).body
+
+
+def make_etag(body: bytes) -> str:
+    """Strong validator derived from the response bytes."""
+    return f'"{xxhash.xxh3_64_hexdigest(body)}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque:
+            return True
+
+    return False
+
+
+def seconds_until_next_rollover(now: Optional[datetime] = None) -> int:
+    """
+    Shelf-life scores only move when the UTC date changes, so the next
+    date-driven threshold crossing can happen at the next UTC midnight
+    at the earliest.
+    """
+    now = now or datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return max(int((midnight - now).total_seconds()), 0)
+
+
+def menu_cache_max_age() -> int:
+    """
+    Client max-age: until the next rollover, capped by MENU_CACHE_MAX_AGE
+    because sensor events can change a dish at any time (clients then
+    revalidate cheaply with If-None-Match).
+    """
+    cap = int(os.getenv("MENU_CACHE_MAX_AGE", 30))
+    return min(seconds_until_next_rollover(), cap)
+
+
+class MenuResponseCache:
+    """
+    Bounded LRU of rendered response bodies, keyed by route key and
+    validated against a data version. A lookup with a different
+    version is a miss and drops the outdated body.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, bytes, str]]" = OrderedDict()
+
+        # Stats
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._invalidations = 0
+
+    def get(self, key: str, version: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            cached = self._entries.get(key)
+
+            if cached is None:
+                self._misses += 1
+                return None
+
+            cached_version, body, etag = cached
+            if cached_version != version:
+                del self._entries[key]
+                self._invalidations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return body, etag
+
+    def put(self, key: str, version: str, body: bytes) -> Tuple[bytes, str]:
+        etag = make_etag(body)
+
+        with self._lock:
+            self._entries[key] = (version, body, etag)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return body, etag
+
+    def record_not_modified(self):
+        with self._lock:
+            self._not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "not_modified": self._not_modified,
+                "invalidations": self._invalidations,
+            }
+
+
+menu_response_cache = MenuResponseCache(
+    max_entries=int(os.getenv("MENU_CACHE_MAX_ENTRIES", 512)),
+)
+
+# One partition per restaurant, each with its own LRU budget,
+# so a busy outlet cannot evict another outlet's bodies.
+_tenant_caches: Dict[str, MenuResponseCache] = {"default": menu_response_cache}
+_tenant_caches_lock = threading.Lock()
+
+
+def get_menu_response_cache(tenant_key: str = "default") -> MenuResponseCache:
+    with _tenant_caches_lock:
+        cache = _tenant_caches.get(tenant_key)
+        if cache is None:
+            cache = MenuResponseCache(
+                max_entries=int(os.getenv("MENU_CACHE_TENANT_MAX_ENTRIES", 128)),
+            )
+            _tenant_caches[tenant_key] = cache
+
+        return cache
+
+
+def tenant_cache_stats() -> Dict[str, dict]:
+    with _tenant_caches_lock:
+        caches = dict(_tenant_caches)
+
+    return {key: cache.stats() for key, cache in caches.items()}
@@ -1,4 +1,4 @@
-from app.services.postgres import get_db_connection
+from app.services.postgres import db_connection
 from app.services.restaurant_table import RestaurantTableRegistry
 
 
@@ -16,37 +16,29 @@ class RestaurantDBService:
         :return: List of table names
         """
 
-        conn = get_db_connection()
-        if conn is None:
-            raise RuntimeError("Database connection not available")
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    query = """
+                        SELECT table_name
+                        FROM information_schema.tables
+                        WHERE table_schema = 'public'
+                          AND table_type = 'BASE TABLE'
+                        ORDER BY table_name;
+                    """
 
-        try:
-            cur = conn.cursor()
+                    cur.execute(query)
+                    db_tables = [row["table_name"] for row in cur.fetchall()]
 
-            query = """
-                SELECT table_name
-                FROM information_schema.tables
-                WHERE table_schema = 'public'
-                  AND table_type = 'BASE TABLE'
-                ORDER BY table_name;
-            """
+                if only_allowed:
+                    return sorted(
+                        RestaurantTableRegistry.ALLOWED_TABLES.intersection(db_tables)
+                    )
 
-            cur.execute(query)
-            db_tables = [row["table_name"] for row in cur.fetchall()]
+                return db_tables
 
-            if only_allowed:
-                return sorted(
-                    RestaurantTableRegistry.ALLOWED_TABLES.intersection(db_tables)
-                )
-
-            return db_tables
-
-        except Exception as e:
-            raise RuntimeError("Failed to fetch tables from database") from e
-
-        finally:
-            cur.close()
-            conn.close()
+            except Exception as e:
+                raise RuntimeError("Failed to fetch tables from database") from e
 
     @staticmethod
     def fetch_rows(table_name: str, limit: int = 50):
@@ -56,25 +48,16 @@ class RestaurantDBService:
 
         RestaurantTableRegistry.validate_table(table_name)
 
-        conn = get_db_connection()
-        if not conn:
-            raise RuntimeError("Database connection not available")
-
-        try:
-            cur = conn.cursor()
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                query = f"""
+                    SELECT *
+                    FROM {table_name}
+                    LIMIT %s;
+                """
 
-            query = f"""
-                SELECT *
-                FROM {table_name}
-                LIMIT %s;
-            """
-
-            cur.execute(query, (limit,))
-            return cur.fetchall()
-
-        finally:
-            cur.close()
-            conn.close()
+                cur.execute(query, (limit,))
+                return cur.fetchall()
 
     @staticmethod
     def insert_row(table_name: str, data: dict):
@@ -87,29 +70,21 @@ class RestaurantDBService:
         if not data:
             raise ValueError("No data provided for insert")
 
-        conn = get_db_connection()
-        if not conn:
-            raise RuntimeError("Database connection not available")
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                columns = ", ".join(data.keys())
+                placeholders = ", ".join(["%s"] * len(data))
+                values = tuple(data.values())
 
-        try:
-            cur = conn.cursor()
+                query = f"""
+                    INSERT INTO {table_name} ({columns})
+                    VALUES ({placeholders})
+                    RETURNING *;
+                """
 
-            columns = ", ".join(data.keys())
-            placeholders = ", ".join(["%s"] * len(data))
-            values = tuple(data.values())
+                cur.execute(query, values)
+                inserted_row = cur.fetchone()
 
-            query = f"""
-                INSERT INTO {table_name} ({columns})
-                VALUES ({placeholders})
-                RETURNING *;
-            """
-
-            cur.execute(query, values)
-            inserted_row = cur.fetchone()
             conn.commit()
 
             return inserted_row
-
-        finally:
-            cur.close()
-            conn.close()
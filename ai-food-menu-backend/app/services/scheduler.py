@@ -0,0 +1,45 @@
+import threading
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> BackgroundScheduler:
+    """
+    Process-wide background scheduler shared by all periodic jobs.
+
+    Jobs run on the scheduler's thread pool, never on the event loop.
+    By default a job never overlaps itself and missed runs are merged.
+    """
+    global _scheduler
+
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = BackgroundScheduler(
+                    timezone="UTC",
+                    job_defaults={
+                        "coalesce": True,
+                        "max_instances": 1,
+                        "misfire_grace_time": 30,
+                    },
+                )
+
+    return _scheduler
+
+
+def start_scheduler():
+    scheduler = get_scheduler()
+    if not scheduler.running:
+        scheduler.start()
+
+
+def shutdown_scheduler():
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is not None and _scheduler.running:
+            _scheduler.shutdown(wait=False)
+        _scheduler = None
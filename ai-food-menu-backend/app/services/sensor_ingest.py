@@ -0,0 +1,391 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.async_postgres import async_db_connection
+from app.services.postgres import db_connection
+from app.services.telemetry_buffer import max_clock_skew_seconds, telemetry_buffer
+
+# Bulk storage-condition readings from fridge / freezer sensors.
+#
+# A batch is validated, its deviation flags computed with NumPy, loaded
+# into storage_conditions with COPY and reduced to the newest reading
+# per ingredient, which is upserted into storage_conditions_latest
+# (one row per ingredient, read by MenuContextBuilder) in the same
+# transaction. Committed readings also feed the in-memory telemetry
+# rings (telemetry_buffer).
+
+LATEST_TABLE = "storage_conditions_latest"
+
+SENSOR_COLUMNS = (
+    "ingredient_id", "storage_type", "temperature",
+    "humidity", "last_checked", "deviation_flag",
+)
+
+# Highest temperature (°C) before a reading counts as a deviation
+DEVIATION_MAX_TEMPS: Dict[str, float] = {
+    "Chiller": 5.0,
+    "Freezer": -10.0,
+}
+
+MAX_STORAGE_TYPE_LENGTH = 32
+
+# ingredient_id is an INT column
+MIN_INGREDIENT_ID = -2 ** 31
+MAX_INGREDIENT_ID = 2 ** 31 - 1
+
+# Newest reading wins; a stored row dated beyond the clock skew (from
+# before future readings were rejected) is always replaced.
+_UPSERT_LATEST = f"""
+    INSERT INTO {LATEST_TABLE} ({', '.join(SENSOR_COLUMNS)})
+    VALUES ({{placeholders}})
+    ON CONFLICT (ingredient_id) DO UPDATE SET
+        storage_type = EXCLUDED.storage_type,
+        temperature = EXCLUDED.temperature,
+        humidity = EXCLUDED.humidity,
+        last_checked = EXCLUDED.last_checked,
+        deviation_flag = EXCLUDED.deviation_flag,
+        updated_at = NOW()
+    WHERE EXCLUDED.last_checked >= {LATEST_TABLE}.last_checked
+       OR {LATEST_TABLE}.last_checked
+          > (NOW() AT TIME ZONE 'UTC') + {{skew}} * INTERVAL '1 second'
+"""
+
+
+def _upsert_latest_sql(placeholders: List[str]) -> str:
+    return _UPSERT_LATEST.format(
+        placeholders=", ".join(placeholders),
+        skew=float(max_clock_skew_seconds()),
+    )
+
+
+def sensor_batch_size() -> int:
+    """Readings per COPY when streaming NDJSON."""
+    return int(os.getenv("SENSOR_BATCH_SIZE", 5000))
+
+
+def sensor_max_readings() -> int:
+    """Largest JSON array accepted in one request."""
+    return int(os.getenv("SENSOR_MAX_READINGS", 100000))
+
+
+# -------------------------
+# Parsing / deviation flags
+# -------------------------
+
+def _timestamp(value) -> datetime:
+    """ISO 8601 string or epoch seconds -> naive UTC; now when missing."""
+    if value is None:
+        return datetime.utcnow()
+
+    try:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+
+        if isinstance(value, str):
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if moment.tzinfo is not None:
+                moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+            return moment
+
+    # Out of the platform's range, e.g. epoch 1e18 (OSError) or 1e20
+    except (OSError, OverflowError):
+        raise ValueError(f"timestamp out of range: {value!r}")
+
+    raise ValueError(f"invalid timestamp: {value!r}")
+
+
+def _number(value, field: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{field} must be a number")
+    return float(value)
+
+
+def parse_reading(reading, now: Optional[datetime] = None) -> Tuple:
+    """
+    One reading (dict) -> (ingredient_id, storage_type, temperature,
+    humidity, last_checked). Raises ValueError when it is unusable.
+
+    Readings dated further ahead than SENSOR_MAX_SKEW_SECONDS are
+    rejected: the telemetry rings and storage_conditions_latest only
+    move forward in time, so one would hide every later reading.
+    """
+    if not isinstance(reading, dict):
+        raise ValueError("reading must be an object")
+
+    ingredient_id = reading.get("ingredient_id")
+    if isinstance(ingredient_id, bool) or not isinstance(ingredient_id, int):
+        raise ValueError("ingredient_id must be an integer")
+    if not MIN_INGREDIENT_ID <= ingredient_id <= MAX_INGREDIENT_ID:
+        raise ValueError("ingredient_id out of range")
+
+    storage_type = reading.get("storage_type")
+    if not isinstance(storage_type, str) or not storage_type:
+        raise ValueError("storage_type is required")
+    if len(storage_type) > MAX_STORAGE_TYPE_LENGTH:
+        raise ValueError("storage_type is too long")
+
+    temperature = _number(reading.get("temperature"), "temperature")
+
+    humidity = reading.get("humidity")
+    if humidity is not None:
+        humidity = _number(humidity, "humidity")
+
+    moment = _timestamp(reading.get("timestamp", reading.get("last_checked")))
+    now = now or datetime.utcnow()
+    if moment > now + timedelta(seconds=max_clock_skew_seconds()):
+        raise ValueError("timestamp is in the future")
+
+    return (
+        ingredient_id,
+        storage_type,
+        temperature,
+        humidity,
+        moment,
+    )
+
+
+def parse_readings(readings: Iterable) -> Tuple[List[Tuple], List[str]]:
+    """(parsed readings, errors); a bad reading never fails the batch."""
+    parsed = []
+    errors = []
+    now = datetime.utcnow()
+
+    for position, reading in enumerate(readings):
+        try:
+            parsed.append(parse_reading(reading, now))
+        except (ValueError, TypeError, OverflowError) as e:
+            errors.append(f"#{position}: {e}")
+
+    return parsed, errors
+
+
+def deviation_flags(storage_types, temperatures) -> np.ndarray:
+    """Vectorized deviation_flag: temperature above its type's maximum."""
+    types = np.asarray(storage_types, dtype=object)
+    temps = np.asarray(temperatures, dtype=float)
+
+    limits = np.full(len(temps), np.inf)
+    for storage_type, max_temp in DEVIATION_MAX_TEMPS.items():
+        limits[types == storage_type] = max_temp
+
+    return temps > limits
+
+
+def latest_per_ingredient(ingredient_ids, timestamps) -> np.ndarray:
+    """Indices of the newest reading of every ingredient in a batch."""
+    ids = np.asarray(ingredient_ids, dtype=np.int64)
+    moments = np.asarray(timestamps, dtype="datetime64[us]")
+
+    order = np.lexsort((moments, ids))
+    sorted_ids = ids[order]
+    last = np.append(sorted_ids[1:] != sorted_ids[:-1], True)
+
+    return order[last]
+
+
+# -------------------------
+# Storage
+# -------------------------
+
+def ensure_sensor_tables():
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {LATEST_TABLE} (
+                    ingredient_id INT PRIMARY KEY,
+                    storage_type TEXT NOT NULL,
+                    temperature DOUBLE PRECISION NOT NULL,
+                    humidity DOUBLE PRECISION,
+                    last_checked TIMESTAMP NOT NULL,
+                    deviation_flag BOOLEAN NOT NULL,
+                    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+                )
+                """
+            )
+
+            # Seed from the history once (new table)
+            cur.execute(f"SELECT EXISTS (SELECT 1 FROM {LATEST_TABLE}) AS seeded")
+            if not cur.fetchone()["seeded"]:
+                cur.execute(
+                    f"""
+                    INSERT INTO {LATEST_TABLE} ({', '.join(SENSOR_COLUMNS)})
+                    SELECT DISTINCT ON (ingredient_id)
+                        ingredient_id,
+                        storage_type,
+                        temperature,
+                        humidity,
+                        last_checked,
+                        COALESCE(deviation_flag, FALSE)
+                    FROM storage_conditions
+                    WHERE ingredient_id IS NOT NULL
+                      AND storage_type IS NOT NULL
+                      AND temperature IS NOT NULL
+                      AND last_checked IS NOT NULL
+                      AND last_checked <= %s
+                    ORDER BY ingredient_id, last_checked DESC
+                    ON CONFLICT (ingredient_id) DO NOTHING
+                    """,
+                    (datetime.utcnow() + timedelta(seconds=max_clock_skew_seconds()),)
+                )
+
+        conn.commit()
+
+
+def upsert_latest_reading(cur, row: Tuple):
+    """Sync single-reading upsert (SENSOR_COLUMNS order), caller commits."""
+    cur.execute(_upsert_latest_sql(["%s"] * len(SENSOR_COLUMNS)), row)
+
+
+# -------------------------
+# Bulk ingestion
+# -------------------------
+
+class SensorIngestor:
+    """
+    COPY-based bulk loader for storage_conditions.
+
+    ingest() takes parsed readings (see parse_readings), adds the
+    deviation flags and writes the batch plus the latest-reading
+    upserts in one transaction on an asyncpg connection.
+    """
+
+    def __init__(self):
+        # Set once the latest-reading table exists (start_sensor_ingest)
+        self.ready = False
+
+        self._lock = threading.Lock()
+
+        # Stats
+        self._batches = 0
+        self._readings = 0
+        self._rejected = 0
+        self._deviations = 0
+        self._failed_batches = 0
+        self._batch_ms: deque = deque(maxlen=256)
+        self._batch_rows: deque = deque(maxlen=256)
+        self._last_batch_at: Optional[datetime] = None
+
+    async def ingest(self, readings: List[Tuple], rejected: int = 0) -> dict:
+        """
+        Write a batch of parsed readings. Returns
+        {"accepted", "deviations", "ingredients"}.
+        Raises RuntimeError if the database is unavailable and
+        asyncpg.PostgresError if it rejects the batch.
+        """
+        with self._lock:
+            self._rejected += rejected
+
+        if not readings:
+            return {"accepted": 0, "deviations": 0, "ingredients": 0}
+
+        started = time.perf_counter()
+
+        ingredient_ids, storage_types, temperatures, humidities, timestamps = zip(*readings)
+        flags = deviation_flags(storage_types, temperatures).tolist()
+        records = [
+            (*reading[:5], flag) for reading, flag in zip(readings, flags)
+        ]
+        latest = [records[i] for i in latest_per_ingredient(ingredient_ids, timestamps)]
+
+        try:
+            async with async_db_connection() as conn:
+                async with conn.transaction():
+                    await conn.copy_records_to_table(
+                        "storage_conditions",
+                        records=records,
+                        columns=SENSOR_COLUMNS,
+                    )
+                    await conn.executemany(
+                        _upsert_latest_sql(
+                            [f"${i}" for i in range(1, len(SENSOR_COLUMNS) + 1)]
+                        ),
+                        latest,
+                    )
+        except Exception:
+            with self._lock:
+                self._failed_batches += 1
+            raise
+
+        if telemetry_buffer.ready:
+            await asyncio.wrap_future(telemetry_buffer.submit(records))
+
+        elapsed = (time.perf_counter() - started) * 1000
+        deviations = sum(flags)
+
+        with self._lock:
+            self._batches += 1
+            self._readings += len(records)
+            self._deviations += deviations
+            self._batch_ms.append(elapsed)
+            self._batch_rows.append(len(records))
+            self._last_batch_at = datetime.now(timezone.utc)
+
+        return {
+            "accepted": len(records),
+            "deviations": deviations,
+            "ingredients": len(latest),
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            batch_ms = sorted(self._batch_ms)
+            total_ms = sum(self._batch_ms)
+
+            return {
+                "ready": self.ready,
+                "batches": self._batches,
+                "readings": self._readings,
+                "rejected": self._rejected,
+                "deviations": self._deviations,
+                "failed_batches": self._failed_batches,
+                "batch_ms": {
+                    "p50": round(batch_ms[len(batch_ms) // 2], 3) if batch_ms else None,
+                    "max": round(batch_ms[-1], 3) if batch_ms else None,
+                },
+                "readings_per_second": (
+                    round(sum(self._batch_rows) / (total_ms / 1000), 1)
+                    if total_ms else None
+                ),
+                "last_batch_at": (
+                    self._last_batch_at.isoformat() if self._last_batch_at else None
+                ),
+            }
+
+
+sensor_ingestor = SensorIngestor()
+
+
+def start_sensor_ingest():
+    try:
+        ensure_sensor_tables()
+    except Exception as e:
+        print("SENSOR TABLE SETUP ERROR:", e)
+        return
+
+    sensor_ingestor.ready = True
+
+
+def ndjson_readings(lines: Iterable[str]) -> Tuple[List[dict], List[str]]:
+    """Decode NDJSON lines (blank lines skipped) -> (objects, errors)."""
+    readings = []
+    errors = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            readings.append(json.loads(line))
+        except ValueError as e:
+            errors.append(f"invalid JSON line: {e}")
+
+    return readings, errors
@@ -0,0 +1,15 @@
+import json
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Keep proxies (nginx, Render) from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    """One Server-Sent Event with a JSON payload."""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
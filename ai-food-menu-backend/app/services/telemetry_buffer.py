@@ -0,0 +1,801 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from app.services.postgres import db_connection
+from app.services.scheduler import get_scheduler
+from context_object.freshness_engine import FreshnessEngine
+
+# In-memory recent storage telemetry per ingredient.
+#
+# Every ingredient gets a fixed-size, array-backed ring of its sensor
+# readings. For each configured window (TELEMETRY_WINDOWS_HOURS) the
+# ring keeps running sums and monotonic min / max deques, updated as
+# readings enter and leave the window, so min / max / mean and the
+# time spent outside the ingredient's safe range are O(1) reads.
+#
+# Time out of range: a reading holds until the next one, capped at
+# TELEMETRY_MAX_GAP_SECONDS so a silent sensor does not count for hours.
+#
+# Complete minute buckets (TELEMETRY_BUCKET_SECONDS) are persisted to
+# storage_telemetry by a scheduler job.
+
+TELEMETRY_TABLE = "storage_telemetry"
+
+_UPSERT_BUCKETS = f"""
+    INSERT INTO {TELEMETRY_TABLE} (
+        ingredient_id, bucket, samples, temp_min, temp_max, temp_sum,
+        humidity_sum, humidity_samples, out_of_range_seconds
+    )
+    VALUES %s
+    ON CONFLICT (ingredient_id, bucket) DO UPDATE SET
+        samples = {TELEMETRY_TABLE}.samples + EXCLUDED.samples,
+        temp_min = LEAST({TELEMETRY_TABLE}.temp_min, EXCLUDED.temp_min),
+        temp_max = GREATEST({TELEMETRY_TABLE}.temp_max, EXCLUDED.temp_max),
+        temp_sum = {TELEMETRY_TABLE}.temp_sum + EXCLUDED.temp_sum,
+        humidity_sum = {TELEMETRY_TABLE}.humidity_sum + EXCLUDED.humidity_sum,
+        humidity_samples = {TELEMETRY_TABLE}.humidity_samples + EXCLUDED.humidity_samples,
+        out_of_range_seconds =
+            {TELEMETRY_TABLE}.out_of_range_seconds + EXCLUDED.out_of_range_seconds
+"""
+
+
+def telemetry_capacity() -> int:
+    """Readings kept per ingredient (oldest overwritten)."""
+    return int(os.getenv("TELEMETRY_CAPACITY", 4096))
+
+
+def telemetry_windows_hours() -> List[float]:
+    """Windows with O(1) queries; always includes the freshness engine's."""
+    configured = os.getenv("TELEMETRY_WINDOWS_HOURS", "1,4")
+    hours = {float(h) for h in configured.split(",") if h.strip()}
+    hours.add(float(FreshnessEngine.TEMP_EXCURSION_WINDOW_HOURS))
+    return sorted(hours)
+
+
+def telemetry_max_gap_seconds() -> float:
+    return float(os.getenv("TELEMETRY_MAX_GAP_SECONDS", 300))
+
+
+def telemetry_bucket_seconds() -> int:
+    return int(os.getenv("TELEMETRY_BUCKET_SECONDS", 60))
+
+
+def telemetry_persist_minutes() -> float:
+    return float(os.getenv("TELEMETRY_PERSIST_MINUTES", 5))
+
+
+def telemetry_retention_days() -> int:
+    return int(os.getenv("TELEMETRY_RETENTION_DAYS", 90))
+
+
+def max_clock_skew_seconds() -> float:
+    """How far ahead of the server clock a sensor reading may be dated."""
+    return float(os.getenv("SENSOR_MAX_SKEW_SECONDS", 300))
+
+
+def _epoch(moment: datetime) -> float:
+    """Naive UTC datetime -> epoch seconds."""
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _utc(seconds: float) -> datetime:
+    """Epoch seconds -> naive UTC datetime."""
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+
+
+# -------------------------
+# Ring buffer
+# -------------------------
+
+class _Window:
+    """
+    Running aggregates over readings [start, ring.count) of a ring
+    that are at most `seconds` old.
+    """
+
+    __slots__ = (
+        "seconds", "start", "samples", "temp_sum", "humidity_sum",
+        "humidity_samples", "out_seconds", "minq", "maxq",
+    )
+
+    def __init__(self, seconds: float, start: int = 0):
+        self.seconds = seconds
+        self.start = start
+        self.samples = 0
+        self.temp_sum = 0.0
+        self.humidity_sum = 0.0
+        self.humidity_samples = 0
+        self.out_seconds = 0.0
+        # (reading number, temperature), temperatures increasing / decreasing
+        self.minq: deque = deque()
+        self.maxq: deque = deque()
+
+
+class TelemetryRing:
+    """
+    Fixed-size ring of one ingredient's readings.
+
+    Readings are numbered 0, 1, 2, ... and stored at number % capacity;
+    only the last `capacity` are kept. Readings must arrive in time
+    order (push() rejects older ones).
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        windows_seconds: Iterable[float],
+        safe_range: Tuple[float, float],
+        max_gap_seconds: float,
+    ):
+        self.capacity = capacity
+        self.max_gap_seconds = max_gap_seconds
+        self.safe_range = safe_range
+
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.temps = np.zeros(capacity, dtype=np.float32)
+        self.humidity = np.full(capacity, np.nan, dtype=np.float32)
+        self.out = np.zeros(capacity, dtype=bool)
+        # Seconds a reading held until the next one (capped); 0 for the newest
+        self.held = np.zeros(capacity, dtype=np.float32)
+
+        self.count = 0
+        self.newest_time = 0.0
+        # First reading not written to storage_telemetry yet
+        self.persisted = 0
+
+        self.windows = {seconds: _Window(seconds) for seconds in windows_seconds}
+
+        # Held by whoever reads or writes this ring
+        self.lock = threading.Lock()
+
+    # ---------- window maintenance ----------
+
+    @staticmethod
+    def _add(window: _Window, seq: int, temp: float, humidity: float):
+        """Add reading `seq` (values as stored, humidity NaN if none)."""
+        window.samples += 1
+        window.temp_sum += temp
+        if humidity == humidity:
+            window.humidity_sum += humidity
+            window.humidity_samples += 1
+
+        while window.minq and window.minq[-1][1] >= temp:
+            window.minq.pop()
+        window.minq.append((seq, temp))
+
+        while window.maxq and window.maxq[-1][1] <= temp:
+            window.maxq.pop()
+        window.maxq.append((seq, temp))
+
+    def _add_stored(self, window: _Window, seq: int):
+        slot = seq % self.capacity
+        self._add(window, seq, float(self.temps[slot]), float(self.humidity[slot]))
+
+    def _evict(self, window: _Window):
+        seq = window.start
+        slot = seq % self.capacity
+
+        window.samples -= 1
+        window.temp_sum -= float(self.temps[slot])
+        if not np.isnan(self.humidity[slot]):
+            window.humidity_sum -= float(self.humidity[slot])
+            window.humidity_samples -= 1
+        if self.out[slot]:
+            window.out_seconds -= float(self.held[slot])
+
+        if window.minq and window.minq[0][0] == seq:
+            window.minq.popleft()
+        if window.maxq and window.maxq[0][0] == seq:
+            window.maxq.popleft()
+
+        window.start += 1
+
+        if window.samples == 0:
+            # Drop accumulated float drift
+            window.temp_sum = window.humidity_sum = window.out_seconds = 0.0
+            window.humidity_samples = 0
+
+    def _expire(self, window: _Window, now: float):
+        cutoff = now - window.seconds
+        while window.start < self.count and self.times[window.start % self.capacity] < cutoff:
+            self._evict(window)
+
+    # ---------- writes ----------
+
+    def push(self, moment: float, temperature: float, humidity: Optional[float]) -> bool:
+        """Append one reading (epoch seconds). False if older than the newest."""
+        if self.count and moment < self.newest_time:
+            return False
+
+        seq = self.count
+        slot = seq % self.capacity
+
+        # Previous reading's hold time is now known
+        if seq:
+            prev = (seq - 1) % self.capacity
+            held = float(np.float32(min(moment - self.newest_time, self.max_gap_seconds)))
+            self.held[prev] = held
+            if self.out[prev]:
+                for window in self.windows.values():
+                    if window.start <= seq - 1:
+                        window.out_seconds += held
+
+        # Overwriting the oldest reading: it leaves every window first
+        if seq >= self.capacity:
+            for window in self.windows.values():
+                if window.start == seq - self.capacity:
+                    self._evict(window)
+            self.persisted = max(self.persisted, seq - self.capacity + 1)
+
+        # Aggregate the stored (float32) values, as set_safe_range does
+        temperature = float(np.float32(temperature))
+        humidity = math.nan if humidity is None else float(np.float32(humidity))
+
+        low, high = self.safe_range
+        self.times[slot] = moment
+        self.newest_time = moment
+        self.temps[slot] = temperature
+        self.humidity[slot] = humidity
+        self.out[slot] = not (low <= temperature <= high)
+        self.held[slot] = 0.0
+        self.count += 1
+
+        for window in self.windows.values():
+            self._expire(window, moment)
+            self._add(window, seq, temperature, humidity)
+
+        return True
+
+    def set_safe_range(self, safe_range: Tuple[float, float]):
+        """Re-flag the kept readings for a new range (rare: O(capacity))."""
+        if safe_range == self.safe_range:
+            return
+
+        self.safe_range = safe_range
+        oldest = max(self.count - self.capacity, 0)
+        slots = np.arange(oldest, self.count) % self.capacity
+        low, high = safe_range
+        temps = self.temps[slots]
+        self.out[slots] = (temps < low) | (temps > high)
+
+        for seconds, window in list(self.windows.items()):
+            start = window.start
+            window = self.windows[seconds] = _Window(seconds, start)
+            for seq in range(start, self.count):
+                self._add_stored(window, seq)
+                slot = seq % self.capacity
+                if self.out[slot]:
+                    window.out_seconds += float(self.held[slot])
+
+    # ---------- reads ----------
+
+    def _live_out_seconds(self, window: _Window, now: float) -> float:
+        """Hold time of the newest reading, up to `now`."""
+        newest = self.count - 1
+        if newest < window.start or not self.out[newest % self.capacity]:
+            return 0.0
+        elapsed = now - self.times[newest % self.capacity]
+        return min(max(elapsed, 0.0), self.max_gap_seconds)
+
+    def summary(self, seconds: float, now: float) -> Optional[dict]:
+        """
+        Aggregates over the readings of the last `seconds` seconds
+        (O(1) for a configured window). None when there are none.
+        Expired readings leave the window for good, so `now` must not
+        go backwards between calls.
+        """
+        window = self.windows.get(seconds)
+        if window is None:
+            return self._scan(seconds, now)
+
+        self._expire(window, now)
+        if not window.samples:
+            return None
+
+        return {
+            "samples": window.samples,
+            "since": float(self.times[window.start % self.capacity]),
+            "temp_min": window.minq[0][1],
+            "temp_max": window.maxq[0][1],
+            "temp_mean": window.temp_sum / window.samples,
+            "humidity_mean": (
+                window.humidity_sum / window.humidity_samples
+                if window.humidity_samples else None
+            ),
+            "out_of_range_seconds": max(
+                window.out_seconds + self._live_out_seconds(window, now), 0.0
+            ),
+        }
+
+    def _scan(self, seconds: float, now: float) -> Optional[dict]:
+        """Same aggregates for any window, vectorized over the ring."""
+        oldest = max(self.count - self.capacity, 0)
+        slots = np.arange(oldest, self.count) % self.capacity
+        slots = slots[self.times[slots] >= now - seconds]
+        if not len(slots):
+            return None
+
+        temps = self.temps[slots]
+        humidity = self.humidity[slots]
+        has_humidity = ~np.isnan(humidity)
+
+        out_seconds = float(self.held[slots][self.out[slots]].sum())
+        newest = (self.count - 1) % self.capacity
+        if slots[-1] == newest and self.out[newest]:
+            out_seconds += min(max(now - self.times[newest], 0.0), self.max_gap_seconds)
+
+        return {
+            "samples": len(slots),
+            "since": float(self.times[slots[0]]),
+            "temp_min": float(temps.min()),
+            "temp_max": float(temps.max()),
+            "temp_mean": float(temps.astype(np.float64).mean()),
+            "humidity_mean": (
+                float(humidity[has_humidity].astype(np.float64).mean())
+                if has_humidity.any() else None
+            ),
+            "out_of_range_seconds": out_seconds,
+        }
+
+    def complete_buckets(
+        self, bucket_seconds: int, final: bool = False
+    ) -> Tuple[List[tuple], int]:
+        """
+        Per-bucket aggregates of the unpersisted readings in buckets that
+        are complete (a newer bucket has started), or in every bucket when
+        `final` (shutdown). Returns (rows without ingredient_id, new
+        persisted position).
+        """
+        start = max(self.persisted, self.count - self.capacity)
+        if self.count - start < (1 if final else 2):
+            return [], start
+
+        slots = np.arange(start, self.count) % self.capacity
+        buckets = np.floor(self.times[slots] / bucket_seconds).astype(np.int64)
+
+        # Readings of the newest bucket wait for it to complete
+        end = len(slots) if final else int(np.count_nonzero(buckets < buckets[-1]))
+        if not end:
+            return [], start
+
+        slots, buckets = slots[:end], buckets[:end]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+
+        temps = self.temps[slots].astype(np.float64)
+        humidity = self.humidity[slots].astype(np.float64)
+        has_humidity = ~np.isnan(humidity)
+        out_seconds = np.where(self.out[slots], self.held[slots], 0.0)
+
+        samples = np.diff(np.append(starts, end))
+        temp_min = np.minimum.reduceat(temps, starts)
+        temp_max = np.maximum.reduceat(temps, starts)
+        temp_sum = np.add.reduceat(temps, starts)
+        humidity_sum = np.add.reduceat(np.where(has_humidity, humidity, 0.0), starts)
+        humidity_samples = np.add.reduceat(has_humidity.astype(np.int64), starts)
+        out_sum = np.add.reduceat(out_seconds, starts)
+
+        rows = [
+            (
+                _utc(int(buckets[i]) * bucket_seconds),
+                int(samples[k]),
+                float(temp_min[k]),
+                float(temp_max[k]),
+                float(temp_sum[k]),
+                float(humidity_sum[k]),
+                int(humidity_samples[k]),
+                float(out_sum[k]),
+            )
+            for k, i in enumerate(starts)
+        ]
+
+        return rows, start + end
+
+
+# -------------------------
+# Buffer (all ingredients)
+# -------------------------
+
+class TelemetryBuffer:
+    """
+    Rings of every ingredient seen by sensor ingestion, plus the
+    downsampled persistence job. All reads are memory-only.
+
+    Writes go through submit(): one worker thread applies batches in
+    submission order, off the event loop. Each ring has its own lock
+    and writers release it every PUSH_CHUNK readings, so a large batch
+    never stalls menu requests reading other (or the same) ingredients.
+    """
+
+    PUSH_CHUNK = 256
+
+    def __init__(
+        self,
+        capacity: int = 4096,
+        windows_hours: Iterable[float] = (1, 4),
+        max_gap_seconds: float = 300,
+        bucket_seconds: int = 60,
+    ):
+        self.capacity = capacity
+        self.windows_seconds = [hours * 3600 for hours in windows_hours]
+        self.max_gap_seconds = max_gap_seconds
+        self.bucket_seconds = bucket_seconds
+
+        # Set once warmed up (start_telemetry_buffer)
+        self.ready = False
+
+        self._rings: Dict[int, TelemetryRing] = {}
+        # Guards _rings and the stats, never held while pushing
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Stats
+        self._readings = 0
+        self._late = 0
+        self._persisted_rows = 0
+        self._persist_failures = 0
+        self._last_persist_ms: Optional[float] = None
+        self._last_persist_at: Optional[datetime] = None
+
+    def _ring(self, ingredient_id: int, category: Optional[str] = None) -> TelemetryRing:
+        with self._lock:
+            ring = self._rings.get(ingredient_id)
+            if ring is None:
+                ring = self._rings[ingredient_id] = TelemetryRing(
+                    self.capacity,
+                    self.windows_seconds,
+                    FreshnessEngine._safe_temp_range(category),
+                    self.max_gap_seconds,
+                )
+                return ring
+
+        if category is not None:
+            with ring.lock:
+                ring.set_safe_range(FreshnessEngine._safe_temp_range(category))
+        return ring
+
+    def _ring_list(self) -> List[Tuple[int, TelemetryRing]]:
+        with self._lock:
+            return list(self._rings.items())
+
+    # ---------- writes ----------
+
+    def record_batch(self, records: List[Tuple], categories: Optional[Dict] = None):
+        """
+        Add readings in SENSOR_COLUMNS order (ingredient_id, storage_type,
+        temperature, humidity, last_checked, ...). Pushed per ingredient
+        in time order; readings older than a ring's newest are dropped.
+        """
+        if not records:
+            return
+
+        ids = np.fromiter((r[0] for r in records), dtype=np.int64, count=len(records))
+        moments = np.fromiter(
+            (_epoch(r[4]) for r in records), dtype=np.float64, count=len(records)
+        )
+        order = np.lexsort((moments, ids))
+        sorted_ids = ids[order]
+        # One run of readings per ingredient
+        bounds = np.concatenate(
+            ([0], np.flatnonzero(np.diff(sorted_ids)) + 1, [len(order)])
+        ).tolist()
+
+        late = 0
+        for run_start, run_end in zip(bounds[:-1], bounds[1:]):
+            ingredient_id = int(sorted_ids[run_start])
+            ring = self._ring(ingredient_id, (categories or {}).get(ingredient_id))
+
+            for chunk in range(run_start, run_end, self.PUSH_CHUNK):
+                with ring.lock:
+                    for i in order[chunk:min(chunk + self.PUSH_CHUNK, run_end)].tolist():
+                        _, _, temperature, humidity = records[i][:4]
+                        if not ring.push(float(moments[i]), temperature, humidity):
+                            late += 1
+
+        with self._lock:
+            self._readings += len(records) - late
+            self._late += late
+
+    def submit(self, records: List[Tuple]) -> Future:
+        """
+        Queue record_batch on the telemetry worker thread (batches are
+        applied in submission order). Await with asyncio.wrap_future.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="telemetry"
+                )
+            executor = self._executor
+
+        return executor.submit(self.record_batch, records)
+
+    def drain(self):
+        """Wait for queued batches and stop the worker thread."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def record(self, ingredient_id: int, temperature: float, humidity: Optional[float],
+               moment: Optional[datetime] = None):
+        self.record_batch(
+            [(ingredient_id, None, temperature, humidity, moment or datetime.utcnow())]
+        )
+
+    def mark_persisted(self):
+        """Treat every kept reading as already in storage_telemetry."""
+        for _, ring in self._ring_list():
+            with ring.lock:
+                ring.persisted = ring.count
+
+    # ---------- reads ----------
+
+    def summary(
+        self,
+        ingredient_id: int,
+        category: Optional[str] = None,
+        hours: float = FreshnessEngine.TEMP_EXCURSION_WINDOW_HOURS,
+        now: Optional[float] = None,
+    ) -> Optional[dict]:
+        """
+        Recent telemetry of one ingredient over the last `hours` hours
+        (safe range from its category), or None without readings.
+        """
+        now = time.time() if now is None else now
+
+        with self._lock:
+            ring = self._rings.get(ingredient_id)
+        if ring is None:
+            return None
+
+        with ring.lock:
+            if category is not None:
+                ring.set_safe_range(FreshnessEngine._safe_temp_range(category))
+            summary = ring.summary(hours * 3600, now)
+
+        if summary is None:
+            return None
+
+        def rounded(value, digits=2):
+            return None if value is None else round(value, digits)
+
+        return {
+            "window_hours": hours,
+            "samples": summary["samples"],
+            "since": _utc(summary["since"]).isoformat(),
+            "temp_min": rounded(summary["temp_min"]),
+            "temp_max": rounded(summary["temp_max"]),
+            "temp_mean": rounded(summary["temp_mean"]),
+            "humidity_mean": rounded(summary["humidity_mean"]),
+            "out_of_range_minutes": round(summary["out_of_range_seconds"] / 60, 1),
+        }
+
+    # ---------- persistence ----------
+
+    def persist(self, final: bool = False) -> int:
+        """
+        Write complete buckets to storage_telemetry (every bucket when
+        `final`, at shutdown); returns rows written.
+        """
+        started = time.perf_counter()
+
+        pending = []
+        for ingredient_id, ring in self._ring_list():
+            with ring.lock:
+                rows, position = ring.complete_buckets(self.bucket_seconds, final)
+            if rows:
+                pending.append((ring, rows, position, ingredient_id))
+
+        rows = [
+            (ingredient_id, *row)
+            for _, bucket_rows, _, ingredient_id in pending
+            for row in bucket_rows
+        ]
+
+        if rows:
+            try:
+                with db_connection() as conn:
+                    with conn.cursor() as cur:
+                        execute_values(cur, _UPSERT_BUCKETS, rows, page_size=1000)
+                    conn.commit()
+            except Exception:
+                with self._lock:
+                    self._persist_failures += 1
+                raise
+
+            for ring, _, position, _ in pending:
+                with ring.lock:
+                    ring.persisted = max(ring.persisted, position)
+
+        with self._lock:
+            self._persisted_rows += len(rows)
+            self._last_persist_ms = (time.perf_counter() - started) * 1000
+            self._last_persist_at = datetime.now(timezone.utc)
+
+        return len(rows)
+
+    def stats(self) -> dict:
+        rings = self._ring_list()
+
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "ingredients": len(rings),
+                "readings": self._readings,
+                "late_readings": self._late,
+                "capacity": self.capacity,
+                "windows_hours": [seconds / 3600 for seconds in self.windows_seconds],
+                "memory_bytes": sum(
+                    ring.times.nbytes + ring.temps.nbytes + ring.humidity.nbytes
+                    + ring.out.nbytes + ring.held.nbytes
+                    for _, ring in rings
+                ),
+                "persisted_rows": self._persisted_rows,
+                "persist_failures": self._persist_failures,
+                "last_persist_ms": (
+                    round(self._last_persist_ms, 3)
+                    if self._last_persist_ms is not None else None
+                ),
+                "last_persist_at": (
+                    self._last_persist_at.isoformat() if self._last_persist_at else None
+                ),
+            }
+
+
+telemetry_buffer = TelemetryBuffer(
+    capacity=telemetry_capacity(),
+    windows_hours=telemetry_windows_hours(),
+    max_gap_seconds=telemetry_max_gap_seconds(),
+    bucket_seconds=telemetry_bucket_seconds(),
+)
+
+
+# -------------------------
+# Storage / startup
+# -------------------------
+
+def ensure_telemetry_table():
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {TELEMETRY_TABLE} (
+                    ingredient_id INT NOT NULL,
+                    bucket TIMESTAMP NOT NULL,
+                    samples INT NOT NULL,
+                    temp_min DOUBLE PRECISION NOT NULL,
+                    temp_max DOUBLE PRECISION NOT NULL,
+                    temp_sum DOUBLE PRECISION NOT NULL,
+                    humidity_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    humidity_samples INT NOT NULL DEFAULT 0,
+                    out_of_range_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    PRIMARY KEY (ingredient_id, bucket)
+                )
+                """
+            )
+
+            # Retention deletes
+            cur.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS {TELEMETRY_TABLE}_bucket_idx
+                ON {TELEMETRY_TABLE} (bucket)
+                """
+            )
+
+        conn.commit()
+
+
+def warm_up() -> int:
+    """
+    Load the largest window of readings from storage_conditions (once,
+    at startup). Already persisted by an earlier process, so they are
+    not written to storage_telemetry again.
+    """
+    now = datetime.utcnow()
+    since = now - timedelta(seconds=max(telemetry_buffer.windows_seconds))
+    # Future-dated history would make every live reading "late"
+    until = now + timedelta(seconds=max_clock_skew_seconds())
+
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT s.ingredient_id, s.temperature, s.humidity,
+                       s.last_checked, i.category
+                FROM storage_conditions s
+                LEFT JOIN ingredients i ON i.ingredient_id = s.ingredient_id
+                WHERE s.last_checked >= %s
+                  AND s.last_checked <= %s
+                  AND s.ingredient_id IS NOT NULL
+                  AND s.temperature IS NOT NULL
+                """,
+                (since, until)
+            )
+            rows = cur.fetchall()
+
+    categories = {row["ingredient_id"]: row["category"] for row in rows}
+    telemetry_buffer.record_batch(
+        [
+            (row["ingredient_id"], None, row["temperature"],
+             row["humidity"], row["last_checked"])
+            for row in rows
+        ],
+        categories=categories,
+    )
+
+    telemetry_buffer.mark_persisted()
+
+    return len(rows)
+
+
+def _persist_and_expire():
+    try:
+        telemetry_buffer.persist()
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    DELETE FROM {TELEMETRY_TABLE}
+                    WHERE bucket < %s
+                    """,
+                    (datetime.utcnow() - timedelta(days=telemetry_retention_days()),)
+                )
+            conn.commit()
+    except Exception as e:
+        print("TELEMETRY PERSIST ERROR:", e)
+
+
+def start_telemetry_buffer():
+    """
+    Warm the rings and schedule downsampled persistence
+    (TELEMETRY_BUFFER_ENABLED=0 to disable).
+    """
+    if os.getenv("TELEMETRY_BUFFER_ENABLED", "1") != "1":
+        return
+
+    try:
+        ensure_telemetry_table()
+        loaded = warm_up()
+    except Exception as e:
+        print("TELEMETRY BUFFER SETUP ERROR:", e)
+        return
+
+    telemetry_buffer.ready = True
+    print(f"Telemetry buffer warmed up: {loaded} readings")
+
+    get_scheduler().add_job(
+        _persist_and_expire,
+        "interval",
+        minutes=telemetry_persist_minutes(),
+        id="telemetry_persist",
+        replace_existing=True,
+    )
+
+
+def stop_telemetry_buffer():
+    """
+    Apply queued batches and persist every bucket, including the
+    current one: the next process's warm_up treats the readings it
+    reloads as already persisted.
+    """
+    telemetry_buffer.drain()
+
+    if not telemetry_buffer.ready:
+        return
+
+    telemetry_buffer.ready = False
+    try:
+        telemetry_buffer.persist(final=True)
+    except Exception as e:
+        print("TELEMETRY PERSIST ERROR:", e)
@@ -0,0 +1,130 @@
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+from app.services.async_postgres import async_db_connection
+from context_object.menu_context import SCHEMA
+
+
+def tenancy_mode() -> str:
+    """
+    How restaurants are separated in the database:
+
+    - "column" (default): shared tables, menu_items.restaurant_id
+    - "schema": one schema per restaurant (TENANT_SCHEMA_TEMPLATE)
+    """
+    mode = os.getenv("TENANCY_MODE", "column")
+    if mode not in ("column", "schema"):
+        raise ValueError(f"Unknown TENANCY_MODE '{mode}'")
+    return mode
+
+
+def tenant_schema_name(restaurant_id: int) -> str:
+    name = os.getenv("TENANT_SCHEMA_TEMPLATE", "restaurant_{restaurant_id}").format(
+        restaurant_id=int(restaurant_id)
+    )
+    if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+        raise ValueError(f"Invalid tenant schema name '{name}'")
+    return name
+
+
+class Tenant:
+    """
+    Where one restaurant's menu lives.
+
+    - schema        : schema holding its tables
+    - restaurant_id : value to filter menu_items.restaurant_id on
+                      (column mode only, None otherwise)
+
+    The default tenant (no restaurant) is the whole `public` menu.
+    """
+
+    def __init__(self, key: str, schema: str, restaurant_id: Optional[int] = None):
+        self.key = key
+        self.schema = schema
+        self.restaurant_id = restaurant_id
+
+    @property
+    def is_default(self) -> bool:
+        return self.key == DEFAULT_TENANT_KEY
+
+    @property
+    def owns_schema(self) -> bool:
+        """True if nothing but this tenant writes to its schema."""
+        return self.restaurant_id is None
+
+    def __repr__(self):
+        return f"Tenant({self.key!r}, schema={self.schema!r})"
+
+
+DEFAULT_TENANT_KEY = "default"
+DEFAULT_TENANT = Tenant(DEFAULT_TENANT_KEY, SCHEMA)
+
+_tenants: Dict[str, Tenant] = {}
+_tenants_lock = threading.Lock()
+
+
+def get_tenant(restaurant_id: Optional[int] = None) -> Tenant:
+    """
+    Tenant for a restaurant (no existence check), or the default one.
+    """
+    if restaurant_id is None:
+        return DEFAULT_TENANT
+
+    key = f"r{int(restaurant_id)}"
+
+    with _tenants_lock:
+        tenant = _tenants.get(key)
+        if tenant is None:
+            if tenancy_mode() == "schema":
+                tenant = Tenant(key, tenant_schema_name(restaurant_id))
+            else:
+                tenant = Tenant(key, SCHEMA, restaurant_id=int(restaurant_id))
+            _tenants[key] = tenant
+
+        return tenant
+
+
+async def resolve_tenant(restaurant_id: int) -> Tenant:
+    """
+    Tenant for an existing restaurant.
+    Raises ValueError if the restaurant (or its schema) does not exist.
+    """
+    key = f"r{int(restaurant_id)}"
+    with _tenants_lock:
+        if key in _tenants:
+            return _tenants[key]
+
+    async with async_db_connection() as conn:
+        if tenancy_mode() == "schema":
+            exists = await conn.fetchval(
+                """
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.schemata
+                    WHERE schema_name = $1
+                )
+                """,
+                tenant_schema_name(restaurant_id),
+            )
+        else:
+            exists = await conn.fetchval(
+                f"""
+                SELECT EXISTS (
+                    SELECT 1 FROM {SCHEMA}.restaurant
+                    WHERE restaurant_id = $1
+                )
+                """,
+                int(restaurant_id),
+            )
+
+    if not exists:
+        raise ValueError(f"Restaurant not found: {restaurant_id}")
+
+    return get_tenant(restaurant_id)
+
+
+def known_tenants() -> List[Tenant]:
+    """Restaurants seen so far (excluding the default tenant)."""
+    with _tenants_lock:
+        return list(_tenants.values())
@@ -0,0 +1,93 @@
+"""
+Sync vs async request path under concurrent slow requests.
+
+Simulates a chat-like request: load one dish context from Postgres,
+then wait on a slow LLM call (sleep). The sync path runs on a thread
+pool the size of Starlette's default (40 threads), like sync `def`
+routes do; the async path runs everything on one event loop.
+
+Run from ai-food-menu-backend/ (needs a reachable DB):
+
+    python -m benchmarks.bench_async_vs_sync --requests 400 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from context_object.menu_context import MenuContextBuilder
+from context_object.async_menu_context import AsyncMenuContextBuilder
+from app.services.async_postgres import close_async_pool
+
+
+def _report(label: str, wall: float, latencies: list):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{label:<6} requests={len(latencies):<5} "
+        f"wall={wall:7.2f}s  throughput={len(latencies) / wall:8.1f} req/s  "
+        f"p50={statistics.median(latencies) * 1000:8.1f}ms  "
+        f"p95={p95 * 1000:8.1f}ms"
+    )
+
+
+def run_sync(slugs, n_requests, llm_latency, threads):
+    def one_request(slug):
+        started = time.perf_counter()
+        MenuContextBuilder.get_menu_context(slug)
+        time.sleep(llm_latency)          # blocking LLM call
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(
+            one_request,
+            (slugs[i % len(slugs)] for i in range(n_requests)),
+        ))
+    _report("sync", time.perf_counter() - started, latencies)
+
+
+async def run_async(slugs, n_requests, llm_latency, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request(slug):
+        async with semaphore:
+            started = time.perf_counter()
+            await AsyncMenuContextBuilder.get_menu_context(slug)
+            await asyncio.sleep(llm_latency)   # awaited LLM call
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(
+        one_request(slugs[i % len(slugs)]) for i in range(n_requests)
+    ))
+    _report("async", time.perf_counter() - started, list(latencies))
+
+    await close_async_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=400)
+    args = parser.parse_args()
+
+    slugs = list(MenuContextBuilder.get_menu_contexts())
+    if not slugs:
+        raise SystemExit("No menu items in the database")
+
+    print(
+        f"{len(slugs)} dishes, {args.requests} requests, "
+        f"simulated LLM latency {args.llm_latency}s"
+    )
+    run_sync(slugs, args.requests, args.llm_latency, args.threads)
+    asyncio.run(
+        run_async(slugs, args.requests, args.llm_latency, args.concurrency)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Single-dish vs batched insight generation: dishes/second and cost per dish.
+
+Runs BatchInsightGenerator over synthetic insight payloads against the
+deterministic local provider (LLM_PROVIDER=local), so no Gemini key or
+database is needed. Each LLM call costs --latency-ms plus --token-ms
+per output word; cost is estimated from prompt / reply size
+(~4 characters per token) and the per-million-token prices given.
+
+    python -m benchmarks.bench_batch_insights --dishes 120 --batch-sizes 1 4 8 16
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ["LLM_PROVIDER"] = "local"
+
+from llm.batch_insights import BatchInsightGenerator
+from llm.llm_provider import get_llm
+
+CATEGORIES = ["Starter", "Main", "Dessert", "Beverage"]
+INGREDIENTS = ["Milk", "Paneer", "Tomato", "Onion", "Rice", "Chicken", "Coriander", "Cream"]
+WARNINGS = ["Near expiry", "Storage temperature above safe range", "Recent spoilage event"]
+
+
+def make_payloads(count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    payloads = {}
+
+    for i in range(count):
+        ingredients = []
+        for name in rng.sample(INGREDIENTS, rng.randint(2, 5)):
+            score = round(rng.uniform(30, 100), 2)
+            ingredients.append({
+                "name": name,
+                "final_freshness": score,
+                "risk_level": "High" if score < 50 else "Medium" if score < 75 else "Low",
+                "warnings": rng.sample(WARNINGS, rng.randint(0, 2)) if score < 75 else [],
+            })
+
+        overall = min(ing["final_freshness"] for ing in ingredients)
+        payloads[f"dish-{i:04d}"] = {
+            "menu": {
+                "name": f"Dish {i}",
+                "category": rng.choice(CATEGORIES),
+                "price": f"{rng.randint(80, 450)}.00",
+                "is_available": True,
+            },
+            "overall_freshness": overall,
+            "overall_risk": "Unsafe" if overall < 40 else "Caution" if overall < 70 else "Fresh",
+            "ingredients": ingredients,
+        }
+
+    return payloads
+
+
+def estimate_tokens(text: str) -> float:
+    return len(text) / 4
+
+
+def run(payloads: dict, batch_size: int) -> dict:
+    generator = BatchInsightGenerator(batch_size)
+
+    started = time.perf_counter()
+    results = generator.generate(payloads)
+    elapsed = time.perf_counter() - started
+
+    # Each distinct prompt was sent once; replies are counted per dish
+    prompts = {prompt for _, prompt, _ in results.values()}
+    input_tokens = sum(estimate_tokens(prompt) for prompt in prompts)
+    output_tokens = sum(estimate_tokens(text) for text, _, _ in results.values())
+
+    stats = generator.stats()
+    return {
+        "answered": len(results),
+        "elapsed": elapsed,
+        "llm_calls": stats["llm_calls"],
+        "fallback_dishes": stats["fallback_dishes"],
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dishes", type=int, default=120)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--token-ms", type=float, default=1)
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="share of dishes the stub leaves out of batch replies")
+    parser.add_argument("--input-price", type=float, default=0.30,
+                        help="USD per million input tokens")
+    parser.add_argument("--output-price", type=float, default=2.50,
+                        help="USD per million output tokens")
+    args = parser.parse_args()
+
+    llm = get_llm()
+    llm.latency_ms = args.latency_ms
+    llm.token_ms = args.token_ms
+    llm.malformed_rate = args.malformed_rate
+
+    payloads = make_payloads(args.dishes)
+
+    for batch_size in args.batch_sizes:
+        result = run(payloads, batch_size)
+        dishes = result["answered"] or 1
+        cost = (
+            result["input_tokens"] * args.input_price
+            + result["output_tokens"] * args.output_price
+        ) / 1e6
+
+        print(
+            f"batch={batch_size:<3} dishes={result['answered']:<5} "
+            f"calls={result['llm_calls']:<5} fallbacks={result['fallback_dishes']:<4} "
+            f"dishes/s={result['answered'] / result['elapsed']:7.2f}  "
+            f"in_tok/dish={result['input_tokens'] / dishes:7.1f}  "
+            f"out_tok/dish={result['output_tokens'] / dishes:6.1f}  "
+            f"usd/1k dishes={cost / dishes * 1000:.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Bytes per ai_interactions row: full text vs content-addressed blobs.
+
+Builds insight prompts for --dishes synthetic dishes (see
+bench_batch_insights) and logs --rows interactions spread over them,
+each with a --response-chars reply; all but one in --repeat-every
+replies repeat the dish's previous reply, as with cached insights.
+Reports the text bytes the old rows carried against what the blob
+store writes (blobs after dedup and zstd + the two hash references
+kept in each row), and the encode / decode time. No database needed.
+
+    python -m benchmarks.bench_blob_store --rows 20000 --dishes 120
+"""
+import argparse
+import random
+import time
+
+from app.services.blob_store import (
+    SEGMENT_SEPARATOR,
+    BlobStore,
+    decode_body,
+)
+from benchmarks.bench_batch_insights import make_payloads
+from llm.prompt_builder import MenuPromptBuilder
+
+WORDS = ["fresh", "today", "ingredients", "safe", "enjoy", "quality", "checked", "dish"]
+
+
+def make_response(rng: random.Random, chars: int) -> str:
+    words = []
+    while sum(len(word) + 1 for word in words) < chars:
+        words.append(rng.choice(WORDS))
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dishes", type=int, default=120)
+    parser.add_argument("--response-chars", type=int, default=600)
+    parser.add_argument("--repeat-every", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    prompts = [
+        MenuPromptBuilder.build_prompt(payload)
+        for payload in make_payloads(args.dishes).values()
+    ]
+    responses = {}
+
+    rows = []
+    for i in range(args.rows):
+        dish = rng.randrange(len(prompts))
+        if i % args.repeat_every and dish in responses:
+            response = responses[dish]
+        else:
+            response = responses[dish] = make_response(rng, args.response_chars)
+        rows.append((dish, "bench", prompts[dish], response, 80.0, "Low", None))
+
+    store = BlobStore()
+    started = time.perf_counter()
+    ref_rows, blobs = store.prepare(rows)
+    encode_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for codec, _, body in blobs.values():
+        decode_body(codec, body)
+    decode_s = time.perf_counter() - started
+
+    text_bytes = sum(
+        len(prompt.encode("utf-8")) + len(response.encode("utf-8"))
+        for _, _, prompt, response, _, _, _ in rows
+    )
+    blob_bytes = sum(len(body) + len(digest) for digest, (_, _, body) in blobs.items())
+    ref_bytes = sum(
+        len(prompt_ref) + len(response_ref)
+        for _, _, prompt_ref, response_ref, _, _, _ in ref_rows
+    )
+    segments = sum(len(prompt.split(SEGMENT_SEPARATOR)) for prompt in prompts)
+
+    print(f"rows={args.rows}  dishes={args.dishes}  prompt segments={segments}  blobs={len(blobs)}")
+    print(f"full text     {text_bytes / 1024:10.1f} KiB  ({text_bytes / args.rows:7.1f} B/row)")
+    print(
+        f"blobs + refs  {(blob_bytes + ref_bytes) / 1024:10.1f} KiB  "
+        f"({(blob_bytes + ref_bytes) / args.rows:7.1f} B/row; "
+        f"blobs {blob_bytes / 1024:.1f} KiB, refs {ref_bytes / 1024:.1f} KiB)"
+    )
+    print(f"reduction     {text_bytes / (blob_bytes + ref_bytes):10.2f}x")
+    print(
+        f"encode {encode_s / args.rows * 1e6:.1f}us/row   "
+        f"decode {decode_s / max(len(blobs), 1) * 1e6:.1f}us/blob"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Semantic chat cache: precision / recall per threshold and lookup latency.
+
+Each intent below has one "seed" question (answered and cached) and
+several paraphrases a customer might type instead. A paraphrase served
+from the cache counts as correct only if the matched seed has the same
+intent; unrelated and negated questions must miss.
+
+No database or LLM needed:
+
+    python -m benchmarks.bench_chat_cache --thresholds 0.6 0.7 0.8 0.9
+"""
+import argparse
+import statistics
+import time
+
+from llm.chat_cache import ChatAnswerCache
+
+INTENTS = {
+    "safe_today": [
+        "Is this safe to eat today?",
+        "is it safe to eat today",
+        "Is this safe to eat today??",
+        "is this dish safe to eat today?",
+        "Is it safe today to eat?",
+        "safe to eat today?",
+    ],
+    "why_fresh": [
+        "Why is this dish marked fresh?",
+        "why is this marked as fresh",
+        "Why is the dish marked fresh?",
+        "why marked fresh?",
+        "Why is this dish fresh?",
+    ],
+    "spicy": [
+        "Is this dish spicy?",
+        "is it spicy",
+        "Is this spicy?",
+        "how spicy is this dish?",
+        "Is the dish very spicy?",
+    ],
+    "allergens": [
+        "Does this contain nuts?",
+        "does it contain nuts",
+        "Does this dish contain any nuts?",
+        "contains nuts?",
+        "Are there nuts in this?",
+    ],
+    "expiry": [
+        "When do the ingredients expire?",
+        "when does the ingredients expire",
+        "When do ingredients expire?",
+        "When will the ingredients expire?",
+        "ingredient expiry date?",
+    ],
+    "vegetarian": [
+        "Is this vegetarian?",
+        "is it vegetarian",
+        "Is this dish vegetarian?",
+        "is this veg?",
+        "Is this suitable for vegetarians?",
+    ],
+}
+
+# Questions that share words with the intents but mean something else
+UNRELATED = [
+    "Is this dish expensive?",
+    "Why is this dish so popular?",
+    "Can I get this without onions?",
+    "How long does it take to prepare?",
+    "Is this safe for kids with a cold?",
+    "Does this come with rice?",
+    "What sauce is used in this?",
+    "Is the chef here today?",
+    "Is this safe to eat tomorrow?",
+    "Why is this dish marked unavailable?",
+    "Does this contain gluten?",
+    "Is this vegan?",
+]
+
+# Negated versions of the seeds: the opposite question, must miss
+NEGATED = [
+    "Is this not safe to eat today?",
+    "Is this dish not safe to eat today?",
+    "Isn't this dish spicy?",
+    "Is this dish not spicy?",
+    "Does this not contain nuts?",
+    "Doesn't this contain nuts?",
+    "Is this not vegetarian?",
+    "Why is this dish not marked fresh?",
+    "When do the ingredients never expire?",
+]
+
+
+def evaluate(threshold: float) -> dict:
+    cache = ChatAnswerCache(threshold=threshold)
+
+    for intent, questions in INTENTS.items():
+        cache.put("dish", "v1", questions[0], intent)
+
+    true_pos = false_pos = false_neg = true_neg = 0
+    latencies = []
+
+    for intent, questions in INTENTS.items():
+        for question in questions[1:]:
+            started = time.perf_counter()
+            hit = cache.lookup("dish", "v1", question)
+            latencies.append(time.perf_counter() - started)
+
+            if hit is None:
+                false_neg += 1
+            elif hit[0] == intent:
+                true_pos += 1
+            else:
+                false_pos += 1
+
+    negated_served = 0
+    for question in UNRELATED + NEGATED:
+        started = time.perf_counter()
+        hit = cache.lookup("dish", "v1", question)
+        latencies.append(time.perf_counter() - started)
+
+        if hit is None:
+            true_neg += 1
+        else:
+            false_pos += 1
+            negated_served += question in NEGATED
+
+    served = true_pos + false_pos
+    return {
+        "precision": true_pos / served if served else 1.0,
+        "recall": true_pos / (true_pos + false_neg),
+        "false_positives": false_pos,
+        "unrelated_rejected": true_neg,
+        "negated_served": negated_served,
+        "lookup_us_median": statistics.median(latencies) * 1e6,
+    }
+
+
+def bench_latency(entries: int, lookups: int = 2000) -> float:
+    """Median lookup time with `entries` cached questions for one dish."""
+    cache = ChatAnswerCache(threshold=0.8, max_per_dish=entries)
+    questions = [q for qs in INTENTS.values() for q in qs]
+
+    for i in range(entries):
+        cache.put("dish", "v1", f"{questions[i % len(questions)]} #{i}", "answer")
+
+    latencies = []
+    for i in range(lookups):
+        started = time.perf_counter()
+        cache.lookup("dish", "v1", UNRELATED[i % len(UNRELATED)])
+        latencies.append(time.perf_counter() - started)
+
+    return statistics.median(latencies) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9]
+    )
+    args = parser.parse_args()
+
+    for threshold in args.thresholds:
+        result = evaluate(threshold)
+        print(
+            f"threshold={threshold:.2f}  precision={result['precision']:.3f}  "
+            f"recall={result['recall']:.3f}  "
+            f"false_pos={result['false_positives']:<3} "
+            f"rejected={result['unrelated_rejected']}/{len(UNRELATED) + len(NEGATED)}  "
+            f"negated_served={result['negated_served']}  "
+            f"lookup={result['lookup_us_median']:7.1f}us"
+        )
+
+    for entries in (8, 64, 256):
+        print(f"lookup latency with {entries:>3} cached questions: "
+              f"{bench_latency(entries):8.1f}us (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+LLMClient under load: throughput, latency and timeouts vs concurrency cap.
+
+Uses the deterministic local provider (LLM_PROVIDER=local), so no
+Gemini key or network is needed. Each run fires --requests concurrent
+agenerate() calls against a provider with --latency-ms per call.
+
+    python -m benchmarks.bench_llm_client --caps 2 8 32 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ["LLM_PROVIDER"] = "local"
+# Deadline timeouts would trip the circuit breaker; measure the cap alone
+os.environ["LLM_BREAKER_ENABLED"] = "0"
+
+from llm import llm_client
+from llm.llm_client import LLMClient, LLMTimeoutError
+
+
+async def run(cap: int, requests: int, timeout: float) -> dict:
+    os.environ["LLM_MAX_CONCURRENCY"] = str(cap)
+    # Fresh semaphore for the new cap
+    llm_client._async_slots = None
+
+    latencies = []
+    timeouts = 0
+
+    async def one(i: int):
+        nonlocal timeouts
+        started = time.perf_counter()
+        try:
+            await LLMClient.agenerate(f"benchmark prompt {i}", timeout=timeout)
+            latencies.append(time.perf_counter() - started)
+        except LLMTimeoutError:
+            timeouts += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "ok": len(latencies),
+        "timeouts": timeouts,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": (
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            if latencies else 0.0
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--caps", type=int, nargs="+", default=[2, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    args = parser.parse_args()
+
+    os.environ["LOCAL_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["LOCAL_LLM_TOKEN_MS"] = "0"
+
+    for cap in args.caps:
+        result = asyncio.run(run(cap, args.requests, args.timeout))
+        print(
+            f"cap={cap:<4} ok={result['ok']:<5} timeouts={result['timeouts']:<5} "
+            f"throughput={result['throughput']:7.1f}/s  "
+            f"p50={result['p50_ms']:8.1f}ms  p95={result['p95_ms']:8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Model routing: tail latency with and without hedged requests.
+
+Registers two local stand-in models (LLM_MODELS) on one route: a
+primary whose latency has a slow tail (--slow-rate of its calls take
+--slow-ms instead of --latency-ms) and a steady backup. Each run fires
+--requests agenerate() calls, --concurrency at a time; the hedged run
+asks the backup once the primary is slower than its own recent p95.
+
+    python -m benchmarks.bench_llm_routing --requests 400 --slow-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+
+os.environ["LLM_PROVIDER"] = "local"
+
+from llm import llm_client
+from llm.llm_client import LLMClient
+from llm.llm_metrics import model_latency
+from llm.llm_provider import get_llm
+
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(requests: int, concurrency: int) -> dict:
+    # Fresh semaphore per event loop
+    llm_client._async_slots = None
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    served_by = {}
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            _, model = await LLMClient.agenerate_with_model(
+                f"benchmark prompt {i}", route="bench"
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            served_by[model] = served_by.get(model, 0) + 1
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "served_by": served_by,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--slow-ms", type=float, default=1200)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--backup-ms", type=float, default=150)
+    args = parser.parse_args()
+
+    os.environ["LLM_MODELS"] = json.dumps({
+        "primary": {"provider": "local", "latency_ms": args.latency_ms, "token_ms": 0},
+        "backup": {"provider": "local", "latency_ms": args.backup_ms, "token_ms": 0},
+    })
+    os.environ["LLM_ROUTES"] = json.dumps({"bench": ["primary", "backup"]})
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.concurrency * 2)
+
+    # Slow tail: patch the primary's first-token delay
+    primary = get_llm("primary")
+    rng = random.Random(11)
+    fast_delay = primary._first_token_delay
+
+    def tail_delay():
+        if rng.random() < args.slow_rate:
+            return args.slow_ms / 1000
+        return fast_delay()
+
+    primary._first_token_delay = tail_delay
+
+    for label, hedge_routes in (("no hedge", ""), ("hedged", "bench")):
+        os.environ["LLM_HEDGE_ROUTES"] = hedge_routes
+        model_latency.__init__()
+        before = LLMClient.stats()
+
+        result = asyncio.run(run(args.requests, args.concurrency))
+
+        after = LLMClient.stats()
+        print(
+            f"{label:<9} p50={result['p50_ms']:7.1f}ms  p95={result['p95_ms']:7.1f}ms  "
+            f"p99={result['p99_ms']:7.1f}ms  "
+            f"hedges={after['hedges'] - before['hedges']:<4} "
+            f"backup_wins={after['hedge_wins'] - before['hedge_wins']:<4} "
+            f"served_by={result['served_by']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
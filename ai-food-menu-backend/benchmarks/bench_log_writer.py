@@ -0,0 +1,86 @@
+"""
+Inline log INSERTs vs the write-behind log writer.
+
+Calls ai_logger.log_ai_interaction --records times from --threads
+threads, first with the writer stopped (one INSERT + commit per call,
+as before) and then with it running (enqueue only; batched flushes).
+Reports the per-call latency a request handler would see and the time
+until every row is committed. Rows are tagged and deleted afterwards.
+
+Run from ai-food-menu-backend/ (needs a reachable DB):
+
+    python -m benchmarks.bench_log_writer --records 2000 --threads 8
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.ai_logger import log_ai_interaction
+from app.services.log_writer import log_writer
+from app.services.postgres import db_connection
+
+MODEL_TAG = "bench-log-writer"
+
+
+def _log(i: int) -> float:
+    started = time.perf_counter()
+    log_ai_interaction(
+        menu_id=None,
+        prompt=f"benchmark prompt {i}",
+        response="benchmark response",
+        freshness_score=80.0,
+        risk_level="Low",
+        model_name=MODEL_TAG,
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+def _cleanup():
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM ai_interactions WHERE model_name = %s", (MODEL_TAG,))
+        conn.commit()
+
+
+def run(label: str, records: int, threads: int):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(_log, range(records)))
+    handlers_done = time.perf_counter() - started
+
+    log_writer.flush(timeout=60)
+    durable = time.perf_counter() - started
+
+    print(
+        f"{label:<13} call p50={statistics.median(latencies):7.3f}ms  "
+        f"p95={latencies[int(len(latencies) * 0.95)]:7.3f}ms  "
+        f"handlers done={handlers_done:6.2f}s  all committed={durable:6.2f}s  "
+        f"rows/s={records / durable:9.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    try:
+        run("inline", args.records, args.threads)
+
+        log_writer.start()
+        run("write-behind", args.records, args.threads)
+
+        stats = log_writer.stats()
+        print(
+            f"flushes={stats['flushes']} rows/flush={stats['rows_per_flush']} "
+            f"flush p95={stats['flush_ms']['p95']}ms peak depth={stats['peak_depth']}"
+        )
+    finally:
+        log_writer.stop()
+        _cleanup()
+
+
+if __name__ == "__main__":
+    main()
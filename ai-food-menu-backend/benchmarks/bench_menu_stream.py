@@ -0,0 +1,86 @@
+"""
+Buffered vs streamed full-menu build: time to first item and peak memory.
+
+The buffered path is what GET /menu does live (load every context,
+score, render one JSON array); the streamed path is what
+GET /menu?format=ndjson does (server-side cursor, one chunk at a time).
+
+Run from ai-food-menu-backend/ (needs a reachable DB):
+
+    python -m benchmarks.bench_menu_stream --chunk-size 100
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from context_object.async_menu_context import AsyncMenuContextBuilder
+from app.services.async_postgres import close_async_pool
+from app.services.freshness_snapshot import build_snapshot_entries
+from app.services.response_cache import render_json
+from app.routes.menu import _decide
+
+
+def _report(label: str, items: int, first: float, total: float, peak: int):
+    print(
+        f"{label:<9} items={items:<6} "
+        f"first_item={first * 1000:8.1f}ms  total={total * 1000:8.1f}ms  "
+        f"peak_mem={peak / 1024:9.1f}KiB"
+    )
+
+
+async def run_buffered():
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    contexts = await AsyncMenuContextBuilder.get_menu_contexts()
+    entries = build_snapshot_entries(contexts)
+    body = render_json([_decide(slug, entry) for slug, entry in entries.items()])
+
+    # The first byte only leaves once the whole body exists
+    total = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    _report("buffered", len(entries), total, total, peak)
+    return len(body)
+
+
+async def run_streamed(chunk_size: int):
+    tracemalloc.start()
+    started = time.perf_counter()
+    first = None
+    items = 0
+    size = 0
+
+    async for contexts in AsyncMenuContextBuilder.iter_menu_contexts(chunk_size):
+        for slug, entry in build_snapshot_entries(contexts).items():
+            size += len(render_json(_decide(slug, entry))) + 1
+            items += 1
+            if first is None:
+                first = time.perf_counter() - started
+
+    total = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    _report("streamed", items, first or total, total, peak)
+    return size
+
+
+async def run(chunk_size: int):
+    await run_buffered()
+    await run_streamed(chunk_size)
+    await close_async_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunk-size", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
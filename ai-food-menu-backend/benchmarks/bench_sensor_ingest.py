@@ -0,0 +1,105 @@
+"""
+Per-reading storage_conditions INSERTs vs the bulk sensor ingestor.
+
+Writes --readings synthetic fridge / freezer readings, first one
+upsert_storage_condition call per reading (INSERT + latest upsert +
+commit each) and then through SensorIngestor.ingest in --batch sized
+COPY batches, the path behind POST /storage/readings. Readings use
+ingredient ids far above the real ones and are deleted afterwards.
+
+Run from ai-food-menu-backend/ (needs a reachable DB):
+
+    python -m benchmarks.bench_sensor_ingest --readings 20000 --batch 5000
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.services.ai_logger import upsert_storage_condition
+from app.services.postgres import db_connection
+from app.services.sensor_ingest import (
+    LATEST_TABLE,
+    ensure_sensor_tables,
+    sensor_ingestor,
+)
+
+# Synthetic ingredients, clear of real ids
+BASE_INGREDIENT_ID = 10_000_000
+INGREDIENTS = 500
+
+
+def _readings(count: int):
+    now = datetime.utcnow()
+    return [
+        (
+            BASE_INGREDIENT_ID + i % INGREDIENTS,
+            random.choice(("Chiller", "Freezer", "Dry")),
+            random.uniform(-20.0, 9.0),
+            random.uniform(40.0, 80.0),
+            now - timedelta(seconds=count - i),
+        )
+        for i in range(count)
+    ]
+
+
+def _cleanup():
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            for table in ("storage_conditions", LATEST_TABLE):
+                cur.execute(
+                    f"DELETE FROM {table} WHERE ingredient_id >= %s",
+                    (BASE_INGREDIENT_ID,)
+                )
+        conn.commit()
+
+
+def run_inline(readings):
+    started = time.perf_counter()
+    for ingredient_id, storage_type, temperature, humidity, _ in readings:
+        upsert_storage_condition(ingredient_id, storage_type, temperature, humidity)
+    elapsed = time.perf_counter() - started
+
+    print(f"{'per-reading':<12} readings={len(readings):7d}  "
+          f"time={elapsed:7.2f}s  readings/s={len(readings) / elapsed:10.1f}")
+
+
+async def run_bulk(readings, batch: int):
+    started = time.perf_counter()
+    for offset in range(0, len(readings), batch):
+        await sensor_ingestor.ingest(readings[offset:offset + batch])
+    elapsed = time.perf_counter() - started
+
+    print(f"{'bulk COPY':<12} readings={len(readings):7d}  "
+          f"time={elapsed:7.2f}s  readings/s={len(readings) / elapsed:10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readings", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument(
+        "--inline-readings", type=int, default=1000,
+        help="readings for the (slow) per-reading baseline",
+    )
+    args = parser.parse_args()
+
+    ensure_sensor_tables()
+    sensor_ingestor.ready = True
+
+    try:
+        run_inline(_readings(args.inline_readings))
+        asyncio.run(run_bulk(_readings(args.readings), args.batch))
+
+        stats = sensor_ingestor.stats()
+        print(
+            f"batches={stats['batches']} batch p50={stats['batch_ms']['p50']}ms "
+            f"max={stats['batch_ms']['max']}ms deviations={stats['deviations']}"
+        )
+    finally:
+        _cleanup()
+
+
+if __name__ == "__main__":
+    main()
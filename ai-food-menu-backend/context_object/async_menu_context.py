@@ -0,0 +1,330 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.services.async_postgres import async_db_connection
+from app.services.freshness_snapshot import SNAPSHOT_TABLE
+from app.services.sensor_ingest import LATEST_TABLE
+from context_object.menu_context import MenuContextBuilder, SCHEMA
+
+
+class AsyncMenuContextBuilder:
+    """
+    asyncpg-backed twin of MenuContextBuilder.
+
+    Runs the same set-based queries without blocking the event loop
+    and produces exactly the same context objects.
+    """
+
+    @staticmethod
+    async def get_menu_context(slug: str, tenant=None) -> dict:
+        contexts = await AsyncMenuContextBuilder.get_menu_contexts(
+            [slug], tenant=tenant
+        )
+
+        if slug not in contexts:
+            raise ValueError(f"Menu item not found for slug='{slug}'")
+
+        return contexts[slug]
+
+    @staticmethod
+    async def resolve_menu_id(ref: str) -> int:
+        """
+        menu_id of a dish given its slug or numeric id.
+        Raises ValueError if no such dish exists.
+        """
+        async with async_db_connection() as conn:
+            if ref.isdigit() and int(ref) <= 2 ** 31 - 1:
+                menu_id = await conn.fetchval(
+                    f"SELECT menu_id FROM {SCHEMA}.menu_items WHERE menu_id = $1",
+                    int(ref)
+                )
+            else:
+                menu_id = await conn.fetchval(
+                    f"SELECT menu_id FROM {SCHEMA}.menu_items WHERE slug = $1",
+                    ref
+                )
+
+        if menu_id is None:
+            raise ValueError(f"Menu item not found: {ref}")
+
+        return menu_id
+
+    @staticmethod
+    async def get_menu_contexts(
+        slugs: Optional[List[str]] = None,
+        tenant=None,
+    ) -> Dict[str, dict]:
+        """
+        Returns {slug: context}, ordered by category, name.
+        Unknown slugs are simply absent from the result.
+        `tenant` restricts it to one restaurant's menu.
+        """
+        if slugs is not None and not slugs:
+            return {}
+
+        async with async_db_connection() as conn:
+            return await AsyncMenuContextBuilder._fetch_contexts(
+                conn, slugs, tenant=tenant
+            )
+
+    @staticmethod
+    async def _fetch_contexts(
+        conn,
+        slugs: Optional[List[str]],
+        tenant=None,
+    ) -> Dict[str, dict]:
+        schema, restaurant_id = MenuContextBuilder.tenant_scope(tenant)
+
+        # 1️⃣ Resolve slugs → menu items
+        conditions = []
+        args = []
+
+        if slugs is not None:
+            args.append(list(slugs))
+            conditions.append(f"slug = ANY(${len(args)}::text[])")
+
+        if restaurant_id is not None:
+            args.append(restaurant_id)
+            conditions.append(f"restaurant_id = ${len(args)}")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        menus = await conn.fetch(
+            f"""
+            SELECT
+                menu_id,
+                slug,
+                name,
+                category,
+                price,
+                is_available
+            FROM {schema}.menu_items
+            {where}
+            ORDER BY category, name
+            """,
+            *args,
+        )
+
+        return await AsyncMenuContextBuilder._contexts_for_menus(
+            conn, menus, schema=schema
+        )
+
+    @staticmethod
+    async def find_menu_page(
+        category: Optional[str] = None,
+        restaurant_id: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        after: Optional[Tuple[str, str, int]] = None,
+        limit: int = 20,
+        tenant=None,
+    ) -> List[dict]:
+        """
+        One filtered page of menu_items rows, ordered by
+        (category, name, menu_id).
+
+        Score bounds ([min_score, max_score)) are checked against the
+        precomputed menu_freshness_snapshot table, so nothing is scored
+        here. `after` is the (category, name, menu_id) keyset of the last
+        row of the previous page. Returns up to `limit` rows.
+        """
+        schema, tenant_restaurant_id = MenuContextBuilder.tenant_scope(tenant)
+
+        joins = ""
+        conditions = []
+        args = []
+
+        def bind(value) -> str:
+            args.append(value)
+            return f"${len(args)}"
+
+        if category is not None:
+            conditions.append(f"m.category = {bind(category)}")
+        if tenant_restaurant_id is not None:
+            conditions.append(f"m.restaurant_id = {bind(tenant_restaurant_id)}")
+        if restaurant_id is not None:
+            conditions.append(f"m.restaurant_id = {bind(restaurant_id)}")
+        if min_price is not None:
+            conditions.append(f"m.price >= {bind(min_price)}")
+        if max_price is not None:
+            conditions.append(f"m.price <= {bind(max_price)}")
+
+        if min_score is not None or max_score is not None:
+            joins = (
+                f"JOIN {schema}.{SNAPSHOT_TABLE} s ON s.menu_id = m.menu_id"
+            )
+            if min_score is not None:
+                conditions.append(f"s.menu_freshness >= {bind(min_score)}")
+            if max_score is not None:
+                conditions.append(f"s.menu_freshness < {bind(max_score)}")
+
+        if after is not None:
+            conditions.append(
+                f"(m.category, m.name, m.menu_id) > "
+                f"({bind(after[0])}, {bind(after[1])}, {bind(after[2])})"
+            )
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        async with async_db_connection() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT
+                    m.menu_id,
+                    m.slug,
+                    m.name,
+                    m.category,
+                    m.price,
+                    m.is_available
+                FROM {schema}.menu_items m
+                {joins}
+                {where}
+                ORDER BY m.category, m.name, m.menu_id
+                LIMIT {bind(limit)}
+                """,
+                *args,
+            )
+
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def iter_menu_contexts(
+        chunk_size: int = 100,
+        tenant=None,
+    ) -> AsyncIterator[Dict[str, dict]]:
+        """
+        Stream contexts for the whole menu, ordered by category, name.
+
+        menu_items is read through a server-side cursor `chunk_size`
+        rows at a time; each chunk gets its own set-based ingredient /
+        event queries and is yielded as {slug: context}. Memory stays
+        bounded by the chunk size, not the catalog size.
+        """
+        schema, restaurant_id = MenuContextBuilder.tenant_scope(tenant)
+        where = "" if restaurant_id is None else "WHERE restaurant_id = $1"
+        args = [] if restaurant_id is None else [restaurant_id]
+
+        async with async_db_connection() as conn:
+            # Cursors only live inside a transaction
+            async with conn.transaction(readonly=True):
+                cursor = await conn.cursor(
+                    f"""
+                    SELECT
+                        menu_id,
+                        slug,
+                        name,
+                        category,
+                        price,
+                        is_available
+                    FROM {schema}.menu_items
+                    {where}
+                    ORDER BY category, name
+                    """,
+                    *args,
+                )
+
+                while True:
+                    menus = await cursor.fetch(chunk_size)
+                    if not menus:
+                        break
+
+                    yield await AsyncMenuContextBuilder._contexts_for_menus(
+                        conn, menus, schema=schema
+                    )
+
+    @staticmethod
+    async def _contexts_for_menus(conn, menus, schema: str = SCHEMA) -> Dict[str, dict]:
+        """Steps 2️⃣-4️⃣ for already-fetched menu_items rows."""
+        if not menus:
+            return {}
+
+        menu_ids = [menu["menu_id"] for menu in menus]
+
+        # 2️⃣ Fetch ingredients for all menu_ids in one go
+        rows = await conn.fetch(
+            f"""
+            SELECT
+                mi.menu_id,
+                i.ingredient_id,
+                i.name,
+                i.category,
+                i.received_date,
+                i.expiry_date,
+                i.freshness_score,
+                i.risk_level
+            FROM {schema}.ingredients i
+            JOIN {schema}.menu_ingredients mi
+                ON i.ingredient_id = mi.ingredient_id
+            WHERE mi.menu_id = ANY($1)
+            """,
+            menu_ids,
+        )
+
+        ingredients_by_menu: Dict[int, List[Dict]] = {}
+        ingredient_ids = set()
+        for row in rows:
+            ingredients_by_menu.setdefault(row["menu_id"], []).append(dict(row))
+            ingredient_ids.add(row["ingredient_id"])
+
+        # 3️⃣ Fetch latest event per ingredient (optional)
+        ingredient_events = {}
+
+        if ingredient_ids:
+            rows = await conn.fetch(
+                f"""
+                SELECT DISTINCT ON (ingredient_id)
+                    ingredient_id,
+                    event_type,
+                    event_value,
+                    created_at
+                FROM {schema}.ingredient_events
+                WHERE ingredient_id = ANY($1)
+                ORDER BY ingredient_id, created_at DESC
+                """,
+                list(ingredient_ids),
+            )
+            for row in rows:
+                event = dict(row)
+                ingredient_events[event.pop("ingredient_id")] = event
+
+        # 3️⃣b Latest storage reading per ingredient (primary key lookups)
+        storage_readings = {}
+
+        if ingredient_ids and MenuContextBuilder.reads_storage(schema):
+            rows = await conn.fetch(
+                f"""
+                SELECT
+                    ingredient_id,
+                    storage_type,
+                    temperature,
+                    humidity,
+                    last_checked,
+                    deviation_flag
+                FROM {schema}.{LATEST_TABLE}
+                WHERE ingredient_id = ANY($1)
+                """,
+                list(ingredient_ids),
+            )
+            for row in rows:
+                reading = dict(row)
+                storage_readings[reading.pop("ingredient_id")] = reading
+
+        # 3️⃣c Recent telemetry per ingredient (in memory)
+        storage_telemetry = MenuContextBuilder.telemetry_summaries(
+            [row for rows in ingredients_by_menu.values() for row in rows], schema
+        )
+
+        # 4️⃣ Build final context objects
+        contexts = {}
+        for menu in menus:
+            contexts[menu["slug"]] = MenuContextBuilder._build_context(
+                menu,
+                menu["slug"],
+                ingredients_by_menu.get(menu["menu_id"], []),
+                ingredient_events,
+                storage_readings,
+                storage_telemetry,
+            )
+
+        return contexts
@@ -1,5 +1,7 @@
 from datetime import datetime, date
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 
 class FreshnessEngine:
@@ -8,6 +10,21 @@ class FreshnessEngine:
     Computes and explains WHY a food item is fresh, risky, or unsafe.
     """
 
+    # Safe storage temperature ranges (°C)
+    SAFE_TEMP_RANGES: Dict[str, Tuple[int, int]] = {
+        "Seafood": (0, 4),
+        "Chicken": (0, 4),
+        "Meat": (0, 4),
+        "Vegetarian": (2, 8),
+        "Dairy": (2, 6),
+    }
+    DEFAULT_TEMP_RANGE: Tuple[int, int] = (0, 8)
+
+    # Sensor telemetry: minutes out of the safe range within the last
+    # TEMP_EXCURSION_WINDOW_HOURS before the temperature penalty applies
+    TEMP_EXCURSION_WINDOW_HOURS = 4
+    TEMP_EXCURSION_MINUTES = 30
+
     # ---------- helpers ----------
 
     @staticmethod
@@ -15,28 +32,32 @@ class FreshnessEngine:
         """Return non-negative day difference."""
         return max((end - start).days, 0)
 
-    @staticmethod
-    def _safe_temp_range(category: str) -> Tuple[int, int]:
+    @classmethod
+    def _safe_temp_range(cls, category: str) -> Tuple[int, int]:
         """
         Safe storage temperature ranges (°C)
         """
-        return {
-            "Seafood": (0, 4),
-            "Chicken": (0, 4),
-            "Meat": (0, 4),
-            "Vegetarian": (2, 8),
-            "Dairy": (2, 6),
-        }.get(category, (0, 8))
+        return cls.SAFE_TEMP_RANGES.get(category, cls.DEFAULT_TEMP_RANGE)
+
+    @staticmethod
+    def _status(min_score: float) -> str:
+        if min_score < 40:
+            return "Unsafe"
+        elif min_score < 70:
+            return "Caution"
+        return "Fresh"
 
     # ---------- ingredient scoring ----------
 
     @classmethod
-    def score_ingredient(cls, ingredient: Dict) -> Dict:
+    def score_ingredient(cls, ingredient: Dict, today: Optional[date] = None) -> Dict:
         """
         Compute freshness score for a single ingredient.
+
+        `today` is the evaluation date (defaults to the current UTC date).
         """
 
-        today = datetime.utcnow().date()
+        today = today or datetime.utcnow().date()
 
         received: date = ingredient["received_date"]
         expiry: date = ingredient["expiry_date"]
@@ -61,9 +82,22 @@ class FreshnessEngine:
             warnings.append("Ingredient near expiry")
             penalty += 20
 
-        # Temperature check (latest event only)
+        # Temperature check: time out of range from sensor telemetry
+        # when available, else the latest storage_check event only
+        out_of_range_minutes = (ingredient.get("storage_telemetry") or {}).get(
+            "out_of_range_minutes"
+        )
         event = ingredient.get("latest_event")
-        if event and event.get("event_type") == "storage_check":
+
+        if out_of_range_minutes is not None:
+            if out_of_range_minutes >= cls.TEMP_EXCURSION_MINUTES:
+                warnings.append(
+                    f"Stored outside the safe temperature range for over "
+                    f"{cls.TEMP_EXCURSION_MINUTES} min in the last "
+                    f"{cls.TEMP_EXCURSION_WINDOW_HOURS}h"
+                )
+                penalty += 15
+        elif event and event.get("event_type") == "storage_check":
             temp = event.get("event_value", {}).get("temp")
             min_t, max_t = cls._safe_temp_range(ingredient["category"])
 
@@ -94,30 +128,28 @@ class FreshnessEngine:
     # ---------- menu scoring ----------
 
     @classmethod
-    def score_menu(cls, context: Dict) -> Dict:
+    def score_menu(cls, context: Dict, evaluated_at: Optional[datetime] = None) -> Dict:
         """
         Compute freshness score for an entire menu item.
         Uses the weakest ingredient as the deciding factor.
         """
 
+        evaluated_at = evaluated_at or datetime.utcnow()
+        today = evaluated_at.date()
+
         ingredient_results: List[Dict] = []
         min_score = 100.0
         all_warnings: List[str] = []
 
         for ingredient in context["ingredients"]:
-            result = cls.score_ingredient(ingredient)
+            result = cls.score_ingredient(ingredient, today=today)
             ingredient_results.append(result)
 
             min_score = min(min_score, result["final_freshness"])
             all_warnings.extend(result["warnings"])
 
         # Menu-level status
-        if min_score < 40:
-            status = "Unsafe"
-        elif min_score < 70:
-            status = "Caution"
-        else:
-            status = "Fresh"
+        status = cls._status(min_score)
 
         return {
             "menu_id": context["menu"]["menu_id"],
@@ -126,5 +158,225 @@ class FreshnessEngine:
             "status": status,
             "warnings": list(set(all_warnings)),
             "ingredients": ingredient_results,
-            "evaluated_at": datetime.utcnow().isoformat(),
+            "evaluated_at": evaluated_at.isoformat(),
+        }
+
+    # ---------- batch (columnar) scoring ----------
+
+    @staticmethod
+    def _column(data, name: str, default=None) -> Optional[np.ndarray]:
+        """
+        Read one column from a dict of arrays, a pandas DataFrame
+        or a pyarrow Table as a NumPy array.
+        """
+        names = data.column_names if hasattr(data, "column_names") else data.keys()
+        if name not in names:
+            return default
+
+        column = data[name]
+        if hasattr(column, "to_numpy"):
+            column = column.to_numpy()
+
+        return np.asarray(column)
+
+    @staticmethod
+    def _round2(values: np.ndarray) -> np.ndarray:
+        """
+        Python's round(x, 2), applied element-wise.
+
+        np.round uses a different algorithm and can disagree with the
+        scalar path on ties, so round each distinct value with Python's
+        round. Scores take few distinct values, so this stays cheap.
+        """
+        unique, inverse = np.unique(values, return_inverse=True)
+        rounded = np.array([round(float(v), 2) for v in unique], dtype=np.float64)
+        return rounded[inverse].reshape(values.shape)
+
+    @staticmethod
+    def ingredient_columns(contexts: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Flatten MenuContextBuilder contexts into the columnar layout
+        accepted by score_ingredients_batch / score_menus_batch.
+        """
+        menu_ids, received, expiry, categories, risks, temps = [], [], [], [], [], []
+        excursions = []
+
+        for context in contexts:
+            for ingredient in context["ingredients"]:
+                event = ingredient.get("latest_event")
+                temp = None
+                if event and event.get("event_type") == "storage_check":
+                    temp = event.get("event_value", {}).get("temp")
+
+                menu_ids.append(context["menu"]["menu_id"])
+                received.append(ingredient["received_date"])
+                expiry.append(ingredient["expiry_date"])
+                categories.append(ingredient["category"])
+                risks.append(ingredient.get("risk_level", "Low"))
+                temps.append(np.nan if temp is None else temp)
+
+                minutes = (ingredient.get("storage_telemetry") or {}).get(
+                    "out_of_range_minutes"
+                )
+                excursions.append(np.nan if minutes is None else minutes)
+
+        return {
+            "menu_id": np.asarray(menu_ids, dtype=np.int64),
+            "received_date": np.asarray(received, dtype="datetime64[D]"),
+            "expiry_date": np.asarray(expiry, dtype="datetime64[D]"),
+            "category": np.asarray(categories, dtype=object),
+            "risk_level": np.asarray(risks, dtype=object),
+            "event_temp": np.asarray(temps, dtype=np.float64),
+            "out_of_range_minutes": np.asarray(excursions, dtype=np.float64),
+        }
+
+    @classmethod
+    def score_ingredients_batch(
+        cls,
+        data,
+        evaluated_at: Optional[datetime] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized score_ingredient over columnar input.
+
+        Columns (dict of arrays, pandas DataFrame or pyarrow Table):
+        - received_date, expiry_date : dates (datetime64 / date objects)
+        - category                   : ingredient category
+        - risk_level   (optional)    : "Low" / "Medium" / "High"
+        - event_temp   (optional)    : latest storage_check temp, NaN if none
+        - event_type   (optional)    : if given, temps only count where
+                                       event_type == "storage_check"
+        - out_of_range_minutes (optional) : sensor telemetry, NaN if none;
+                                       replaces event_temp where present
+
+        One evaluation timestamp is used for every row. Scores are
+        identical to the scalar path.
+        """
+        today = np.datetime64((evaluated_at or datetime.utcnow()).date(), "D")
+
+        received = cls._column(data, "received_date").astype("datetime64[D]")
+        expiry = cls._column(data, "expiry_date").astype("datetime64[D]")
+        n = len(expiry)
+
+        total_life = np.maximum((expiry - received).astype(np.int64), 0)
+        remaining_life = np.maximum((expiry - today).astype(np.int64), 0)
+
+        # Base freshness from shelf life
+        with np.errstate(divide="ignore", invalid="ignore"):
+            base = np.where(
+                total_life == 0,
+                0.0,
+                (remaining_life / np.where(total_life == 0, 1, total_life)) * 100,
+            )
+        base = cls._round2(base)
+
+        # Expiry checks
+        expired = remaining_life <= 0
+        near_expiry = ~expired & (remaining_life <= 1)
+        penalty = np.where(expired, 50, np.where(near_expiry, 20, 0))
+
+        # Temperature check (latest event only)
+        temps = cls._column(data, "event_temp")
+        if temps is None:
+            temp_violation = np.zeros(n, dtype=bool)
+        else:
+            temps = temps.astype(np.float64)
+            has_temp = ~np.isnan(temps)
+
+            event_type = cls._column(data, "event_type")
+            if event_type is not None:
+                has_temp &= event_type == "storage_check"
+
+            categories = cls._column(data, "category")
+            min_t = np.full(n, cls.DEFAULT_TEMP_RANGE[0], dtype=np.float64)
+            max_t = np.full(n, cls.DEFAULT_TEMP_RANGE[1], dtype=np.float64)
+            for category, (low, high) in cls.SAFE_TEMP_RANGES.items():
+                mask = categories == category
+                min_t[mask] = low
+                max_t[mask] = high
+
+            with np.errstate(invalid="ignore"):
+                temp_violation = has_temp & ~((min_t <= temps) & (temps <= max_t))
+
+        # Sensor telemetry overrides the latest event where present
+        excursions = cls._column(data, "out_of_range_minutes")
+        if excursions is not None:
+            excursions = excursions.astype(np.float64)
+            with np.errstate(invalid="ignore"):
+                temp_violation = np.where(
+                    np.isnan(excursions),
+                    temp_violation,
+                    excursions >= cls.TEMP_EXCURSION_MINUTES,
+                )
+
+        penalty = penalty + np.where(temp_violation, 15, 0)
+
+        # Risk weighting
+        risks = cls._column(data, "risk_level")
+        if risks is not None:
+            penalty = penalty + np.where(
+                risks == "Medium", 10, np.where(risks == "High", 25, 0)
+            )
+
+        final = np.maximum(cls._round2(base - penalty), 0.0)
+
+        return {
+            "base_freshness": base,
+            "penalty": penalty.astype(np.int64),
+            "final_freshness": final,
+            "expired": expired,
+            "near_expiry": near_expiry,
+            "temp_violation": temp_violation,
+        }
+
+    @classmethod
+    def score_menus_batch(
+        cls,
+        data,
+        evaluated_at: Optional[datetime] = None,
+        menu_ids=None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized score_menu over columnar input with one row per
+        (menu_id, ingredient). Same columns as score_ingredients_batch
+        plus `menu_id`.
+
+        Pass `menu_ids` to include dishes without ingredients
+        (they score 100, like the scalar path).
+
+        Returns per-menu arrays sorted by menu_id: menu_id,
+        menu_freshness, status, any_expired, any_near_expiry,
+        any_temp_violation.
+        """
+        scored = cls.score_ingredients_batch(data, evaluated_at=evaluated_at)
+        row_menu_ids = cls._column(data, "menu_id")
+
+        all_ids = row_menu_ids if menu_ids is None else np.concatenate(
+            [row_menu_ids, np.asarray(menu_ids, dtype=row_menu_ids.dtype)]
+        )
+        unique_ids = np.unique(all_ids)
+        index = np.searchsorted(unique_ids, row_menu_ids)
+
+        # Weakest ingredient decides
+        min_score = np.full(len(unique_ids), 100.0)
+        np.minimum.at(min_score, index, scored["final_freshness"])
+        min_score = cls._round2(min_score)
+
+        flags = {}
+        for flag in ("expired", "near_expiry", "temp_violation"):
+            any_flag = np.zeros(len(unique_ids), dtype=bool)
+            np.logical_or.at(any_flag, index, scored[flag])
+            flags[f"any_{flag}"] = any_flag
+
+        status = np.where(
+            min_score < 40,
+            "Unsafe",
+            np.where(min_score < 70, "Caution", "Fresh"),
+        ).astype(object)
+
+        return {
+            "menu_id": unique_ids,
+            "menu_freshness": min_score,
+            "status": status,
+            **flags,
         }
@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import Dict, List, Optional
 from psycopg2.extras import RealDictCursor
-from app.services.postgres import get_db_connection
+from app.services.postgres import db_connection
+from app.services.sensor_ingest import LATEST_TABLE, sensor_ingestor
+from app.services.telemetry_buffer import telemetry_buffer
 
 SCHEMA = "public"
 
@@ -18,104 +21,260 @@ class MenuContextBuilder:
     """
 
     @staticmethod
-    def get_menu_context(slug: str) -> dict:
-        conn = get_db_connection()
-        if not conn:
-            raise RuntimeError("Database connection not available")
+    def _build_context(
+        menu: Dict,
+        slug: str,
+        ingredients: List[Dict],
+        ingredient_events: Dict,
+        storage_readings: Optional[Dict] = None,
+        storage_telemetry: Optional[Dict] = None,
+    ) -> dict:
+        """
+        Assemble the final context object from already-fetched rows.
+        Shared by the single-slug and bulk paths so both stay identical.
+        """
+        context = {
+            "menu": {
+                "menu_id": menu["menu_id"],
+                "slug": slug,
+                "name": menu["name"],
+                "category": menu["category"],
+                "price": menu["price"],
+                "is_available": menu["is_available"],
+            },
+            "ingredients": [],
+            "generated_at": datetime.utcnow().isoformat(),
+        }
 
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        for ingredient in ingredients:
+            context["ingredients"].append({
+                "ingredient_id": ingredient["ingredient_id"],
+                "name": ingredient["name"],
+                "category": ingredient["category"],
+                "received_date": ingredient["received_date"],
+                "expiry_date": ingredient["expiry_date"],
+                "freshness_score": ingredient["freshness_score"],
+                "risk_level": ingredient["risk_level"],
+                "latest_event": ingredient_events.get(
+                    ingredient["ingredient_id"]
+                ),
+                "latest_storage": (storage_readings or {}).get(
+                    ingredient["ingredient_id"]
+                ),
+                "storage_telemetry": (storage_telemetry or {}).get(
+                    ingredient["ingredient_id"]
+                ),
+            })
 
-        try:
-            # 1️⃣ Resolve slug → menu item
+        return context
+
+    @staticmethod
+    def get_menu_context(slug: str, tenant=None) -> dict:
+        contexts = MenuContextBuilder.get_menu_contexts([slug], tenant=tenant)
+
+        if slug not in contexts:
+            raise ValueError(f"Menu item not found for slug='{slug}'")
+
+        return contexts[slug]
+
+    @staticmethod
+    def tenant_scope(tenant) -> tuple:
+        """
+        (schema, restaurant_id filter) for an app.services.tenancy.Tenant,
+        or the shared public menu when tenant is None.
+        """
+        if tenant is None:
+            return SCHEMA, None
+        return tenant.schema, tenant.restaurant_id
+
+    @staticmethod
+    def reads_storage(schema: str) -> bool:
+        """
+        Latest sensor readings (storage_conditions_latest) are kept for
+        the shared schema only, once sensor ingestion is set up.
+        """
+        return schema == SCHEMA and sensor_ingestor.ready
+
+    @staticmethod
+    def telemetry_summaries(ingredients, schema: str) -> Dict[int, dict]:
+        """
+        Recent sensor telemetry per ingredient from the in-memory ring
+        buffers (no DB read), over the freshness engine's window.
+        """
+        if not (MenuContextBuilder.reads_storage(schema) and telemetry_buffer.ready):
+            return {}
+
+        summaries = {}
+        for ingredient in ingredients:
+            summary = telemetry_buffer.summary(
+                ingredient["ingredient_id"], ingredient["category"]
+            )
+            if summary is not None:
+                summaries[ingredient["ingredient_id"]] = summary
+
+        return summaries
+
+    @staticmethod
+    def get_menu_contexts(
+        slugs: Optional[List[str]] = None,
+        menu_ids: Optional[List[int]] = None,
+        tenant=None,
+    ) -> Dict[str, dict]:
+        """
+        Bulk variant of get_menu_context.
+
+        Builds contexts for the given slugs or menu_ids (or the whole
+        menu when neither is given) with a fixed number of set-based
+        queries, regardless of how many dishes or ingredients are
+        involved. `tenant` restricts it to one restaurant's menu.
+
+        Returns {slug: context}, ordered by category, name.
+        Unknown slugs / ids are simply absent from the result.
+        """
+        if (slugs is not None and not slugs) or (
+            menu_ids is not None and not menu_ids
+        ):
+            return {}
+
+        with db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                return MenuContextBuilder._fetch_contexts(
+                    cur, slugs, menu_ids, tenant=tenant
+                )
+
+    @staticmethod
+    def _fetch_contexts(
+        cur,
+        slugs: Optional[List[str]],
+        menu_ids: Optional[List[int]] = None,
+        tenant=None,
+    ) -> Dict[str, dict]:
+        """Run the set-based context queries on an open cursor."""
+        schema, restaurant_id = MenuContextBuilder.tenant_scope(tenant)
+
+        # 1️⃣ Resolve slugs / ids → menu items
+        conditions = []
+        params = []
+
+        if menu_ids is not None:
+            conditions.append("menu_id = ANY(%s)")
+            params.append(list(menu_ids))
+        elif slugs is not None:
+            conditions.append("slug = ANY(%s)")
+            params.append(list(slugs))
+
+        if restaurant_id is not None:
+            conditions.append("restaurant_id = %s")
+            params.append(restaurant_id)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        cur.execute(
+            f"""
+            SELECT
+                menu_id,
+                slug,
+                name,
+                category,
+                price,
+                is_available
+            FROM {schema}.menu_items
+            {where}
+            ORDER BY category, name
+            """,
+            tuple(params)
+        )
+        menus = cur.fetchall()
+
+        if not menus:
+            return {}
+
+        menu_ids = [menu["menu_id"] for menu in menus]
+
+        # 2️⃣ Fetch ingredients for all menu_ids in one go
+        cur.execute(
+            f"""
+            SELECT
+                mi.menu_id,
+                i.ingredient_id,
+                i.name,
+                i.category,
+                i.received_date,
+                i.expiry_date,
+                i.freshness_score,
+                i.risk_level
+            FROM {schema}.ingredients i
+            JOIN {schema}.menu_ingredients mi
+                ON i.ingredient_id = mi.ingredient_id
+            WHERE mi.menu_id = ANY(%s)
+            """,
+            (menu_ids,)
+        )
+
+        ingredients_by_menu: Dict[int, List[Dict]] = {}
+        ingredient_ids = set()
+        for row in cur.fetchall():
+            ingredients_by_menu.setdefault(row["menu_id"], []).append(row)
+            ingredient_ids.add(row["ingredient_id"])
+
+        # 3️⃣ Fetch latest event per ingredient (optional)
+        ingredient_events = {}
+
+        if ingredient_ids:
             cur.execute(
                 f"""
-                SELECT
-                    menu_id,
-                    name,
-                    category,
-                    price,
-                    is_available
-                FROM {SCHEMA}.menu_items
-                WHERE slug = %s
+                SELECT DISTINCT ON (ingredient_id)
+                    ingredient_id,
+                    event_type,
+                    event_value,
+                    created_at
+                FROM {schema}.ingredient_events
+                WHERE ingredient_id = ANY(%s)
+                ORDER BY ingredient_id, created_at DESC
                 """,
-                (slug,)
+                (list(ingredient_ids),)
             )
-            menu = cur.fetchone()
+            for row in cur.fetchall():
+                ingredient_id = row.pop("ingredient_id")
+                ingredient_events[ingredient_id] = row
 
-            if not menu:
-                raise ValueError(f"Menu item not found for slug='{slug}'")
+        # 3️⃣b Latest storage reading per ingredient (primary key lookups)
+        storage_readings = {}
 
-            menu_id = menu["menu_id"]
-
-            # 2️⃣ Fetch ingredients linked to menu_id
+        if ingredient_ids and MenuContextBuilder.reads_storage(schema):
             cur.execute(
                 f"""
                 SELECT
-                    i.ingredient_id,
-                    i.name,
-                    i.category,
-                    i.received_date,
-                    i.expiry_date,
-                    i.freshness_score,
-                    i.risk_level
-                FROM {SCHEMA}.ingredients i
-                JOIN {SCHEMA}.menu_ingredients mi
-                    ON i.ingredient_id = mi.ingredient_id
-                WHERE mi.menu_id = %s
+                    ingredient_id,
+                    storage_type,
+                    temperature,
+                    humidity,
+                    last_checked,
+                    deviation_flag
+                FROM {schema}.{LATEST_TABLE}
+                WHERE ingredient_id = ANY(%s)
                 """,
-                (menu_id,)
+                (list(ingredient_ids),)
             )
-            ingredients = cur.fetchall()
-
-            # 3️⃣ Fetch latest event per ingredient (optional)
-            ingredient_events = {}
-
-            for ingredient in ingredients:
-                cur.execute(
-                    f"""
-                    SELECT
-                        event_type,
-                        event_value,
-                        created_at
-                    FROM {SCHEMA}.ingredient_events
-                    WHERE ingredient_id = %s
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                    """,
-                    (ingredient["ingredient_id"],)
-                )
-                ingredient_events[ingredient["ingredient_id"]] = cur.fetchone()
-
-            # 4️⃣ Build final context object
-            context = {
-                "menu": {
-                    "menu_id": menu["menu_id"],
-                    "slug": slug,
-                    "name": menu["name"],
-                    "category": menu["category"],
-                    "price": menu["price"],
-                    "is_available": menu["is_available"],
-                },
-                "ingredients": [],
-                "generated_at": datetime.utcnow().isoformat(),
-            }
-
-            for ingredient in ingredients:
-                context["ingredients"].append({
-                    "ingredient_id": ingredient["ingredient_id"],
-                    "name": ingredient["name"],
-                    "category": ingredient["category"],
-                    "received_date": ingredient["received_date"],
-                    "expiry_date": ingredient["expiry_date"],
-                    "freshness_score": ingredient["freshness_score"],
-                    "risk_level": ingredient["risk_level"],
-                    "latest_event": ingredient_events.get(
-                        ingredient["ingredient_id"]
-                    ),
-                })
-
-            return context
-
-        finally:
-            cur.close()
-            conn.close()
+            for row in cur.fetchall():
+                ingredient_id = row.pop("ingredient_id")
+                storage_readings[ingredient_id] = row
+
+        # 3️⃣c Recent telemetry per ingredient (in memory)
+        storage_telemetry = MenuContextBuilder.telemetry_summaries(
+            [row for rows in ingredients_by_menu.values() for row in rows], schema
+        )
+
+        # 4️⃣ Build final context objects
+        contexts = {}
+        for menu in menus:
+            contexts[menu["slug"]] = MenuContextBuilder._build_context(
+                menu,
+                menu["slug"],
+                ingredients_by_menu.get(menu["menu_id"], []),
+                ingredient_events,
+                storage_readings,
+                storage_telemetry,
+            )
+
+        return contexts
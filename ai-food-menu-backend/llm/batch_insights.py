@@ -0,0 +1,180 @@
+import json
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from llm.llm_client import LLMClient
+from llm.prompt_builder import MenuPromptBuilder
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def parse_batch_response(text: str, dish_ids) -> Dict[str, str]:
+    """
+    Per-dish answers from a batch reply.
+
+    Accepts the JSON object bare or inside a ``` fence. Only dishes
+    that were asked for and got a non-empty string are returned;
+    anything else (bad JSON, missing or empty answers) is left out
+    for the caller to regenerate one by one.
+    """
+    text = _FENCE.sub("", text.strip())
+
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return {}
+
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+
+    if not isinstance(data, dict):
+        return {}
+
+    answers = {}
+    for dish_id in dish_ids:
+        answer = data.get(dish_id)
+        if isinstance(answer, str) and answer.strip():
+            answers[dish_id] = answer.strip()
+
+    return answers
+
+
+class BatchInsightGenerator:
+    """
+    Generates insights for several dishes per LLM call.
+
+    Dishes are packed `batch_size` at a time into
+    MenuPromptBuilder.build_batch_prompt (framing sent once per batch);
+    dishes whose answer fails validation fall back to a single-dish
+    build_prompt call.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 8,
+        endpoint: str = "insight_warmup",
+        route: str = "insight",
+    ):
+        self.batch_size = max(batch_size, 1)
+        # Prompt sizes are recorded as `endpoint` / `endpoint`_batch
+        self.endpoint = endpoint
+        # Model chain (llm_provider.route_models)
+        self.route = route
+
+        self._lock = threading.Lock()
+
+        # Stats
+        self._batches = 0
+        self._batched_dishes = 0
+        self._parse_failures = 0
+        self._fallback_dishes = 0
+        self._fallback_errors = 0
+        self._llm_calls = 0
+        self._answered = 0
+
+    def _call(self, prompt: str, acquire: Optional[Callable[[], bool]]):
+        """(text, llm_ms), or None if `acquire` refused the call."""
+        if acquire is not None and not acquire():
+            return None
+
+        started = time.perf_counter()
+        text = LLMClient.generate(prompt, route=self.route)
+
+        with self._lock:
+            self._llm_calls += 1
+
+        return text, (time.perf_counter() - started) * 1000
+
+    def _single(self, payload: Dict, acquire) -> Optional[Tuple[str, str, float]]:
+        prompt = MenuPromptBuilder.build_prompt(payload, endpoint=self.endpoint)
+        result = self._call(prompt, acquire)
+        if result is None:
+            return None
+        return result[0], prompt, result[1]
+
+    def generate(
+        self,
+        payloads: Dict[str, Dict],
+        acquire: Optional[Callable[[], bool]] = None,
+    ) -> Dict[str, Tuple[str, str, float]]:
+        """
+        {dish id: (text, prompt sent, llm_ms share)} for every dish that
+        got an answer. `acquire` is called before each LLM call (e.g. a
+        rate budget); when it returns False the remaining dishes are
+        skipped. Errors of a batch call propagate; errors of single-dish
+        fallbacks only drop that dish.
+        """
+        results: Dict[str, Tuple[str, str, float]] = {}
+        dish_ids = list(payloads)
+
+        for i in range(0, len(dish_ids), self.batch_size):
+            chunk = dish_ids[i:i + self.batch_size]
+
+            if len(chunk) == 1:
+                single = self._single(payloads[chunk[0]], acquire)
+                if single is None:
+                    return results
+                results[chunk[0]] = single
+                with self._lock:
+                    self._answered += 1
+                continue
+
+            prompt = MenuPromptBuilder.build_batch_prompt(
+                {dish_id: payloads[dish_id] for dish_id in chunk},
+                endpoint=f"{self.endpoint}_batch",
+            )
+            reply = self._call(prompt, acquire)
+            if reply is None:
+                return results
+
+            text, llm_ms = reply
+            answers = parse_batch_response(text, chunk)
+            missing = [dish_id for dish_id in chunk if dish_id not in answers]
+
+            with self._lock:
+                self._batches += 1
+                self._batched_dishes += len(answers)
+                self._answered += len(answers)
+                if missing:
+                    self._parse_failures += 1
+                    self._fallback_dishes += len(missing)
+
+            share = llm_ms / len(chunk)
+            for dish_id, answer in answers.items():
+                results[dish_id] = (answer, prompt, share)
+
+            for dish_id in missing:
+                try:
+                    single = self._single(payloads[dish_id], acquire)
+                except Exception as e:
+                    print("BATCH INSIGHT FALLBACK ERROR:", dish_id, e)
+                    with self._lock:
+                        self._fallback_errors += 1
+                    continue
+
+                if single is None:
+                    return results
+                results[dish_id] = single
+                with self._lock:
+                    self._answered += 1
+
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batch_size": self.batch_size,
+                "batches": self._batches,
+                "batched_dishes": self._batched_dishes,
+                "parse_failures": self._parse_failures,
+                "fallback_dishes": self._fallback_dishes,
+                "fallback_errors": self._fallback_errors,
+                "llm_calls": self._llm_calls,
+                "dishes_per_call": (
+                    round(self._answered / self._llm_calls, 3)
+                    if self._llm_calls else None
+                ),
+            }
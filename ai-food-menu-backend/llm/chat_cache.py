@@ -0,0 +1,328 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+import xxhash
+
+
+# -------------------------
+# Question vectors (char n-gram TF-IDF)
+# -------------------------
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation, collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def char_ngrams(text: str, n_min: int = 3, n_max: int = 5) -> Counter:
+    """
+    Character n-grams inside word boundaries (each word padded with
+    spaces), robust to typos, plurals and word order.
+    """
+    grams: Counter = Counter()
+
+    for word in normalize_question(text).split():
+        padded = f" {word} "
+        for n in range(n_min, n_max + 1):
+            for i in range(max(len(padded) - n + 1, 1)):
+                grams[padded[i:i + n]] += 1
+
+    return grams
+
+
+# Words that flip a question's meaning: a fuzzy match must agree on them
+NEGATIONS = frozenset({"not", "no", "never", "nor", "none", "nothing", "without"})
+
+# Function words ignored when comparing content words
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "it", "its", "this",
+    "that", "these", "those", "there", "do", "does", "did", "to", "of", "in",
+    "on", "for", "with", "any", "i", "me", "my", "you", "your", "we", "can",
+    "will", "would", "should", "could", "please", "as", "so", "very",
+})
+
+
+def _words(text: str) -> List[str]:
+    """Normalized words; "n't" contractions become the word plus "not"."""
+    text = re.sub(r"n['’]t\b", " not", text.lower())
+    return normalize_question(text).split()
+
+
+def negation_tokens(text: str) -> frozenset:
+    return frozenset(word for word in _words(text) if word in NEGATIONS)
+
+
+def content_words(text: str) -> frozenset:
+    """Words other than negations / stopwords, crude plural folding."""
+    words = set()
+    for word in _words(text):
+        if word in NEGATIONS or word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return frozenset(words)
+
+
+def content_overlap(a: frozenset, b: frozenset) -> float:
+    """Shared content words over the larger set (1.0 when both empty)."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / max(len(a), len(b))
+
+
+def context_version(prompt_without_question: str) -> str:
+    """Version of everything the chat prompt says about the dish."""
+    return xxhash.xxh64_hexdigest(prompt_without_question)
+
+
+class _Entry:
+    __slots__ = (
+        "question", "normalized", "grams", "negations", "content", "answer",
+        "llm_ms", "expires_at", "vector", "generation",
+    )
+
+    def __init__(self, question, grams, answer, llm_ms, expires_at):
+        self.question = question
+        self.normalized = normalize_question(question)
+        self.grams = grams
+        self.negations = negation_tokens(question)
+        self.content = content_words(question)
+        self.answer = answer
+        self.llm_ms = llm_ms
+        self.expires_at = expires_at
+        # TF-IDF vector, valid while the cache generation is unchanged
+        self.vector = None
+        self.generation = -1
+
+
+class ChatAnswerCache:
+    """
+    Offline semantic cache for dish chat answers.
+
+    Questions are compared with char n-gram TF-IDF vectors (IDF over
+    every cached question) and cosine similarity; the best match at or
+    above `threshold` is served, provided both questions carry the same
+    negations and share at least `min_content_overlap` of their content
+    words (n-grams alone score "is it safe" vs "is it not safe" ~0.9).
+    Entries are grouped per dish and tied
+    to the dish's context version: a new version discards the dish's
+    answers.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.75,
+        max_per_dish: int = 64,
+        max_dishes: int = 1024,
+        ttl_seconds: float = 6 * 3600,
+        min_content_overlap: float = 0.5,
+    ):
+        self.threshold = threshold
+        self.min_content_overlap = min_content_overlap
+        self.max_per_dish = max_per_dish
+        self.max_dishes = max_dishes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # slug -> (context version, [entries])
+        self._dishes: "OrderedDict[str, Tuple[str, List[_Entry]]]" = OrderedDict()
+        self._df: Counter = Counter()
+        self._docs = 0
+        # Bumped whenever document frequencies change
+        self._generation = 0
+
+        # Stats
+        self._exact_hits = 0
+        self._fuzzy_hits = 0
+        self._misses = 0
+        self._near_misses = 0
+        self._invalidations = 0
+        self._fuzzy_similarity_sum = 0.0
+        self._saved_llm_ms = 0.0
+        self._lookup_us: deque = deque(maxlen=1024)
+
+    # ---------- TF-IDF ----------
+
+    def _idf(self, gram: str) -> float:
+        return math.log((1 + self._docs) / (1 + self._df.get(gram, 0))) + 1.0
+
+    def _vector(self, grams: Counter) -> Dict[str, float]:
+        weights = {
+            gram: (1.0 + math.log(count)) * self._idf(gram)
+            for gram, count in grams.items()
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {gram: w / norm for gram, w in weights.items()}
+
+    @staticmethod
+    def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(w * b.get(gram, 0.0) for gram, w in a.items())
+
+    # ---------- bookkeeping ----------
+
+    def _entry_vector(self, entry: _Entry) -> Dict[str, float]:
+        if entry.generation != self._generation:
+            entry.vector = self._vector(entry.grams)
+            entry.generation = self._generation
+        return entry.vector
+
+    def _forget(self, entries: List[_Entry]):
+        for entry in entries:
+            for gram in entry.grams:
+                self._df[gram] -= 1
+                if self._df[gram] <= 0:
+                    del self._df[gram]
+            self._docs -= 1
+        self._generation += 1
+
+    def _dish(self, slug: str, version: str) -> List[_Entry]:
+        """Entries for the dish at `version` (older versions discarded)."""
+        cached = self._dishes.get(slug)
+
+        if cached is not None and cached[0] != version:
+            self._forget(cached[1])
+            self._invalidations += len(cached[1])
+            cached = None
+
+        if cached is None:
+            cached = (version, [])
+            self._dishes[slug] = cached
+
+            while len(self._dishes) > self.max_dishes:
+                _, (_, evicted) = self._dishes.popitem(last=False)
+                self._forget(evicted)
+
+        self._dishes.move_to_end(slug)
+        return cached[1]
+
+    # ---------- public API ----------
+
+    def lookup(self, slug: str, version: str, question: str) -> Optional[Tuple[str, float]]:
+        """
+        (answer, similarity) of the closest cached question for the
+        dish at this context version, or None.
+        """
+        started = time.perf_counter()
+
+        with self._lock:
+            entries = self._dish(slug, version)
+
+            now = time.monotonic()
+            expired = [entry for entry in entries if entry.expires_at < now]
+            if expired:
+                self._forget(expired)
+                entries[:] = [entry for entry in entries if entry.expires_at >= now]
+
+            best, best_score = None, 0.0
+            normalized = normalize_question(question)
+
+            for entry in entries:
+                if entry.normalized == normalized:
+                    best, best_score = entry, 1.0
+                    break
+
+            if best is None and entries:
+                query = self._vector(char_ngrams(question))
+                negations = negation_tokens(question)
+                content = content_words(question)
+
+                for entry in entries:
+                    if entry.negations != negations or content_overlap(
+                        entry.content, content
+                    ) < self.min_content_overlap:
+                        continue
+                    score = self._cosine(query, self._entry_vector(entry))
+                    if score > best_score:
+                        best, best_score = entry, score
+
+            if best is not None and best_score >= self.threshold:
+                if best_score >= 1.0 - 1e-9:
+                    self._exact_hits += 1
+                else:
+                    self._fuzzy_hits += 1
+                    self._fuzzy_similarity_sum += best_score
+                self._saved_llm_ms += best.llm_ms
+                result = (best.answer, best_score)
+            else:
+                self._misses += 1
+                if best_score >= self.threshold - 0.1:
+                    self._near_misses += 1
+                result = None
+
+            self._lookup_us.append((time.perf_counter() - started) * 1e6)
+
+        return result
+
+    def put(self, slug: str, version: str, question: str, answer: str, llm_ms: float = 0.0):
+        grams = char_ngrams(question)
+
+        with self._lock:
+            entries = self._dish(slug, version)
+
+            entries.append(
+                _Entry(question, grams, answer, llm_ms, time.monotonic() + self.ttl_seconds)
+            )
+            self._df.update(grams.keys())
+            self._docs += 1
+            self._generation += 1
+
+            if len(entries) > self.max_per_dish:
+                self._forget(entries[:1])
+                del entries[0]
+
+    def clear(self):
+        with self._lock:
+            self._dishes.clear()
+            self._df = Counter()
+            self._docs = 0
+            self._generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._exact_hits + self._fuzzy_hits
+            lookups = hits + self._misses
+            latencies = sorted(self._lookup_us)
+
+            return {
+                "threshold": self.threshold,
+                "min_content_overlap": self.min_content_overlap,
+                "dishes": len(self._dishes),
+                "entries": self._docs,
+                "exact_hits": self._exact_hits,
+                "fuzzy_hits": self._fuzzy_hits,
+                "misses": self._misses,
+                "near_misses": self._near_misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "avg_fuzzy_similarity": (
+                    round(self._fuzzy_similarity_sum / self._fuzzy_hits, 4)
+                    if self._fuzzy_hits else None
+                ),
+                "invalidations": self._invalidations,
+                "saved_llm_ms": round(self._saved_llm_ms, 3),
+                "lookup_us": {
+                    "avg": (
+                        round(sum(latencies) / len(latencies), 1)
+                        if latencies else None
+                    ),
+                    "p95": (
+                        round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1)
+                        if latencies else None
+                    ),
+                },
+            }
+
+
+chat_cache = ChatAnswerCache(
+    threshold=float(os.getenv("CHAT_CACHE_THRESHOLD", 0.75)),
+    max_per_dish=int(os.getenv("CHAT_CACHE_MAX_PER_DISH", 64)),
+    max_dishes=int(os.getenv("CHAT_CACHE_MAX_DISHES", 1024)),
+    ttl_seconds=float(os.getenv("CHAT_CACHE_TTL_SECONDS", 6 * 3600)),
+    min_content_overlap=float(os.getenv("CHAT_CACHE_MIN_CONTENT_OVERLAP", 0.5)),
+)
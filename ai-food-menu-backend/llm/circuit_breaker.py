@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from llm.llm_provider import route_models
+
+
+class CircuitOpenError(RuntimeError):
+    """Every model of the route is behind an open circuit breaker."""
+
+
+# -------------------------
+# Settings (LLM_BREAKER_* env vars)
+# -------------------------
+
+def breaker_enabled() -> bool:
+    return os.getenv("LLM_BREAKER_ENABLED", "1") == "1"
+
+
+def _breaker_settings() -> dict:
+    return {
+        "window": int(os.getenv("LLM_BREAKER_WINDOW", 20)),
+        "min_calls": int(os.getenv("LLM_BREAKER_MIN_CALLS", 5)),
+        "failure_rate": float(os.getenv("LLM_BREAKER_FAILURE_RATE", 0.5)),
+        "slow_ms": float(os.getenv("LLM_BREAKER_SLOW_MS", 10000)),
+        "open_seconds": float(os.getenv("LLM_BREAKER_OPEN_SECONDS", 30)),
+        "half_open_probes": int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", 1)),
+    }
+
+
+class CircuitBreaker:
+    """
+    Error-rate + latency circuit breaker for one model.
+
+    CLOSED: calls go through; the outcome of the last `window` calls is
+    kept, and once at least `min_calls` were seen with `failure_rate`
+    of them bad (errors, timeouts, or slower than `slow_ms`) it opens.
+    OPEN: calls are refused for `open_seconds`.
+    HALF_OPEN: up to `half_open_probes` calls are let through; when all
+    of them succeed the breaker closes, any bad probe reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_ms: float = 10000,
+        open_seconds: float = 30,
+        half_open_probes: int = 1,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_ms = slow_ms
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(half_open_probes, 1)
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        # True = bad outcome
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        # Stats
+        self._opens = 0
+        self._rejected = 0
+        self._slow_calls = 0
+
+    # ---------- state changes (lock held) ----------
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self._opens += 1
+        print(f"LLM CIRCUIT OPEN: {self.name}")
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._outcomes.clear()
+        print(f"LLM CIRCUIT CLOSED: {self.name}")
+
+    def _refresh(self):
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.open_seconds
+        ):
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+
+    def _record(self, bad: bool):
+        if self._state == self.HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            if bad:
+                self._open()
+                return
+
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._close()
+            return
+
+        if self._state == self.OPEN:
+            # Started before the breaker opened
+            return
+
+        self._outcomes.append(bad)
+        if (
+            len(self._outcomes) >= self.min_calls
+            and sum(self._outcomes) >= self.failure_rate * len(self._outcomes)
+        ):
+            self._open()
+
+    # ---------- public API ----------
+
+    def allow(self) -> bool:
+        """
+        May a call go out now? In HALF_OPEN this reserves a probe, so
+        every allowed call must end in record_success / record_failure
+        / record_cancelled.
+        """
+        with self._lock:
+            self._refresh()
+
+            if self._state == self.CLOSED:
+                return True
+
+            if (
+                self._state == self.HALF_OPEN
+                and self._probes_in_flight < self.half_open_probes
+            ):
+                self._probes_in_flight += 1
+                return True
+
+            self._rejected += 1
+            return False
+
+    def available(self) -> bool:
+        """allow() without reserving anything (CLOSED, or probes left)."""
+        with self._lock:
+            self._refresh()
+            return self._state == self.CLOSED or (
+                self._state == self.HALF_OPEN
+                and self._probes_in_flight < self.half_open_probes
+            )
+
+    def record_success(self, latency_ms: float):
+        with self._lock:
+            slow = latency_ms > self.slow_ms
+            if slow:
+                self._slow_calls += 1
+            self._record(slow)
+
+    def record_failure(self):
+        with self._lock:
+            self._record(True)
+
+    def record_cancelled(self):
+        """The caller gave up: no verdict, but a probe slot is freed."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            outcomes = len(self._outcomes)
+            return {
+                "state": self._state,
+                "recent_calls": outcomes,
+                "recent_failure_rate": (
+                    round(sum(self._outcomes) / outcomes, 4) if outcomes else None
+                ),
+                "opens": self._opens,
+                "rejected": self._rejected,
+                "slow_calls": self._slow_calls,
+                "open_for_seconds": (
+                    round(
+                        max(self.open_seconds - (time.monotonic() - self._opened_at), 0), 3
+                    )
+                    if self._state == self.OPEN else None
+                ),
+            }
+
+
+# -------------------------
+# One breaker per registered model
+# -------------------------
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker(model, **_breaker_settings())
+        return _breakers[model]
+
+
+def route_available(route: str) -> bool:
+    """False when every model of the route is behind an open breaker."""
+    if not breaker_enabled():
+        return True
+    return any(breaker_for(model).available() for model in route_models(route))
+
+
+def breaker_stats() -> dict:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+
+    return {
+        "enabled": breaker_enabled(),
+        "models": {model: breaker.stats() for model, breaker in breakers.items()},
+    }
@@ -0,0 +1,96 @@
+import threading
+from typing import Dict, List
+
+from llm.prompt_builder import rank_warnings
+
+# Served instead of LLM answers while every model of the route is
+# behind an open circuit breaker. Same payload in, same text out.
+
+STATUS_SENTENCES = {
+    "Fresh": "All of its ingredients are within their expected freshness range.",
+    "Caution": (
+        "Some ingredients are getting close to the end of their shelf life, "
+        "so it is best enjoyed today."
+    ),
+    "Unsafe": (
+        "Some ingredients did not pass today's freshness checks, "
+        "so we recommend choosing another dish."
+    ),
+}
+
+DEGRADED_NOTE = (
+    "(Our assistant is busy right now, so this is a standard summary "
+    "of today's freshness data.)"
+)
+DEGRADED_CHAT_INTRO = (
+    "Our assistant can't answer questions right now. "
+    "Here is what we know about this dish:"
+)
+
+# Ingredients mentioned with their most severe warning
+MAX_NOTED_INGREDIENTS = 3
+
+_served_lock = threading.Lock()
+_served: Dict[str, int] = {}
+
+
+def _ingredient_notes(ingredients: List[Dict]) -> List[str]:
+    flagged = [ing for ing in ingredients if ing.get("warnings")]
+    flagged.sort(key=lambda ing: ing.get("final_freshness", 100))
+
+    return [
+        f"{ing['name']}: {rank_warnings(ing['warnings'])[0].rstrip('.')}"
+        for ing in flagged[:MAX_NOTED_INGREDIENTS]
+    ]
+
+
+class DegradedAnswers:
+    """
+    Templated answers built from an insight payload
+    (MenuPromptBuilder.build_insight_payload over
+    FreshnessEngine.score_menu output), no LLM involved.
+    """
+
+    @staticmethod
+    def insight(payload: Dict) -> str:
+        menu = payload["menu"]
+        status = payload["overall_risk"]
+        sentences = []
+
+        # Safety first
+        if not menu.get("is_available", True):
+            sentences.append(f"{menu['name']} is currently unavailable.")
+
+        sentences.append(
+            f"{menu['name']} has an overall freshness score of "
+            f"{payload['overall_freshness']}/100 ({status})."
+        )
+
+        if status in STATUS_SENTENCES:
+            sentences.append(STATUS_SENTENCES[status])
+
+        notes = _ingredient_notes(payload.get("ingredients", []))
+        if notes:
+            sentences.append("Notes: " + "; ".join(notes) + ".")
+
+        sentences.append(DEGRADED_NOTE)
+        return " ".join(sentences)
+
+    @staticmethod
+    def chat(payload: Dict) -> str:
+        return f"{DEGRADED_CHAT_INTRO} {DegradedAnswers.insight(payload)}"
+
+    @staticmethod
+    def answer(route: str, payload: Dict) -> str:
+        """Degraded answer for an LLM route ("insight" / "chat"), counted."""
+        with _served_lock:
+            _served[route] = _served.get(route, 0) + 1
+
+        if route == "chat":
+            return DegradedAnswers.chat(payload)
+        return DegradedAnswers.insight(payload)
+
+    @staticmethod
+    def stats() -> dict:
+        with _served_lock:
+            return {"served": dict(_served)}
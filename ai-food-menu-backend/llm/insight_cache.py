@@ -0,0 +1,365 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+import xxhash
+
+from app.services.async_postgres import async_db_connection
+from rlhf.feedback_analyzer import FeedbackAnalyzer
+
+SCHEMA = "public"
+INSIGHT_CACHE_TABLE = "llm_insight_cache"
+
+# Bump when the insight prompt template changes meaningfully
+PROMPT_VERSION = 2
+
+
+# -------------------------
+# Keys
+# -------------------------
+
+def _normalize_text(value) -> str:
+    return " ".join(str(value).split())
+
+
+def normalize_insight_inputs(slug: str, payload: Dict) -> Dict:
+    """
+    Everything MenuPromptBuilder.build_prompt reads for an insight,
+    in a canonical form (whitespace collapsed, numbers rounded,
+    ingredients and warnings sorted).
+    """
+    menu = payload["menu"]
+
+    return {
+        "v": PROMPT_VERSION,
+        "slug": slug,
+        "menu": {
+            "name": _normalize_text(menu["name"]),
+            "category": _normalize_text(menu["category"]),
+            "price": str(menu["price"]),
+            "is_available": bool(menu["is_available"]),
+        },
+        "overall_freshness": round(float(payload["overall_freshness"]), 2),
+        "overall_risk": payload["overall_risk"],
+        "ingredients": sorted(
+            (
+                _normalize_text(ing["name"]),
+                round(float(ing.get("final_freshness", ing.get("freshness_score", 0))), 2),
+                ing["risk_level"],
+                sorted(set(ing.get("warnings", []))),
+            )
+            for ing in payload.get("ingredients", [])
+        ),
+        "style": FeedbackAnalyzer.get_prompt_modifiers(),
+    }
+
+
+def insight_cache_key(slug: str, payload: Dict) -> str:
+    normalized = normalize_insight_inputs(slug, payload)
+    return xxhash.xxh3_128_hexdigest(
+        json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    )
+
+
+def freshness_fingerprint(payload: Dict) -> str:
+    """
+    Status + warnings of a dish. When it changes, every cached
+    insight for the dish is dropped, whatever its TTL.
+    """
+    warnings = sorted({
+        warning
+        for ing in payload.get("ingredients", [])
+        for warning in ing.get("warnings", [])
+    })
+    return xxhash.xxh64_hexdigest(
+        json.dumps([payload["overall_risk"], warnings], ensure_ascii=False)
+    )
+
+
+# -------------------------
+# Cache
+# -------------------------
+
+class InsightCache:
+    """
+    Two-tier cache for generated insights.
+
+    - memory   : bounded LRU with a TTL (always on)
+    - postgres : optional shared tier (INSIGHT_CACHE_DB=1), longer TTL,
+                 survives restarts and is shared between workers
+
+    Entries are keyed by insight_cache_key(); each dish also tracks its
+    current freshness_fingerprint(), and a change drops all of that
+    dish's entries in both tiers.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 6 * 3600,
+        db_enabled: bool = False,
+        db_ttl_seconds: float = 24 * 3600,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_enabled = db_enabled
+        self.db_ttl_seconds = db_ttl_seconds
+
+        self._lock = threading.Lock()
+        # key -> (slug, fingerprint, text, llm_ms, expires_at monotonic)
+        self._entries: "OrderedDict[str, Tuple[str, str, str, float, float]]" = OrderedDict()
+        self._keys_by_slug: Dict[str, Set[str]] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._db_ready = False
+
+        # Stats
+        self._memory_hits = 0
+        self._db_hits = 0
+        self._misses = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._saved_llm_ms = 0.0
+        self._llm_calls = 0
+        self._llm_ms = 0.0
+
+    # ---------- memory tier ----------
+
+    def _drop(self, key: str):
+        slug = self._entries.pop(key)[0]
+        keys = self._keys_by_slug.get(slug)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_slug[slug]
+
+    def _check_fingerprint(self, slug: str, fingerprint: str) -> bool:
+        """
+        Record the dish's current fingerprint; True if it changed
+        (its memory entries are dropped).
+        """
+        previous = self._fingerprints.get(slug)
+        self._fingerprints[slug] = fingerprint
+
+        if previous is None or previous == fingerprint:
+            return False
+
+        for key in list(self._keys_by_slug.get(slug, ())):
+            self._drop(key)
+            self._invalidations += 1
+        return True
+
+    def get(self, slug: str, key: str, fingerprint: str) -> Optional[str]:
+        """Memory-tier lookup. Counts a miss when absent."""
+        with self._lock:
+            self._check_fingerprint(slug, fingerprint)
+
+            cached = self._entries.get(key)
+            if cached is not None and cached[4] < time.monotonic():
+                self._drop(key)
+                self._expirations += 1
+                cached = None
+
+            if cached is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._memory_hits += 1
+            self._saved_llm_ms += cached[3]
+            return cached[2]
+
+    def put(self, slug: str, key: str, fingerprint: str, text: str, llm_ms: float):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+            self._entries[key] = (
+                slug,
+                fingerprint,
+                text,
+                llm_ms,
+                time.monotonic() + self.ttl_seconds,
+            )
+            self._keys_by_slug.setdefault(slug, set()).add(key)
+            self._fingerprints[slug] = fingerprint
+
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def record_llm_call(self, llm_ms: float):
+        with self._lock:
+            self._llm_calls += 1
+            self._llm_ms += llm_ms
+
+    # ---------- both tiers ----------
+
+    async def lookup(self, slug: str, key: str, fingerprint: str) -> Optional[str]:
+        """
+        Memory first, then Postgres (promoting hits into memory).
+        """
+        with self._lock:
+            # Also true on first sight of a dish (e.g. after a restart)
+            changed = self._fingerprints.get(slug) != fingerprint
+
+        text = self.get(slug, key, fingerprint)
+        if text is not None or not self.db_enabled:
+            return text
+
+        try:
+            if changed:
+                await self._db_invalidate(slug, fingerprint)
+
+            row = await self._db_get(key, fingerprint)
+        except Exception as e:
+            print("INSIGHT CACHE DB ERROR:", e)
+            return None
+
+        if row is None:
+            return None
+
+        self.put(slug, key, fingerprint, row["response"], row["llm_ms"])
+        with self._lock:
+            # The memory miss above turned out to be a hit
+            self._misses -= 1
+            self._db_hits += 1
+            self._saved_llm_ms += row["llm_ms"]
+
+        return row["response"]
+
+    async def store(self, slug: str, key: str, fingerprint: str, text: str, llm_ms: float):
+        self.put(slug, key, fingerprint, text, llm_ms)
+
+        if not self.db_enabled:
+            return
+
+        try:
+            await self._db_put(slug, key, fingerprint, text, llm_ms)
+        except Exception as e:
+            print("INSIGHT CACHE DB ERROR:", e)
+
+    # ---------- postgres tier ----------
+
+    async def _ensure_table(self, conn):
+        if self._db_ready:
+            return
+
+        await conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA}.{INSIGHT_CACHE_TABLE} (
+                cache_key TEXT PRIMARY KEY,
+                slug TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                response TEXT NOT NULL,
+                llm_ms DOUBLE PRECISION NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                expires_at TIMESTAMP NOT NULL
+            )
+            """
+        )
+        await conn.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS {INSIGHT_CACHE_TABLE}_slug_idx
+            ON {SCHEMA}.{INSIGHT_CACHE_TABLE} (slug)
+            """
+        )
+        self._db_ready = True
+
+    async def _db_get(self, key: str, fingerprint: str):
+        async with async_db_connection() as conn:
+            await self._ensure_table(conn)
+            return await conn.fetchrow(
+                f"""
+                SELECT response, llm_ms
+                FROM {SCHEMA}.{INSIGHT_CACHE_TABLE}
+                WHERE cache_key = $1
+                  AND fingerprint = $2
+                  AND expires_at > $3
+                """,
+                key,
+                fingerprint,
+                datetime.utcnow(),
+            )
+
+    async def _db_put(self, slug: str, key: str, fingerprint: str, text: str, llm_ms: float):
+        now = datetime.utcnow()
+
+        async with async_db_connection() as conn:
+            await self._ensure_table(conn)
+            await conn.execute(
+                f"""
+                INSERT INTO {SCHEMA}.{INSIGHT_CACHE_TABLE} (
+                    cache_key,
+                    slug,
+                    fingerprint,
+                    response,
+                    llm_ms,
+                    created_at,
+                    expires_at
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    fingerprint = EXCLUDED.fingerprint,
+                    response = EXCLUDED.response,
+                    llm_ms = EXCLUDED.llm_ms,
+                    created_at = EXCLUDED.created_at,
+                    expires_at = EXCLUDED.expires_at
+                """,
+                key,
+                slug,
+                fingerprint,
+                text,
+                llm_ms,
+                now,
+                now + timedelta(seconds=self.db_ttl_seconds),
+            )
+
+    async def _db_invalidate(self, slug: str, fingerprint: str):
+        """Drop the dish's rows from older fingerprints and expired rows."""
+        async with async_db_connection() as conn:
+            await self._ensure_table(conn)
+            await conn.execute(
+                f"""
+                DELETE FROM {SCHEMA}.{INSIGHT_CACHE_TABLE}
+                WHERE slug = $1
+                  AND (fingerprint <> $2 OR expires_at <= $3)
+                """,
+                slug,
+                fingerprint,
+                datetime.utcnow(),
+            )
+
+    # ---------- stats ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._memory_hits + self._db_hits
+            lookups = hits + self._misses
+            avg_llm_ms = self._llm_ms / self._llm_calls if self._llm_calls else None
+
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "db_enabled": self.db_enabled,
+                "memory_hits": self._memory_hits,
+                "db_hits": self._db_hits,
+                "misses": self._misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "llm_calls": self._llm_calls,
+                "avg_llm_ms": round(avg_llm_ms, 3) if avg_llm_ms is not None else None,
+                "saved_llm_ms": round(self._saved_llm_ms, 3),
+            }
+
+
+insight_cache = InsightCache(
+    max_entries=int(os.getenv("INSIGHT_CACHE_MAX_ENTRIES", 1024)),
+    ttl_seconds=float(os.getenv("INSIGHT_CACHE_TTL_SECONDS", 6 * 3600)),
+    db_enabled=os.getenv("INSIGHT_CACHE_DB", "0") == "1",
+    db_ttl_seconds=float(os.getenv("INSIGHT_CACHE_DB_TTL_SECONDS", 24 * 3600)),
+)
@@ -1,23 +1,267 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Set, Tuple
+
 from langchain_core.messages import HumanMessage
-from llm.llm_provider import get_llm
+from llm.circuit_breaker import CircuitBreaker, CircuitOpenError, breaker_enabled, breaker_for
+from llm.llm_metrics import model_latency
+from llm.llm_provider import get_llm, hedge_enabled, model_specs, route_models
+from llm.single_flight import SingleFlight, prompt_key
+
+
+class LLMTimeoutError(TimeoutError):
+    """The call (queueing + attempts + backoff) ran past its deadline."""
+
+
+class LLMDisconnectedError(RuntimeError):
+    """The HTTP client went away; the in-flight call was cancelled."""
+
+
+class _SlotTimeoutError(LLMTimeoutError):
+    """Timed out queueing for a slot: local congestion, not the model's fault."""
+
+
+# -------------------------
+# Limits (LLM_* env vars, read per call)
+# -------------------------
+
+def _max_concurrency() -> int:
+    return int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+
+
+def _timeout_seconds() -> float:
+    return float(os.getenv("LLM_TIMEOUT_SECONDS", 20))
+
+
+def _stream_timeout_seconds() -> float:
+    return float(os.getenv("LLM_STREAM_TIMEOUT_SECONDS", 60))
+
+
+def _max_retries() -> int:
+    return int(os.getenv("LLM_MAX_RETRIES", 2))
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Full jitter: uniform(0, min(cap, base * 2^attempt))."""
+    base = float(os.getenv("LLM_RETRY_BASE_MS", 200)) / 1000
+    cap = float(os.getenv("LLM_RETRY_MAX_MS", 2000)) / 1000
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _hedge_delay_seconds(model: str) -> float:
+    """
+    How long a hedged call waits before also asking the backup model:
+    LLM_HEDGE_DELAY_MS if set, else the primary's recent p95 latency
+    (once LLM_HEDGE_MIN_SAMPLES calls were seen), else LLM_HEDGE_DEFAULT_MS.
+    """
+    fixed = os.getenv("LLM_HEDGE_DELAY_MS")
+    if fixed:
+        return float(fixed) / 1000
+
+    p95 = model_latency.total_percentile(
+        model, 0.95, int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+    )
+    if p95 is None:
+        return float(os.getenv("LLM_HEDGE_DEFAULT_MS", 1000)) / 1000
+    return p95 / 1000
+
+
+def _attempt_deadline(model: str, deadline: float, steps_left: int) -> float:
+    """
+    Deadline of one model attempt: the model's timeout_seconds if set,
+    else an even share of the time left for the remaining models, so a
+    hanging primary still leaves room for its fallbacks.
+    """
+    now = time.monotonic()
+    timeout = model_specs().get(model, {}).get("timeout_seconds")
+
+    if timeout is not None:
+        return min(deadline, now + float(timeout))
+    return now + max(deadline - now, 0) / max(steps_left, 1)
+
+
+def _expired(deadline: float) -> bool:
+    # Timers may fire a hair early
+    return time.monotonic() >= deadline - 0.005
+
+
+DISCONNECT_POLL_SECONDS = float(os.getenv("LLM_DISCONNECT_POLL_SECONDS", 0.25))
+
+
+# -------------------------
+# Concurrency slots + stats
+# -------------------------
+
+_stats_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "in_flight": 0,
+    "peak_in_flight": 0,
+    "waiting": 0,
+    "retries": 0,
+    "timeouts": 0,
+    "cancelled": 0,
+    "errors": 0,
+    "fallbacks": 0,
+    "hedges": 0,
+    "hedge_wins": 0,
+    "rejected": 0,
+}
+
+# Per registered model: attempts and how they ended
+_model_stats: Dict[str, Dict[str, int]] = {}
+
+# asyncio.Semaphore binds to one event loop; recreated if the loop changes
+_async_slots = None
+_sync_slots = None
+_sync_slots_lock = threading.Lock()
+
+
+def _count(name: str, delta: int = 1):
+    with _stats_lock:
+        _stats[name] += delta
+        if name == "in_flight":
+            _stats["peak_in_flight"] = max(_stats["peak_in_flight"], _stats["in_flight"])
+
+
+def _count_model(model: str, name: str):
+    with _stats_lock:
+        counters = _model_stats.setdefault(
+            model,
+            {"calls": 0, "errors": 0, "timeouts": 0, "cancelled": 0, "rejected": 0},
+        )
+        counters[name] += 1
+
+
+def _admit(model: str) -> Optional[CircuitBreaker]:
+    """
+    The model's breaker (None when breakers are disabled), or
+    CircuitOpenError if it refuses the call.
+    """
+    if not breaker_enabled():
+        return None
+
+    breaker = breaker_for(model)
+    if not breaker.allow():
+        _count_model(model, "rejected")
+        raise CircuitOpenError(f"Circuit open for {model}")
+    return breaker
+
+
+def _timeout_outcome(error: LLMTimeoutError) -> str:
+    return "cancelled" if isinstance(error, _SlotTimeoutError) else "failed"
+
+
+def _settle(breaker: Optional[CircuitBreaker], outcome: str, latency_ms: float = 0.0):
+    """Report an admitted call's outcome: "ok", "failed" or "cancelled"."""
+    if breaker is None:
+        return
+    if outcome == "ok":
+        breaker.record_success(latency_ms)
+    elif outcome == "failed":
+        breaker.record_failure()
+    else:
+        breaker.record_cancelled()
+
+
+def _async_semaphore() -> asyncio.Semaphore:
+    global _async_slots
+
+    loop = asyncio.get_running_loop()
+    if _async_slots is None or _async_slots[0] is not loop:
+        _async_slots = (loop, asyncio.Semaphore(_max_concurrency()))
+
+    return _async_slots[1]
+
+
+def _sync_semaphore() -> threading.BoundedSemaphore:
+    global _sync_slots
+
+    with _sync_slots_lock:
+        if _sync_slots is None:
+            _sync_slots = threading.BoundedSemaphore(_max_concurrency())
+        return _sync_slots
+
+
+def _remaining(deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise LLMTimeoutError("LLM deadline exceeded")
+    return remaining
+
+
+@asynccontextmanager
+async def _async_slot(deadline: float):
+    semaphore = _async_semaphore()
+
+    _count("waiting")
+    try:
+        await asyncio.wait_for(semaphore.acquire(), _remaining(deadline))
+    except (asyncio.TimeoutError, LLMTimeoutError):
+        raise _SlotTimeoutError("Timed out waiting for an LLM slot")
+    finally:
+        _count("waiting", -1)
+
+    _count("in_flight")
+    try:
+        yield
+    finally:
+        _count("in_flight", -1)
+        semaphore.release()
+
+
+@contextmanager
+def _sync_slot(deadline: float):
+    semaphore = _sync_semaphore()
+
+    _count("waiting")
+    try:
+        acquired = semaphore.acquire(timeout=_remaining(deadline))
+    except LLMTimeoutError:
+        acquired = False
+    finally:
+        _count("waiting", -1)
+
+    if not acquired:
+        raise _SlotTimeoutError("Timed out waiting for an LLM slot")
+
+    _count("in_flight")
+    try:
+        yield
+    finally:
+        _count("in_flight", -1)
+        semaphore.release()
 
 
 class LLMClient:
     """
     Stateless LLM client wrapper.
     Safe to call from anywhere in the backend.
-    """
 
-    @staticmethod
-    def generate(prompt: str) -> str:
-        llm = get_llm()
+    Every call shares one concurrency budget (LLM_MAX_CONCURRENCY),
+    gets a deadline (LLM_TIMEOUT_SECONDS, covering queueing, attempts
+    and backoff) and up to LLM_MAX_RETRIES retries with jittered
+    exponential backoff, so a slow provider cannot tie up every worker.
 
-        response = llm.invoke(
-            [HumanMessage(content=prompt)]
-        )
+    Calls are made for a `route` ("insight", "chat", ...), which maps
+    to a chain of registered models (llm_provider.route_models): on an
+    error or a per-model timeout the next model is tried, and a retry
+    goes through the chain again. On LLM_HEDGE_ROUTES, async calls
+    also ask the second model once the primary is slower than its p95
+    and keep whichever answers first. The *_with_model variants
+    return (text, model actually used).
 
-        content = response.content
+    Each model sits behind a circuit breaker (llm.circuit_breaker):
+    models with an open breaker are skipped, and when all of a route's
+    are open the call fails at once with CircuitOpenError.
+    """
 
+    @staticmethod
+    def _normalize_content(content, strip: bool = True) -> str:
         # 🔑 Gemini may return list OR string
         if isinstance(content, list):
             text_parts = []
@@ -27,7 +271,591 @@ class LLMClient:
                 elif hasattr(block, "text"):
                     text_parts.append(block.text)
 
-            return "\n".join(text_parts).strip()
+            text = "\n".join(text_parts)
+            return text.strip() if strip else text
 
         # fallback (string)
-        return str(content).strip()
+        text = str(content)
+        return text.strip() if strip else text
+
+    # -------------------------
+    # Blocking calls
+    # -------------------------
+
+    @staticmethod
+    def generate(
+        prompt: str,
+        timeout: Optional[float] = None,
+        flight: Optional[SingleFlight] = None,
+        route: str = "default",
+    ) -> str:
+        """Blocking call; see generate_with_model."""
+        return LLMClient.generate_with_model(prompt, route, timeout, flight)[0]
+
+    @staticmethod
+    def generate_with_model(
+        prompt: str,
+        route: str = "default",
+        timeout: Optional[float] = None,
+        flight: Optional[SingleFlight] = None,
+    ) -> Tuple[str, str]:
+        """
+        Blocking call. The deadline bounds queueing, fallbacks and
+        retries; the provider's own request timeout bounds a single
+        attempt. Blocking calls fall back but never hedge (a thread
+        cannot be cancelled).
+
+        With a `flight` group, concurrent calls for the same prompt
+        share one upstream call (and the first caller's deadline).
+        """
+        _count("calls")
+
+        if flight is None:
+            return LLMClient._route(prompt, route, timeout)
+
+        return flight.do(
+            prompt_key(prompt),
+            lambda: LLMClient._route(prompt, route, timeout),
+        )
+
+    @staticmethod
+    def _call_model(prompt: str, model: str, deadline: float) -> str:
+        breaker = _admit(model)
+        _count_model(model, "calls")
+        started = time.perf_counter()
+
+        try:
+            llm = get_llm(model)
+            with _sync_slot(deadline):
+                response = llm.invoke([HumanMessage(content=prompt)])
+        except LLMTimeoutError as e:
+            _count_model(model, "timeouts")
+            _settle(breaker, _timeout_outcome(e))
+            raise
+        except Exception:
+            _count_model(model, "errors")
+            _settle(breaker, "failed")
+            raise
+
+        elapsed = (time.perf_counter() - started) * 1000
+        model_latency.record(model, elapsed, elapsed)
+        _settle(breaker, "ok", elapsed)
+        return LLMClient._normalize_content(response.content)
+
+    @staticmethod
+    def _route(prompt: str, route: str, timeout: Optional[float]) -> Tuple[str, str]:
+        chain = route_models(route)
+        deadline = time.monotonic() + (timeout or _timeout_seconds())
+
+        attempt = 0
+        while True:
+            error = None
+            attempted = False
+
+            for index, model in enumerate(chain):
+                if error is not None:
+                    _count("fallbacks")
+                    if not isinstance(error, CircuitOpenError):
+                        print("LLM FALLBACK:", model, error)
+
+                try:
+                    text = LLMClient._call_model(
+                        prompt, model, _attempt_deadline(model, deadline, len(chain) - index)
+                    )
+                    return text, model
+
+                except CircuitOpenError as e:
+                    error = e
+                    continue
+
+                except LLMTimeoutError as e:
+                    if _expired(deadline):
+                        _count("timeouts")
+                        raise
+                    error = e
+
+                except Exception as e:
+                    error = e
+
+                attempted = True
+
+            if not attempted:
+                # Every breaker is open: fail fast, no backoff
+                _count("rejected")
+                raise error
+
+            # Every model failed: back off, then go through the chain again
+            attempt += 1
+            delay = _backoff_seconds(attempt)
+
+            if attempt > _max_retries() or time.monotonic() + delay >= deadline:
+                _count("timeouts" if isinstance(error, LLMTimeoutError) else "errors")
+                raise error
+
+            _count("retries")
+            print("LLM RETRY:", error)
+            time.sleep(delay)
+
+    # -------------------------
+    # Async calls
+    # -------------------------
+
+    @staticmethod
+    async def _acall_model(prompt: str, model: str, deadline: float) -> str:
+        breaker = _admit(model)
+        _count_model(model, "calls")
+        started = time.perf_counter()
+
+        try:
+            llm = get_llm(model)
+            async with _async_slot(deadline):
+                try:
+                    response = await asyncio.wait_for(
+                        llm.ainvoke([HumanMessage(content=prompt)]),
+                        _remaining(deadline),
+                    )
+                except asyncio.TimeoutError:
+                    raise LLMTimeoutError(f"LLM call to {model} timed out")
+        except LLMTimeoutError as e:
+            _count_model(model, "timeouts")
+            _settle(breaker, _timeout_outcome(e))
+            raise
+        except asyncio.CancelledError:
+            _count_model(model, "cancelled")
+            _settle(breaker, "cancelled")
+            raise
+        except Exception:
+            _count_model(model, "errors")
+            _settle(breaker, "failed")
+            raise
+
+        elapsed = (time.perf_counter() - started) * 1000
+        model_latency.record(model, elapsed, elapsed)
+        _settle(breaker, "ok", elapsed)
+        return LLMClient._normalize_content(response.content)
+
+    @staticmethod
+    async def _ahedged(
+        prompt: str,
+        primary: str,
+        backup: str,
+        deadline: float,
+        tried: Set[str],
+    ) -> Tuple[str, str]:
+        """
+        Primary first; if it has not answered after its hedge delay,
+        the backup too. The first success wins and the other call is
+        cancelled. Models that were asked are added to `tried`.
+        """
+        calls = {
+            asyncio.ensure_future(LLMClient._acall_model(prompt, primary, deadline)): primary
+        }
+        tried.add(primary)
+
+        try:
+            done, _ = await asyncio.wait(
+                calls, timeout=min(_hedge_delay_seconds(primary), _remaining(deadline))
+            )
+            if not done:
+                _count("hedges")
+                tried.add(backup)
+                calls[asyncio.ensure_future(
+                    LLMClient._acall_model(prompt, backup, deadline)
+                )] = backup
+
+            error = None
+            while calls:
+                done, _ = await asyncio.wait(calls, return_when=asyncio.FIRST_COMPLETED)
+
+                for call in done:
+                    model = calls.pop(call)
+                    if call.exception() is None:
+                        if model == backup:
+                            _count("hedge_wins")
+                        return call.result(), model
+                    error = call.exception()
+
+            raise error
+
+        finally:
+            for call in calls:
+                call.cancel()
+            if calls:
+                await asyncio.gather(*calls, return_exceptions=True)
+
+    @staticmethod
+    async def _aroute(prompt: str, route: str, deadline: float) -> Tuple[str, str]:
+        chain = route_models(route)
+        hedge = hedge_enabled(route) and len(chain) > 1
+
+        attempt = 0
+        while True:
+            error = None
+            attempted = False
+            tried: Set[str] = set()
+
+            for index, model in enumerate(chain):
+                if model in tried:
+                    continue
+
+                if error is not None:
+                    _count("fallbacks")
+                    if not isinstance(error, CircuitOpenError):
+                        print("LLM FALLBACK:", model, error)
+
+                try:
+                    if hedge and index == 0:
+                        # The hedged pair counts as one step of the chain
+                        return await LLMClient._ahedged(
+                            prompt,
+                            model,
+                            chain[1],
+                            _attempt_deadline(model, deadline, len(chain) - 1),
+                            tried,
+                        )
+
+                    tried.add(model)
+                    text = await LLMClient._acall_model(
+                        prompt, model, _attempt_deadline(model, deadline, len(chain) - index)
+                    )
+                    return text, model
+
+                except CircuitOpenError as e:
+                    error = e
+                    continue
+
+                except LLMTimeoutError as e:
+                    if _expired(deadline):
+                        _count("timeouts")
+                        raise
+                    error = e
+
+                except Exception as e:
+                    error = e
+
+                attempted = True
+
+            if not attempted:
+                # Every breaker is open: fail fast, no backoff
+                _count("rejected")
+                raise error
+
+            # Every model failed: back off, then go through the chain again
+            attempt += 1
+            delay = _backoff_seconds(attempt)
+
+            if attempt > _max_retries() or time.monotonic() + delay >= deadline:
+                _count("timeouts" if isinstance(error, LLMTimeoutError) else "errors")
+                raise error
+
+            _count("retries")
+            print("LLM RETRY:", error)
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def agenerate(
+        prompt: str,
+        timeout: Optional[float] = None,
+        disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        flight: Optional[SingleFlight] = None,
+        route: str = "default",
+    ) -> str:
+        """Non-blocking call; see agenerate_with_model."""
+        text, _ = await LLMClient.agenerate_with_model(
+            prompt, route, timeout, disconnected, flight
+        )
+        return text
+
+    @staticmethod
+    async def agenerate_with_model(
+        prompt: str,
+        route: str = "default",
+        timeout: Optional[float] = None,
+        disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        flight: Optional[SingleFlight] = None,
+    ) -> Tuple[str, str]:
+        """
+        Non-blocking variant for `async def` routes.
+
+        `disconnected` (e.g. request.is_disconnected) is polled while
+        the call runs; when it reports True the call is cancelled and
+        LLMDisconnectedError is raised. With a `flight` group, callers
+        with the same prompt share one upstream call, which is only
+        cancelled once all of them have gone away.
+        """
+        deadline = time.monotonic() + (timeout or _timeout_seconds())
+        _count("calls")
+
+        if flight is None:
+            call = asyncio.ensure_future(
+                LLMClient._aroute(prompt, route, deadline)
+            )
+        else:
+            call = asyncio.ensure_future(
+                flight.ado(
+                    prompt_key(prompt),
+                    lambda: LLMClient._aroute(prompt, route, deadline),
+                )
+            )
+
+        if disconnected is None:
+            return await call
+
+        try:
+            while True:
+                done, _ = await asyncio.wait({call}, timeout=DISCONNECT_POLL_SECONDS)
+                if done:
+                    return call.result()
+
+                if await disconnected():
+                    call.cancel()
+                    await asyncio.gather(call, return_exceptions=True)
+                    _count("cancelled")
+                    raise LLMDisconnectedError("Client disconnected")
+
+        except asyncio.CancelledError:
+            call.cancel()
+            _count("cancelled")
+            raise
+
+    # -------------------------
+    # Streams
+    # -------------------------
+
+    @staticmethod
+    def stream(
+        prompt: str,
+        route: str = "default",
+        used: Optional[dict] = None,
+    ) -> Iterator[str]:
+        """
+        Yields text chunks as the model produces them.
+
+        Each chunk gets the same list/string normalization as
+        generate(), minus stripping (whitespace between chunks matters).
+        Holds a concurrency slot for the whole stream. Models that fail
+        before their first chunk fall back to the next one of the
+        route; `used["model"]` is set to the model being streamed.
+        """
+        chain = route_models(route)
+        deadline = time.monotonic() + _timeout_seconds()
+        _count("calls")
+
+        error = None
+        attempted = False
+
+        for index, model in enumerate(chain):
+            if error is not None:
+                _count("fallbacks")
+                if not isinstance(error, CircuitOpenError):
+                    print("LLM FALLBACK:", model, error)
+
+            try:
+                breaker = _admit(model)
+            except CircuitOpenError as e:
+                error = e
+                continue
+
+            if used is not None:
+                used["model"] = model
+            _count_model(model, "calls")
+            attempted = True
+            started = time.perf_counter()
+            first_ms = None
+
+            try:
+                llm = get_llm(model)
+                with _sync_slot(_attempt_deadline(model, deadline, len(chain) - index)):
+                    chunks = llm.stream([HumanMessage(content=prompt)])
+
+                    # Closed on every exit (consumer gone, failure, fallback)
+                    try:
+                        for chunk in chunks:
+                            text = LLMClient._normalize_content(chunk.content, strip=False)
+                            if text:
+                                if first_ms is None:
+                                    first_ms = (time.perf_counter() - started) * 1000
+                                yield text
+                    finally:
+                        chunks.close()
+
+                _settle(breaker, "ok", first_ms or (time.perf_counter() - started) * 1000)
+                return
+
+            except GeneratorExit:
+                _settle(breaker, "cancelled")
+                raise
+
+            except LLMTimeoutError as e:
+                _count_model(model, "timeouts")
+                _settle(breaker, _timeout_outcome(e))
+                if first_ms is not None or _expired(deadline):
+                    _count("timeouts")
+                    raise
+                error = e
+
+            except Exception as e:
+                _count_model(model, "errors")
+                _settle(breaker, "failed")
+                if first_ms is not None:
+                    _count("errors")
+                    raise
+                error = e
+
+        if not attempted:
+            _count("rejected")
+        else:
+            _count("timeouts" if isinstance(error, LLMTimeoutError) else "errors")
+        raise error
+
+    @staticmethod
+    async def astream(
+        prompt: str,
+        route: str = "default",
+        used: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Non-blocking variant of stream() for `async def` routes.
+
+        The first chunk must arrive within LLM_TIMEOUT_SECONDS (failed
+        attempts before it fall back / are retried), the whole stream
+        within LLM_STREAM_TIMEOUT_SECONDS. Starlette cancels the
+        generator when the client disconnects, which releases the slot.
+        Streams are not hedged; the breaker judges them by their time
+        to first chunk.
+        """
+        chain = route_models(route)
+        started = time.monotonic()
+        first_deadline = started + _timeout_seconds()
+        stream_deadline = started + _stream_timeout_seconds()
+        _count("calls")
+
+        attempt = 0
+        while True:
+            error = None
+            attempted = False
+
+            for index, model in enumerate(chain):
+                if error is not None:
+                    _count("fallbacks")
+                    if not isinstance(error, CircuitOpenError):
+                        print("LLM FALLBACK:", model, error)
+
+                try:
+                    breaker = _admit(model)
+                except CircuitOpenError as e:
+                    error = e
+                    continue
+
+                if used is not None:
+                    used["model"] = model
+                _count_model(model, "calls")
+                attempted = True
+                attempt_deadline = _attempt_deadline(
+                    model, first_deadline, len(chain) - index
+                )
+                attempt_started = time.perf_counter()
+                first_ms = None
+
+                try:
+                    llm = get_llm(model)
+                    async with _async_slot(attempt_deadline):
+                        chunks = llm.astream([HumanMessage(content=prompt)]).__aiter__()
+
+                        # Closed on every exit (disconnect, timeout, fallback)
+                        try:
+                            while True:
+                                deadline = (
+                                    attempt_deadline if first_ms is None else stream_deadline
+                                )
+                                try:
+                                    chunk = await asyncio.wait_for(
+                                        chunks.__anext__(), _remaining(deadline)
+                                    )
+                                except StopAsyncIteration:
+                                    break
+                                except asyncio.TimeoutError:
+                                    raise LLMTimeoutError("LLM stream timed out")
+
+                                text = LLMClient._normalize_content(chunk.content, strip=False)
+                                if text:
+                                    if first_ms is None:
+                                        first_ms = (
+                                            time.perf_counter() - attempt_started
+                                        ) * 1000
+                                    yield text
+                        finally:
+                            await chunks.aclose()
+
+                    _settle(
+                        breaker,
+                        "ok",
+                        first_ms or (time.perf_counter() - attempt_started) * 1000,
+                    )
+                    return
+
+                except LLMTimeoutError as e:
+                    _count_model(model, "timeouts")
+                    _settle(breaker, _timeout_outcome(e))
+                    if first_ms is not None or _expired(first_deadline):
+                        _count("timeouts")
+                        raise
+                    error = e
+
+                except (asyncio.CancelledError, GeneratorExit):
+                    _count_model(model, "cancelled")
+                    _count("cancelled")
+                    _settle(breaker, "cancelled")
+                    raise
+
+                except Exception as e:
+                    _count_model(model, "errors")
+                    _settle(breaker, "failed")
+                    # Partial answers cannot be retried transparently
+                    if first_ms is not None:
+                        _count("errors")
+                        raise
+                    error = e
+
+            if not attempted:
+                # Every breaker is open: fail fast, no backoff
+                _count("rejected")
+                raise error
+
+            attempt += 1
+            delay = _backoff_seconds(attempt)
+
+            if attempt > _max_retries() or time.monotonic() + delay >= first_deadline:
+                _count("timeouts" if isinstance(error, LLMTimeoutError) else "errors")
+                raise error
+
+            _count("retries")
+            print("LLM RETRY:", error)
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def stats() -> dict:
+        routes = {}
+        for route in ("default", "insight", "chat"):
+            try:
+                routes[route] = {
+                    "models": route_models(route),
+                    "hedged": hedge_enabled(route),
+                }
+            except RuntimeError as e:
+                routes[route] = {"error": str(e)}
+
+        latency = model_latency.stats()
+
+        with _stats_lock:
+            return {
+                "max_concurrency": _max_concurrency(),
+                "timeout_seconds": _timeout_seconds(),
+                "max_retries": _max_retries(),
+                **_stats,
+                "routes": routes,
+                "models": {
+                    model: {**counters, "latency": latency.get(model)}
+                    for model, counters in _model_stats.items()
+                },
+            }
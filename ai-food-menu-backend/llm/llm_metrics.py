@@ -0,0 +1,126 @@
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class LLMLatencyTracker:
+    """
+    Recent LLM latencies per endpoint.
+
+    ttft_ms is the time to the first token: the user-visible latency
+    for streamed answers (for blocking calls it equals total_ms).
+    """
+
+    def __init__(self, window: int = 512):
+        self.window = window
+
+        self._lock = threading.Lock()
+        self._ttft: Dict[str, deque] = {}
+        self._total: Dict[str, deque] = {}
+        self._calls: Dict[str, int] = {}
+
+    def record(self, endpoint: str, ttft_ms: float, total_ms: float):
+        with self._lock:
+            self._ttft.setdefault(endpoint, deque(maxlen=self.window)).append(ttft_ms)
+            self._total.setdefault(endpoint, deque(maxlen=self.window)).append(total_ms)
+            self._calls[endpoint] = self._calls.get(endpoint, 0) + 1
+
+    def total_percentile(self, endpoint: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Recent total_ms percentile, or None with fewer than `min_samples`."""
+        with self._lock:
+            total = self._total.get(endpoint)
+            if not total or len(total) < min_samples:
+                return None
+            return _percentile(total, q)
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {}
+
+            for endpoint, ttft in self._ttft.items():
+                total = self._total[endpoint]
+                result[endpoint] = {
+                    "calls": self._calls[endpoint],
+                    "ttft_ms": {
+                        "p50": round(_percentile(ttft, 0.5), 3),
+                        "p95": round(_percentile(ttft, 0.95), 3),
+                    },
+                    "total_ms": {
+                        "p50": round(_percentile(total, 0.5), 3),
+                        "p95": round(_percentile(total, 0.95), 3),
+                    },
+                }
+
+            return result
+
+
+llm_latency = LLMLatencyTracker()
+
+# Per registered model (successful attempts only); drives hedge delays
+model_latency = LLMLatencyTracker()
+
+
+class PromptSizeTracker:
+    """
+    Prompt sizes per endpoint, to track input tokens
+    (estimated at ~4 characters per token).
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, window: int = 512):
+        self.window = window
+
+        self._lock = threading.Lock()
+        self._chars: Dict[str, deque] = {}
+        self._prompts: Dict[str, int] = {}
+        self._total_chars: Dict[str, int] = {}
+        self._truncated: Dict[str, int] = {}
+        self._dropped_warnings: Dict[str, int] = {}
+
+    def record(
+        self,
+        endpoint: str,
+        chars: int,
+        omitted_ingredients: int = 0,
+        dropped_warnings: int = 0,
+    ):
+        with self._lock:
+            self._chars.setdefault(endpoint, deque(maxlen=self.window)).append(chars)
+            self._prompts[endpoint] = self._prompts.get(endpoint, 0) + 1
+            self._total_chars[endpoint] = self._total_chars.get(endpoint, 0) + chars
+            if omitted_ingredients:
+                self._truncated[endpoint] = self._truncated.get(endpoint, 0) + 1
+            self._dropped_warnings[endpoint] = (
+                self._dropped_warnings.get(endpoint, 0) + dropped_warnings
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {}
+
+            for endpoint, chars in self._chars.items():
+                prompts = self._prompts[endpoint]
+                total = self._total_chars[endpoint]
+                result[endpoint] = {
+                    "prompts": prompts,
+                    "avg_chars": round(total / prompts, 1),
+                    "p95_chars": _percentile(chars, 0.95),
+                    "max_chars": max(chars),
+                    "avg_input_tokens": round(total / prompts / self.CHARS_PER_TOKEN, 1),
+                    "total_input_tokens": total // self.CHARS_PER_TOKEN,
+                    "truncated_prompts": self._truncated.get(endpoint, 0),
+                    "dropped_warnings": self._dropped_warnings[endpoint],
+                }
+
+            return result
+
+
+prompt_sizes = PromptSizeTracker()
@@ -1,35 +1,154 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
-import asyncio
+import json
 import os
+import threading
+from functools import lru_cache
+from typing import Dict, List
 
-_llm = None
+from llm.local_provider import build_local_llm
 
+# name -> chat model instance (built on first use)
+_clients: Dict[str, object] = {}
+_clients_lock = threading.Lock()
 
-def ensure_event_loop():
-    try:
-        asyncio.get_running_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
 
+# -------------------------
+# Model registry
+# -------------------------
 
-def get_llm():
-    global _llm
+# Always available; LLM_MODELS entries are added on top (same name wins).
+# Gemini entries: model, temperature, timeout_seconds.
+# Local entries: any LocalLLM argument (latency_ms, error_rate, ...),
+# unset ones come from the LOCAL_LLM_* env vars.
+# timeout_seconds (any provider) caps one attempt before falling back.
+DEFAULT_MODELS = {
+    "gemini-flash": {"provider": "gemini", "model": "models/gemini-flash-latest"},
+    "gemini-flash-lite": {"provider": "gemini", "model": "models/gemini-flash-lite-latest"},
+    "gemini-pro": {"provider": "gemini", "model": "models/gemini-pro-latest"},
+    "local": {"provider": "local"},
+}
 
-    if _llm is None:
-        ensure_event_loop()
-        
-        # 🔑 Get key INSIDE function to ensure we catch the .env load result
-        api_key = os.getenv("GEMINI_API_KEY")
-        print(f"DEBUG LLM: Using key starting with {api_key[:8] if api_key else 'NONE'}")
 
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY is not set in environment variables.")
+def llm_provider_name() -> str:
+    """LLM_PROVIDER: "gemini" (default) or "local" (offline stub)."""
+    return os.getenv("LLM_PROVIDER", "gemini").lower()
 
-        _llm = ChatGoogleGenerativeAI(
-            model="models/gemini-flash-latest",
-            google_api_key=api_key,
-            temperature=0.2,
-        )
 
-    return _llm
+@lru_cache(maxsize=8)
+def _parse_models(raw: str) -> Dict[str, dict]:
+    models = {name: dict(spec) for name, spec in DEFAULT_MODELS.items()}
+
+    if raw:
+        for name, spec in json.loads(raw).items():
+            models[name] = {"provider": "gemini", **spec}
+
+    return models
+
+
+def model_specs() -> Dict[str, dict]:
+    """
+    Registered models by name.
+
+    LLM_MODELS (JSON) adds or overrides entries, e.g.
+    {"fast": {"provider": "local", "latency_ms": 80},
+     "pro": {"provider": "gemini", "model": "models/gemini-pro-latest"}}
+    """
+    return _parse_models(os.getenv("LLM_MODELS", ""))
+
+
+@lru_cache(maxsize=8)
+def _parse_routes(raw: str) -> Dict[str, List[str]]:
+    if not raw:
+        return {}
+
+    routes = {}
+    for route, chain in json.loads(raw).items():
+        if isinstance(chain, str):
+            chain = chain.split(",")
+        routes[route] = [name.strip() for name in chain if name.strip()]
+
+    return routes
+
+
+def route_models(route: str = "default") -> List[str]:
+    """
+    Models to try for a route, primary first, then fallbacks.
+
+    LLM_ROUTES (JSON) maps routes to model names, e.g.
+    {"insight": ["gemini-flash-lite", "gemini-flash"],
+     "chat": ["gemini-pro", "gemini-flash"]}
+    Routes without an entry use "default", which falls back to the
+    single LLM_PROVIDER model ("gemini-flash" or "local").
+    """
+    routes = _parse_routes(os.getenv("LLM_ROUTES", ""))
+    specs = model_specs()
+
+    chain = routes.get(route) or routes.get("default")
+    if not chain:
+        chain = ["local" if llm_provider_name() == "local" else "gemini-flash"]
+
+    known = [name for name in chain if name in specs]
+    if len(known) < len(chain):
+        print("LLM ROUTE WARNING: unknown models ignored:", route, set(chain) - set(known))
+
+    if not known:
+        raise RuntimeError(f"No LLM models configured for route '{route}'")
+
+    return known
+
+
+def hedge_enabled(route: str) -> bool:
+    """LLM_HEDGE_ROUTES: comma-separated routes that send hedged requests."""
+    routes = os.getenv("LLM_HEDGE_ROUTES", "")
+    return route in {name.strip() for name in routes.split(",") if name.strip()}
+
+
+# -------------------------
+# Clients
+# -------------------------
+
+def _build_gemini(spec: dict):
+    # 🔑 Get key INSIDE function to ensure we catch the .env load result
+    api_key = os.getenv("GEMINI_API_KEY")
+    print(f"DEBUG LLM: Using key starting with {api_key[:8] if api_key else 'NONE'}")
+
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY is not set in environment variables.")
+
+    # Retries and deadlines are owned by LLMClient, so the SDK's
+    # own retry loop is disabled
+    return ChatGoogleGenerativeAI(
+        model=spec.get("model", "models/gemini-flash-latest"),
+        google_api_key=api_key,
+        temperature=spec.get("temperature", 0.2),
+        max_retries=0,
+        timeout=float(
+            spec.get("timeout_seconds", os.getenv("LLM_TIMEOUT_SECONDS", 20))
+        ),
+    )
+
+
+def get_llm(name: str = None):
+    """
+    Chat model registered as `name` (default: the primary model of
+    the "default" route). Instances are built once and shared.
+    """
+    if name is None:
+        name = route_models("default")[0]
+
+    with _clients_lock:
+        if name not in _clients:
+            spec = model_specs().get(name)
+            if spec is None:
+                raise RuntimeError(f"Unknown LLM model '{name}'")
+
+            if spec["provider"] == "local":
+                options = {
+                    key: value for key, value in spec.items()
+                    if key not in ("provider", "timeout_seconds")
+                }
+                _clients[name] = build_local_llm(**options)
+            else:
+                _clients[name] = _build_gemini(spec)
+
+        return _clients[name]
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import AsyncIterator, Iterator, List
+
+import xxhash
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+from llm.prompt_builder import BATCH_END_TAG, BATCH_TAG_PREFIX
+
+# Canned sentences; the prompt hash picks which ones are used
+_SENTENCES = [
+    "This dish is prepared with ingredients checked against today's freshness data.",
+    "Storage conditions for its ingredients are within the expected range.",
+    "Some ingredients are close to the end of their shelf life, so enjoy it soon.",
+    "The kitchen rotates stock daily to keep quality consistent.",
+    "Freshness scores combine shelf life, storage and recent sensor events.",
+    "Ask staff if you need details about allergens or preparation.",
+]
+
+
+class LocalLLM:
+    """
+    Deterministic offline stand-in for ChatGoogleGenerativeAI.
+
+    The same prompt always produces the same answer. Latency is
+    simulated (LOCAL_LLM_LATENCY_MS before the first token,
+    LOCAL_LLM_TOKEN_MS per streamed word, ± LOCAL_LLM_JITTER_MS), and
+    LOCAL_LLM_ERROR_RATE injects transient failures, so the whole
+    stack can be load-tested without a Gemini key. Batch prompts get
+    a JSON reply; LOCAL_LLM_MALFORMED_RATE drops dishes from it.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        token_ms: float = 15.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        malformed_rate: float = 0.0,
+    ):
+        self.latency_ms = latency_ms
+        self.token_ms = token_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        # Share of batch dishes left out of the JSON reply
+        self.malformed_rate = malformed_rate
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    # ---------- behaviour ----------
+
+    @staticmethod
+    def _prompt_text(messages: List[BaseMessage]) -> str:
+        return "\n".join(str(message.content) for message in messages)
+
+    def answer(self, prompt: str) -> str:
+        if BATCH_TAG_PREFIX in prompt:
+            return self._batch_answer(prompt)
+
+        digest = xxhash.xxh64_intdigest(prompt)
+        picks = [
+            _SENTENCES[(digest >> shift) % len(_SENTENCES)]
+            for shift in (0, 16, 32)
+        ]
+        # Keep order, drop repeats
+        return " ".join(dict.fromkeys(picks))
+
+    def _batch_answer(self, prompt: str) -> str:
+        """JSON {dish id: answer}, as build_batch_prompt asks for."""
+        body = prompt.split(BATCH_END_TAG, 1)[0]
+        sections = re.split(
+            r"^" + re.escape(BATCH_TAG_PREFIX) + r"(.+?)\]$", body, flags=re.M
+        )
+
+        answers = {}
+        for dish_id, section in zip(sections[1::2], sections[2::2]):
+            with self._lock:
+                dropped = self._random.random() < self.malformed_rate
+            if not dropped:
+                answers[dish_id] = self.answer(section)
+
+        return json.dumps(answers, ensure_ascii=False)
+
+    def _first_token_delay(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+
+        if failed:
+            raise RuntimeError("Local LLM injected failure")
+
+        return max(self.latency_ms + jitter, 0.0) / 1000
+
+    def _words(self, text: str) -> List[str]:
+        words = text.split(" ")
+        return [words[0]] + [f" {word}" for word in words[1:]]
+
+    # ---------- LangChain chat model surface ----------
+
+    def invoke(self, messages: List[BaseMessage], **kwargs) -> AIMessage:
+        text = self.answer(self._prompt_text(messages))
+        time.sleep(
+            self._first_token_delay() + self.token_ms * len(text.split()) / 1000
+        )
+        return AIMessage(content=text)
+
+    async def ainvoke(self, messages: List[BaseMessage], **kwargs) -> AIMessage:
+        text = self.answer(self._prompt_text(messages))
+        await asyncio.sleep(
+            self._first_token_delay() + self.token_ms * len(text.split()) / 1000
+        )
+        return AIMessage(content=text)
+
+    def stream(self, messages: List[BaseMessage], **kwargs) -> Iterator[AIMessageChunk]:
+        text = self.answer(self._prompt_text(messages))
+        time.sleep(self._first_token_delay())
+
+        for word in self._words(text):
+            yield AIMessageChunk(content=word)
+            time.sleep(self.token_ms / 1000)
+
+    async def astream(
+        self, messages: List[BaseMessage], **kwargs
+    ) -> AsyncIterator[AIMessageChunk]:
+        text = self.answer(self._prompt_text(messages))
+        await asyncio.sleep(self._first_token_delay())
+
+        for word in self._words(text):
+            yield AIMessageChunk(content=word)
+            await asyncio.sleep(self.token_ms / 1000)
+
+
+def build_local_llm(**overrides) -> LocalLLM:
+    """
+    LocalLLM configured from LOCAL_LLM_* env vars; `overrides` (e.g. a
+    model registry entry) take precedence.
+    """
+    options = {
+        "latency_ms": float(os.getenv("LOCAL_LLM_LATENCY_MS", 300)),
+        "token_ms": float(os.getenv("LOCAL_LLM_TOKEN_MS", 15)),
+        "jitter_ms": float(os.getenv("LOCAL_LLM_JITTER_MS", 0)),
+        "error_rate": float(os.getenv("LOCAL_LLM_ERROR_RATE", 0)),
+        "seed": int(os.getenv("LOCAL_LLM_SEED", 0)),
+        "malformed_rate": float(os.getenv("LOCAL_LLM_MALFORMED_RATE", 0)),
+    }
+    options.update(overrides)
+    return LocalLLM(**options)
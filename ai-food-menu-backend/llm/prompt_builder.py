@@ -1,6 +1,133 @@
-from typing import Dict
+import os
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from llm.llm_metrics import prompt_sizes
 from rlhf.feedback_analyzer import FeedbackAnalyzer
 
+# Dish markers of batch prompts
+BATCH_TAG_PREFIX = "[DISH "
+BATCH_END_TAG = "[END DISHES]"
+
+
+# -------------------------
+# Static segments (built once)
+# -------------------------
+
+SYSTEM_FRAMING = (
+    "You are a food safety assistant for a restaurant menu.\n"
+    "Explain information clearly, calmly, and honestly.\n"
+    "Do NOT exaggerate or give medical advice.\n"
+)
+SIMPLE_TONE = (
+    "Use simple, non-technical language that customers can easily understand."
+)
+SAFETY_FIRST = "If food is unsafe or unavailable, clearly state this first."
+
+INSIGHT_INSTRUCTION = (
+    "\nExplain the above information in a friendly, customer-facing way. "
+    "Keep it short, transparent, and confidence-building."
+)
+CHAT_INSTRUCTION = (
+    "\nAnswer the customer's question clearly and confidently, "
+    "using the information above. Be concise and reassuring."
+)
+BATCH_INTRO = (
+    "Below are several menu items. Each one starts with a [DISH <id>] tag."
+)
+BATCH_INSTRUCTIONS = (
+    "\nFor EACH dish, explain its information in a friendly, "
+    "customer-facing way. Keep each explanation short, transparent, "
+    "and confidence-building.\n"
+    "Reply with ONLY a JSON object mapping every dish id to its "
+    "explanation, e.g. {\"<id>\": \"...\"}. No other text."
+)
+
+
+@lru_cache(maxsize=8)
+def _framing_block(simple_tone: bool, safety_emphasis: bool) -> str:
+    """System framing + tone modifiers, one string per style combination."""
+    lines = [SYSTEM_FRAMING]
+
+    if simple_tone:
+        lines.append(SIMPLE_TONE)
+
+    if safety_emphasis:
+        lines.append(SAFETY_FIRST)
+
+    lines.append("")
+    return "\n".join(lines)
+
+
+# -------------------------
+# Budget + warnings
+# -------------------------
+
+def prompt_max_chars() -> int:
+    """Character budget of a single-dish prompt (~4 characters per token)."""
+    return int(os.getenv("PROMPT_MAX_CHARS", 3000))
+
+
+def prompt_dish_max_chars() -> int:
+    """Character budget of one dish inside a batch prompt."""
+    return int(os.getenv("PROMPT_DISH_MAX_CHARS", 1200))
+
+
+def prompt_max_warnings() -> int:
+    """Warnings kept per ingredient (most severe first)."""
+    return int(os.getenv("PROMPT_MAX_WARNINGS_PER_INGREDIENT", 3))
+
+
+OMITTED_LINE = "- (+{count} more ingredient(s), all fresher than those above)"
+
+# Ingredient lines always get at least this much room
+MIN_INGREDIENT_CHARS = 200
+
+# Substring -> severity (lower = more severe); unknown warnings rank last
+WARNING_SEVERITY = (
+    ("expired", 0),
+    ("unsafe", 1),
+    ("temperature", 1),
+    ("near expiry", 2),
+)
+
+
+def _warning_rank(warning: str) -> int:
+    text = warning.lower()
+    for marker, rank in WARNING_SEVERITY:
+        if marker in text:
+            return rank
+    return len(WARNING_SEVERITY)
+
+
+def rank_warnings(warnings) -> List[str]:
+    """
+    Distinct warnings (case / whitespace-insensitive), most severe
+    first; ties keep their original order.
+    """
+    seen = set()
+    distinct = []
+
+    for warning in warnings:
+        key = " ".join(str(warning).lower().split())
+        if key and key not in seen:
+            seen.add(key)
+            distinct.append(warning)
+
+    return sorted(distinct, key=_warning_rank)
+
+
+def _ingredient_freshness(ing: Dict) -> float:
+    score = ing.get("final_freshness", ing.get("freshness_score"))
+    try:
+        return float(score)
+    except (TypeError, ValueError):
+        return 100.0
+
+
+def _lines_size(lines: List[str]) -> int:
+    return sum(len(line) + 1 for line in lines)
+
 
 class MenuPromptBuilder:
     """
@@ -9,72 +136,156 @@ class MenuPromptBuilder:
     2) Menu Chat (RAG-based Q&A)
 
     Backward-compatible with insight.py
+
+    Prompts are kept within a character budget: ingredients are listed
+    weakest (lowest freshness) first, each with its distinct warnings
+    ranked by severity, and the freshest ingredients are summarised
+    once the budget runs out. Pass `endpoint` to record the prompt's
+    size in llm_metrics.prompt_sizes.
     """
 
     @staticmethod
-    def build_prompt(payload: Dict) -> str:
+    def build_insight_payload(context: Dict, report: Dict) -> Dict:
+        """
+        Insight payload from a dish context and its
+        FreshnessEngine.score_menu report.
+        """
+        risk_by_id = {
+            ing["ingredient_id"]: ing["risk_level"] for ing in context["ingredients"]
+        }
+
+        return {
+            "menu": context["menu"],
+            "overall_freshness": report["menu_freshness"],
+            "overall_risk": report["status"],
+            "ingredients": [
+                {
+                    "name": ing["name"],
+                    "final_freshness": ing["final_freshness"],
+                    "risk_level": risk_by_id.get(ing["ingredient_id"], "Low"),
+                    "warnings": ing["warnings"],
+                }
+                for ing in report["ingredients"]
+            ],
+        }
+
+    @staticmethod
+    def _framing() -> str:
         # 🔹 RLHF tone modifiers (safe default)
         style = FeedbackAnalyzer.get_prompt_modifiers()
 
-        lines = []
+        return _framing_block(
+            style.get("tone") == "simple",
+            bool(style.get("safety_emphasis", False)),
+        )
+
+    @staticmethod
+    def _menu_lines(menu: Dict) -> List[str]:
+        return [
+            f"Menu Item: {menu['name']}",
+            f"Category: {menu['category']}",
+            f"Price: ₹{menu['price']}",
+            f"Availability: {'Available' if menu['is_available'] else 'Unavailable'}",
+        ]
+
+    @staticmethod
+    def _ingredient_lines(
+        ingredients: List[Dict],
+        budget: int,
+        describe: Callable[[Dict], str],
+        with_warnings: bool,
+    ) -> Tuple[List[str], int, int]:
+        """
+        (lines, ingredients left out, warnings left out) for the
+        ingredients, weakest first, within `budget` characters.
+        """
+        ordered = sorted(ingredients, key=_ingredient_freshness)
+        max_warnings = prompt_max_warnings()
+
+        # Keep room for the "+N more" line
+        budget -= len(OMITTED_LINE.format(count=len(ordered))) + 1
 
-        # 🔹 System framing
+        lines: List[str] = []
+        used = 0
+        dropped_warnings = 0
+
+        for index, ing in enumerate(ordered):
+            line = describe(ing)
+
+            if lines and used + len(line) + 1 > budget:
+                omitted = len(ordered) - index
+                lines.append(OMITTED_LINE.format(count=omitted))
+                for rest in ordered[index:]:
+                    dropped_warnings += len(rest.get("warnings", []))
+                return lines, omitted, dropped_warnings
+
+            lines.append(line)
+            used += len(line) + 1
+
+            if not with_warnings:
+                continue
+
+            warnings = ing.get("warnings", [])
+            ranked = rank_warnings(warnings)
+            dropped_warnings += len(warnings) - len(ranked)
+
+            for position, warning in enumerate(ranked):
+                warning_line = f"  ⚠ {warning}"
+                if position >= max_warnings or used + len(warning_line) + 1 > budget:
+                    dropped_warnings += len(ranked) - position
+                    break
+
+                lines.append(warning_line)
+                used += len(warning_line) + 1
+
+        return lines, 0, dropped_warnings
+
+    @staticmethod
+    def _insight_detail_lines(payload: Dict, budget: int) -> Tuple[List[str], int, int]:
+        """Dish facts of an insight payload within `budget` characters."""
+        lines = MenuPromptBuilder._menu_lines(payload["menu"])
+
+        lines.append("")
+        lines.append(
+            f"Overall Freshness Score: {payload['overall_freshness']}/100"
+        )
         lines.append(
-            "You are a food safety assistant for a restaurant menu.\n"
-            "Explain information clearly, calmly, and honestly.\n"
-            "Do NOT exaggerate or give medical advice.\n"
+            f"Overall Risk Level: {payload['overall_risk']}"
         )
 
-        if style.get("tone") == "simple":
-            lines.append(
-                "Use simple, non-technical language that customers can easily understand."
-            )
+        lines.append("\nIngredient Details:")
 
-        if style.get("safety_emphasis", False):
-            lines.append(
-                "If food is unsafe or unavailable, clearly state this first."
-            )
+        ingredient_lines, omitted, dropped = MenuPromptBuilder._ingredient_lines(
+            payload.get("ingredients", []),
+            max(budget - _lines_size(lines), MIN_INGREDIENT_CHARS),
+            lambda ing: (
+                f"- {ing['name']}: "
+                f"{ing.get('final_freshness', ing.get('freshness_score', 'N/A'))}/100 "
+                f"(Risk: {ing['risk_level']})"
+            ),
+            with_warnings=True,
+        )
 
-        lines.append("")
+        return lines + ingredient_lines, omitted, dropped
+
+    @staticmethod
+    def build_prompt(payload: Dict, endpoint: Optional[str] = None) -> str:
+        framing = MenuPromptBuilder._framing()
+        budget = prompt_max_chars() - len(framing) - 1
 
         # --------------------------------------------------
         # CASE 1️⃣: INSIGHT FLOW (existing insight.py)
         # --------------------------------------------------
         if "overall_freshness" in payload:
-            menu = payload["menu"]
-
-            lines.append(f"Menu Item: {menu['name']}")
-            lines.append(f"Category: {menu['category']}")
-            lines.append(f"Price: ₹{menu['price']}")
-            lines.append(
-                f"Availability: {'Available' if menu['is_available'] else 'Unavailable'}"
-            )
-
-            lines.append("")
-            lines.append(
-                f"Overall Freshness Score: {payload['overall_freshness']}/100"
-            )
-            lines.append(
-                f"Overall Risk Level: {payload['overall_risk']}"
+            details, omitted, dropped = MenuPromptBuilder._insight_detail_lines(
+                payload, budget - len(INSIGHT_INSTRUCTION) - 1
             )
 
-            lines.append("\nIngredient Details:")
-            for ing in payload.get("ingredients", []):
-                lines.append(
-                    f"- {ing['name']}: "
-                    f"{ing.get('final_freshness', ing.get('freshness_score', 'N/A'))}/100 "
-                    f"(Risk: {ing['risk_level']})"
-                )
-
-                for w in ing.get("warnings", []):
-                    lines.append(f"  ⚠ {w}")
-
-            lines.append(
-                "\nExplain the above information in a friendly, customer-facing way. "
-                "Keep it short, transparent, and confidence-building."
-            )
+            prompt = "\n".join([framing, *details, INSIGHT_INSTRUCTION])
 
-            return "\n".join(lines)
+            if endpoint:
+                prompt_sizes.record(endpoint, len(prompt), omitted, dropped)
+            return prompt
 
         # --------------------------------------------------
         # CASE 2️⃣: CHAT FLOW (menu/{slug}/chat)
@@ -83,26 +294,58 @@ class MenuPromptBuilder:
         ingredients = payload.get("ingredients", [])
         user_question = payload.get("user_question", "")
 
-        lines.append(f"Menu Item: {menu['name']}")
-        lines.append(f"Category: {menu['category']}")
-        lines.append(f"Price: ₹{menu['price']}")
-        lines.append(
-            f"Availability: {'Available' if menu['is_available'] else 'Unavailable'}"
-        )
-
+        lines = MenuPromptBuilder._menu_lines(menu)
         lines.append("\nIngredients:")
-        for ing in ingredients:
-            lines.append(
+
+        tail = ["", f"Customer question: {user_question}", CHAT_INSTRUCTION]
+
+        ingredient_lines, omitted, dropped = MenuPromptBuilder._ingredient_lines(
+            ingredients,
+            max(budget - _lines_size(lines) - _lines_size(tail), MIN_INGREDIENT_CHARS),
+            lambda ing: (
                 f"- {ing['name']} "
                 f"(Freshness: {ing['freshness_score']}, Risk: {ing['risk_level']})"
+            ),
+            with_warnings=False,
+        )
+
+        prompt = "\n".join([framing, *lines, *ingredient_lines, *tail])
+
+        if endpoint:
+            prompt_sizes.record(endpoint, len(prompt), omitted, dropped)
+        return prompt
+
+    @staticmethod
+    def build_batch_prompt(payloads: Dict[str, Dict], endpoint: Optional[str] = None) -> str:
+        """
+        CASE 3️⃣: several insight payloads in one request.
+
+        The framing is sent once; each dish is tagged `[DISH <id>]`
+        (each within PROMPT_DISH_MAX_CHARS) and the model must answer
+        with one JSON object {id: explanation}
+        (see llm.batch_insights.parse_batch_response).
+        """
+        lines = [MenuPromptBuilder._framing(), BATCH_INTRO]
+        dish_budget = prompt_dish_max_chars()
+        omitted_total = dropped_total = 0
+
+        for dish_id, payload in payloads.items():
+            details, omitted, dropped = MenuPromptBuilder._insight_detail_lines(
+                payload, dish_budget
             )
+            omitted_total += omitted
+            dropped_total += dropped
+
+            lines.append("")
+            lines.append(f"{BATCH_TAG_PREFIX}{dish_id}]")
+            lines.extend(details)
 
         lines.append("")
-        lines.append(f"Customer question: {user_question}")
+        lines.append(BATCH_END_TAG)
+        lines.append(BATCH_INSTRUCTIONS)
 
-        lines.append(
-            "\nAnswer the customer's question clearly and confidently, "
-            "using the information above. Be concise and reassuring."
-        )
+        prompt = "\n".join(lines)
 
-        return "\n".join(lines)
+        if endpoint:
+            prompt_sizes.record(endpoint, len(prompt), omitted_total, dropped_total)
+        return prompt
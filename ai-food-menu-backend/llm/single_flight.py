@@ -0,0 +1,165 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import xxhash
+
+T = TypeVar("T")
+
+
+def prompt_key(prompt: str) -> str:
+    return xxhash.xxh3_128_hexdigest(prompt)
+
+
+class _Flight:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future):
+        self.future = future
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: the first caller for a key
+    (the leader) runs the call, everyone arriving before it finishes
+    shares its result or exception.
+
+    - ado() : asyncio path; the shared call is cancelled only when its
+              last waiter goes away
+    - do()  : thread path; followers block on the leader's future
+
+    Keys are forgotten as soon as the call finishes, so this never
+    serves stale results (caching is the caches' job).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._async: Dict[str, _Flight] = {}
+        self._sync: Dict[str, Future] = {}
+
+        # Stats
+        self._leaders = 0
+        self._merged = 0
+        self._abandoned = 0
+
+    # ---------- asyncio ----------
+
+    def _forget_async(self, key: str, flight: _Flight):
+        with self._lock:
+            if self._async.get(key) is flight:
+                del self._async[key]
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        with self._lock:
+            flight = self._async.get(key)
+
+            # An abandoned flight is being cancelled: start a new one
+            if flight is None or flight.waiters == 0 or flight.future.done():
+                flight = _Flight(asyncio.ensure_future(fn()))
+                flight.future.add_done_callback(
+                    lambda _, key=key, flight=flight: self._forget_async(key, flight)
+                )
+                self._async[key] = flight
+                self._leaders += 1
+            else:
+                self._merged += 1
+
+            flight.waiters += 1
+
+        try:
+            # shield: one caller cancelling must not cancel the others
+            return await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.future.done():
+                flight.future.cancel()
+                with self._lock:
+                    self._abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    # ---------- threads ----------
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._sync.get(key)
+            leader = future is None
+
+            if leader:
+                future = Future()
+                self._sync[key] = future
+                self._leaders += 1
+            else:
+                self._merged += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._sync[key]
+
+        return future.result()
+
+    # ---------- stats ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self._leaders + self._merged
+            return {
+                "in_flight": len(self._async) + len(self._sync),
+                "upstream_calls": self._leaders,
+                "merged_calls": self._merged,
+                "merge_ratio": round(self._merged / calls, 4) if calls else 0.0,
+                "abandoned": self._abandoned,
+            }
+
+
+# -------------------------
+# Per-route groups
+# -------------------------
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def single_flight_enabled(route: str) -> bool:
+    """
+    LLM_SINGLE_FLIGHT=0 turns coalescing off everywhere;
+    LLM_SINGLE_FLIGHT_ROUTES lists the routes that use it.
+    """
+    if os.getenv("LLM_SINGLE_FLIGHT", "1") != "1":
+        return False
+
+    routes = os.getenv("LLM_SINGLE_FLIGHT_ROUTES", "insight,chat")
+    return route in {name.strip() for name in routes.split(",")}
+
+
+def single_flight_for(route: str) -> Optional[SingleFlight]:
+    """The route's group, or None when coalescing is off for it."""
+    if not single_flight_enabled(route):
+        return None
+
+    with _groups_lock:
+        group = _groups.get(route)
+        if group is None:
+            group = SingleFlight(route)
+            _groups[route] = group
+
+        return group
+
+
+def single_flight_stats() -> Dict[str, dict]:
+    with _groups_lock:
+        groups = dict(_groups)
+
+    return {route: group.stats() for route, group in groups.items()}
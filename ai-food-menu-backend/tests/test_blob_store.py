@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.services.blob_store import (
+    CODEC_SEGMENTS,
+    CODEC_ZSTD,
+    SEGMENT_SEPARATOR,
+    BlobStore,
+    content_hash,
+    prompt_hash,
+    split_prompt,
+)
+
+FRAMING = "You are a food safety assistant.\n\nAnswer briefly and kindly."
+
+
+def _prompt(dish: str) -> str:
+    return SEGMENT_SEPARATOR.join([FRAMING, f"Dish: {dish}", "Explain its freshness."])
+
+
+def _row(prompt, response, menu_id=1):
+    return (menu_id, "gemini-flash", prompt, response, 82.5, "Low", datetime(2026, 1, 1))
+
+
+class FakeBlobTable:
+    """ai_blobs in memory: asyncpg-style writes, psycopg2-style reads."""
+
+    def __init__(self):
+        self.blobs = {}
+        self.selects = 0
+        self._result = []
+
+    async def executemany(self, sql, args):
+        for digest, codec, raw_size, body in args:
+            self.blobs[digest] = (codec, body)
+
+    def execute(self, sql, params):
+        self.selects += 1
+        (digests,) = params
+        self._result = [
+            {"hash": d, "codec": self.blobs[d][0], "body": self.blobs[d][1]}
+            for d in digests if d in self.blobs
+        ]
+
+    def fetchall(self):
+        return self._result
+
+
+def _store(table, rows, store=None):
+    store = store or BlobStore(compress_min_bytes=64)
+    ref_rows = asyncio.run(store.ato_references(table, rows))
+    return store, ref_rows
+
+
+def _as_dicts(ref_rows):
+    return [
+        {"id": i, "prompt": None, "response": None,
+         "prompt_hash": row[2], "response_hash": row[3]}
+        for i, row in enumerate(ref_rows)
+    ]
+
+
+@pytest.mark.parametrize("prompt", [
+    _prompt("curry"),
+    "no separator at all",
+    "\n\nleading and trailing\n\n",
+    "three\n\n\nnewlines\n\n\n\nand four",
+    "",
+])
+def test_split_prompt_round_trips(prompt):
+    assert SEGMENT_SEPARATOR.join(split_prompt(prompt)) == prompt
+
+
+def test_manifest_hash_differs_from_segment_hash():
+    assert prompt_hash("single segment") != content_hash("single segment")
+
+
+def test_shared_segments_stored_once():
+    table = FakeBlobTable()
+    _store(table, [_row(_prompt("curry"), "Fresh."), _row(_prompt("soup"), "Fresh.")])
+
+    segment_bodies = [body for codec, body in table.blobs.values() if codec != CODEC_SEGMENTS]
+    # 2 framing segments + instruction + 2 dish lines + 1 shared response
+    assert len(segment_bodies) == 6
+    assert sum(codec == CODEC_SEGMENTS for codec, _ in table.blobs.values()) == 2
+
+
+def test_known_blobs_not_resent():
+    table = FakeBlobTable()
+    store, _ = _store(table, [_row(_prompt("curry"), "Fresh.")])
+
+    ref_rows, blobs = store.prepare([_row(_prompt("curry"), "Fresh."), _row(_prompt("soup"), "Fresh.")])
+
+    assert prompt_hash(_prompt("curry")) not in blobs
+    assert set(blobs) == {prompt_hash(_prompt("soup")), content_hash("Dish: soup")}
+    assert ref_rows[0][2] == prompt_hash(_prompt("curry"))
+
+
+def test_rehydrate_round_trip():
+    table = FakeBlobTable()
+    long_response = "The curry is fresh. " * 50
+    rows = [
+        _row(_prompt("curry"), long_response),
+        _row(_prompt("soup"), "Caution: near expiry."),
+        _row(None, None),
+    ]
+    _, ref_rows = _store(table, rows)
+    assert table.blobs[content_hash(long_response)][0] == CODEC_ZSTD
+
+    # Fresh store: nothing cached, everything read from the table
+    rehydrated = BlobStore().rehydrate(_as_dicts(ref_rows), cur=table)
+
+    assert [(r["prompt"], r["response"]) for r in rehydrated] == [
+        (prompt, response) for _, _, prompt, response, *_ in rows
+    ]
+    assert all("prompt_hash" not in r and "response_hash" not in r for r in rehydrated)
+
+
+def test_rehydrate_uses_the_cache():
+    table = FakeBlobTable()
+    _, ref_rows = _store(table, [_row(_prompt("curry"), "Fresh.")])
+    reader = BlobStore()
+
+    reader.rehydrate(_as_dicts(ref_rows), cur=table)
+    selects = table.selects
+    reader.rehydrate(_as_dicts(ref_rows), cur=table)
+
+    assert table.selects == selects
+
+
+def test_legacy_rows_left_untouched():
+    legacy = {"id": 1, "prompt": "old prompt", "response": "old answer"}
+
+    assert BlobStore().rehydrate([dict(legacy)], cur=FakeBlobTable()) == [legacy]
+
+
+def test_missing_segment_leaves_prompt_empty():
+    table = FakeBlobTable()
+    _, ref_rows = _store(table, [_row(_prompt("curry"), "Fresh.")])
+    del table.blobs[content_hash("Dish: curry")]
+
+    row = BlobStore().rehydrate(_as_dicts(ref_rows), cur=table)[0]
+
+    assert row["prompt"] is None
+    assert row["response"] == "Fresh."
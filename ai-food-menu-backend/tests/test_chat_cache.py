@@ -0,0 +1,64 @@
+import pytest
+
+from llm.chat_cache import ChatAnswerCache, content_words, negation_tokens
+
+
+@pytest.fixture
+def cache():
+    cache = ChatAnswerCache(threshold=0.6)
+    cache.put("curry", "v1", "Is this safe to eat today?", "Yes, it is safe.")
+    cache.put("curry", "v1", "Does it contain nuts?", "No nuts.")
+    return cache
+
+
+def test_negation_tokens_expand_contractions():
+    assert negation_tokens("Isn't this safe?") == {"not"}
+    assert negation_tokens("Is it nut-free with no dairy") == {"no"}
+    assert negation_tokens("Is this safe?") == frozenset()
+
+
+def test_content_words_skip_stopwords_and_fold_plurals():
+    assert content_words("Does it contain any nuts?") == {"contain", "nut"}
+
+
+def test_exact_and_paraphrase_hit(cache):
+    assert cache.lookup("curry", "v1", "is this safe to eat today")[1] == 1.0
+
+    answer, similarity = cache.lookup("curry", "v1", "Is it safe to eat today?")
+    assert answer == "Yes, it is safe."
+    assert similarity < 1.0
+
+
+@pytest.mark.parametrize("question", [
+    "Is this not safe to eat today?",
+    "Isn't this safe to eat today?",
+    "Is this never safe to eat today?",
+    "Doesn't it contain nuts?",
+])
+def test_negated_question_never_hits(cache, question):
+    assert cache.lookup("curry", "v1", question) is None
+
+
+def test_cached_negation_not_served_to_plain_question():
+    cache = ChatAnswerCache(threshold=0.6)
+    cache.put("curry", "v1", "Why is this not fresh?", "It is near expiry.")
+
+    assert cache.lookup("curry", "v1", "Why is this fresh?") is None
+    assert cache.lookup("curry", "v1", "why isn't this fresh") is not None
+
+
+def test_low_content_overlap_misses():
+    question = "Is this spicy today?"
+
+    gated = ChatAnswerCache(threshold=0.3)
+    gated.put("curry", "v1", "Is this safe to eat today?", "Yes.")
+    assert gated.lookup("curry", "v1", question) is None
+
+    ungated = ChatAnswerCache(threshold=0.3, min_content_overlap=0.0)
+    ungated.put("curry", "v1", "Is this safe to eat today?", "Yes.")
+    assert ungated.lookup("curry", "v1", question) is not None
+
+
+def test_new_context_version_discards_answers(cache):
+    assert cache.lookup("curry", "v2", "Is this safe to eat today?") is None
+    assert cache.stats()["invalidations"] == 2
@@ -0,0 +1,135 @@
+import pytest
+
+from llm import circuit_breaker
+from llm.circuit_breaker import CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    return clock
+
+
+def _breaker(**settings):
+    defaults = dict(window=4, min_calls=4, failure_rate=0.5, slow_ms=100,
+                    open_seconds=30, half_open_probes=1)
+    defaults.update(settings)
+    return CircuitBreaker("test-model", **defaults)
+
+
+def _trip(breaker):
+    for _ in range(breaker.min_calls):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state() == CircuitBreaker.CLOSED
+
+
+def test_opens_at_failure_rate_and_refuses_calls(clock):
+    breaker = _breaker()
+    breaker.record_success(10)
+    breaker.record_success(10)
+    breaker.record_failure()
+    assert breaker.state() == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state() == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_slow_successes_count_as_bad(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record_success(500)
+
+    assert breaker.state() == CircuitBreaker.OPEN
+    assert breaker.stats()["slow_calls"] == 4
+
+
+def test_half_open_after_open_seconds(clock):
+    breaker = _breaker()
+    _trip(breaker)
+
+    clock.now += 29.9
+    assert breaker.state() == CircuitBreaker.OPEN
+
+    clock.now += 0.1
+    assert breaker.state() == CircuitBreaker.HALF_OPEN
+
+
+def test_half_open_allows_only_the_probe_budget(clock):
+    breaker = _breaker(half_open_probes=2)
+    _trip(breaker)
+    clock.now += 30
+
+    assert breaker.allow()
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert not breaker.available()
+
+
+def test_successful_probes_close(clock):
+    breaker = _breaker(half_open_probes=2)
+    _trip(breaker)
+    clock.now += 30
+
+    breaker.allow()
+    breaker.record_success(10)
+    assert breaker.state() == CircuitBreaker.HALF_OPEN
+
+    breaker.allow()
+    breaker.record_success(10)
+    assert breaker.state() == CircuitBreaker.CLOSED
+    assert breaker.stats()["recent_calls"] == 0
+
+
+def test_bad_probe_reopens(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock.now += 30
+
+    assert breaker.allow()
+    breaker.record_success(500)
+
+    assert breaker.state() == CircuitBreaker.OPEN
+    assert breaker.stats()["opens"] == 2
+
+
+def test_cancelled_probe_frees_its_slot(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock.now += 30
+
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_cancelled()
+    assert breaker.state() == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_late_result_while_open_is_ignored(clock):
+    breaker = _breaker()
+    _trip(breaker)
+
+    # A call started before the breaker opened finishes afterwards
+    breaker.record_success(10)
+
+    assert breaker.state() == CircuitBreaker.OPEN
+    assert breaker.stats()["opens"] == 1
@@ -0,0 +1,133 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from context_object.freshness_engine import FreshnessEngine
+
+EVALUATED_AT = datetime(2026, 3, 15, 12, 0)
+TODAY = EVALUATED_AT.date()
+
+
+def _ingredient(ingredient_id, category="Meat", received=-5, expiry=5,
+                risk_level="Low", temp=None, event_type="storage_check",
+                out_of_range_minutes=None):
+    return {
+        "ingredient_id": ingredient_id,
+        "name": f"ing-{ingredient_id}",
+        "category": category,
+        "received_date": TODAY + timedelta(days=received),
+        "expiry_date": TODAY + timedelta(days=expiry),
+        "risk_level": risk_level,
+        "latest_event": (
+            {"event_type": event_type, "event_value": {"temp": temp}}
+            if temp is not None else None
+        ),
+        "storage_telemetry": (
+            {"out_of_range_minutes": out_of_range_minutes}
+            if out_of_range_minutes is not None else None
+        ),
+    }
+
+
+def _random_contexts(menus=120, per_menu=5, seed=11):
+    rng = random.Random(seed)
+    contexts = []
+
+    for menu_id in range(menus):
+        ingredients = []
+        for i in range(per_menu):
+            received = -rng.randint(0, 10)
+            ingredients.append(_ingredient(
+                menu_id * per_menu + i,
+                category=rng.choice(["Seafood", "Chicken", "Vegetarian", "Dairy", "Grain"]),
+                received=received,
+                expiry=received + rng.randint(0, 14),
+                risk_level=rng.choice(["Low", "Medium", "High", None]),
+                temp=rng.choice([None, -2, 0, 4, 5, 7.5, 12]),
+                event_type=rng.choice(["storage_check", "received"]),
+                out_of_range_minutes=rng.choice([None, None, 0.0, 29.9, 30.0, 95.0]),
+            ))
+        contexts.append({
+            "menu": {"menu_id": menu_id, "name": f"menu-{menu_id}"},
+            "ingredients": ingredients,
+        })
+
+    return contexts
+
+
+def _scalar_menus(contexts):
+    reports = [FreshnessEngine.score_menu(c, evaluated_at=EVALUATED_AT) for c in contexts]
+    return {r["menu_id"]: r for r in sorted(reports, key=lambda r: r["menu_id"])}
+
+
+def test_menu_batch_matches_scalar():
+    contexts = _random_contexts()
+    expected = _scalar_menus(contexts)
+
+    batch = FreshnessEngine.score_menus_batch(
+        FreshnessEngine.ingredient_columns(contexts), evaluated_at=EVALUATED_AT
+    )
+
+    assert batch["menu_id"].tolist() == list(expected)
+    assert batch["menu_freshness"].tolist() == [r["menu_freshness"] for r in expected.values()]
+    assert batch["status"].tolist() == [r["status"] for r in expected.values()]
+
+
+def test_ingredient_batch_matches_scalar():
+    contexts = _random_contexts(menus=40)
+    scalar = [
+        FreshnessEngine.score_ingredient(i, today=TODAY)
+        for c in contexts for i in c["ingredients"]
+    ]
+
+    batch = FreshnessEngine.score_ingredients_batch(
+        FreshnessEngine.ingredient_columns(contexts), evaluated_at=EVALUATED_AT
+    )
+
+    for field in ("base_freshness", "penalty", "final_freshness"):
+        assert batch[field].tolist() == [s[field] for s in scalar], field
+
+
+@pytest.mark.parametrize("ingredient, expected_warning", [
+    # zero shelf life scores 0
+    (_ingredient(1, received=0, expiry=0), "Ingredient expired"),
+    (_ingredient(2, received=-3, expiry=1), "Ingredient near expiry"),
+    # Grain falls back to the default range (0..8)
+    (_ingredient(3, category="Grain", temp=9), "Unsafe storage temperature detected (9°C)"),
+    # telemetry replaces the (unsafe) latest event
+    (_ingredient(4, temp=20, out_of_range_minutes=10.0), None),
+    (_ingredient(5, out_of_range_minutes=30.0), "Stored outside"),
+])
+def test_edge_cases_match(ingredient, expected_warning):
+    context = {"menu": {"menu_id": 1, "name": "dish"}, "ingredients": [ingredient]}
+    scalar = FreshnessEngine.score_menu(context, evaluated_at=EVALUATED_AT)
+
+    batch = FreshnessEngine.score_menus_batch(
+        FreshnessEngine.ingredient_columns([context]), evaluated_at=EVALUATED_AT
+    )
+
+    assert batch["menu_freshness"][0] == scalar["menu_freshness"]
+    assert batch["status"][0] == scalar["status"]
+    if expected_warning is None:
+        assert scalar["warnings"] == []
+    else:
+        assert any(w.startswith(expected_warning) for w in scalar["warnings"])
+
+
+def test_menus_without_ingredients_score_100():
+    context = {"menu": {"menu_id": 1, "name": "dish"}, "ingredients": [_ingredient(1)]}
+    batch = FreshnessEngine.score_menus_batch(
+        FreshnessEngine.ingredient_columns([context]),
+        evaluated_at=EVALUATED_AT,
+        menu_ids=np.array([1, 7]),
+    )
+
+    assert batch["menu_id"].tolist() == [1, 7]
+    assert batch["menu_freshness"][1] == 100.0
+    assert batch["status"][1] == "Fresh"
+    assert FreshnessEngine.score_menu(
+        {"menu": {"menu_id": 7, "name": "empty"}, "ingredients": []},
+        evaluated_at=EVALUATED_AT,
+    )["menu_freshness"] == 100.0
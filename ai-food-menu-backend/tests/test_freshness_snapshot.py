@@ -0,0 +1,120 @@
+import time
+
+from app.services.freshness_snapshot import FreshnessSnapshot
+
+
+def _entry(menu_id, name, score=0.9, category="Mains", evaluated_at="2026-01-01T00:00:00"):
+    return {
+        "menu": {
+            "menu_id": menu_id,
+            "name": name,
+            "category": category,
+            "price": 10,
+            "is_available": True,
+        },
+        "freshness": {
+            "menu_freshness": score,
+            "status": "FRESH",
+            "warnings": [],
+            "evaluated_at": evaluated_at,
+        },
+    }
+
+
+def _menu():
+    return {
+        "a": _entry(1, "Apple pie"),
+        "b": _entry(2, "Bean soup"),
+        "c": _entry(3, "Curry"),
+    }
+
+
+def _version(snapshot):
+    return snapshot.versioned_items()[0]
+
+
+def test_version_ignores_evaluated_at():
+    first, second = FreshnessSnapshot(), FreshnessSnapshot()
+    first.replace(_menu())
+    second.replace({
+        slug: _entry(e["menu"]["menu_id"], e["menu"]["name"], evaluated_at="later")
+        for slug, e in _menu().items()
+    })
+
+    assert _version(first) == _version(second)
+
+
+def test_visible_change_bumps_version_and_revert_restores_it():
+    snapshot = FreshnessSnapshot()
+    snapshot.replace(_menu())
+    original = _version(snapshot)
+
+    snapshot.update({"b": _entry(2, "Bean soup", score=0.4)})
+    assert _version(snapshot) != original
+
+    snapshot.update({"b": _entry(2, "Bean soup")})
+    assert _version(snapshot) == original
+
+
+def test_incremental_update_matches_full_replace():
+    incremental = FreshnessSnapshot()
+    incremental.replace(_menu())
+    incremental.update({"d": _entry(4, "Dal", category="Sides")}, removed_menu_ids={1})
+
+    expected = _menu()
+    del expected["a"]
+    expected["d"] = _entry(4, "Dal", category="Sides")
+    full = FreshnessSnapshot()
+    full.replace(expected)
+
+    assert _version(incremental) == _version(full)
+    assert incremental.get("a") is None
+
+
+def test_update_keeps_menu_order():
+    snapshot = FreshnessSnapshot()
+    snapshot.replace(_menu())
+    snapshot.update({"aa": _entry(5, "Apple tart")})
+
+    assert [slug for slug, _ in snapshot.items()] == ["a", "aa", "b", "c"]
+
+
+def test_slug_change_replaces_old_entry():
+    snapshot = FreshnessSnapshot()
+    snapshot.replace(_menu())
+    snapshot.update({"b-renamed": _entry(2, "Bean soup")})
+
+    assert snapshot.get("b") is None
+    assert snapshot.get("b-renamed") is not None
+
+
+def test_replace_keeps_entries_updated_after_refresh_started():
+    snapshot = FreshnessSnapshot()
+    snapshot.replace(_menu())
+
+    started = time.monotonic()
+    newer = _entry(2, "Bean soup", score=0.2)
+    snapshot.update({"b": newer})
+
+    # Refresh read the database before the incremental update
+    snapshot.replace(_menu(), started=started)
+
+    assert snapshot.get("b") == newer
+
+
+def test_versioned_get():
+    snapshot = FreshnessSnapshot()
+    snapshot.replace(_menu())
+
+    version, entry = snapshot.versioned_get("a")
+    assert version is not None and entry["menu"]["menu_id"] == 1
+    assert snapshot.versioned_get("missing") == (None, None)
+
+
+def test_empty_snapshot_is_not_fresh():
+    snapshot = FreshnessSnapshot()
+
+    assert not snapshot.is_fresh()
+
+    snapshot.replace(_menu())
+    assert snapshot.is_fresh(max_age=60)
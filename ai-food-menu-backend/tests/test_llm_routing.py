@@ -0,0 +1,193 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from llm import circuit_breaker, llm_client, llm_provider
+from llm.circuit_breaker import CircuitOpenError, breaker_for
+from llm.llm_client import LLMClient
+from llm.llm_provider import route_models
+
+# LocalLLM stand-ins: latency and failures are simulated
+MODELS = {
+    "fast": {"provider": "local", "latency_ms": 5, "token_ms": 0},
+    "backup": {"provider": "local", "latency_ms": 5, "token_ms": 0},
+    "slow": {"provider": "local", "latency_ms": 2000, "token_ms": 0},
+    "broken": {"provider": "local", "latency_ms": 5, "error_rate": 1.0},
+    "broken2": {"provider": "local", "latency_ms": 5, "error_rate": 1.0},
+}
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """Fresh clients and breakers; returns the models asked, in order."""
+    monkeypatch.setenv("LLM_MODELS", json.dumps(MODELS))
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    monkeypatch.setenv("LLM_TIMEOUT_SECONDS", "5")
+    monkeypatch.setenv("LLM_HEDGE_DELAY_MS", "50")
+    monkeypatch.setenv("LLM_BREAKER_MIN_CALLS", "2")
+    monkeypatch.setattr(llm_provider, "_clients", {})
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+
+    asked = []
+    real_get_llm = llm_client.get_llm
+
+    def get_llm(name):
+        asked.append(name)
+        return real_get_llm(name)
+
+    monkeypatch.setattr(llm_client, "get_llm", get_llm)
+    return asked
+
+
+def _routes(monkeypatch, hedged=(), **routes):
+    monkeypatch.setenv("LLM_ROUTES", json.dumps(routes))
+    monkeypatch.setenv("LLM_HEDGE_ROUTES", ",".join(hedged))
+
+
+def _generate(route):
+    return asyncio.run(LLMClient.agenerate_with_model("Explain freshness.", route))
+
+
+def _counter(name):
+    return LLMClient.stats()[name]
+
+
+# -------------------------
+# Route chains
+# -------------------------
+
+@pytest.mark.parametrize(
+    "routes, route, provider, expected",
+    [
+        ({"chat": ["fast", "backup"]}, "chat", "gemini", ["fast", "backup"]),
+        ({"chat": "fast, backup"}, "chat", "gemini", ["fast", "backup"]),
+        # Unknown route: the "default" entry
+        ({"default": ["backup"]}, "insight", "gemini", ["backup"]),
+        # No entry at all: the LLM_PROVIDER model
+        ({}, "insight", "gemini", ["gemini-flash"]),
+        ({}, "insight", "local", ["local"]),
+        # Unregistered names are dropped, order kept
+        ({"chat": ["nope", "backup", "fast"]}, "chat", "gemini", ["backup", "fast"]),
+    ],
+)
+def test_route_models(monkeypatch, models, routes, route, provider, expected):
+    monkeypatch.setenv("LLM_PROVIDER", provider)
+    _routes(monkeypatch, **routes)
+
+    assert route_models(route) == expected
+
+
+def test_route_without_registered_models(monkeypatch, models):
+    _routes(monkeypatch, chat=["nope"])
+
+    with pytest.raises(RuntimeError):
+        route_models("chat")
+
+
+# -------------------------
+# Fallbacks / breakers
+# -------------------------
+
+def test_falls_back_in_chain_order(monkeypatch, models):
+    _routes(monkeypatch, chat=["broken", "broken2", "fast", "backup"])
+    fallbacks = _counter("fallbacks")
+
+    text, model = _generate("chat")
+
+    assert model == "fast"
+    assert text
+    assert models == ["broken", "broken2", "fast"]
+    assert _counter("fallbacks") - fallbacks == 2
+
+
+def test_every_model_failing_raises_last_error(monkeypatch, models):
+    _routes(monkeypatch, chat=["broken", "broken2"])
+
+    with pytest.raises(RuntimeError, match="injected failure"):
+        _generate("chat")
+    assert models == ["broken", "broken2"]
+
+
+def test_open_breaker_is_skipped(monkeypatch, models):
+    _routes(monkeypatch, chat=["fast", "backup"])
+    breaker = breaker_for("fast")
+    for _ in range(2):
+        breaker.record_failure()
+
+    _, model = _generate("chat")
+
+    assert model == "backup"
+    # Never called, not even to fail
+    assert models == ["backup"]
+
+
+def test_all_breakers_open_fails_fast(monkeypatch, models):
+    _routes(monkeypatch, chat=["fast", "backup"])
+    for name in ("fast", "backup"):
+        for _ in range(2):
+            breaker_for(name).record_failure()
+    rejected = _counter("rejected")
+
+    with pytest.raises(CircuitOpenError):
+        _generate("chat")
+
+    assert models == []
+    assert _counter("rejected") - rejected == 1
+
+
+# -------------------------
+# Hedging
+# -------------------------
+
+def test_hedge_fires_for_slow_primary(monkeypatch, models):
+    _routes(monkeypatch, hedged=["chat"], chat=["slow", "fast"])
+    hedges, wins = _counter("hedges"), _counter("hedge_wins")
+
+    started = time.monotonic()
+    _, model = _generate("chat")
+
+    assert model == "fast"
+    # The slow primary was cancelled, not waited for
+    assert time.monotonic() - started < 1
+    assert _counter("hedges") - hedges == 1
+    assert _counter("hedge_wins") - wins == 1
+    assert LLMClient.stats()["models"]["slow"]["cancelled"] >= 1
+
+
+def test_no_hedge_when_primary_answers_in_time(monkeypatch, models):
+    _routes(monkeypatch, hedged=["chat"], chat=["fast", "slow"])
+    hedges = _counter("hedges")
+
+    _, model = _generate("chat")
+
+    assert model == "fast"
+    assert models == ["fast"]
+    assert _counter("hedges") == hedges
+
+
+def test_primary_fast_fail_falls_back_without_hedge(monkeypatch, models):
+    _routes(monkeypatch, hedged=["chat"], chat=["broken", "fast"])
+    hedges, wins = _counter("hedges"), _counter("hedge_wins")
+
+    _, model = _generate("chat")
+
+    # Failed before the hedge delay: plain fallback to the next model
+    assert model == "fast"
+    assert models == ["broken", "fast"]
+    assert _counter("hedges") == hedges
+    assert _counter("hedge_wins") == wins
+
+
+def test_unhedged_route_waits_for_slow_primary(monkeypatch, models):
+    monkeypatch.setitem(MODELS["slow"], "latency_ms", 150)
+    monkeypatch.setenv("LLM_MODELS", json.dumps(MODELS))
+    _routes(monkeypatch, chat=["slow", "fast"])
+    hedges = _counter("hedges")
+
+    _, model = _generate("chat")
+
+    assert model == "slow"
+    assert models == ["slow"]
+    assert _counter("hedges") == hedges
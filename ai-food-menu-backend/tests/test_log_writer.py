@@ -0,0 +1,157 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import pytest
+
+from app.services import log_writer as log_writer_module
+from app.services.log_writer import WriteBehindLogWriter
+
+
+def _feedback(n):
+    return (n, f"feedback {n}", 0.5, [], 0.9)
+
+
+@pytest.fixture
+def make_writer(monkeypatch):
+    """Running writers whose flushes are captured instead of written."""
+    writers = []
+
+    def make(**settings):
+        # batch_size above max_queue: only flush() / stop() write
+        defaults = dict(max_queue=3, batch_size=100, flush_interval=60.0)
+        defaults.update(settings)
+        writer = WriteBehindLogWriter(**defaults)
+        writer.written = []
+
+        def write(batch):
+            writer.written.extend(values for _, values, _ in batch)
+            with writer._cond:
+                writer._in_flight = 0
+                writer._cond.notify_all()
+
+        monkeypatch.setattr(writer, "_write", write)
+        writer.start()
+        writers.append(writer)
+        return writer
+
+    yield make
+
+    for writer in writers:
+        writer.stop(1.0)
+
+
+def _ids(writer):
+    return [values[0] for values in writer.written]
+
+
+def test_not_running_writer_refuses_records():
+    writer = WriteBehindLogWriter()
+
+    assert writer.enqueue("feedback", _feedback(1)) is False
+
+
+def test_unknown_kind_rejected(make_writer):
+    writer = make_writer()
+
+    with pytest.raises(ValueError):
+        writer.enqueue("nope", ())
+
+
+def test_drop_newest_keeps_the_queued_records(make_writer):
+    writer = make_writer(policy="drop_newest")
+    for n in range(5):
+        assert writer.enqueue("feedback", _feedback(n))
+
+    writer.stop(1.0)
+
+    assert _ids(writer) == [0, 1, 2]
+    assert writer.stats()["dropped"]["queue_full"] == 2
+
+
+def test_drop_oldest_makes_room(make_writer):
+    writer = make_writer(policy="drop_oldest")
+    for n in range(5):
+        writer.enqueue("feedback", _feedback(n))
+
+    writer.stop(1.0)
+
+    assert _ids(writer) == [2, 3, 4]
+    assert writer.stats()["dropped"]["queue_full"] == 2
+
+
+def test_block_drops_after_timeout(make_writer):
+    writer = make_writer(policy="block", block_ms=50)
+    for n in range(3):
+        writer.enqueue("feedback", _feedback(n))
+
+    started = time.monotonic()
+    assert writer.enqueue("feedback", _feedback(3))
+    assert time.monotonic() - started >= 0.04
+
+    writer.stop(1.0)
+    assert _ids(writer) == [0, 1, 2]
+    assert writer.stats()["dropped"]["queue_full"] == 1
+
+
+def test_block_waits_for_a_flush(make_writer):
+    writer = make_writer(policy="block", block_ms=2000)
+    for n in range(3):
+        writer.enqueue("feedback", _feedback(n))
+
+    threading.Timer(0.05, writer.flush).start()
+    writer.enqueue("feedback", _feedback(3))
+
+    writer.stop(1.0)
+    assert _ids(writer) == [0, 1, 2, 3]
+    assert writer.stats()["dropped"]["queue_full"] == 0
+
+
+def test_flush_writes_everything_queued(make_writer):
+    writer = make_writer(max_queue=10)
+    for n in range(4):
+        writer.enqueue("feedback", _feedback(n))
+
+    assert writer.flush(1.0)
+    assert _ids(writer) == [0, 1, 2, 3]
+    assert writer.stats()["queue_depth"] == 0
+
+
+def test_stopped_writer_refuses_records(make_writer):
+    writer = make_writer()
+    writer.stop(1.0)
+
+    assert writer.enqueue("feedback", _feedback(1)) is False
+
+
+def test_unreachable_database_retries_then_drops(monkeypatch):
+    @contextmanager
+    def unreachable():
+        raise psycopg2.OperationalError("connection refused")
+        yield
+
+    monkeypatch.setattr(log_writer_module, "db_connection", unreachable)
+    writer = WriteBehindLogWriter(
+        max_queue=10, batch_size=100, flush_interval=0.01, max_attempts=2
+    )
+    writer.start()
+    try:
+        writer.enqueue("feedback", _feedback(1))
+        writer.enqueue("feedback", _feedback(2))
+
+        deadline = time.monotonic() + 2
+        while writer.stats()["dropped"]["insert_failed"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        writer.stop(1.0)
+
+    stats = writer.stats()
+    assert stats["dropped"]["insert_failed"] == 2
+    assert stats["failed_flushes"] == 2
+    assert stats["written"] == {}
+
+
+def test_invalid_policy_rejected():
+    with pytest.raises(ValueError):
+        WriteBehindLogWriter(policy="drop_random")
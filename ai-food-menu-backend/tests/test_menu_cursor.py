@@ -0,0 +1,126 @@
+import base64
+import json
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.domain.menu_decision_engine import decide_menu_item, score_band
+from app.routes.menu import _decode_cursor, _encode_cursor, router
+
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.fixture
+def client():
+    # Menu routes only: no lifespan, no DB pool
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+# -------------------------
+# Cursors
+# -------------------------
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        {"category": "Starters", "name": "Paneer Tikka", "menu_id": 7},
+        {"category": "Desserts", "name": "Crème brûlée, \"house\"", "menu_id": 2 ** 31 - 1},
+        {"category": "", "name": "", "menu_id": 0},
+    ],
+)
+def test_cursor_round_trip(row):
+    assert _decode_cursor(_encode_cursor(row)) == (row["category"], row["name"], row["menu_id"])
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        "é",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        _raw_cursor({"category": "Starters", "name": "Tikka", "menu_id": 7}),
+        _raw_cursor("abc"),
+        _raw_cursor(["Starters", "Tikka"]),
+        _raw_cursor(["Starters", "Tikka", 7, 8]),
+        _raw_cursor(["Starters", "Tikka", "seven"]),
+        _raw_cursor(["Starters", "Tikka", None]),
+        _raw_cursor(["Starters", "Tikka", -1]),
+        _raw_cursor(["Starters", "Tikka", 2 ** 31]),
+        _raw_cursor(["Starters", "Tik\x00ka", 7]),
+        base64.urlsafe_b64encode(b'["Starters", "Tikka", 1e400]').decode(),
+        base64.urlsafe_b64encode(b'["Starters", "Tikka", NaN]').decode(),
+    ],
+)
+def test_garbage_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        _raw_cursor(["Starters", "Tikka", 2 ** 40]),
+        base64.urlsafe_b64encode(b'["Starters", "Tikka", 1e400]').decode(),
+    ],
+)
+def test_menu_route_answers_400_for_garbage_cursor(client, cursor):
+    response = client.get("/menu", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_menu_route_answers_400_for_unknown_status(client):
+    response = client.get("/menu", params={"status": "rotten"})
+
+    assert response.status_code == 400
+
+
+# -------------------------
+# Score bands
+# -------------------------
+
+@pytest.mark.parametrize(
+    "availability, status, expected",
+    [
+        (None, None, (None, None)),
+        ("available", None, (75, None)),
+        ("LIMITED", None, (60, 75)),
+        (None, "caution", (60, 75)),
+        (None, "Unavailable", (None, 60)),
+        ("AVAILABLE", "fresh", (75, None)),
+        # Contradictory: an empty range, not an error
+        ("AVAILABLE", "Unavailable", (0, 0)),
+        ("UNAVAILABLE", "Fresh", (0, 0)),
+        ("limited", "fresh", (0, 0)),
+    ],
+)
+def test_score_band(availability, status, expected):
+    assert score_band(availability=availability, status=status) == expected
+
+
+@pytest.mark.parametrize(
+    "availability, status",
+    [("SOLD_OUT", None), (None, "rotten"), ("AVAILABLE", "rotten")],
+)
+def test_score_band_unknown_values(availability, status):
+    with pytest.raises(ValueError):
+        score_band(availability=availability, status=status)
+
+
+@pytest.mark.parametrize("score", [0, 59.9, 60, 74.9, 75, 100])
+def test_score_band_matches_decision_engine(score):
+    menu = {"menu_id": 1, "name": "Tikka", "category": "Starters", "price": 240}
+    item = decide_menu_item(menu, {"score": score})
+
+    low, high = score_band(availability=item["availability"], status=item["status"])
+
+    assert (low is None or low <= score) and (high is None or score < high)
@@ -0,0 +1,243 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+from app.services import log_rollups
+from app.services.partition_manager import (
+    _free_range,
+    _parse_bound,
+    next_period,
+    partition_name,
+    period_start,
+)
+
+D = datetime
+
+
+# -------------------------
+# Periods
+# -------------------------
+
+@pytest.mark.parametrize(
+    "moment, interval, expected",
+    [
+        (D(2026, 3, 14, 15, 9, 26), "daily", D(2026, 3, 14)),
+        (D(2026, 3, 14, 0, 0), "daily", D(2026, 3, 14)),
+        (D(2026, 3, 14, 15, 9, 26), "monthly", D(2026, 3, 1)),
+        (D(2026, 12, 31, 23, 59, 59), "monthly", D(2026, 12, 1)),
+    ],
+)
+def test_period_start(moment, interval, expected):
+    assert period_start(moment, interval) == expected
+
+
+@pytest.mark.parametrize(
+    "start, interval, expected",
+    [
+        (D(2026, 3, 14), "daily", D(2026, 3, 15)),
+        (D(2026, 2, 28), "daily", D(2026, 3, 1)),
+        (D(2028, 2, 28), "daily", D(2028, 2, 29)),
+        (D(2026, 12, 31), "daily", D(2027, 1, 1)),
+        (D(2026, 1, 1), "monthly", D(2026, 2, 1)),
+        (D(2026, 11, 1), "monthly", D(2026, 12, 1)),
+        (D(2026, 12, 1), "monthly", D(2027, 1, 1)),
+    ],
+)
+def test_next_period(start, interval, expected):
+    assert next_period(start, interval) == expected
+
+
+@pytest.mark.parametrize(
+    "start, interval, expected",
+    [
+        (D(2026, 3, 4), "daily", "freshness_logs_p20260304"),
+        (D(2026, 3, 1), "monthly", "freshness_logs_p202603"),
+        (D(2026, 12, 1), "monthly", "freshness_logs_p202612"),
+    ],
+)
+def test_partition_name(start, interval, expected):
+    assert partition_name("freshness_logs", start, interval) == expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("MINVALUE", None),
+        (" MAXVALUE ", None),
+        ("'2026-03-04 00:00:00'", D(2026, 3, 4)),
+        ("'2026-03-04 12:30:00'", D(2026, 3, 4, 12, 30)),
+    ],
+)
+def test_parse_bound(value, expected):
+    assert _parse_bound(value) == expected
+
+
+# -------------------------
+# Free ranges
+# -------------------------
+
+LEGACY = ("t_legacy", None, D(2026, 3, 2))
+
+
+@pytest.mark.parametrize(
+    "partitions, start, end, expected",
+    [
+        # Nothing yet
+        ([], D(2026, 3, 4), D(2026, 3, 5), (D(2026, 3, 4), D(2026, 3, 5))),
+        # Exactly covered
+        ([("t_p0304", D(2026, 3, 4), D(2026, 3, 5))], D(2026, 3, 4), D(2026, 3, 5), None),
+        # Adjacent on either side: untouched
+        (
+            [
+                ("t_p0303", D(2026, 3, 3), D(2026, 3, 4)),
+                ("t_p0305", D(2026, 3, 5), D(2026, 3, 6)),
+            ],
+            D(2026, 3, 4), D(2026, 3, 5),
+            (D(2026, 3, 4), D(2026, 3, 5)),
+        ),
+        # Overlapping the start: begins where it ends
+        (
+            [("t_p0303", D(2026, 3, 3), D(2026, 3, 4, 12))],
+            D(2026, 3, 4), D(2026, 3, 5),
+            (D(2026, 3, 4, 12), D(2026, 3, 5)),
+        ),
+        # Overlapping the end: stops where it begins
+        (
+            [("t_p0304", D(2026, 3, 4, 6), D(2026, 3, 6))],
+            D(2026, 3, 4), D(2026, 3, 5),
+            (D(2026, 3, 4), D(2026, 3, 4, 6)),
+        ),
+        # Chained partitions covering the start
+        (
+            [
+                ("t_a", D(2026, 3, 1), D(2026, 3, 4, 6)),
+                ("t_b", D(2026, 3, 4, 6), D(2026, 3, 4, 12)),
+            ],
+            D(2026, 3, 4), D(2026, 3, 5),
+            (D(2026, 3, 4, 12), D(2026, 3, 5)),
+        ),
+        # Legacy (MINVALUE) partition reaching into the period
+        (
+            [("t_legacy", None, D(2026, 3, 4, 12))],
+            D(2026, 3, 4), D(2026, 3, 5),
+            (D(2026, 3, 4, 12), D(2026, 3, 5)),
+        ),
+        # Legacy partition ending before the period
+        ([LEGACY], D(2026, 3, 4), D(2026, 3, 5), (D(2026, 3, 4), D(2026, 3, 5))),
+        # Legacy partition covering the whole period
+        ([("t_legacy", None, D(2026, 4, 1))], D(2026, 3, 4), D(2026, 3, 5), None),
+        # Unbounded (MAXVALUE) partition
+        ([("t_max", D(2026, 3, 1), None)], D(2026, 3, 4), D(2026, 3, 5), None),
+        # Monthly period across the year boundary
+        (
+            [("t_p202612", D(2026, 12, 1), D(2027, 1, 1))],
+            D(2026, 12, 1), D(2027, 1, 1),
+            None,
+        ),
+        (
+            [("t_p202612", D(2026, 12, 1), D(2027, 1, 1))],
+            D(2027, 1, 1), D(2027, 2, 1),
+            (D(2027, 1, 1), D(2027, 2, 1)),
+        ),
+    ],
+)
+def test_free_range(partitions, start, end, expected):
+    assert _free_range(partitions, start, end) == expected
+
+
+# -------------------------
+# Rollup windows
+# -------------------------
+
+class FakeRollupConnection:
+    """Records each source's upsert; sources in `failing` raise."""
+
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.rowcount = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        source = next(name for name in log_rollups.ROLLUP_SOURCES if f"FROM {name}" in sql)
+        if source in self.failing:
+            raise RuntimeError("relation does not exist")
+        self.statements.append((source, sql, list(params)))
+        self.rowcount = 7
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def rollup_conn(monkeypatch):
+    conn = FakeRollupConnection()
+
+    @contextmanager
+    def fake_connection():
+        yield conn
+
+    monkeypatch.setattr(log_rollups, "db_connection", fake_connection)
+    return conn
+
+
+@pytest.mark.parametrize(
+    "start, end, window, params",
+    [
+        (None, None, [], []),
+        (D(2026, 3, 4, 10), None, [">= %s"], [D(2026, 3, 4, 10)]),
+        (None, D(2026, 3, 5), ["< %s"], [D(2026, 3, 5)]),
+        (
+            D(2026, 12, 31, 23), D(2027, 1, 1),
+            [">= %s", "< %s"], [D(2026, 12, 31, 23), D(2027, 1, 1)],
+        ),
+    ],
+)
+def test_refresh_rollups_window(rollup_conn, start, end, window, params):
+    upserted = log_rollups.refresh_rollups(start=start, end=end)
+
+    assert upserted == {source: 7 for source in log_rollups.ROLLUP_SOURCES}
+    assert rollup_conn.commits == len(log_rollups.ROLLUP_SOURCES)
+
+    for source, sql, sent in rollup_conn.statements:
+        column = log_rollups.ROLLUP_SOURCES[source][0]
+        assert sent == params
+        for condition in window:
+            assert f"AND {column} {condition}" in sql
+        assert sql.count("%s") == len(params)
+
+
+def test_refresh_rollups_one_source(rollup_conn):
+    upserted = log_rollups.refresh_rollups(
+        start=D(2026, 3, 4), end=D(2026, 3, 5), sources=["feedback_logs"]
+    )
+
+    assert upserted == {"feedback_logs": 7}
+    ((source, sql, _),) = rollup_conn.statements
+    # Joined query: the window uses the qualified column
+    assert "AND f.created_at >= %s AND f.created_at < %s" in sql
+
+
+def test_refresh_rollups_failed_source_keeps_others(rollup_conn):
+    rollup_conn.failing = ("freshness_logs",)
+
+    upserted = log_rollups.refresh_rollups(start=D(2026, 3, 4))
+
+    assert upserted["freshness_logs"] is None
+    assert upserted["ai_interactions"] == 7
+    assert upserted["feedback_logs"] == 7
+    assert rollup_conn.rollbacks == 1
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+from psycopg2 import extensions
+
+from app.services import postgres
+from app.services.postgres import PoolTimeout, PostgresPool
+
+
+class FakeConnection:
+    class _Info:
+        def __init__(self):
+            self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def __init__(self):
+        self.closed = 0
+        self.info = self._Info()
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    opened = []
+
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(postgres, "_connect", connect)
+    return opened
+
+
+def test_checkout_and_release_reuse_the_connection(connections):
+    pool = PostgresPool(minconn=0, maxconn=2, timeout=0.1)
+
+    conn = pool.getconn()
+    assert pool.stats()["in_use"] == 1
+
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+
+    stats = pool.stats()
+    assert stats["connections_created"] == 1
+    assert stats["checkouts"] == 2
+
+
+def test_open_prefills_minconn(connections):
+    pool = PostgresPool(minconn=2, maxconn=4)
+    pool.open()
+
+    stats = pool.stats()
+    assert stats["size"] == 2
+    assert stats["idle"] == 2
+    assert len(connections) == 2
+
+
+def test_exhausted_pool_times_out(connections):
+    pool = PostgresPool(minconn=0, maxconn=1, timeout=0.05)
+    pool.getconn()
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_the_released_connection(connections):
+    pool = PostgresPool(minconn=0, maxconn=1, timeout=2.0)
+    conn = pool.getconn()
+    got = []
+
+    waiter = threading.Thread(target=lambda: got.append(pool.getconn()))
+    waiter.start()
+    time.sleep(0.05)
+    pool.putconn(conn)
+    waiter.join(2.0)
+
+    assert got == [conn]
+    assert len(connections) == 1
+
+
+def test_release_rolls_back_open_transaction(connections):
+    pool = PostgresPool(minconn=0, maxconn=1)
+    conn = pool.getconn()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+
+    pool.putconn(conn)
+
+    assert conn.rollbacks == 1
+    assert pool.stats()["idle"] == 1
+
+
+def test_release_discards_broken_connection(connections):
+    pool = PostgresPool(minconn=0, maxconn=1)
+    conn = pool.getconn()
+    conn.closed = 2
+
+    pool.putconn(conn)
+
+    stats = pool.stats()
+    assert stats["size"] == 0
+    assert stats["connections_discarded"] == 1
+    assert pool.getconn() is not conn
+
+
+def test_invalid_sizes_rejected():
+    with pytest.raises(ValueError):
+        PostgresPool(minconn=3, maxconn=2)
+
+
+def test_db_connection_maps_timeout_to_runtime_error(connections, monkeypatch):
+    pool = PostgresPool(minconn=0, maxconn=1, timeout=0.01)
+    monkeypatch.setattr(postgres, "_pool", pool)
+    pool.getconn()
+
+    with pytest.raises(RuntimeError):
+        with postgres.db_connection():
+            pass
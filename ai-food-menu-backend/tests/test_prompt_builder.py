@@ -0,0 +1,140 @@
+import pytest
+
+from llm import prompt_builder
+from llm.llm_metrics import PromptSizeTracker
+from llm.prompt_builder import (
+    CHAT_INSTRUCTION,
+    INSIGHT_INSTRUCTION,
+    MenuPromptBuilder,
+    rank_warnings,
+)
+
+MENU = {"name": "Paneer Tikka", "category": "Starters", "price": 240, "is_available": True}
+
+
+def _ingredient(name, freshness, warnings=()):
+    return {
+        "name": name,
+        "final_freshness": freshness,
+        "risk_level": "High" if freshness < 40 else "Low",
+        "warnings": list(warnings),
+    }
+
+
+def _payload(ingredients):
+    return {
+        "menu": MENU,
+        "overall_freshness": 61.5,
+        "overall_risk": "Medium",
+        "ingredients": ingredients,
+    }
+
+
+@pytest.fixture
+def sizes(monkeypatch):
+    sizes = PromptSizeTracker()
+    monkeypatch.setattr(prompt_builder, "prompt_sizes", sizes)
+    return sizes
+
+
+def test_rank_warnings_dedupes_and_orders_by_severity():
+    ranked = rank_warnings([
+        "Stored near expiry",
+        "Check labelling",
+        "EXPIRED two days ago",
+        "stored  NEAR expiry ",
+        "",
+        "Temperature above 8°C",
+        "expired two days ago",
+    ])
+
+    assert ranked == [
+        "EXPIRED two days ago",
+        "Temperature above 8°C",
+        "Stored near expiry",
+        "Check labelling",
+    ]
+
+
+def test_rank_warnings_keeps_order_of_ties():
+    assert rank_warnings(["Unsafe storage", "Temperature spike"]) == [
+        "Unsafe storage",
+        "Temperature spike",
+    ]
+
+
+def test_small_payload_is_kept_whole(sizes):
+    prompt = MenuPromptBuilder.build_prompt(
+        _payload([_ingredient("Paneer", 90), _ingredient("Capsicum", 70, ["Near expiry"])]),
+        endpoint="insight",
+    )
+
+    assert "- Paneer: 90/100" in prompt
+    assert "⚠ Near expiry" in prompt
+    assert "more ingredient(s)" not in prompt
+    assert sizes.stats()["insight"]["truncated_prompts"] == 0
+
+
+def test_over_budget_drops_freshest_ingredients_first(monkeypatch, sizes):
+    monkeypatch.setenv("PROMPT_MAX_CHARS", "900")
+    ingredients = [_ingredient(f"Spice {i:02d}", 50 + i) for i in range(40)]
+    ingredients.append(_ingredient("Cream", 12, ["Expired yesterday"]))
+
+    prompt = MenuPromptBuilder.build_prompt(_payload(ingredients), endpoint="insight")
+
+    assert len(prompt) <= 900
+    # Weakest first; the instruction survives the trim
+    assert prompt.index("- Cream: 12/100") < prompt.index("- Spice 00: 50/100")
+    assert "⚠ Expired yesterday" in prompt
+    assert "- Spice 39" not in prompt
+    assert "more ingredient(s), all fresher than those above)" in prompt
+    assert prompt.endswith(INSIGHT_INSTRUCTION)
+    assert sizes.stats()["insight"]["truncated_prompts"] == 1
+
+
+def test_warning_cap_keeps_safety_warnings(monkeypatch, sizes):
+    monkeypatch.setenv("PROMPT_MAX_WARNINGS_PER_INGREDIENT", "2")
+    warnings = ["Near expiry", "Check labelling", "Temperature above 8°C", "Expired"]
+
+    prompt = MenuPromptBuilder.build_prompt(
+        _payload([_ingredient("Cream", 12, warnings)]), endpoint="insight"
+    )
+
+    assert "⚠ Expired" in prompt
+    assert "⚠ Temperature above 8°C" in prompt
+    assert "Near expiry" not in prompt
+    assert "Check labelling" not in prompt
+    assert sizes.stats()["insight"]["dropped_warnings"] == 2
+
+
+def test_chat_prompt_keeps_question_when_trimmed(monkeypatch):
+    monkeypatch.setenv("PROMPT_MAX_CHARS", "700")
+    payload = {
+        "menu": MENU,
+        "ingredients": [
+            {"name": f"Herb {i:02d}", "freshness_score": 60 + i % 30, "risk_level": "Low"}
+            for i in range(60)
+        ],
+        "user_question": "Is it safe for kids?",
+    }
+
+    prompt = MenuPromptBuilder.build_prompt(payload)
+
+    assert len(prompt) <= 700
+    assert "Customer question: Is it safe for kids?" in prompt
+    assert prompt.endswith(CHAT_INSTRUCTION)
+    assert "more ingredient(s)" in prompt
+
+
+def test_batch_prompt_trims_each_dish(monkeypatch, sizes):
+    monkeypatch.setenv("PROMPT_DISH_MAX_CHARS", "500")
+    crowded = _payload([_ingredient(f"Spice {i:02d}", 50 + i) for i in range(40)])
+    small = _payload([_ingredient("Paneer", 90)])
+
+    prompt = MenuPromptBuilder.build_batch_prompt({"1": crowded, "2": small}, endpoint="batch")
+
+    first, second = prompt.split("[DISH 1]")[1].split("[DISH 2]")
+    assert len(first) <= 520
+    assert "more ingredient(s)" in first
+    assert "- Paneer: 90/100" in second
+    assert sizes.stats()["batch"]["truncated_prompts"] == 1
@@ -0,0 +1,226 @@
+import json
+from datetime import datetime, timedelta
+
+import asyncpg
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import sensors
+from app.services.sensor_ingest import (
+    deviation_flags,
+    latest_per_ingredient,
+    ndjson_readings,
+    parse_reading,
+    parse_readings,
+)
+
+NOW = datetime(2026, 5, 1, 12, 0, 0)
+
+
+def _reading(**fields):
+    reading = {
+        "ingredient_id": 12,
+        "storage_type": "Chiller",
+        "temperature": 3.5,
+        "humidity": 61,
+        "timestamp": "2026-05-01T11:00:00Z",
+    }
+    reading.update(fields)
+    return reading
+
+
+def test_valid_reading():
+    assert parse_reading(_reading(), NOW) == (
+        12, "Chiller", 3.5, 61.0, datetime(2026, 5, 1, 11, 0)
+    )
+
+
+@pytest.mark.parametrize("timestamp, expected", [
+    ("2026-05-01T13:00:00+02:00", datetime(2026, 5, 1, 11, 0)),
+    ("2026-05-01T11:00:00", datetime(2026, 5, 1, 11, 0)),
+    (1777633200, datetime(2026, 5, 1, 11, 0)),
+    (1777633200.5, datetime(2026, 5, 1, 11, 0, 0, 500000)),
+])
+def test_timestamps_become_naive_utc(timestamp, expected):
+    moment = parse_reading(_reading(timestamp=timestamp), NOW)[4]
+
+    assert moment.tzinfo is None
+    assert moment == expected
+
+
+def test_missing_timestamp_is_now():
+    reading = _reading()
+    del reading["timestamp"]
+
+    moment = parse_reading(reading)[4]
+    assert abs(moment - datetime.utcnow()) < timedelta(seconds=5)
+
+
+def test_last_checked_accepted_as_timestamp():
+    reading = _reading(last_checked="2026-05-01T10:00:00Z")
+    del reading["timestamp"]
+
+    assert parse_reading(reading, NOW)[4] == datetime(2026, 5, 1, 10, 0)
+
+
+def test_humidity_optional():
+    assert parse_reading(_reading(humidity=None), NOW)[3] is None
+
+
+@pytest.mark.parametrize("fields, message", [
+    ({"ingredient_id": "12"}, "ingredient_id must be an integer"),
+    ({"ingredient_id": True}, "ingredient_id must be an integer"),
+    ({"ingredient_id": 2 ** 31}, "ingredient_id out of range"),
+    ({"ingredient_id": 2 ** 70}, "ingredient_id out of range"),
+    ({"ingredient_id": -2 ** 31 - 1}, "ingredient_id out of range"),
+    ({"storage_type": ""}, "storage_type is required"),
+    ({"storage_type": "x" * 33}, "storage_type is too long"),
+    ({"temperature": "cold"}, "temperature must be a number"),
+    ({"temperature": None}, "temperature must be a number"),
+    ({"humidity": False}, "humidity must be a number"),
+    ({"timestamp": "2026-05-01T12:05:01Z"}, "timestamp is in the future"),
+    ({"timestamp": "yesterday"}, "Invalid isoformat"),
+    ({"timestamp": [2026]}, "invalid timestamp"),
+    ({"timestamp": 1e18}, "timestamp out of range"),
+    ({"timestamp": -1e18}, "timestamp out of range"),
+    ({"timestamp": 1e20}, "timestamp out of range"),
+    ({"timestamp": "0001-01-01T00:00:00+01:00"}, "timestamp out of range"),
+])
+def test_invalid_readings(fields, message):
+    with pytest.raises(ValueError, match=message):
+        parse_reading(_reading(**fields), NOW)
+
+
+def test_int4_bounds_accepted():
+    assert parse_reading(_reading(ingredient_id=2 ** 31 - 1), NOW)[0] == 2 ** 31 - 1
+    assert parse_reading(_reading(ingredient_id=-2 ** 31), NOW)[0] == -2 ** 31
+
+
+def test_clock_skew_allowance(monkeypatch):
+    within = _reading(timestamp="2026-05-01T12:04:59Z")
+    assert parse_reading(within, NOW)[4] == datetime(2026, 5, 1, 12, 4, 59)
+
+    monkeypatch.setenv("SENSOR_MAX_SKEW_SECONDS", "0")
+    with pytest.raises(ValueError, match="future"):
+        parse_reading(within, NOW)
+
+
+def test_parse_readings_reports_bad_ones_by_position():
+    parsed, errors = parse_readings([
+        _reading(timestamp=None),
+        "not an object",
+        _reading(ingredient_id=2 ** 40),
+        _reading(timestamp=1e20),
+        _reading(timestamp=1e18),
+    ])
+
+    assert len(parsed) == 1
+    assert [e.split(":")[0] for e in errors] == ["#1", "#2", "#3", "#4"]
+
+
+def test_deviation_flags():
+    flags = deviation_flags(
+        ["Chiller", "Chiller", "Freezer", "Freezer", "Dry"],
+        [5.0, 5.1, -10.0, -9.5, 30.0],
+    )
+
+    assert flags.tolist() == [False, True, False, True, False]
+
+
+def test_latest_per_ingredient():
+    ids = [3, 1, 3, 1, 2]
+    moments = [
+        datetime(2026, 5, 1, 10), datetime(2026, 5, 1, 9), datetime(2026, 5, 1, 11),
+        datetime(2026, 5, 1, 12), datetime(2026, 5, 1, 8),
+    ]
+
+    latest = latest_per_ingredient(ids, moments)
+
+    assert sorted(latest.tolist()) == [2, 3, 4]
+    assert latest_per_ingredient(np.array([7]), [moments[0]]).tolist() == [0]
+
+
+def test_ndjson_skips_blank_lines_and_reports_bad_json():
+    readings, errors = ndjson_readings(['{"a": 1}', "", "   ", "{bad", '{"b": 2}'])
+
+    assert readings == [{"a": 1}, {"b": 2}]
+    assert len(errors) == 1
+
+
+# -------------------------
+# Route: batches and failures
+# -------------------------
+
+class FakeIngestor:
+    """Accepts every batch until `fail_on` (1-based), which raises `error`."""
+
+    def __init__(self, fail_on=None, error=None):
+        self.ready = True
+        self.fail_on = fail_on
+        self.error = error
+        self.calls = 0
+
+    async def ingest(self, readings, rejected=0):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise self.error
+        return {"accepted": len(readings), "deviations": 0, "ingredients": 1}
+
+
+def _post_ndjson(monkeypatch, ingestor, lines):
+    monkeypatch.setattr(sensors, "sensor_ingestor", ingestor)
+    monkeypatch.setenv("SENSOR_BATCH_SIZE", "2")
+    app = FastAPI()
+    app.include_router(sensors.router)
+
+    return TestClient(app).post(
+        "/storage/readings",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+
+LINES = [json.dumps(_reading(ingredient_id=i)) for i in range(1, 8)] + ["{bad"]
+
+
+def test_ndjson_batches_all_written(monkeypatch):
+    response = _post_ndjson(monkeypatch, FakeIngestor(), LINES)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["accepted"], body["rejected"], body["batches"]) == (7, 1, 4)
+    assert "detail" not in body
+
+
+@pytest.mark.parametrize(
+    "error, status_code, detail",
+    [
+        (asyncpg.DataError("bad value"), 422, "Readings rejected by the database"),
+        (RuntimeError("pool closed"), 500, "DB unavailable"),
+    ],
+)
+def test_ndjson_failed_batch_reports_committed_ones(monkeypatch, error, status_code, detail):
+    ingestor = FakeIngestor(fail_on=3, error=error)
+
+    response = _post_ndjson(monkeypatch, ingestor, LINES)
+
+    assert response.status_code == status_code
+    body = response.json()
+    # Batches 1-2 were written; nothing after the failed one was tried
+    assert (body["accepted"], body["batches"], body["detail"]) == (4, 2, detail)
+    assert ingestor.calls == 3
+
+
+def test_json_array_failure_keeps_detail(monkeypatch):
+    ingestor = FakeIngestor(fail_on=1, error=asyncpg.DataError("bad value"))
+    monkeypatch.setattr(sensors, "sensor_ingestor", ingestor)
+    app = FastAPI()
+    app.include_router(sensors.router)
+
+    response = TestClient(app).post("/storage/readings", json=[_reading()])
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Readings rejected by the database"
+    assert response.json()["accepted"] == 0
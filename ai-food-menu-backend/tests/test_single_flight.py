@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm.single_flight import SingleFlight, single_flight_for
+
+
+def test_concurrent_async_calls_share_one_upstream_call():
+    group = SingleFlight("test")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(group.ado("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert len(calls) == 1
+
+    stats = group.stats()
+    assert stats["upstream_calls"] == 1
+    assert stats["merged_calls"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_async_exception_reaches_every_waiter():
+    group = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def main():
+        return await asyncio.gather(
+            *(group.ado("k", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert group.stats()["upstream_calls"] == 1
+
+
+def test_finished_key_is_not_reused():
+    group = SingleFlight("test")
+    counter = iter(range(10))
+
+    async def fetch():
+        return next(counter)
+
+    async def main():
+        return [await group.ado("k", fetch), await group.ado("k", fetch)]
+
+    assert asyncio.run(main()) == [0, 1]
+
+
+def test_one_cancelled_waiter_does_not_cancel_the_others():
+    group = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        first = asyncio.ensure_future(group.ado("k", fetch))
+        second = asyncio.ensure_future(group.ado("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "answer"
+    assert group.stats()["abandoned"] == 0
+
+
+def test_last_waiter_cancelling_abandons_the_call():
+    group = SingleFlight("test")
+    finished = []
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def main():
+        waiter = asyncio.ensure_future(group.ado("k", fetch))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.06)
+
+    asyncio.run(main())
+    assert finished == []
+    assert group.stats()["abandoned"] == 1
+
+
+def test_thread_callers_share_one_call():
+    group = SingleFlight("test")
+    calls = []
+    started = threading.Event()
+    results = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "answer"
+
+    leader = threading.Thread(target=lambda: results.append(group.do("k", fetch)))
+    leader.start()
+    started.wait(1)
+    followers = [
+        threading.Thread(target=lambda: results.append(group.do("k", fetch)))
+        for _ in range(3)
+    ]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join(1)
+
+    assert results == ["answer"] * 4
+    assert len(calls) == 1
+
+
+def test_disabled_route_has_no_group(monkeypatch):
+    monkeypatch.setenv("LLM_SINGLE_FLIGHT_ROUTES", "insight")
+
+    assert single_flight_for("chat") is None
+    assert single_flight_for("insight") is single_flight_for("insight")
@@ -0,0 +1,143 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from app.services.telemetry_buffer import TelemetryBuffer, TelemetryRing, _epoch
+
+T0 = 1_700_000_000.0
+HOUR = 3600.0
+
+
+def _ring(capacity=64, windows=(HOUR,), safe_range=(0.0, 4.0), max_gap=300.0):
+    return TelemetryRing(capacity, windows, safe_range, max_gap)
+
+
+def _close(a, b):
+    if a is None or b is None:
+        return a is b
+    return a == pytest.approx(b, rel=1e-6, abs=1e-6)
+
+
+def test_window_matches_scan_under_random_load():
+    rng = random.Random(5)
+    ring = _ring(capacity=200, windows=(HOUR, 4 * HOUR))
+    moment = now = T0
+
+    for _ in range(3000):
+        moment += rng.choice([1, 5, 30, 120, 900])
+        ring.push(moment, rng.uniform(-2, 8), rng.choice([None, 55.0, 70.0]))
+        if rng.random() < 0.1:
+            ring.set_safe_range(rng.choice([(0.0, 4.0), (2.0, 8.0)]))
+
+        # summary() needs a non-decreasing `now`
+        now = max(now, moment + rng.uniform(0, 600))
+        for seconds in (HOUR, 4 * HOUR):
+            fast, scanned = ring.summary(seconds, now), ring._scan(seconds, now)
+            assert (fast is None) == (scanned is None)
+            if fast is not None:
+                for key in fast:
+                    assert _close(fast[key], scanned[key]), key
+
+
+def test_empty_ring_and_expired_window():
+    ring = _ring()
+    assert ring.summary(HOUR, T0) is None
+
+    ring.push(T0, 3.0, None)
+    assert ring.summary(HOUR, T0 + HOUR)["samples"] == 1
+    assert ring.summary(HOUR, T0 + HOUR + 0.001) is None
+
+
+def test_older_reading_rejected():
+    ring = _ring()
+    assert ring.push(T0, 3.0, None)
+    assert ring.push(T0, 3.5, None)
+    assert not ring.push(T0 - 1, 2.0, None)
+    assert ring.count == 2
+
+
+def test_min_max_follow_evictions():
+    ring = _ring(windows=(100.0,))
+    ring.push(T0, 9.0, None)
+    ring.push(T0 + 50, 1.0, None)
+    ring.push(T0 + 90, 5.0, None)
+
+    summary = ring.summary(100.0, T0 + 120)
+    assert (summary["temp_min"], summary["temp_max"]) == (1.0, 5.0)
+
+    summary = ring.summary(100.0, T0 + 160)
+    assert (summary["temp_min"], summary["temp_max"]) == (5.0, 5.0)
+
+
+def test_out_of_range_time_is_capped_by_max_gap():
+    ring = _ring(max_gap=300.0)
+    ring.push(T0, 9.0, None)            # out of range, silent for 20 min
+    ring.push(T0 + 1200, 3.0, None)     # back in range
+
+    assert ring.summary(HOUR, T0 + 1200)["out_of_range_seconds"] == 300.0
+
+
+def test_newest_out_of_range_reading_counts_until_now():
+    ring = _ring(max_gap=300.0)
+    ring.push(T0, 3.0, None)
+    ring.push(T0 + 60, 9.0, None)
+
+    assert ring.summary(HOUR, T0 + 120)["out_of_range_seconds"] == 60.0
+    assert ring.summary(HOUR, T0 + 2000)["out_of_range_seconds"] == 300.0
+
+
+def test_capacity_overwrite_leaves_window():
+    ring = _ring(capacity=4)
+    for i in range(10):
+        ring.push(T0 + i, float(i), 50.0)
+
+    summary = ring.summary(HOUR, T0 + 10)
+    assert summary["samples"] == 4
+    assert (summary["temp_min"], summary["temp_max"]) == (6.0, 9.0)
+    assert summary["since"] == T0 + 6
+
+
+def test_safe_range_change_reflags_kept_readings():
+    ring = _ring(safe_range=(0.0, 4.0))
+    ring.push(T0, 6.0, None)
+    ring.push(T0 + 60, 3.0, None)
+    assert ring.summary(HOUR, T0 + 60)["out_of_range_seconds"] == 60.0
+
+    ring.set_safe_range((2.0, 8.0))
+    assert ring.summary(HOUR, T0 + 60)["out_of_range_seconds"] == 0.0
+
+
+def test_complete_buckets_hold_back_the_newest_bucket():
+    ring = _ring()
+    start = 1_700_000_040.0  # minute boundary
+    for offset in (0, 20, 40, 60, 70):
+        ring.push(start + offset, 3.0, None)
+
+    rows, persisted = ring.complete_buckets(60)
+    assert [row[1] for row in rows] == [3]
+    assert persisted == 3
+
+    ring.persisted = persisted
+    rows, persisted = ring.complete_buckets(60, final=True)
+    assert [row[1] for row in rows] == [2]
+    assert persisted == 5
+
+
+def test_buffer_routes_readings_per_ingredient():
+    buffer = TelemetryBuffer(capacity=16, windows_hours=(4,))
+    now = datetime.utcnow().replace(microsecond=0)
+    buffer.record_batch([
+        (1, "Chiller", 3.0, None, now),
+        (2, "Chiller", 7.0, 60.0, now),
+        (1, "Chiller", 5.0, None, now),
+    ])
+    # Older than ingredient 1's newest: dropped
+    buffer.submit([(1, "Chiller", 1.0, None, datetime(2020, 1, 1))]).result(1)
+    buffer.drain()
+
+    first = buffer.summary(1, "Meat", now=_epoch(now))
+    assert first["samples"] == 2 and first["temp_max"] == 5.0
+    assert buffer.summary(2, now=_epoch(now))["humidity_mean"] == 60.0
+    assert buffer.summary(3, now=_epoch(now)) is None
+    assert buffer.stats()["late_readings"] == 1